@@ -0,0 +1,44 @@
+"""create langgraph checkpoints
+
+Revision ID: 5b8d2f61a0c3
+Revises: c4e1a9b27d35
+Create Date: 2026-10-17 14:03:51.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d2f61a0c3'
+down_revision: Union[str, Sequence[str], None] = 'c4e1a9b27d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store the latest LangGraph checkpoint per thread for the postgres checkpointer."""
+    op.create_table(
+        "langgraph_checkpoints",
+        sa.Column("thread_id", sa.String(length=256), primary_key=True),
+        sa.Column("checkpoint_ns", sa.String(length=256), primary_key=True,
+                  server_default=sa.text("''")),
+        sa.Column("kind", sa.String(length=16), primary_key=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True),
+                  nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(timezone=True),
+                  nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("ix_langgraph_checkpoints_expires_at",
+                    "langgraph_checkpoints", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Drop the LangGraph checkpoint table."""
+    op.drop_index("ix_langgraph_checkpoints_expires_at",
+                  table_name="langgraph_checkpoints")
+    op.drop_table("langgraph_checkpoints")
@@ -0,0 +1,37 @@
+"""per-task langgraph checkpoint writes
+
+Revision ID: 9e2a47c1d8b6
+Revises: 5b8d2f61a0c3
+Create Date: 2026-10-17 18:20:37.551904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2a47c1d8b6'
+down_revision: Union[str, Sequence[str], None] = '5b8d2f61a0c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Widen `kind` to hold one `writes:<checkpoint_id>:<task_id>` row per task."""
+    # Single shared writes rows are superseded; threads resume from their checkpoint.
+    op.execute("DELETE FROM langgraph_checkpoints WHERE kind = 'writes'")
+    op.alter_column("langgraph_checkpoints", "kind",
+                    existing_type=sa.String(length=16),
+                    type_=sa.String(length=128),
+                    existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Drop per-task writes rows and restore the narrow `kind` column."""
+    op.execute("DELETE FROM langgraph_checkpoints WHERE kind LIKE 'writes:%'")
+    op.alter_column("langgraph_checkpoints", "kind",
+                    existing_type=sa.String(length=128),
+                    type_=sa.String(length=16),
+                    existing_nullable=False)
@@ -0,0 +1,41 @@
+"""tune memory embedding vector index
+
+Revision ID: c4e1a9b27d35
+Revises: 8f327fc4442f
+Create Date: 2026-10-17 09:12:04.118220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.settings import settings
+from app.memory.vector_index import (
+    VECTOR_INDEX_TYPES,
+    create_vector_index_sql,
+    vector_index_name,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1a9b27d35'
+down_revision: Union[str, Sequence[str], None] = '8f327fc4442f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Rebuild the ANN index with explicit, settings-driven build parameters."""
+    for index_type in VECTOR_INDEX_TYPES:
+        op.execute(f"DROP INDEX IF EXISTS {vector_index_name(index_type)}")
+    op.execute(create_vector_index_sql(settings))
+
+
+def downgrade() -> None:
+    """Restore the default-parameter HNSW index from the initial schema."""
+    for index_type in VECTOR_INDEX_TYPES:
+        op.execute(f"DROP INDEX IF EXISTS {vector_index_name(index_type)}")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_memory_embeddings_embedding_hnsw "
+        "ON memory_embeddings USING hnsw (embedding vector_cosine_ops)"
+    )
@@ -1,6 +1,10 @@
+import json
 import logging
+from collections.abc import AsyncIterator
+from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from app.schemas.chat import (
     ChatHistoryResponse,
@@ -18,7 +22,7 @@ router = APIRouter()
 orchestrator = ChatOrchestrator()
 
 
-def _chat_forced_role(payload: RoleChatRequest, *, role: ChatRole) -> ChatResponse:
+async def _chat_forced_role(payload: RoleChatRequest, *, role: ChatRole) -> ChatResponse:
     request = ChatRequest(
         user_id=payload.user_id,
         role=role,
@@ -26,7 +30,22 @@ def _chat_forced_role(payload: RoleChatRequest, *, role: ChatRole) -> ChatRespon
         message=payload.message,
         attachment=payload.attachment,
     )
-    return orchestrator.generate_reply(request)
+    return await orchestrator.agenerate_reply(request)
+
+
+def _sse_event(event: str, payload: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def _chat_event_stream(payload: ChatRequest) -> AsyncIterator[str]:
+    try:
+        async for event, data in orchestrator.astream_reply(payload):
+            yield _sse_event(event, data)
+    except Exception:
+        # Headers are already sent once streaming starts, so failures are
+        # reported in-band instead of as an HTTP status.
+        logger.exception("chat_stream_endpoint_error user_id=%s role=%s", payload.user_id, payload.role)
+        yield _sse_event("error", {"detail": "Internal error processing chat request."})
 
 
 def _history_forced_role(
@@ -45,36 +64,45 @@ def _history_forced_role(
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest) -> ChatResponse:
+async def chat(payload: ChatRequest) -> ChatResponse:
     try:
-        return orchestrator.generate_reply(payload)
+        return await orchestrator.agenerate_reply(payload)
     except Exception:
         logger.exception("chat_endpoint_error user_id=%s role=%s", payload.user_id, payload.role)
         raise HTTPException(status_code=500, detail="Internal error processing chat request.")
 
 
+@router.post("/chat/stream")
+async def chat_stream(payload: ChatRequest) -> StreamingResponse:
+    return StreamingResponse(
+        _chat_event_stream(payload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/chat/companion", response_model=ChatResponse)
-def chat_companion(payload: RoleChatRequest) -> ChatResponse:
+async def chat_companion(payload: RoleChatRequest) -> ChatResponse:
     try:
-        return _chat_forced_role(payload, role="companion")
+        return await _chat_forced_role(payload, role="companion")
     except Exception:
         logger.exception("chat_companion_endpoint_error user_id=%s", payload.user_id)
         raise HTTPException(status_code=500, detail="Internal error processing companion chat request.")
 
 
 @router.post("/chat/guide", response_model=ChatResponse)
-def chat_guide(payload: RoleChatRequest) -> ChatResponse:
+async def chat_guide(payload: RoleChatRequest) -> ChatResponse:
     try:
-        return _chat_forced_role(payload, role="local_guide")
+        return await _chat_forced_role(payload, role="local_guide")
     except Exception:
         logger.exception("chat_guide_endpoint_error user_id=%s", payload.user_id)
         raise HTTPException(status_code=500, detail="Internal error processing guide chat request.")
 
 
 @router.post("/chat/study", response_model=ChatResponse)
-def chat_study(payload: RoleChatRequest) -> ChatResponse:
+async def chat_study(payload: RoleChatRequest) -> ChatResponse:
     try:
-        return _chat_forced_role(payload, role="study_guide")
+        return await _chat_forced_role(payload, role="study_guide")
     except Exception:
         logger.exception("chat_study_endpoint_error user_id=%s", payload.user_id)
         raise HTTPException(status_code=500, detail="Internal error processing study chat request.")
@@ -5,6 +5,7 @@ from sqlalchemy import text
 from fastapi import APIRouter, Response, status
 
 from app.core.database import SessionLocal
+from app.core.metrics import metrics
 from app.core.redis_client import get_redis_client
 from app.core.settings import settings
 from app.providers.router import ProviderRouter
@@ -13,6 +14,7 @@ from app.schemas.health import (
     ExaProbeResult,
     HealthDependenciesResponse,
     HealthResponse,
+    MetricsResponse,
     RuntimeStatusResponse,
 )
 
@@ -136,6 +138,11 @@ def health_exa_probe(query: str = "popular cafes") -> ExaProbeResult:
         )
 
 
+@router.get("/health/metrics", response_model=MetricsResponse)
+def health_metrics() -> MetricsResponse:
+    return MetricsResponse(**metrics.snapshot())
+
+
 @router.get("/ready", response_model=HealthDependenciesResponse)
 def readiness(response: Response) -> HealthDependenciesResponse:
     payload = health_dependencies()
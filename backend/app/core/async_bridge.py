@@ -0,0 +1,47 @@
+import asyncio
+import concurrent.futures
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_bridge_loop: asyncio.AbstractEventLoop | None = None
+_bridge_lock = threading.Lock()
+
+
+def _get_bridge_loop() -> asyncio.AbstractEventLoop:
+    global _bridge_loop
+    with _bridge_lock:
+        if _bridge_loop is None or _bridge_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="async-bridge",
+                daemon=True,
+            )
+            thread.start()
+            _bridge_loop = loop
+        return _bridge_loop
+
+
+def run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Coroutines run on one long-lived background loop rather than a fresh
+    `asyncio.run` loop per call, so loop-bound clients (async Redis, async
+    SQLAlchemy pools) are reused across sync callers.
+    """
+    future = asyncio.run_coroutine_threadsafe(coroutine, _get_bridge_loop())
+    return future.result()
+
+
+def submit(coroutine: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+    """Schedule a coroutine on the bridge loop without waiting for it."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_bridge_loop())
+
+
+async def arun_on_bridge(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Await a coroutine that must run on the bridge loop from any other loop."""
+    return await asyncio.wrap_future(submit(coroutine))
@@ -1,7 +1,15 @@
+import asyncio
 from collections.abc import Generator
+from weakref import WeakKeyDictionary
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.core.settings import settings
@@ -36,6 +44,11 @@ def create_sqlalchemy_engine(database_url: str | None = None) -> Engine:
     return create_engine(resolved_database_url, **_engine_options(resolved_database_url))
 
 
+def create_async_sqlalchemy_engine(database_url: str | None = None) -> AsyncEngine:
+    resolved_database_url = database_url or settings.sqlalchemy_database_url
+    return create_async_engine(resolved_database_url, **_engine_options(resolved_database_url))
+
+
 engine = create_sqlalchemy_engine()
 SessionLocal = sessionmaker(
     bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
@@ -47,3 +60,27 @@ def get_db_session() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+# Async pooled connections are bound to the event loop that opened them, so
+# each loop (uvicorn's, the sync bridge's) gets its own engine and pool.
+_async_session_factories: "WeakKeyDictionary[asyncio.AbstractEventLoop, async_sessionmaker[AsyncSession]]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    loop = asyncio.get_running_loop()
+    factory = _async_session_factories.get(loop)
+    if factory is None:
+        factory = async_sessionmaker(
+            bind=create_async_sqlalchemy_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        _async_session_factories[loop] = factory
+    return factory
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    return get_async_session_factory()()
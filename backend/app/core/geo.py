@@ -0,0 +1,92 @@
+import math
+from typing import Any
+
+
+def approx_distance_meters(
+    *, origin_latitude: float, origin_longitude: float, latitude: float, longitude: float
+) -> int:
+    # Equirectangular approximation is accurate enough for nearby HK urban ranges.
+    meters_per_degree_lat = 111_320.0
+    meters_per_degree_lng = 111_320.0 * math.cos(math.radians(origin_latitude))
+    delta_lat = (latitude - origin_latitude) * meters_per_degree_lat
+    delta_lng = (longitude - origin_longitude) * meters_per_degree_lng
+    return max(1, int(round(math.sqrt((delta_lat * delta_lat) + (delta_lng * delta_lng)))))
+
+
+def format_distance_text(distance_meters: int) -> str:
+    if distance_meters < 1000:
+        rounded = max(50, int(round(distance_meters / 50.0) * 50))
+        return f"{rounded} m"
+    return f"{distance_meters / 1000:.1f} km"
+
+
+def format_walking_duration_text(distance_meters: int) -> str:
+    # Approximate walking speed: 4.8 km/h => ~80 m/min.
+    minutes = max(3, int(round(distance_meters / 80)))
+    return f"{minutes} mins"
+
+
+def approximate_route(
+    *,
+    origin_latitude: float,
+    origin_longitude: float,
+    destination_latitude: float,
+    destination_longitude: float,
+    travel_mode: str
+) -> dict[str, Any]:
+    """Route metadata from straight-line distance, shaped like `MapsProvider.get_route`."""
+    distance_meters = approx_distance_meters(
+        origin_latitude=origin_latitude,
+        origin_longitude=origin_longitude,
+        latitude=destination_latitude,
+        longitude=destination_longitude,
+    )
+    return {
+        "distance_meters": distance_meters,
+        "distance_text": format_distance_text(distance_meters),
+        "duration_seconds": None,
+        # Straight-line distance only supports a walking-time estimate.
+        "duration_text": (
+            format_walking_duration_text(distance_meters)
+            if travel_mode == "walking"
+            else None
+        ),
+        "travel_mode": travel_mode,
+    }
+
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 6) -> str:
+    """Standard base32 geohash; precision 6 is a cell of roughly 1.2 km x 0.6 km."""
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    chars: list[str] = []
+    bits = 0
+    bit_count = 0
+    even_bit = True
+    while len(chars) < max(1, precision):
+        if even_bit:
+            midpoint = (longitude_range[0] + longitude_range[1]) / 2
+            if longitude >= midpoint:
+                bits = (bits << 1) | 1
+                longitude_range[0] = midpoint
+            else:
+                bits <<= 1
+                longitude_range[1] = midpoint
+        else:
+            midpoint = (latitude_range[0] + latitude_range[1]) / 2
+            if latitude >= midpoint:
+                bits = (bits << 1) | 1
+                latitude_range[0] = midpoint
+            else:
+                bits <<= 1
+                latitude_range[1] = midpoint
+        even_bit = not even_bit
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
@@ -0,0 +1,69 @@
+import threading
+from typing import Any
+
+
+class MetricsRegistry:
+    """
+    Minimal thread-safe in-process metrics store.
+
+    Counters only go up, gauges hold the latest value and observations keep
+    count/sum/max/last so callers can derive averages without a time-series
+    backend. Exposed through `GET /health/metrics`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._observations: dict[str, dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = float(value)
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            stats = self._observations.get(name)
+            if stats is None:
+                stats = {"count": 0.0, "sum": 0.0, "max": value, "last": value}
+                self._observations[name] = stats
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["max"] = max(stats["max"], value)
+            stats["last"] = value
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0.0)
+
+    def average(self, name: str) -> float:
+        with self._lock:
+            stats = self._observations.get(name)
+            return stats["sum"] / stats["count"] if stats and stats["count"] else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "observations": {
+                    name: {
+                        **stats,
+                        "avg": stats["sum"] / stats["count"] if stats["count"] else 0.0,
+                    }
+                    for name, stats in self._observations.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+metrics = MetricsRegistry()
@@ -1,8 +1,11 @@
+import asyncio
 import json
 from functools import lru_cache
 from typing import Any
+from weakref import WeakKeyDictionary
 
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
 from app.schemas.chat import ChatRole
 from app.core.settings import settings
@@ -23,6 +26,51 @@ def get_redis_client(redis_url: str | None = None) -> Redis:
     )
 
 
+@lru_cache(maxsize=1)
+def get_redis_binary_client() -> Redis:
+    """Like `get_redis_client`, but returns raw bytes for binary payloads."""
+    return Redis.from_url(
+        settings.effective_redis_url,
+        decode_responses=False,
+        socket_connect_timeout=1,
+        socket_timeout=1,
+    )
+
+
+_async_redis_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRedis]" = WeakKeyDictionary()
+_async_redis_binary_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRedis]" = WeakKeyDictionary()
+
+
+def get_async_redis_client() -> AsyncRedis:
+    """Return an asyncio Redis client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        client = AsyncRedis.from_url(
+            settings.effective_redis_url,
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        _async_redis_clients[loop] = client
+    return client
+
+
+def get_async_redis_binary_client() -> AsyncRedis:
+    """Return an asyncio Redis client bound to the running loop that returns raw bytes."""
+    loop = asyncio.get_running_loop()
+    client = _async_redis_binary_clients.get(loop)
+    if client is None:
+        client = AsyncRedis.from_url(
+            settings.effective_redis_url,
+            decode_responses=False,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        _async_redis_binary_clients[loop] = client
+    return client
+
+
 def serialize_json(value: Any) -> str:
     return json.dumps(value, ensure_ascii=True)
 
@@ -25,6 +25,22 @@ class Settings(BaseSettings):
         default=False, alias="FEATURE_LANGGRAPH_ENABLED")
     langgraph_checkpointer_backend: str = Field(
         default="memory", alias="LANGGRAPH_CHECKPOINTER_BACKEND")
+    langgraph_memory_checkpoint_max_bytes: int = Field(
+        default=64 * 1024 * 1024, alias="LANGGRAPH_MEMORY_CHECKPOINT_MAX_BYTES")
+    langgraph_history_window_enabled: bool = Field(
+        default=True, alias="LANGGRAPH_HISTORY_WINDOW_ENABLED")
+    langgraph_history_window_turns: int = Field(
+        default=6, alias="LANGGRAPH_HISTORY_WINDOW_TURNS")
+    langgraph_history_window_token_budget: int = Field(
+        default=2000, alias="LANGGRAPH_HISTORY_WINDOW_TOKEN_BUDGET")
+    langgraph_history_summary_max_tokens: int = Field(
+        default=300, alias="LANGGRAPH_HISTORY_SUMMARY_MAX_TOKENS")
+    prompt_token_budget: int = Field(
+        default=4000, alias="PROMPT_TOKEN_BUDGET")
+    prompt_item_max_tokens: int = Field(
+        default=120, alias="PROMPT_ITEM_MAX_TOKENS")
+    prompt_tokenizer: str = Field(
+        default="heuristic", alias="PROMPT_TOKENIZER")
 
     feature_minimax_enabled: bool = Field(
         default=False, alias="FEATURE_MINIMAX_ENABLED")
@@ -50,6 +66,11 @@ class Settings(BaseSettings):
         default=True, alias="FEATURE_VOICE_API_ENABLED")
     feature_weather_enabled: bool = Field(
         default=True, alias="FEATURE_WEATHER_ENABLED")
+    weather_cache_enabled: bool = Field(default=True, alias="WEATHER_CACHE_ENABLED")
+    weather_cache_grid_degrees: float = Field(
+        default=0.05, alias="WEATHER_CACHE_GRID_DEGREES")
+    weather_cache_ttl_seconds: int = Field(default=600, alias="WEATHER_CACHE_TTL_SECONDS")
+    weather_cache_max_entries: int = Field(default=512, alias="WEATHER_CACHE_MAX_ENTRIES")
     feature_google_maps_enabled: bool = Field(
         default=True, alias="FEATURE_GOOGLE_MAPS_ENABLED")
 
@@ -63,14 +84,73 @@ class Settings(BaseSettings):
         default="walking", alias="GOOGLE_MAPS_TRANSPORT_MODE")
     google_maps_photo_max_width: int = Field(
         default=800, alias="GOOGLE_MAPS_PHOTO_MAX_WIDTH")
+    place_search_cache_enabled: bool = Field(
+        default=True, alias="PLACE_SEARCH_CACHE_ENABLED")
+    place_search_cache_geohash_precision: int = Field(
+        default=6, alias="PLACE_SEARCH_CACHE_GEOHASH_PRECISION")
+    place_search_cache_ttl_seconds: int = Field(
+        default=900, alias="PLACE_SEARCH_CACHE_TTL_SECONDS")
+    place_search_cache_stale_seconds: int = Field(
+        default=3600, alias="PLACE_SEARCH_CACHE_STALE_SECONDS")
+    place_search_cache_max_entries: int = Field(
+        default=1024, alias="PLACE_SEARCH_CACHE_MAX_ENTRIES")
+    route_cache_enabled: bool = Field(default=True, alias="ROUTE_CACHE_ENABLED")
+    route_cache_geohash_precision: int = Field(
+        default=7, alias="ROUTE_CACHE_GEOHASH_PRECISION")
+    route_cache_ttl_seconds: int = Field(default=600, alias="ROUTE_CACHE_TTL_SECONDS")
+    route_cache_max_entries: int = Field(default=4096, alias="ROUTE_CACHE_MAX_ENTRIES")
 
     open_meteo_base_url: str = Field(
         default="https://api.open-meteo.com", alias="OPEN_METEO_BASE_URL")
     exa_api_key: str = Field(default="", alias="EXA_API_KEY")
     exa_base_url: str = Field(default="https://api.exa.ai", alias="EXA_BASE_URL")
     exa_top_k: int = Field(default=3, alias="EXA_TOP_K")
+    retrieval_cache_enabled: bool = Field(default=True, alias="RETRIEVAL_CACHE_ENABLED")
+    retrieval_cache_ttl_seconds: int = Field(
+        default=1800, alias="RETRIEVAL_CACHE_TTL_SECONDS")
+    retrieval_cache_max_entries: int = Field(
+        default=512, alias="RETRIEVAL_CACHE_MAX_ENTRIES")
+    fresh_retrieval_gate_enabled: bool = Field(
+        default=True, alias="FRESH_RETRIEVAL_GATE_ENABLED")
+    fresh_retrieval_gate_signal_only_roles: str = Field(
+        default="", alias="FRESH_RETRIEVAL_GATE_SIGNAL_ONLY_ROLES")
     provider_timeout_seconds: float = Field(
         default=6.0, alias="PROVIDER_TIMEOUT_SECONDS")
+    provider_http_max_connections: int = Field(
+        default=20, alias="PROVIDER_HTTP_MAX_CONNECTIONS")
+    provider_http_keepalive_seconds: float = Field(
+        default=60.0, alias="PROVIDER_HTTP_KEEPALIVE_SECONDS")
+    single_flight_enabled: bool = Field(default=True, alias="SINGLE_FLIGHT_ENABLED")
+    single_flight_backend: str = Field(
+        default="redis", alias="SINGLE_FLIGHT_BACKEND")
+    single_flight_lock_ttl_seconds: float = Field(
+        default=10.0, alias="SINGLE_FLIGHT_LOCK_TTL_SECONDS")
+    single_flight_wait_seconds: float = Field(
+        default=8.0, alias="SINGLE_FLIGHT_WAIT_SECONDS")
+
+    chat_safety_deadline_seconds: float = Field(
+        default=4.0, alias="CHAT_SAFETY_DEADLINE_SECONDS")
+    chat_short_term_memory_deadline_seconds: float = Field(
+        default=0.5, alias="CHAT_SHORT_TERM_MEMORY_DEADLINE_SECONDS")
+    chat_long_term_memory_deadline_seconds: float = Field(
+        default=1.5, alias="CHAT_LONG_TERM_MEMORY_DEADLINE_SECONDS")
+    chat_fresh_retrieval_deadline_seconds: float = Field(
+        default=3.0, alias="CHAT_FRESH_RETRIEVAL_DEADLINE_SECONDS")
+
+    chat_persistence_write_behind_enabled: bool = Field(
+        default=True, alias="CHAT_PERSISTENCE_WRITE_BEHIND_ENABLED")
+    chat_persistence_queue_backend: str = Field(
+        default="redis", alias="CHAT_PERSISTENCE_QUEUE_BACKEND")
+    chat_persistence_batch_size: int = Field(
+        default=50, alias="CHAT_PERSISTENCE_BATCH_SIZE")
+    chat_persistence_batch_wait_ms: int = Field(
+        default=200, alias="CHAT_PERSISTENCE_BATCH_WAIT_MS")
+    chat_persistence_max_attempts: int = Field(
+        default=5, alias="CHAT_PERSISTENCE_MAX_ATTEMPTS")
+    chat_persistence_retry_backoff_seconds: float = Field(
+        default=2.0, alias="CHAT_PERSISTENCE_RETRY_BACKOFF_SECONDS")
+    chat_persistence_workers: int = Field(
+        default=1, alias="CHAT_PERSISTENCE_WORKERS")
 
     memory_long_term_strategy: str = Field(
         default="hybrid_profile_retrieval", alias="MEMORY_LONG_TERM_STRATEGY")
@@ -84,6 +164,30 @@ class Settings(BaseSettings):
         default="text-embedding-3-small", alias="MEMORY_EMBEDDING_MODEL")
     memory_embedding_dimensions: int = Field(
         default=1536, alias="MEMORY_EMBEDDING_DIMENSIONS")
+    memory_embedding_batch_size: int = Field(
+        default=64, alias="MEMORY_EMBEDDING_BATCH_SIZE")
+    memory_embedding_batch_wait_ms: int = Field(
+        default=250, alias="MEMORY_EMBEDDING_BATCH_WAIT_MS")
+    embedding_cache_enabled: bool = Field(
+        default=True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_max_entries: int = Field(
+        default=2048, alias="EMBEDDING_CACHE_MAX_ENTRIES")
+    embedding_cache_ttl_seconds: int = Field(
+        default=86400, alias="EMBEDDING_CACHE_TTL_SECONDS")
+    embedding_cache_encoding: str = Field(
+        default="float16", alias="EMBEDDING_CACHE_ENCODING")
+    memory_vector_index_type: str = Field(
+        default="hnsw", alias="MEMORY_VECTOR_INDEX_TYPE")
+    memory_vector_hnsw_m: int = Field(
+        default=16, alias="MEMORY_VECTOR_HNSW_M")
+    memory_vector_hnsw_ef_construction: int = Field(
+        default=64, alias="MEMORY_VECTOR_HNSW_EF_CONSTRUCTION")
+    memory_vector_hnsw_ef_search: int = Field(
+        default=40, alias="MEMORY_VECTOR_HNSW_EF_SEARCH")
+    memory_vector_ivfflat_lists: int = Field(
+        default=100, alias="MEMORY_VECTOR_IVFFLAT_LISTS")
+    memory_vector_ivfflat_probes: int = Field(
+        default=10, alias="MEMORY_VECTOR_IVFFLAT_PROBES")
     memory_retrieval_source: str = Field(
         default="hybrid_profile_retrieval", alias="MEMORY_RETRIEVAL_SOURCE")
     memory_write_audit_required: bool = Field(
@@ -116,6 +220,28 @@ class Settings(BaseSettings):
         default=False, alias="PRIVACY_STORE_PRECISE_USER_LOCATION")
     recommendation_user_location_geohash_precision: int = Field(
         default=6, alias="RECOMMENDATION_USER_LOCATION_GEOHASH_PRECISION")
+    recommendation_search_concurrency: int = Field(
+        default=10, alias="RECOMMENDATION_SEARCH_CONCURRENCY")
+    recommendation_route_concurrency: int = Field(
+        default=6, alias="RECOMMENDATION_ROUTE_CONCURRENCY")
+    recommendation_route_deadline_seconds: float = Field(
+        default=2.5, alias="RECOMMENDATION_ROUTE_DEADLINE_SECONDS")
+    recommendation_route_margin: int = Field(
+        default=3, alias="RECOMMENDATION_ROUTE_MARGIN")
+    recommendation_fallback_catalog_path: str = Field(
+        default="", alias="RECOMMENDATION_FALLBACK_CATALOG_PATH")
+    recommendation_weight_relevance: float = Field(
+        default=0.25, alias="RECOMMENDATION_WEIGHT_RELEVANCE")
+    recommendation_weight_rating: float = Field(
+        default=0.20, alias="RECOMMENDATION_WEIGHT_RATING")
+    recommendation_weight_review_volume: float = Field(
+        default=0.15, alias="RECOMMENDATION_WEIGHT_REVIEW_VOLUME")
+    recommendation_weight_distance: float = Field(
+        default=0.20, alias="RECOMMENDATION_WEIGHT_DISTANCE")
+    recommendation_weight_weather: float = Field(
+        default=0.10, alias="RECOMMENDATION_WEIGHT_WEATHER")
+    recommendation_weight_preference: float = Field(
+        default=0.10, alias="RECOMMENDATION_WEIGHT_PREFERENCE")
 
     @property
     def sqlalchemy_database_url(self) -> str:
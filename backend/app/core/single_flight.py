@@ -0,0 +1,236 @@
+import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis_client, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+_POLL_INTERVAL_SECONDS = 0.05
+# Marks a leader whose upstream call raised, so there is nothing to publish.
+_NO_RESULT = object()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls so only one reaches the upstream.
+
+    Within a process, callers with the same key share one Future; the first
+    caller runs the call and the rest wait for its result or exception.
+    With `use_redis`, the leader also takes a short `SET NX` lock. Leaders in
+    other processes that lose the race poll for the published JSON result
+    (up to `wait_seconds`) instead of calling upstream themselves. Redis errors
+    degrade to in-process coalescing only.
+
+    Counters: `single_flight.<name>.originated` for calls that went upstream,
+    `.coalesced` for in-process waiters and `.coalesced_remote` for results
+    taken from another process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        use_redis: bool = True,
+        lock_ttl_seconds: float = 10.0,
+        wait_seconds: float = 8.0,
+        result_ttl_seconds: float = 5.0,
+    ):
+        self._name = name
+        self._use_redis = use_redis
+        self._lock_ttl_ms = max(1, int(lock_ttl_seconds * 1000))
+        self._wait_seconds = max(0.0, wait_seconds)
+        self._result_ttl_ms = max(1, int(result_ttl_seconds * 1000))
+        self._inflight: dict[str, Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def _count(self, outcome: str) -> None:
+        metrics.increment(f"single_flight.{self._name}.{outcome}")
+
+    def _lock_key(self, key: str) -> str:
+        return f"singleflight:{self._name}:{key}:lock"
+
+    def _result_key(self, key: str) -> str:
+        return f"singleflight:{self._name}:{key}:result"
+
+    def _join_or_lead(self, key: str) -> tuple[Future[Any], bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            # A running future cannot be cancelled, so a waiter that gives up
+            # never cancels the flight for everyone else.
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future[Any], *, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, call: Callable[[], T]) -> T:
+        future, is_leader = self._join_or_lead(key)
+        if not is_leader:
+            self._count("coalesced")
+            return copy.deepcopy(future.result())
+        try:
+            result = self._remote_or_call(key, call)
+        except BaseException as exc:
+            self._finish(key, future, error=exc)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def ado(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Async `do`. The upstream call runs in its own task, shielded from the
+        leader: a leader that is cancelled (a deadline, a skipped retrieval)
+        stops waiting, but the call still completes for its followers.
+        """
+        future, is_leader = self._join_or_lead(key)
+        if not is_leader:
+            self._count("coalesced")
+            return copy.deepcopy(await asyncio.wrap_future(future))
+
+        async def lead() -> T:
+            try:
+                result = await self._aremote_or_call(key, call)
+            except BaseException as exc:
+                self._finish(key, future, error=exc)
+                raise
+            self._finish(key, future, result=result)
+            return result
+
+        task = asyncio.ensure_future(lead())
+        # Nobody may be left to read the outcome once the leader is cancelled.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(task)
+
+    def _remote_or_call(self, key: str, call: Callable[[], T]) -> T:
+        if not self._use_redis:
+            self._count("originated")
+            return call()
+        token = uuid.uuid4().hex
+        try:
+            client = get_redis_client()
+            deadline = time.monotonic() + self._wait_seconds
+            while not client.set(self._lock_key(key), token, nx=True, px=self._lock_ttl_ms):
+                raw = client.get(self._result_key(key))
+                if raw is not None:
+                    self._count("coalesced_remote")
+                    return json.loads(raw)
+                if time.monotonic() >= deadline or not client.exists(self._lock_key(key)):
+                    # The other leader failed or is too slow; call upstream ourselves.
+                    break
+                time.sleep(_POLL_INTERVAL_SECONDS)
+        except Exception:
+            logger.debug("single_flight_redis_unavailable name=%s", self._name)
+            self._count("originated")
+            return call()
+
+        self._count("originated")
+        result: Any = _NO_RESULT
+        try:
+            result = call()
+            return result
+        finally:
+            # Released on failure too, so other processes stop polling and
+            # retry upstream at once instead of waiting out `wait_seconds`.
+            try:
+                pipeline = self._publish_and_release(client.pipeline(transaction=False), key, token, result)
+                pipeline.execute()
+            except Exception:
+                logger.debug("single_flight_redis_publish_failed name=%s", self._name)
+
+    async def _aremote_or_call(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        if not self._use_redis:
+            self._count("originated")
+            return await call()
+        token = uuid.uuid4().hex
+        try:
+            client = get_async_redis_client()
+            deadline = time.monotonic() + self._wait_seconds
+            while not await client.set(self._lock_key(key), token, nx=True, px=self._lock_ttl_ms):
+                raw = await client.get(self._result_key(key))
+                if raw is not None:
+                    self._count("coalesced_remote")
+                    return json.loads(raw)
+                if time.monotonic() >= deadline or not await client.exists(self._lock_key(key)):
+                    break
+                await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+        except Exception:
+            logger.debug("single_flight_redis_unavailable name=%s", self._name)
+            self._count("originated")
+            return await call()
+
+        self._count("originated")
+        result: Any = _NO_RESULT
+        try:
+            result = await call()
+            return result
+        finally:
+            try:
+                pipeline = self._publish_and_release(client.pipeline(transaction=False), key, token, result)
+                await pipeline.execute()
+            except Exception:
+                logger.debug("single_flight_redis_publish_failed name=%s", self._name)
+
+    def _publish_and_release(self, pipeline: Any, key: str, token: str, result: Any) -> Any:
+        """Queue the result (if any) and the lock release on `pipeline`."""
+        if result is not _NO_RESULT:
+            pipeline.set(self._result_key(key), json.dumps(result), px=self._result_ttl_ms)
+        pipeline.eval(_RELEASE_LOCK_SCRIPT, 1, self._lock_key(key), token)
+        return pipeline
+
+    def stats(self) -> dict[str, float]:
+        originated = metrics.counter(f"single_flight.{self._name}.originated")
+        coalesced = metrics.counter(f"single_flight.{self._name}.coalesced")
+        coalesced_remote = metrics.counter(f"single_flight.{self._name}.coalesced_remote")
+        return {
+            "originated": originated,
+            "coalesced": coalesced,
+            "coalesced_remote": coalesced_remote,
+        }
+
+
+@lru_cache(maxsize=32)
+def get_single_flight(
+    name: str,
+    *,
+    use_redis: bool = True,
+    lock_ttl_seconds: float = 10.0,
+    wait_seconds: float = 8.0,
+) -> SingleFlight:
+    """Return the process-wide single-flight group for `name`."""
+    return SingleFlight(
+        name,
+        use_redis=use_redis,
+        lock_ttl_seconds=lock_ttl_seconds,
+        wait_seconds=wait_seconds,
+    )
@@ -0,0 +1,127 @@
+import logging
+import re
+import threading
+
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None  # type: ignore[assignment]
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# CJK ideographs/kana/hangul are roughly one token each; ASCII words cost about
+# one token per four characters; other symbols count as one token.
+_TOKEN_PATTERN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+    r"|[A-Za-z0-9]+"
+    r"|[^\sA-Za-z0-9]"
+)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece[0].isascii() and piece[0].isalnum():
+        return (len(piece) + 3) // 4
+    return 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, model-agnostic token estimate for budgeting prompts."""
+    return sum(_piece_tokens(match.group(0)) for match in _TOKEN_PATTERN.finditer(text or ""))
+
+
+def estimate_message_tokens(messages: list[dict[str, str]]) -> int:
+    return sum(
+        MESSAGE_OVERHEAD_TOKENS + estimate_tokens(str(message.get("content", "")))
+        for message in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int, *, suffix: str = "…") -> str:
+    """Cut `text` after at most `max_tokens` estimated tokens, at a piece boundary."""
+    if max_tokens <= 0:
+        return ""
+    used = 0
+    for match in _TOKEN_PATTERN.finditer(text or ""):
+        used += _piece_tokens(match.group(0))
+        if used > max_tokens:
+            return text[: match.start()].rstrip() + suffix
+    return text
+
+
+def text_pieces(text: str) -> list[str]:
+    """Lower-cased words and CJK characters of `text`, punctuation dropped."""
+    return [
+        piece.lower()
+        for piece in (match.group(0) for match in _TOKEN_PATTERN.finditer(text or ""))
+        if piece.isalnum()
+    ]
+
+
+class TokenCounter:
+    """
+    Counts and truncates tokens for prompt budgeting.
+
+    `encoding` names a tiktoken encoding (e.g. `o200k_base`, install the
+    `tokenizer` extra); `heuristic`, an unknown name, a missing tiktoken install or an encoding that cannot be
+    loaded (tiktoken downloads them on first use) fall back to
+    `estimate_tokens`. The encoding is loaded lazily, once per counter.
+    """
+
+    def __init__(self, encoding: str = "heuristic"):
+        self._encoding_name = (encoding or "heuristic").strip().lower()
+        self._encoding: object | None = None
+        self._resolved = self._encoding_name == "heuristic"
+        self._lock = threading.Lock()
+
+    def _get_encoding(self) -> object | None:
+        if self._resolved:
+            return self._encoding
+        with self._lock:
+            if self._resolved:
+                return self._encoding
+            if not TIKTOKEN_AVAILABLE:
+                logger.warning("tokenizer_unavailable encoding=%s, using heuristic", self._encoding_name)
+            else:
+                try:
+                    self._encoding = tiktoken.get_encoding(self._encoding_name)
+                except Exception as exc:
+                    logger.warning(
+                        "tokenizer_load_failed encoding=%s error=%s, using heuristic",
+                        self._encoding_name,
+                        exc,
+                    )
+            self._resolved = True
+            return self._encoding
+
+    @property
+    def name(self) -> str:
+        encoding = self._get_encoding()
+        return self._encoding_name if encoding is not None else "heuristic"
+
+    def count(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return estimate_tokens(text)
+        return len(encoding.encode(text or "", disallowed_special=()))  # type: ignore[attr-defined]
+
+    def count_messages(self, messages: list[dict[str, str]]) -> int:
+        return sum(
+            MESSAGE_OVERHEAD_TOKENS + self.count(str(message.get("content", "")))
+            for message in messages
+        )
+
+    def truncate(self, text: str, max_tokens: int, *, suffix: str = "…") -> str:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return truncate_to_tokens(text, max_tokens, suffix=suffix)
+        if max_tokens <= 0:
+            return ""
+        tokens = encoding.encode(text or "", disallowed_special=())  # type: ignore[attr-defined]
+        if len(tokens) <= max_tokens:
+            return text
+        head = encoding.decode_bytes(tokens[:max_tokens]).decode("utf-8", errors="ignore")  # type: ignore[attr-defined]
+        return head.rstrip() + suffix
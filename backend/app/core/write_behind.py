@@ -0,0 +1,451 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ResponseError
+
+from app.core.async_bridge import arun_on_bridge, submit
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[list[dict[str, Any]]], Awaitable[None]]
+
+_DEAD_LETTER_BUFFER_SIZE = 1000
+
+
+class _QueuedJob:
+    __slots__ = ("envelope", "message_id")
+
+    def __init__(self, envelope: dict[str, Any], message_id: str | None = None):
+        self.envelope = envelope
+        # Redis stream entry id, or None for jobs held in the in-process buffer.
+        self.message_id = message_id
+
+
+class WriteBehindQueue:
+    """
+    Durable write-behind queue for deferred persistence.
+
+    `aenqueue` appends a JSON job to a Redis stream (read through a consumer
+    group) and falls back to an in-process buffer when Redis is unavailable or
+    the backend is `memory`. Workers run on the shared bridge loop and hand
+    `handler` a batch once `batch_size` jobs are available or `batch_wait_ms`
+    has passed since the first one arrived.
+
+    A failed batch is retried job by job so one bad job cannot block the rest.
+    Failing Redis jobs stay pending and are reclaimed after
+    `retry_backoff_seconds`; buffered jobs back off exponentially. After
+    `max_attempts` a job moves to the dead-letter stream (`<stream>:dead`) or,
+    for buffered jobs, a bounded in-process dead-letter list.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        handler: JobHandler,
+        backend: str = "redis",
+        batch_size: int = 50,
+        batch_wait_ms: int = 200,
+        max_attempts: int = 5,
+        retry_backoff_seconds: float = 2.0,
+        worker_count: int = 1,
+        redis_client_factory: Callable[[], AsyncRedis] = get_async_redis_client,
+    ):
+        self.name = name
+        self._handler = handler
+        self._backend = backend if backend in {"redis", "memory"} else "redis"
+        self._batch_size = max(1, batch_size)
+        self._batch_wait_seconds = max(0, batch_wait_ms) / 1000
+        self._max_attempts = max(1, max_attempts)
+        self._retry_backoff_seconds = max(0.0, retry_backoff_seconds)
+        self._worker_count = max(1, worker_count)
+        self._redis_client_factory = redis_client_factory
+
+        self._stream_key = f"queue:{name}"
+        self._dead_letter_key = f"queue:{name}:dead"
+        self._group = f"{name}-writers"
+        self._consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._lock = threading.Lock()
+        self._buffer: deque[dict[str, Any]] = deque()
+        self._retry_heap: list[tuple[float, int, dict[str, Any]]] = []
+        self._retry_sequence = 0
+        self.dead_letters: deque[dict[str, Any]] = deque(maxlen=_DEAD_LETTER_BUFFER_SIZE)
+
+        self._started = False
+        self._stopping = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._group_ready = False
+        self._redis_healthy = True
+        self._last_reclaim = 0.0
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    def _metric(self, suffix: str) -> str:
+        return f"write_behind.{self.name}.{suffix}"
+
+    def buffered_count(self) -> int:
+        with self._lock:
+            return len(self._buffer) + len(self._retry_heap)
+
+    async def aenqueue(self, payload: dict[str, Any]) -> None:
+        envelope = {
+            "job_id": str(uuid4()),
+            "enqueued_at": time.time(),
+            "attempts": 0,
+            "payload": payload,
+        }
+        self._ensure_started()
+
+        if self._backend == "redis":
+            try:
+                await self._redis_client_factory().xadd(
+                    self._stream_key,
+                    {"job": json.dumps(envelope, ensure_ascii=True, default=str)},
+                )
+                metrics.increment(self._metric("enqueued"))
+                return
+            except Exception:
+                metrics.increment(self._metric("fallback_enqueued"))
+                logger.warning(
+                    "write_behind_redis_enqueue_failed queue=%s job_id=%s fallback=in_process",
+                    self.name,
+                    envelope["job_id"],
+                )
+
+        with self._lock:
+            self._buffer.append(envelope)
+        metrics.increment(self._metric("enqueued"))
+        self._refresh_buffer_gauge()
+        self._notify()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for worker_index in range(self._worker_count):
+            submit(self._run_worker(worker_index))
+
+    def _notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _refresh_buffer_gauge(self) -> None:
+        metrics.set_gauge(self._metric("buffered"), self.buffered_count())
+
+    async def _run_worker(self, worker_index: int) -> None:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+        task = asyncio.current_task()
+        if task is not None:
+            self._workers.append(task)
+        consumer = f"{self._consumer_prefix}-{worker_index}"
+
+        while not self._stopping:
+            try:
+                batch = await self._next_batch(consumer)
+                if batch:
+                    try:
+                        await self._process(batch)
+                    except asyncio.CancelledError:
+                        self._requeue_unfinished(batch)
+                        raise
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("write_behind_worker_error queue=%s consumer=%s", self.name, consumer)
+                await asyncio.sleep(self._retry_backoff_seconds)
+
+    async def _next_batch(self, consumer: str) -> list[_QueuedJob]:
+        """Return up to `batch_size` jobs, waiting at most `batch_wait_ms` once the first arrives."""
+        batch = await self._fetch(consumer, self._batch_size, block=True)
+        if not batch:
+            if self._backend == "memory" or not self._redis_healthy:
+                await self._wait_for_work(
+                    self._batch_wait_seconds if self._redis_healthy
+                    else self._retry_backoff_seconds
+                )
+            return []
+
+        deadline = time.monotonic() + self._batch_wait_seconds
+        while len(batch) < self._batch_size and not self._stopping:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await self._wait_for_work(remaining)
+            batch.extend(
+                await self._fetch(consumer, self._batch_size - len(batch), block=False)
+            )
+        return batch
+
+    async def _fetch(self, consumer: str, limit: int, *, block: bool) -> list[_QueuedJob]:
+        batch = self._drain_buffer(limit)
+        if self._backend == "redis" and len(batch) < limit:
+            batch.extend(
+                await self._read_redis(consumer, limit - len(batch), block=block and not batch)
+            )
+        return batch
+
+    def _requeue_unfinished(self, batch: list[_QueuedJob]) -> None:
+        # Redis entries stay pending on their own; buffered jobs would be lost.
+        with self._lock:
+            self._buffer.extendleft(
+                job.envelope for job in reversed(batch) if job.message_id is None
+            )
+
+    async def _wait_for_work(self, timeout: float) -> None:
+        assert self._wakeup is not None
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def _drain_buffer(self, limit: int) -> list[_QueuedJob]:
+        now = time.time()
+        drained: list[_QueuedJob] = []
+        with self._lock:
+            while self._retry_heap and self._retry_heap[0][0] <= now and len(drained) < limit:
+                drained.append(_QueuedJob(heapq.heappop(self._retry_heap)[2]))
+            while self._buffer and len(drained) < limit:
+                drained.append(_QueuedJob(self._buffer.popleft()))
+        if drained:
+            self._refresh_buffer_gauge()
+        return drained
+
+    async def _read_redis(self, consumer: str, count: int, *, block: bool) -> list[_QueuedJob]:
+        client = self._redis_client_factory()
+        try:
+            await self._ensure_group(client)
+            jobs = await self._reclaim_stale(client, consumer, count)
+            if len(jobs) < count:
+                response = await client.xreadgroup(
+                    self._group,
+                    consumer,
+                    streams={self._stream_key: ">"},
+                    count=count - len(jobs),
+                    block=int(self._batch_wait_seconds * 1000) if block and not jobs else None,
+                )
+                jobs.extend(self._decode_entries(_stream_entries(response)))
+        except Exception:
+            if self._redis_healthy:
+                logger.warning("write_behind_redis_unavailable queue=%s", self.name)
+            self._redis_healthy = False
+            self._group_ready = False
+            return []
+        if not self._redis_healthy:
+            logger.info("write_behind_redis_recovered queue=%s", self.name)
+        self._redis_healthy = True
+        return jobs
+
+    async def _ensure_group(self, client: AsyncRedis) -> None:
+        if self._group_ready:
+            return
+        try:
+            await client.xgroup_create(self._stream_key, self._group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._group_ready = True
+
+    async def _reclaim_stale(self, client: AsyncRedis, consumer: str, count: int) -> list[_QueuedJob]:
+        """Take over entries left pending by failed batches or crashed workers."""
+        now = time.monotonic()
+        if now - self._last_reclaim < self._retry_backoff_seconds:
+            return []
+        self._last_reclaim = now
+        min_idle_ms = int(self._retry_backoff_seconds * 1000)
+        pending = await client.xpending_range(
+            self._stream_key,
+            self._group,
+            min="-",
+            max="+",
+            count=count,
+            idle=min_idle_ms,
+        )
+        if not pending:
+            return []
+
+        exhausted = [
+            entry["message_id"] for entry in pending
+            if int(entry["times_delivered"]) >= self._max_attempts
+        ]
+        retryable = [
+            entry["message_id"] for entry in pending
+            if int(entry["times_delivered"]) < self._max_attempts
+        ]
+        for message_id in exhausted:
+            entries = await client.xrange(self._stream_key, min=message_id, max=message_id)
+            for job in self._decode_entries(entries):
+                await self._dead_letter(job, reason="max_attempts_exceeded")
+        if not retryable:
+            return []
+        claimed = await client.xclaim(
+            self._stream_key,
+            self._group,
+            consumer,
+            min_idle_time=min_idle_ms,
+            message_ids=retryable,
+        )
+        jobs = self._decode_entries(claimed)
+        for job in jobs:
+            job.envelope["attempts"] = int(job.envelope.get("attempts", 0)) + 1
+        metrics.increment(self._metric("retried"), len(jobs))
+        return jobs
+
+    def _decode_entries(self, entries: Any) -> list[_QueuedJob]:
+        jobs: list[_QueuedJob] = []
+        for message_id, fields in entries or []:
+            if not fields:
+                continue
+            try:
+                envelope = json.loads(fields["job"])
+            except (KeyError, TypeError, ValueError):
+                logger.warning("write_behind_invalid_entry queue=%s message_id=%s", self.name, message_id)
+                continue
+            jobs.append(_QueuedJob(envelope, message_id))
+        return jobs
+
+    async def _process(self, batch: list[_QueuedJob]) -> None:
+        metrics.observe(self._metric("batch_size"), len(batch))
+        started = time.perf_counter()
+        try:
+            await self._handler([job.envelope["payload"] for job in batch])
+        except Exception:
+            if len(batch) == 1:
+                await self._handle_failure(batch[0])
+                return
+            logger.warning(
+                "write_behind_batch_failed queue=%s batch_size=%s retrying=individually",
+                self.name,
+                len(batch),
+            )
+            for job in batch:
+                await self._process([job])
+            return
+
+        metrics.observe(self._metric("batch_latency_ms"), (time.perf_counter() - started) * 1000)
+        metrics.increment(self._metric("persisted"), len(batch))
+        now = time.time()
+        for job in batch:
+            metrics.observe(self._metric("lag_seconds"), now - float(job.envelope["enqueued_at"]))
+        await self._ack([job.message_id for job in batch if job.message_id is not None])
+
+    async def _handle_failure(self, job: _QueuedJob) -> None:
+        attempts = int(job.envelope.get("attempts", 0)) + 1
+        logger.exception(
+            "write_behind_job_failed queue=%s job_id=%s attempts=%s",
+            self.name,
+            job.envelope.get("job_id"),
+            attempts,
+        )
+        if job.message_id is not None:
+            # Left pending; `_reclaim_stale` retries or dead-letters it using
+            # the delivery count Redis keeps for the entry.
+            return
+        job.envelope["attempts"] = attempts
+        if attempts >= self._max_attempts:
+            await self._dead_letter(job, reason="max_attempts_exceeded")
+            return
+        retry_at = time.time() + self._retry_backoff_seconds * (2 ** (attempts - 1))
+        with self._lock:
+            self._retry_sequence += 1
+            heapq.heappush(self._retry_heap, (retry_at, self._retry_sequence, job.envelope))
+        metrics.increment(self._metric("retried"))
+        self._refresh_buffer_gauge()
+
+    async def _dead_letter(self, job: _QueuedJob, *, reason: str) -> None:
+        metrics.increment(self._metric("dead_lettered"))
+        logger.error(
+            "write_behind_job_dead_lettered queue=%s job_id=%s reason=%s",
+            self.name,
+            job.envelope.get("job_id"),
+            reason,
+        )
+        if job.message_id is None:
+            self.dead_letters.append({**job.envelope, "dead_letter_reason": reason})
+            return
+        client = self._redis_client_factory()
+        await client.xadd(
+            self._dead_letter_key,
+            {
+                "job": json.dumps(job.envelope, ensure_ascii=True, default=str),
+                "reason": reason,
+                "source_id": job.message_id,
+            },
+        )
+        await self._ack([job.message_id])
+
+    async def _ack(self, message_ids: list[str]) -> None:
+        if not message_ids:
+            return
+        client = self._redis_client_factory()
+        try:
+            await client.xack(self._stream_key, self._group, *message_ids)
+            await client.xdel(self._stream_key, *message_ids)
+        except Exception:
+            logger.warning(
+                "write_behind_ack_failed queue=%s count=%s",
+                self.name,
+                len(message_ids),
+            )
+
+    async def _aclose(self, timeout: float) -> None:
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._workers:
+            # Let in-flight batches finish; only stragglers are cancelled.
+            _done, pending = await asyncio.wait(self._workers, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._workers.clear()
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                # Flush pending retries too; shutdown is their last chance.
+                while self._retry_heap:
+                    self._buffer.append(heapq.heappop(self._retry_heap)[2])
+            batch = self._drain_buffer(self._batch_size)
+            if not batch:
+                break
+            await self._process(batch)
+        remaining = self.buffered_count()
+        if remaining:
+            logger.error("write_behind_shutdown_dropped queue=%s count=%s", self.name, remaining)
+        with self._lock:
+            self._started = False
+            self._stopping = False
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        """Stop the workers and flush the in-process buffer before shutdown."""
+        if not self._started:
+            return
+        await arun_on_bridge(self._aclose(timeout))
+
+
+def _stream_entries(response: Any) -> list[Any]:
+    # XREADGROUP replies with [[stream_key, [(entry_id, fields), ...]], ...].
+    return [entry for _stream, stream_entries in response or [] for entry in stream_entries]
@@ -1,19 +1,30 @@
+import asyncio
+import logging
+import time
 from typing import Any, cast
 
-from app.core.database import SessionLocal
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.metrics import metrics
 from app.core.redis_client import (
     build_short_term_memory_key,
     deserialize_json,
+    get_async_redis_client,
     get_redis_client,
 )
 from app.core.settings import Settings
-from app.memory.embeddings import DeterministicEmbeddingProvider
+from app.memory.embeddings import TaggedEmbedding, get_embedding_service
+from app.memory.retrieval_gate import classify_fresh_retrieval
+from app.memory.vector_index import vector_search_parameters
 from app.models.enums import RoleType
 from app.providers.router import ProviderRouter
 from app.repositories.memory_repository import MemoryRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.chat import ChatRole
 
+logger = logging.getLogger(__name__)
+
 
 class ConversationContextBuilder:
     """
@@ -21,13 +32,15 @@ class ConversationContextBuilder:
 
     This defines a single context shape that future memory adapters
     (Redis, Postgres profile memory, pgvector retrieval) can populate.
+    `build` and `abuild` populate the same shape; `abuild` uses async Redis,
+    async SQLAlchemy sessions and async retrieval clients.
     """
 
     def __init__(self, settings: Settings):
         self._settings = settings
-        self._embedding_provider = DeterministicEmbeddingProvider(
-            settings.memory_embedding_dimensions
-        )
+        # Shared with the chat write path so queries and stored memories
+        # are always embedded in the same vector space.
+        self._embedding_service = get_embedding_service(settings)
         self._provider_router = ProviderRouter(settings)
 
     def build(
@@ -38,11 +51,7 @@ class ConversationContextBuilder:
         role: ChatRole,
         message: str
     ) -> dict[str, Any]:
-        short_term_context: dict[str, Any] = {
-            "source": "redis",
-            "status": "ok",
-            "entries": [],
-        }
+        short_term_context = self._new_short_term_context()
         redis_key = build_short_term_memory_key(
             user_id=user_id,
             role=role,
@@ -58,19 +67,279 @@ class ConversationContextBuilder:
                     self._settings.memory_short_term_max_turns - 1,
                 ),
             )
-            short_term_context["entries"] = [
-                entry
-                for entry in (
-                    deserialize_json(raw_value)
-                    for raw_value in short_term_entries
+            self._apply_short_term_entries(short_term_context, short_term_entries)
+        except Exception:
+            short_term_context["status"] = "degraded"
+            short_term_context["fallback_reason"] = "redis_unavailable"
+
+        long_term_profile, long_term_retrieval = self._new_long_term_context()
+        try:
+            query_embedding = self._embedding_service.embed(message)
+            with SessionLocal() as session:
+                self._load_long_term_memory(
+                    session,
+                    user_id=user_id,
+                    role=role,
+                    query_embedding=query_embedding,
+                    long_term_profile=long_term_profile,
+                    long_term_retrieval=long_term_retrieval,
                 )
-                if isinstance(entry, dict)
-            ]
-            short_term_context["count"] = len(short_term_context["entries"])
+        except Exception:
+            self._mark_long_term_degraded(long_term_profile, long_term_retrieval)
+
+        fresh_retrieval = self._new_fresh_retrieval_context()
+        if not self._gate_fresh_retrieval(fresh_retrieval, role=role, message=message):
+            try:
+                retrieval_provider = self._provider_router.resolve_retrieval_provider()
+                started = time.perf_counter()
+                retrieved_items = retrieval_provider.retrieve(message)
+                self._observe_retrieval_latency(started)
+                self._apply_fresh_retrieval(
+                    fresh_retrieval, retrieval_provider.provider_name, retrieved_items)
+            except Exception:
+                fresh_retrieval["status"] = "degraded"
+                fresh_retrieval["fallback_reason"] = "exa_unavailable"
+
+        return self._assemble(
+            user_id=user_id,
+            thread_id=thread_id,
+            role=role,
+            message=message,
+            short_term_context=short_term_context,
+            long_term_profile=long_term_profile,
+            long_term_retrieval=long_term_retrieval,
+            fresh_retrieval=fresh_retrieval,
+        )
+
+    async def abuild(
+        self,
+        *,
+        user_id: str,
+        thread_id: str,
+        role: ChatRole,
+        message: str,
+        skip_fresh_retrieval: asyncio.Event | None = None,
+    ) -> dict[str, Any]:
+        """
+        Build the context with short-term, long-term and fresh retrieval
+        stages running concurrently, each bounded by its own deadline.
+
+        Setting `skip_fresh_retrieval` while Exa is still in flight cancels
+        the retrieval and marks the section as skipped, so the caller never
+        waits on context it has decided not to use.
+        """
+        short_term_context, long_term, fresh_retrieval = await asyncio.gather(
+            self._abuild_short_term(
+                user_id=user_id,
+                thread_id=thread_id,
+                role=role,
+            ),
+            self._abuild_long_term(
+                user_id=user_id,
+                role=role,
+                message=message,
+            ),
+            self._abuild_fresh_retrieval(
+                role=role,
+                message=message,
+                skip_fresh_retrieval=skip_fresh_retrieval,
+            ),
+        )
+        long_term_profile, long_term_retrieval = long_term
+        return self._assemble(
+            user_id=user_id,
+            thread_id=thread_id,
+            role=role,
+            message=message,
+            short_term_context=short_term_context,
+            long_term_profile=long_term_profile,
+            long_term_retrieval=long_term_retrieval,
+            fresh_retrieval=fresh_retrieval,
+        )
+
+    async def _abuild_short_term(
+        self,
+        *,
+        user_id: str,
+        thread_id: str,
+        role: ChatRole,
+    ) -> dict[str, Any]:
+        short_term_context = self._new_short_term_context()
+        redis_key = build_short_term_memory_key(
+            user_id=user_id,
+            role=role,
+            thread_id=thread_id,
+        )
+        try:
+            redis_client = get_async_redis_client()
+            short_term_entries = cast(
+                list[Any],
+                await asyncio.wait_for(
+                    redis_client.lrange(
+                        redis_key,
+                        0,
+                        self._settings.memory_short_term_max_turns - 1,
+                    ),
+                    timeout=self._settings.chat_short_term_memory_deadline_seconds,
+                ),
+            )
+            self._apply_short_term_entries(short_term_context, short_term_entries)
+        except TimeoutError:
+            short_term_context["status"] = "degraded"
+            short_term_context["fallback_reason"] = "redis_deadline_exceeded"
         except Exception:
             short_term_context["status"] = "degraded"
             short_term_context["fallback_reason"] = "redis_unavailable"
+        return short_term_context
+
+    async def _abuild_long_term(
+        self,
+        *,
+        user_id: str,
+        role: ChatRole,
+        message: str,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        long_term_profile, long_term_retrieval = self._new_long_term_context()
+
+        async def load() -> None:
+            query_embedding = await self._embedding_service.aembed(message)
+            async with AsyncSessionLocal() as session:
+                await session.run_sync(
+                    lambda sync_session: self._load_long_term_memory(
+                        sync_session,
+                        user_id=user_id,
+                        role=role,
+                        query_embedding=query_embedding,
+                        long_term_profile=long_term_profile,
+                        long_term_retrieval=long_term_retrieval,
+                    )
+                )
+
+        try:
+            await asyncio.wait_for(
+                load(),
+                timeout=self._settings.chat_long_term_memory_deadline_seconds,
+            )
+        except TimeoutError:
+            self._mark_long_term_degraded(long_term_profile, long_term_retrieval)
+            long_term_profile["fallback_reason"] = "postgres_deadline_exceeded"
+            long_term_retrieval["fallback_reason"] = "pgvector_deadline_exceeded"
+        except Exception:
+            self._mark_long_term_degraded(long_term_profile, long_term_retrieval)
+        return long_term_profile, long_term_retrieval
+
+    async def _abuild_fresh_retrieval(
+        self,
+        *,
+        role: ChatRole,
+        message: str,
+        skip_fresh_retrieval: asyncio.Event | None,
+    ) -> dict[str, Any]:
+        fresh_retrieval = self._new_fresh_retrieval_context()
+        if self._gate_fresh_retrieval(fresh_retrieval, role=role, message=message):
+            return fresh_retrieval
+        try:
+            retrieval_provider = self._provider_router.resolve_retrieval_provider()
+        except Exception:
+            fresh_retrieval["status"] = "degraded"
+            fresh_retrieval["fallback_reason"] = "exa_unavailable"
+            return fresh_retrieval
+
+        started = time.perf_counter()
+        retrieval_task = asyncio.ensure_future(
+            asyncio.wait_for(
+                retrieval_provider.aretrieve(message),
+                timeout=self._settings.chat_fresh_retrieval_deadline_seconds,
+            )
+        )
+        if skip_fresh_retrieval is not None:
+            skip_task = asyncio.ensure_future(skip_fresh_retrieval.wait())
+            try:
+                await asyncio.wait(
+                    {retrieval_task, skip_task},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                # Also reached when `abuild` itself is cancelled: `asyncio.wait`
+                # never cancels what it waits on, so neither task may outlive it.
+                skip_task.cancel()
+                skipped = not retrieval_task.done()
+                if skipped:
+                    retrieval_task.cancel()
+            if skipped:
+                fresh_retrieval["source"] = retrieval_provider.provider_name
+                fresh_retrieval["status"] = "skipped"
+                fresh_retrieval["fallback_reason"] = "safety_supportive_refusal"
+                return fresh_retrieval
+
+        try:
+            retrieved_items = await retrieval_task
+            self._observe_retrieval_latency(started)
+            self._apply_fresh_retrieval(
+                fresh_retrieval, retrieval_provider.provider_name, retrieved_items)
+        except TimeoutError:
+            fresh_retrieval["status"] = "degraded"
+            fresh_retrieval["fallback_reason"] = "exa_deadline_exceeded"
+        except Exception:
+            fresh_retrieval["status"] = "degraded"
+            fresh_retrieval["fallback_reason"] = "exa_unavailable"
+        return fresh_retrieval
 
+    def _gate_fresh_retrieval(
+        self,
+        fresh_retrieval: dict[str, Any],
+        *,
+        role: ChatRole,
+        message: str,
+    ) -> bool:
+        """
+        Mark `fresh_retrieval` as skipped and return True when the turn is
+        unlikely to need web context.
+
+        Reports the skip rate, and credits each skip with the average latency
+        of the retrievals that did run as `fresh_retrieval.gate.saved_latency_ms`.
+        """
+        if not self._settings.fresh_retrieval_gate_enabled:
+            return False
+        decision = classify_fresh_retrieval(
+            role,
+            message,
+            signal_only_roles=frozenset(
+                name.strip()
+                for name in self._settings.fresh_retrieval_gate_signal_only_roles.split(",")
+                if name.strip()
+            ),
+        )
+        if decision.should_retrieve:
+            metrics.increment("fresh_retrieval.gate.allowed")
+        else:
+            metrics.increment("fresh_retrieval.gate.skipped")
+            metrics.increment(f"fresh_retrieval.gate.skipped.{decision.reason}")
+            metrics.increment(
+                "fresh_retrieval.gate.saved_latency_ms",
+                metrics.average("fresh_retrieval.latency_ms"),
+            )
+            fresh_retrieval["status"] = "skipped"
+            fresh_retrieval["fallback_reason"] = f"gate_{decision.reason}"
+            logger.debug("fresh_retrieval_gated role=%s reason=%s", role, decision.reason)
+        skipped = metrics.counter("fresh_retrieval.gate.skipped")
+        total = skipped + metrics.counter("fresh_retrieval.gate.allowed")
+        metrics.set_gauge("fresh_retrieval.gate.skip_rate", skipped / total if total else 0.0)
+        return not decision.should_retrieve
+
+    @staticmethod
+    def _observe_retrieval_latency(started: float) -> None:
+        metrics.observe("fresh_retrieval.latency_ms", (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _new_short_term_context() -> dict[str, Any]:
+        return {
+            "source": "redis",
+            "status": "ok",
+            "entries": [],
+        }
+
+    def _new_long_term_context(self) -> tuple[dict[str, Any], dict[str, Any]]:
         long_term_profile: dict[str, Any] = {
             "source": "postgres",
             "status": "ok",
@@ -83,80 +352,125 @@ class ConversationContextBuilder:
             "top_k": self._settings.memory_retrieval_top_k,
             "entries": [],
         }
-        fresh_retrieval: dict[str, Any] = {
+        return long_term_profile, long_term_retrieval
+
+    def _new_fresh_retrieval_context(self) -> dict[str, Any]:
+        return {
             "source": "exa",
             "status": "ok",
             "top_k": self._settings.exa_top_k,
             "entries": [],
         }
 
-        try:
-            role_enum = RoleType(role)
-            with SessionLocal() as session:
-                user_repository = UserRepository(session)
-                memory_repository = MemoryRepository(session)
+    @staticmethod
+    def _apply_short_term_entries(
+        short_term_context: dict[str, Any],
+        short_term_entries: list[Any],
+    ) -> None:
+        short_term_context["entries"] = [
+            entry
+            for entry in (
+                deserialize_json(raw_value)
+                for raw_value in short_term_entries
+            )
+            if isinstance(entry, dict)
+        ]
+        short_term_context["count"] = len(short_term_context["entries"])
 
-                profiles = user_repository.list_profiles(user_id)
-                preferences = user_repository.list_preferences(
-                    user_id=user_id,
-                    role=role_enum,
-                )
-                retrieval_entries = memory_repository.list_retrieval_memory(
-                    user_id=user_id,
-                    role=role_enum,
-                    top_k=self._settings.memory_retrieval_top_k,
-                    query_embedding=self._embedding_provider.embed(message),
-                )
+    def _load_long_term_memory(
+        self,
+        session: Session,
+        *,
+        user_id: str,
+        role: ChatRole,
+        query_embedding: TaggedEmbedding,
+        long_term_profile: dict[str, Any],
+        long_term_retrieval: dict[str, Any],
+    ) -> None:
+        role_enum = RoleType(role)
+        user_repository = UserRepository(session)
+        memory_repository = MemoryRepository(session)
 
-                long_term_profile["profiles"] = [
-                    {
-                        "key": profile.profile_key,
-                        "value": profile.profile_value,
-                        "source": profile.source,
-                        "is_sensitive": profile.is_sensitive,
-                    }
-                    for profile in profiles
-                ]
-                long_term_profile["preferences"] = [
-                    {
-                        "tag": preference.preference_tag,
-                        "weight": preference.weight,
-                        "role": None if preference.role is None else preference.role.value,
-                    }
-                    for preference in preferences
-                ]
-                long_term_retrieval["entries"] = [
-                    {
-                        "entry_type": entry.entry_type.value,
-                        "content": entry.content,
-                        "source_provider": entry.source_provider,
-                    }
-                    for entry in retrieval_entries
-                ]
-        except Exception:
-            long_term_profile["status"] = "degraded"
-            long_term_profile["fallback_reason"] = "postgres_unavailable"
-            long_term_retrieval["status"] = "degraded"
-            long_term_retrieval["fallback_reason"] = "pgvector_unavailable"
+        profiles = user_repository.list_profiles(user_id)
+        preferences = user_repository.list_preferences(
+            user_id=user_id,
+            role=role_enum,
+        )
+        retrieval_entries = memory_repository.list_retrieval_memory(
+            user_id=user_id,
+            role=role_enum,
+            top_k=self._settings.memory_retrieval_top_k,
+            query_embedding=query_embedding.vector,
+            embedding_model=query_embedding.model,
+            search_parameters=vector_search_parameters(self._settings),
+        )
 
-        try:
-            retrieval_provider = self._provider_router.resolve_retrieval_provider()
-            retrieved_items = retrieval_provider.retrieve(message)
-            fresh_retrieval["source"] = retrieval_provider.provider_name
-            fresh_retrieval["entries"] = [
-                {
-                    "title": str(item.get("title", "")),
-                    "url": item.get("url"),
-                    "summary": item.get("summary"),
-                    "source": item.get("source", retrieval_provider.provider_name),
-                }
-                for item in retrieved_items
-                if isinstance(item, dict)
-            ]
-        except Exception:
-            fresh_retrieval["status"] = "degraded"
-            fresh_retrieval["fallback_reason"] = "exa_unavailable"
+        long_term_profile["profiles"] = [
+            {
+                "key": profile.profile_key,
+                "value": profile.profile_value,
+                "source": profile.source,
+                "is_sensitive": profile.is_sensitive,
+            }
+            for profile in profiles
+        ]
+        long_term_profile["preferences"] = [
+            {
+                "tag": preference.preference_tag,
+                "weight": preference.weight,
+                "role": None if preference.role is None else preference.role.value,
+            }
+            for preference in preferences
+        ]
+        long_term_retrieval["entries"] = [
+            {
+                "entry_type": entry.entry_type.value,
+                "content": entry.content,
+                "source_provider": entry.source_provider,
+            }
+            for entry in retrieval_entries
+        ]
+
+    @staticmethod
+    def _mark_long_term_degraded(
+        long_term_profile: dict[str, Any],
+        long_term_retrieval: dict[str, Any],
+    ) -> None:
+        long_term_profile["status"] = "degraded"
+        long_term_profile["fallback_reason"] = "postgres_unavailable"
+        long_term_retrieval["status"] = "degraded"
+        long_term_retrieval["fallback_reason"] = "pgvector_unavailable"
 
+    @staticmethod
+    def _apply_fresh_retrieval(
+        fresh_retrieval: dict[str, Any],
+        provider_name: str,
+        retrieved_items: list[dict[str, Any]],
+    ) -> None:
+        fresh_retrieval["source"] = provider_name
+        fresh_retrieval["entries"] = [
+            {
+                "title": str(item.get("title", "")),
+                "url": item.get("url"),
+                "summary": item.get("summary"),
+                "source": item.get("source", provider_name),
+            }
+            for item in retrieved_items
+            if isinstance(item, dict)
+        ]
+
+    def _assemble(
+        self,
+        *,
+        user_id: str,
+        thread_id: str,
+        role: ChatRole,
+        message: str,
+        short_term_context: dict[str, Any],
+        long_term_profile: dict[str, Any],
+        long_term_retrieval: dict[str, Any],
+        fresh_retrieval: dict[str, Any],
+    ) -> dict[str, Any]:
         return {
             "user_id": user_id,
             "thread_id": thread_id,
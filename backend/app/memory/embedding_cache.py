@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis_binary_client, get_redis_binary_client
+
+logger = logging.getLogger(__name__)
+
+# One header byte identifies the element type so either encoding can be read
+# back regardless of the current EMBEDDING_CACHE_ENCODING.
+_ENCODING_FORMATS = {"float16": (b"\x01", "e"), "float32": (b"\x02", "f")}
+_HEADER_FORMATS = {header: fmt for header, fmt in _ENCODING_FORMATS.values()}
+
+
+def normalize_embedding_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def encode_vector(vector: list[float], encoding: str = "float16") -> bytes:
+    header, fmt = _ENCODING_FORMATS.get(encoding, _ENCODING_FORMATS["float32"])
+    return header + struct.pack(f"<{len(vector)}{fmt}", *vector)
+
+
+def decode_vector(payload: bytes) -> list[float]:
+    fmt = _HEADER_FORMATS[payload[:1]]
+    count = (len(payload) - 1) // struct.calcsize(fmt)
+    return list(struct.unpack(f"<{count}{fmt}", payload[1:]))
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: an in-process LRU in front of Redis.
+
+    Keys are `(model, dimensions, sha256(normalized text))`, so casing and
+    whitespace variants of the same message share one entry. Both tiers hold
+    the same compact binary encoding. A hit therefore returns the same vector
+    whichever tier served it. Redis errors count as misses.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2048,
+        ttl_seconds: int = 86400,
+        encoding: str = "float16",
+        use_redis: bool = True,
+    ):
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._encoding = encoding if encoding in _ENCODING_FORMATS else "float16"
+        self._use_redis = use_redis
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, dimensions: int, text: str) -> str:
+        digest = hashlib.sha256(normalize_embedding_text(text).encode("utf-8")).hexdigest()
+        return f"embedding:{model}:{dimensions}:{digest}"
+
+    def _lru_get_many(self, keys: list[str]) -> dict[str, bytes]:
+        found: dict[str, bytes] = {}
+        with self._lock:
+            for key in keys:
+                payload = self._entries.get(key)
+                if payload is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = payload
+        return found
+
+    def _lru_set_many(self, payloads: dict[str, bytes]) -> None:
+        with self._lock:
+            for key, payload in payloads.items():
+                self._entries[key] = payload
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _record(self, *, memory_hits: int, redis_hits: int, misses: int) -> None:
+        if memory_hits:
+            metrics.increment("embedding_cache.memory_hits", memory_hits)
+        if redis_hits:
+            metrics.increment("embedding_cache.redis_hits", redis_hits)
+        if misses:
+            metrics.increment("embedding_cache.misses", misses)
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = self._lru_get_many(keys)
+        memory_hits = len(found)
+        pending = [key for key in keys if key not in found]
+        redis_found: dict[str, bytes] = {}
+        if pending and self._use_redis:
+            try:
+                values = get_redis_binary_client().mget(pending)
+                redis_found = {
+                    key: value for key, value in zip(pending, values) if value is not None
+                }
+            except Exception:
+                logger.debug("embedding_cache_redis_read_failed count=%s", len(pending))
+        self._lru_set_many(redis_found)
+        found.update(redis_found)
+        self._record(
+            memory_hits=memory_hits,
+            redis_hits=len(redis_found),
+            misses=len(keys) - len(found),
+        )
+        return {key: decode_vector(payload) for key, payload in found.items()}
+
+    async def aget_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = self._lru_get_many(keys)
+        memory_hits = len(found)
+        pending = [key for key in keys if key not in found]
+        redis_found: dict[str, bytes] = {}
+        if pending and self._use_redis:
+            try:
+                values = await get_async_redis_binary_client().mget(pending)
+                redis_found = {
+                    key: value for key, value in zip(pending, values) if value is not None
+                }
+            except Exception:
+                logger.debug("embedding_cache_redis_read_failed count=%s", len(pending))
+        self._lru_set_many(redis_found)
+        found.update(redis_found)
+        self._record(
+            memory_hits=memory_hits,
+            redis_hits=len(redis_found),
+            misses=len(keys) - len(found),
+        )
+        return {key: decode_vector(payload) for key, payload in found.items()}
+
+    def set_many(self, vectors: dict[str, list[float]]) -> dict[str, list[float]]:
+        """Store vectors; returns them as they will be served from the cache."""
+        payloads = {key: encode_vector(vector, self._encoding) for key, vector in vectors.items()}
+        self._lru_set_many(payloads)
+        if payloads and self._use_redis:
+            try:
+                pipeline = get_redis_binary_client().pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    pipeline.set(key, payload, ex=self._ttl_seconds)
+                pipeline.execute()
+            except Exception:
+                logger.debug("embedding_cache_redis_write_failed count=%s", len(payloads))
+        return {key: decode_vector(payload) for key, payload in payloads.items()}
+
+    async def aset_many(self, vectors: dict[str, list[float]]) -> dict[str, list[float]]:
+        payloads = {key: encode_vector(vector, self._encoding) for key, vector in vectors.items()}
+        self._lru_set_many(payloads)
+        if payloads and self._use_redis:
+            try:
+                pipeline = get_async_redis_binary_client().pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    pipeline.set(key, payload, ex=self._ttl_seconds)
+                await pipeline.execute()
+            except Exception:
+                logger.debug("embedding_cache_redis_write_failed count=%s", len(payloads))
+        return {key: decode_vector(payload) for key, payload in payloads.items()}
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "memory_hits": metrics.counter("embedding_cache.memory_hits"),
+            "redis_hits": metrics.counter("embedding_cache.redis_hits"),
+            "misses": metrics.counter("embedding_cache.misses"),
+        }
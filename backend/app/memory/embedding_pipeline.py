@@ -0,0 +1,112 @@
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.core.write_behind import WriteBehindQueue
+from app.memory.embeddings import DETERMINISTIC_EMBEDDING_MODEL, EmbeddingService
+from app.models.enums import RoleType
+from app.repositories.memory_repository import MemoryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryEmbeddingPipeline:
+    """
+    Embeds committed memory entries in batches, outside any DB transaction.
+
+    Entries are queued after the chat turn that created them has committed.
+    Workers embed up to `MEMORY_EMBEDDING_BATCH_SIZE` texts per
+    `embed_documents` call (or whatever arrived within
+    `MEMORY_EMBEDDING_BATCH_WAIT_MS`). The vectors are then bulk-inserted in a
+    short transaction of their own. A batch with deterministic fallback vectors
+    (primary provider down) is not stored; it fails so the queue retries it.
+    """
+
+    def __init__(self, settings: Settings, embedding_service: EmbeddingService):
+        self._settings = settings
+        self._embedding_service = embedding_service
+        self._queue = WriteBehindQueue(
+            name="memory_embeddings",
+            handler=self._aembed_batch,
+            backend=settings.chat_persistence_queue_backend,
+            batch_size=settings.memory_embedding_batch_size,
+            batch_wait_ms=settings.memory_embedding_batch_wait_ms,
+            max_attempts=settings.chat_persistence_max_attempts,
+            retry_backoff_seconds=settings.chat_persistence_retry_backoff_seconds,
+        )
+
+    async def asubmit(
+        self,
+        *,
+        memory_entry_id: str,
+        user_id: str,
+        role: str | None,
+        text: str,
+    ) -> None:
+        await self._queue.aenqueue(
+            {
+                "memory_entry_id": memory_entry_id,
+                "user_id": user_id,
+                "role": role,
+                "text": text,
+            }
+        )
+
+    async def aclose(self) -> None:
+        await self._queue.aclose()
+
+    async def _aembed_batch(self, jobs: list[dict[str, object]]) -> None:
+        started = time.perf_counter()
+        embeddings = await self._embedding_service.aembed_batch(
+            [str(job["text"]) for job in jobs]
+        )
+        embed_ms = (time.perf_counter() - started) * 1000
+
+        fallback_count = sum(
+            1 for embedding in embeddings if embedding.model != self._embedding_service.model
+        )
+        if fallback_count:
+            # Store nothing: the queue retries the jobs (one by one) with backoff
+            # and dead-letters them if the provider stays down.
+            metrics.increment("memory_embedding.fallback_batches")
+            raise RuntimeError(
+                f"embedding provider unavailable: {fallback_count} of {len(jobs)} "
+                f"vectors are {DETERMINISTIC_EMBEDDING_MODEL} fallbacks"
+            )
+
+        rows = [
+            {
+                "memory_entry_id": job["memory_entry_id"],
+                "user_id": job["user_id"],
+                "role": RoleType(job["role"]) if job["role"] else None,
+                "embedding_model": embedding.model,
+                "embedding_dimensions": embedding.dimensions,
+                "embedding": embedding.vector,
+                "distance_metric": "cosine",
+            }
+            for job, embedding in zip(jobs, embeddings)
+        ]
+
+        def write_rows(sync_session: Session) -> int:
+            return MemoryRepository(sync_session).bulk_create_memory_embeddings(rows)
+
+        write_started = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            written = await session.run_sync(write_rows)
+            await session.commit()
+        write_ms = (time.perf_counter() - write_started) * 1000
+
+        metrics.observe("memory_embedding.batch_size", len(jobs))
+        metrics.observe("memory_embedding.embed_latency_ms", embed_ms)
+        metrics.observe("memory_embedding.write_latency_ms", write_ms)
+        logger.info(
+            "memory_embedding_batch_written batch_size=%s written=%s embed_ms=%.1f write_ms=%.1f",
+            len(jobs),
+            written,
+            embed_ms,
+            write_ms,
+        )
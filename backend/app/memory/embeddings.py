@@ -1,43 +1,95 @@
 import hashlib
 import logging
-import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Protocol
 
+import numpy as np
+from numpy.typing import NDArray
+
+from app.core.settings import Settings
+from app.memory.embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
+DETERMINISTIC_EMBEDDING_MODEL = "deterministic-sha256"
+
+
+EmbeddingVector = list[float] | NDArray[np.float32]
+
 
 class EmbeddingProvider(Protocol):
-    def embed(self, text: str) -> list[float]:
+    def embed(self, text: str) -> EmbeddingVector:
         ...
 
+    async def aembed(self, text: str) -> EmbeddingVector:
+        ...
+
+    def embed_batch(self, texts: list[str]) -> Sequence[EmbeddingVector]:
+        ...
+
+    async def aembed_batch(self, texts: list[str]) -> Sequence[EmbeddingVector]:
+        ...
+
+
+@lru_cache(maxsize=65536)
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
 
 class DeterministicEmbeddingProvider:
     """
     Hash-based embedding for local dev when no API key is available.
     Not semantically meaningful -- use LangChainEmbeddingProvider in production.
+
+    Each whitespace token's SHA-256 digest is read as 16 big-endian uint16
+    pairs. A pair adds +1/-1 (by the parity of its first byte) to bucket
+    `pair % dimensions`, and the result is L2-normalized. All tokens of a
+    batch are scattered with one `bincount`; vectors are returned as float32.
     """
 
     def __init__(self, dimensions: int):
         self._dimensions = max(8, dimensions)
 
-    def embed(self, text: str) -> list[float]:
-        values = [0.0] * self._dimensions
-        normalized_text = text.strip().lower()
-        if not normalized_text:
-            return values
+    def embed(self, text: str) -> NDArray[np.float32]:
+        return self.embed_batch([text])[0]
+
+    async def aembed(self, text: str) -> NDArray[np.float32]:
+        # Pure CPU hashing; cheap enough to run inline on the event loop.
+        return self.embed(text)
+
+    def embed_batch(self, texts: list[str]) -> NDArray[np.float32]:
+        dimensions = self._dimensions
+        token_lists = [text.strip().lower().split() for text in texts]
+        token_counts = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(texts))
+        if not token_counts.sum():
+            return np.zeros((len(texts), dimensions), dtype=np.float32)
+
+        digests = np.frombuffer(
+            b"".join(_token_digest(token) for tokens in token_lists for token in tokens),
+            dtype=np.uint8,
+        ).reshape(-1, 32)
+        high = digests[:, 0::2].astype(np.int64)
+        buckets = ((high << 8) | digests[:, 1::2]) % dimensions
+        signs = np.where(high % 2 == 0, 1.0, -1.0)
 
-        for token in normalized_text.split():
-            digest = hashlib.sha256(token.encode("utf-8")).digest()
-            for byte_index in range(0, len(digest), 2):
-                bucket = int.from_bytes(
-                    digest[byte_index:byte_index + 2], "big") % self._dimensions
-                sign = 1.0 if digest[byte_index] % 2 == 0 else -1.0
-                values[bucket] += sign
+        # Offset each token's buckets by its text's row so one bincount
+        # accumulates the whole batch.
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), token_counts)
+        flat_buckets = (buckets + (rows * dimensions)[:, None]).ravel()
+        values = np.bincount(
+            flat_buckets, weights=signs.ravel(), minlength=len(texts) * dimensions
+        ).reshape(len(texts), dimensions)
 
-        norm = math.sqrt(sum(c * c for c in values))
-        if norm <= 0:
-            return values
-        return [c / norm for c in values]
+        # Bucket sums are small integers, so float64 squares and sums are
+        # exact and the normalized vectors match the scalar algorithm.
+        norms = np.sqrt(np.square(values).sum(axis=1, keepdims=True))
+        np.divide(values, norms, out=values, where=norms > 0)
+        return values.astype(np.float32)
+
+    async def aembed_batch(self, texts: list[str]) -> NDArray[np.float32]:
+        return self.embed_batch(texts)
 
 
 class LangChainEmbeddingProvider:
@@ -66,25 +118,163 @@ class LangChainEmbeddingProvider:
         self._dimensions = dimensions
 
     def embed(self, text: str) -> list[float]:
-        try:
-            result = self._embeddings.embed_query(text)
-            return result
-        except Exception:
-            logger.exception("langchain_embedding_failed, falling_back_to_deterministic")
-            fallback = DeterministicEmbeddingProvider(self._dimensions)
-            return fallback.embed(text)
+        return self._embeddings.embed_query(text)
 
+    async def aembed(self, text: str) -> list[float]:
+        return await self._embeddings.aembed_query(text)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents(texts)
+
+    async def aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        return await self._embeddings.aembed_documents(texts)
+
+
+@dataclass(frozen=True)
+class TaggedEmbedding:
+    vector: list[float]
+    model: str
+    dimensions: int
+
+
+class EmbeddingService:
+    """
+    Single embedding entry point shared by memory writes and retrieval reads.
 
-def build_embedding_provider(
+    Every vector is tagged with the model that actually produced it. If the
+    primary provider fails, the deterministic fallback vector is tagged as
+    `deterministic-sha256`, so it is never searched as a real embedding, and
+    `MemoryEmbeddingPipeline` fails the batch instead of storing it. With a cache attached, only vectors from the service's own
+    model are cached, so a transient outage never pins fallback vectors.
+    """
+
+    def __init__(
+        self,
+        primary: EmbeddingProvider | None,
+        *,
+        model: str,
+        dimensions: int,
+        cache: EmbeddingCache | None = None,
+    ):
+        self._primary = primary
+        self._model = model if primary is not None else DETERMINISTIC_EMBEDDING_MODEL
+        self._dimensions = dimensions
+        self._fallback = DeterministicEmbeddingProvider(dimensions)
+        self._cache = cache
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def cache(self) -> EmbeddingCache | None:
+        return self._cache
+
+    def _tag(self, vector: EmbeddingVector, model: str) -> TaggedEmbedding:
+        # pgvector stores float4, so every vector is carried at float32 precision.
+        values = np.asarray(vector, dtype=np.float32).tolist()
+        return TaggedEmbedding(vector=values, model=model, dimensions=len(values))
+
+    def _cache_keys(self, texts: list[str]) -> list[str]:
+        return [EmbeddingCache.key(self._model, self._dimensions, text) for text in texts]
+
+    def embed(self, text: str) -> TaggedEmbedding:
+        return self.embed_batch([text])[0]
+
+    async def aembed(self, text: str) -> TaggedEmbedding:
+        return (await self.aembed_batch([text]))[0]
+
+    def embed_batch(self, texts: list[str]) -> list[TaggedEmbedding]:
+        if self._cache is None:
+            return self._embed_uncached(texts)
+        keys = self._cache_keys(texts)
+        cached = self._cache.get_many(keys)
+        missing = [index for index, key in enumerate(keys) if key not in cached]
+        fallbacks: dict[str, TaggedEmbedding] = {}
+        if missing:
+            computed = self._embed_uncached([texts[index] for index in missing])
+            cached.update(self._cache.set_many({
+                keys[index]: embedding.vector
+                for index, embedding in zip(missing, computed)
+                if embedding.model == self._model
+            }))
+            fallbacks = {
+                keys[index]: embedding
+                for index, embedding in zip(missing, computed)
+                if embedding.model != self._model
+            }
+        return [
+            fallbacks[key] if key in fallbacks else self._tag(cached[key], self._model)
+            for key in keys
+        ]
+
+    async def aembed_batch(self, texts: list[str]) -> list[TaggedEmbedding]:
+        if self._cache is None:
+            return await self._aembed_uncached(texts)
+        keys = self._cache_keys(texts)
+        cached = await self._cache.aget_many(keys)
+        missing = [index for index, key in enumerate(keys) if key not in cached]
+        fallbacks: dict[str, TaggedEmbedding] = {}
+        if missing:
+            computed = await self._aembed_uncached([texts[index] for index in missing])
+            cached.update(await self._cache.aset_many({
+                keys[index]: embedding.vector
+                for index, embedding in zip(missing, computed)
+                if embedding.model == self._model
+            }))
+            fallbacks = {
+                keys[index]: embedding
+                for index, embedding in zip(missing, computed)
+                if embedding.model != self._model
+            }
+        return [
+            fallbacks[key] if key in fallbacks else self._tag(cached[key], self._model)
+            for key in keys
+        ]
+
+    def _embed_uncached(self, texts: list[str]) -> list[TaggedEmbedding]:
+        if self._primary is not None:
+            try:
+                vectors = (
+                    [self._primary.embed(texts[0])] if len(texts) == 1
+                    else self._primary.embed_batch(texts)
+                )
+                return [self._tag(vector, self._model) for vector in vectors]
+            except Exception:
+                logger.exception("embedding_failed model=%s, falling_back_to_deterministic", self._model)
+        return [
+            self._tag(vector, DETERMINISTIC_EMBEDDING_MODEL)
+            for vector in self._fallback.embed_batch(texts)
+        ]
+
+    async def _aembed_uncached(self, texts: list[str]) -> list[TaggedEmbedding]:
+        if self._primary is not None:
+            try:
+                vectors = (
+                    [await self._primary.aembed(texts[0])] if len(texts) == 1
+                    else await self._primary.aembed_batch(texts)
+                )
+                return [self._tag(vector, self._model) for vector in vectors]
+            except Exception:
+                logger.exception("embedding_failed model=%s, falling_back_to_deterministic", self._model)
+        return [
+            self._tag(vector, DETERMINISTIC_EMBEDDING_MODEL)
+            for vector in self._fallback.embed_batch(texts)
+        ]
+
+
+def build_embedding_service(
     *,
     api_key: str,
     model: str,
     base_url: str,
     dimensions: int,
-) -> EmbeddingProvider:
+    cache: EmbeddingCache | None = None,
+) -> EmbeddingService:
+    primary: EmbeddingProvider | None = None
     if api_key:
         try:
-            return LangChainEmbeddingProvider(
+            primary = LangChainEmbeddingProvider(
                 api_key=api_key,
                 model=model,
                 base_url=base_url,
@@ -92,4 +282,47 @@ def build_embedding_provider(
             )
         except Exception:
             logger.exception("langchain_embedding_init_failed, using_deterministic")
-    return DeterministicEmbeddingProvider(dimensions)
+    return EmbeddingService(primary, model=model, dimensions=dimensions, cache=cache)
+
+
+@lru_cache(maxsize=4)
+def _shared_embedding_service(
+    api_key: str,
+    model: str,
+    base_url: str,
+    dimensions: int,
+    cache_settings: tuple[bool, int, int, str],
+) -> EmbeddingService:
+    cache_enabled, max_entries, ttl_seconds, encoding = cache_settings
+    cache = None
+    if cache_enabled:
+        cache = EmbeddingCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            encoding=encoding,
+            # Hashing locally is cheaper than a Redis round trip.
+            use_redis=bool(api_key),
+        )
+    return build_embedding_service(
+        api_key=api_key,
+        model=model,
+        base_url=base_url,
+        dimensions=dimensions,
+        cache=cache,
+    )
+
+
+def get_embedding_service(settings: Settings) -> EmbeddingService:
+    """Return the process-wide embedding service for the given settings."""
+    return _shared_embedding_service(
+        settings.minimax_api_key,
+        settings.memory_embedding_model,
+        settings.minimax_base_url,
+        settings.memory_embedding_dimensions,
+        (
+            settings.embedding_cache_enabled,
+            settings.embedding_cache_max_entries,
+            settings.embedding_cache_ttl_seconds,
+            settings.embedding_cache_encoding,
+        ),
+    )
@@ -0,0 +1,158 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from app.schemas.chat import ChatRole
+
+# Turns that are pure acknowledgement or greeting never need web context.
+_SMALL_TALK_PHRASES = frozenset(
+    {
+        "hi",
+        "hello",
+        "hey",
+        "thanks",
+        "thank you",
+        "thank you so much",
+        "thx",
+        "ok",
+        "okay",
+        "ok thanks",
+        "cool",
+        "nice",
+        "great",
+        "got it",
+        "sounds good",
+        "sure",
+        "yes",
+        "no",
+        "bye",
+        "good night",
+        "good morning",
+        "lol",
+        "haha",
+        "多謝",
+        "唔該",
+        "好",
+        "好呀",
+        "你好",
+        "早晨",
+        "拜拜",
+        "係",
+        "唔係",
+    }
+)
+# Signals that the answer depends on what is happening now.
+_FRESHNESS_KEYWORDS = (
+    "today",
+    "tonight",
+    "tomorrow",
+    "this weekend",
+    "this week",
+    "latest",
+    "news",
+    "event",
+    "festival",
+    "exhibition",
+    "concert",
+    "open now",
+    "opening hours",
+    "closing time",
+    "schedule",
+    "weather",
+    "typhoon",
+    "traffic",
+    "price",
+    "deadline",
+    "exam date",
+    "今日",
+    "今晚",
+    "聽日",
+    "最新",
+    "新聞",
+    "活動",
+    "天氣",
+    "颱風",
+)
+# Signals that the user is asking about places in Hong Kong.
+_LOCAL_KEYWORDS = (
+    "where",
+    "near",
+    "nearby",
+    "recommend",
+    "restaurant",
+    "cafe",
+    "bar",
+    "park",
+    "museum",
+    "hike",
+    "beach",
+    "market",
+    "mall",
+    "mtr",
+    "ferry",
+    "central",
+    "mong kok",
+    "tsim sha tsui",
+    "causeway bay",
+    "sham shui po",
+    "hong kong",
+    "邊度",
+    "附近",
+    "推介",
+    "餐廳",
+    "香港",
+)
+_TOKEN_PATTERN = re.compile(r"[\w']+|[^\w\s]", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class RetrievalGateDecision:
+    should_retrieve: bool
+    reason: str
+
+
+def _normalize(message: str) -> str:
+    text = unicodedata.normalize("NFKC", message).casefold()
+    return " ".join(re.sub(r"[^\w\s']", " ", text).split())
+
+
+def _contains_keyword(text: str, keywords: tuple[str, ...]) -> bool:
+    padded = f" {text} "
+    for keyword in keywords:
+        # CJK keywords have no word boundaries; latin ones must match whole
+        # words (allowing a plural "s").
+        if keyword.isascii():
+            if f" {keyword} " in padded or f" {keyword}s " in padded:
+                return True
+        elif keyword in text:
+            return True
+    return False
+
+
+def classify_fresh_retrieval(
+    role: ChatRole,
+    message: str,
+    *,
+    signal_only_roles: frozenset[str] = frozenset(),
+) -> RetrievalGateDecision:
+    """
+    Decide whether a chat turn is worth an Exa web search.
+
+    Explicit freshness or local-place keywords always retrieve. Small talk and
+    near-empty turns never do. Any other turn retrieves as before the gate,
+    unless its role is in `signal_only_roles`, which only retrieve on a keyword.
+    """
+    text = _normalize(message)
+    if not text:
+        return RetrievalGateDecision(False, "empty")
+    if text in _SMALL_TALK_PHRASES:
+        return RetrievalGateDecision(False, "small_talk")
+    if _contains_keyword(text, _FRESHNESS_KEYWORDS):
+        return RetrievalGateDecision(True, "freshness_keyword")
+    if _contains_keyword(text, _LOCAL_KEYWORDS):
+        return RetrievalGateDecision(True, "local_keyword")
+    if len(_TOKEN_PATTERN.findall(text)) < 3 and text.isascii():
+        return RetrievalGateDecision(False, "too_short")
+    if role in signal_only_roles:
+        return RetrievalGateDecision(False, "no_fresh_signal")
+    return RetrievalGateDecision(True, "role_default")
@@ -0,0 +1,40 @@
+from app.core.settings import Settings
+
+VECTOR_INDEX_TYPES = ("hnsw", "ivfflat")
+
+
+def resolve_vector_index_type(settings: Settings) -> str:
+    index_type = settings.memory_vector_index_type.strip().lower()
+    return index_type if index_type in VECTOR_INDEX_TYPES else "hnsw"
+
+
+def vector_index_name(index_type: str, *, table: str = "memory_embeddings") -> str:
+    return f"ix_{table}_embedding_{index_type}"
+
+
+def create_vector_index_sql(
+    settings: Settings,
+    *,
+    table: str = "memory_embeddings",
+    index_type: str | None = None,
+) -> str:
+    """DDL for the cosine ANN index on `<table>.embedding`, using build parameters from `Settings`."""
+    resolved_type = index_type or resolve_vector_index_type(settings)
+    if resolved_type == "ivfflat":
+        options = f"lists = {max(1, settings.memory_vector_ivfflat_lists)}"
+    else:
+        options = (
+            f"m = {max(2, settings.memory_vector_hnsw_m)}, "
+            f"ef_construction = {max(4, settings.memory_vector_hnsw_ef_construction)}"
+        )
+    return (
+        f"CREATE INDEX IF NOT EXISTS {vector_index_name(resolved_type, table=table)} "
+        f"ON {table} USING {resolved_type} (embedding vector_cosine_ops) WITH ({options})"
+    )
+
+
+def vector_search_parameters(settings: Settings) -> dict[str, str]:
+    """Per-query recall/latency knobs, applied with `set_config(..., is_local => true)`."""
+    if resolve_vector_index_type(settings) == "ivfflat":
+        return {"ivfflat.probes": str(max(1, settings.memory_vector_ivfflat_probes))}
+    return {"hnsw.ef_search": str(max(1, settings.memory_vector_hnsw_ef_search))}
@@ -1,5 +1,6 @@
 from app.models.audit import AuditEvent, ProviderEvent
 from app.models.chat import ChatMessage, ChatThread, SafetyEvent
+from app.models.checkpoint import LangGraphCheckpoint
 from app.models.family_mode import FamilyShareCard, FamilyShareConsent
 from app.models.memory import MemoryEmbedding, MemoryEntry
 from app.models.recommendation import RecommendationItem, RecommendationRequest
@@ -12,6 +13,7 @@ __all__ = [
     "ChatThread",
     "FamilyShareCard",
     "FamilyShareConsent",
+    "LangGraphCheckpoint",
     "MemoryEmbedding",
     "MemoryEntry",
     "ProviderEvent",
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.base import TimestampMixin
+
+
+class LangGraphCheckpoint(Base, TimestampMixin):
+    """
+    Latest LangGraph checkpoint (kind="checkpoint") and its pending writes
+    (kind="writes:<checkpoint_id>:<task_id>", one row per task).
+    """
+
+    __tablename__ = "langgraph_checkpoints"
+    __table_args__ = (
+        Index("ix_langgraph_checkpoints_expires_at", "expires_at"),
+    )
+
+    thread_id: Mapped[str] = mapped_column(String(256), primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(
+        String(256), primary_key=True, default="")
+    kind: Mapped[str] = mapped_column(String(128), primary_key=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False)
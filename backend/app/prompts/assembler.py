@@ -0,0 +1,336 @@
+"""
+Token-budgeted prompt assembly from the conversation context.
+
+`ConversationContextBuilder.build` gathers short-term turns, the user's
+profile and preferences, long-term retrievals and fresh web results. The
+assembler packs them into provider messages under one token budget, taking
+sections in `SECTION_PRIORITY` order: a section only gets what the sections
+before it left over, and items that do not fit are dropped. The system prompt
+and the incoming message are always sent.
+
+Long-term retrievals and web results that repeat something already in the
+prompt (the incoming message, a short-term turn, a profile fact or an earlier
+retrieval) are skipped, and every retrieved snippet and summary is truncated
+to a fixed token allowance before it is costed.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.core.tokens import MESSAGE_OVERHEAD_TOKENS, TokenCounter, text_pieces
+
+logger = logging.getLogger(__name__)
+
+SECTION_PRIORITY = (
+    "safety",
+    "profile",
+    "summary",
+    "history",
+    "long_term_retrieval",
+    "fresh_retrieval",
+)
+_SECTION_HEADERS = {
+    "safety": "SAFETY CONTEXT:",
+    "profile": "WHAT YOU KNOW ABOUT THE USER:",
+    "summary": "SUMMARY OF EARLIER CONVERSATION:",
+    "long_term_retrieval": "RELEVANT MEMORIES:",
+    "fresh_retrieval": "FRESH WEB RESULTS:",
+}
+# Share of an item's words already present in one earlier item for it to be
+# treated as a repeat.
+_DUPLICATE_OVERLAP = 0.8
+
+
+def _fingerprint(text: str) -> frozenset[str]:
+    return frozenset(text_pieces(text))
+
+
+def _is_duplicate(fingerprint: frozenset[str], seen: list[frozenset[str]]) -> bool:
+    if not fingerprint:
+        return True
+    threshold = _DUPLICATE_OVERLAP * len(fingerprint)
+    return any(len(fingerprint & other) >= threshold for other in seen)
+
+
+def _section_entries(memory: dict[str, Any], name: str, key: str = "entries") -> list[Any]:
+    section = memory.get(name)
+    if not isinstance(section, dict):
+        return []
+    entries = section.get(key)
+    return entries if isinstance(entries, list) else []
+
+
+def _valid_history(history: list[Any]) -> list[dict[str, str]]:
+    return [
+        {"role": turn["role"], "content": str(turn.get("content", ""))}
+        for turn in history
+        if isinstance(turn, dict) and turn.get("role") in ("user", "assistant")
+    ]
+
+
+def _short_term_history(entries: list[Any]) -> list[dict[str, str]]:
+    """Short-term turns (stored newest first) as chat messages, oldest first."""
+    history: list[dict[str, str]] = []
+    for entry in reversed(entries):
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("user_message"):
+            history.append({"role": "user", "content": str(entry["user_message"])})
+        if entry.get("assistant_reply"):
+            history.append({"role": "assistant", "content": str(entry["assistant_reply"])})
+    return history
+
+
+def _group_turns(history: list[dict[str, str]]) -> list[list[dict[str, str]]]:
+    """Split messages into turns, each starting at a user message."""
+    turns: list[list[dict[str, str]]] = []
+    for message in history:
+        if message["role"] == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+@dataclass(frozen=True)
+class AssembledPrompt:
+    """
+    Provider messages for one turn: an optional system message carrying the
+    packed context, the kept history, then the incoming user message.
+    """
+
+    messages: list[dict[str, str]]
+    prompt_tokens: int
+    section_tokens: dict[str, int]
+    dropped_items: int
+    deduplicated_items: int
+
+
+class PromptAssembler:
+    """
+    Packs the conversation context into provider messages under `token_budget`.
+
+    Each assembly observes `prompt_assembler.prompt_tokens` and counts
+    `prompt_assembler.dropped_items` (did not fit the budget) and
+    `prompt_assembler.deduplicated_items` (repeated content that was skipped).
+    """
+
+    def __init__(
+        self,
+        *,
+        token_budget: int = 4000,
+        item_max_tokens: int = 120,
+        summary_max_tokens: int = 300,
+        token_counter: TokenCounter | None = None,
+    ):
+        self._token_budget = max(1, token_budget)
+        self._item_max_tokens = max(1, item_max_tokens)
+        self._summary_max_tokens = max(1, summary_max_tokens)
+        self._counter = token_counter or TokenCounter()
+
+    @classmethod
+    def from_settings(
+        cls, app_settings: Settings, *, token_counter: TokenCounter | None = None
+    ) -> "PromptAssembler":
+        return cls(
+            token_budget=app_settings.prompt_token_budget,
+            item_max_tokens=app_settings.prompt_item_max_tokens,
+            summary_max_tokens=app_settings.langgraph_history_summary_max_tokens,
+            token_counter=token_counter or TokenCounter(app_settings.prompt_tokenizer),
+        )
+
+    @property
+    def token_budget(self) -> int:
+        return self._token_budget
+
+    @property
+    def token_counter(self) -> TokenCounter:
+        return self._counter
+
+    def assemble(
+        self,
+        *,
+        system_prompt: str,
+        context: dict[str, Any],
+        message: str,
+        history: list[Any] | None = None,
+        summary: str = "",
+    ) -> AssembledPrompt:
+        """
+        Build the messages for `message`.
+
+        `history` is the conversation the runtime already tracks (the LangGraph
+        checkpoint window); without it the short-term turns from the context
+        are sent as history instead. `summary` is the rolling summary of turns
+        older than `history`.
+        """
+        memory = context.get("memory")
+        memory = memory if isinstance(memory, dict) else {}
+        short_term_entries = _section_entries(memory, "short_term")
+
+        seen: list[frozenset[str]] = [_fingerprint(message)]
+        if history is None:
+            history = _short_term_history(short_term_entries)
+        else:
+            history = _valid_history(history)
+            # The runtime's history already holds these turns.
+            seen.extend(
+                _fingerprint(f"{entry.get('user_message', '')} {entry.get('assistant_reply', '')}")
+                for entry in short_term_entries
+                if isinstance(entry, dict)
+            )
+
+        used = MESSAGE_OVERHEAD_TOKENS + self._counter.count(message)
+        if system_prompt:
+            used += MESSAGE_OVERHEAD_TOKENS + self._counter.count(system_prompt)
+        blocks: list[str] = []
+        section_tokens: dict[str, int] = {}
+        kept_history: list[dict[str, str]] = []
+        dropped = 0
+        deduplicated = 0
+        context_overhead_charged = bool(system_prompt)
+
+        for name in SECTION_PRIORITY:
+            if name == "history":
+                turns = _group_turns(history)
+                kept_turns = 0
+                cost = 0
+                for turn in reversed(turns):
+                    turn_cost = self._counter.count_messages(turn)
+                    if used + cost + turn_cost > self._token_budget:
+                        break
+                    kept_turns += 1
+                    cost += turn_cost
+                for turn in turns[len(turns) - kept_turns:]:
+                    kept_history.extend(turn)
+                    seen.append(_fingerprint(" ".join(turn_message["content"] for turn_message in turn)))
+                dropped += len(history) - len(kept_history)
+                used += cost
+                section_tokens[name] = cost
+                continue
+
+            items = self._section_items(name, context, memory, summary)
+            lines: list[str] = []
+            cost = 0
+            for text, fingerprint in items:
+                if name in ("long_term_retrieval", "fresh_retrieval") and _is_duplicate(fingerprint, seen):
+                    deduplicated += 1
+                    continue
+                line_cost = self._counter.count(text)
+                if not lines:
+                    line_cost += self._counter.count(_SECTION_HEADERS[name])
+                    if not context_overhead_charged:
+                        line_cost += MESSAGE_OVERHEAD_TOKENS
+                if used + cost + line_cost > self._token_budget:
+                    dropped += 1
+                    continue
+                lines.append(text)
+                cost += line_cost
+                context_overhead_charged = True
+                seen.append(fingerprint)
+            if lines:
+                blocks.append("\n".join([_SECTION_HEADERS[name], *lines]))
+            used += cost
+            section_tokens[name] = cost
+
+        system_content = "\n\n".join(part for part in [system_prompt, *blocks] if part)
+        messages: list[dict[str, str]] = []
+        if system_content:
+            messages.append({"role": "system", "content": system_content})
+        messages.extend(kept_history)
+        messages.append({"role": "user", "content": message})
+
+        metrics.observe("prompt_assembler.prompt_tokens", used)
+        if dropped:
+            metrics.increment("prompt_assembler.dropped_items", dropped)
+        if deduplicated:
+            metrics.increment("prompt_assembler.deduplicated_items", deduplicated)
+        logger.info(
+            "prompt_assembled thread_id=%s prompt_tokens=%s budget=%s tokenizer=%s dropped=%s deduplicated=%s",
+            context.get("thread_id"),
+            used,
+            self._token_budget,
+            self._counter.name,
+            dropped,
+            deduplicated,
+        )
+        return AssembledPrompt(
+            messages=messages,
+            prompt_tokens=used,
+            section_tokens=section_tokens,
+            dropped_items=dropped,
+            deduplicated_items=deduplicated,
+        )
+
+    def _section_items(
+        self,
+        name: str,
+        context: dict[str, Any],
+        memory: dict[str, Any],
+        summary: str,
+    ) -> list[tuple[str, frozenset[str]]]:
+        """Rendered lines of a section, in keep order, with their dedupe fingerprints."""
+        if name == "safety":
+            safety = context.get("safety")
+            if not isinstance(safety, dict):
+                return []
+            action = safety.get("policy_action") or "allow"
+            if action == "allow" and not safety.get("show_crisis_banner"):
+                return []
+            emotion = safety.get("emotion_label") or "unknown"
+            text = (
+                f"- The safety monitor flagged this message (policy: {action}, emotion: {emotion}). "
+                "Prioritize de-escalation and support."
+            )
+            return [(text, _fingerprint(text))]
+
+        if name == "profile":
+            items: list[tuple[str, frozenset[str]]] = []
+            for profile in _section_entries(memory, "long_term_profile", "profiles"):
+                if not isinstance(profile, dict) or profile.get("is_sensitive"):
+                    continue
+                fact = self._counter.truncate(
+                    f"{profile.get('key', '')}: {profile.get('value', '')}", self._item_max_tokens
+                )
+                items.append((f"- {fact}", _fingerprint(fact)))
+            preferences = [
+                preference
+                for preference in _section_entries(memory, "long_term_profile", "preferences")
+                if isinstance(preference, dict) and preference.get("tag")
+            ]
+            preferences.sort(key=lambda preference: float(preference.get("weight") or 0.0), reverse=True)
+            for preference in preferences:
+                tag = str(preference["tag"])
+                items.append((f"- Interested in: {tag}", _fingerprint(tag)))
+            return items
+
+        if name == "summary":
+            if not summary:
+                return []
+            text = self._counter.truncate(summary, self._summary_max_tokens)
+            return [(text, _fingerprint(text))]
+
+        if name == "long_term_retrieval":
+            items = []
+            for entry in _section_entries(memory, "long_term_retrieval"):
+                if not isinstance(entry, dict) or not entry.get("content"):
+                    continue
+                content = self._counter.truncate(str(entry["content"]), self._item_max_tokens)
+                items.append((f"- {content}", _fingerprint(content)))
+            return items
+
+        items = []
+        for entry in _section_entries(memory, "fresh_retrieval"):
+            if not isinstance(entry, dict):
+                continue
+            title = str(entry.get("title") or "").strip()
+            snippet = self._counter.truncate(str(entry.get("summary") or "").strip(), self._item_max_tokens)
+            if not title and not snippet:
+                continue
+            text = "- " + ": ".join(part for part in (title, snippet) if part)
+            if entry.get("url"):
+                text += f" ({entry['url']})"
+            items.append((text, _fingerprint(f"{title} {snippet}")))
+        return items
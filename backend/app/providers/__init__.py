@@ -6,7 +6,7 @@ from app.providers.google_maps import GoogleMapsProvider, StubMapsProvider
 from app.providers.minimax import MiniMaxChatProvider
 from app.providers.mock import MockChatProvider
 from app.providers.open_meteo import OpenMeteoWeatherProvider, StubWeatherProvider
-from app.providers.router import ProviderRouter
+from app.providers.router import ProviderRegistry, ProviderRouter
 
 __all__ = [
     "AWSAdapter",
@@ -17,6 +17,7 @@ __all__ = [
     "MiniMaxChatProvider",
     "MockChatProvider",
     "OpenMeteoWeatherProvider",
+    "ProviderRegistry",
     "ProviderRouter",
     "StubMapsProvider",
     "StubWeatherProvider"
@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any
 
 
@@ -9,6 +11,26 @@ class ChatProvider(ABC):
     def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
         """Generate a supportive chat reply."""
 
+    def is_fallback_reply(self, reply: str) -> bool:
+        """True when `reply` is a canned stand-in (outage, no model) rather than generated text."""
+        _ = reply
+        return False
+
+    async def agenerate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
+        """Async variant; providers with native async clients should override this."""
+        return await asyncio.to_thread(self.generate_reply, message, context)
+
+    async def astream_reply(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield reply text chunks; providers that support token streaming should override this.
+
+        A failure after the first chunk must raise instead of ending the
+        stream, so callers never take a partial reply for a complete one.
+        """
+        yield await self.agenerate_reply(message, context)
+
 
 class VoiceProvider(ABC):
     provider_name: str
@@ -25,6 +47,10 @@ class RetrievalProvider(ABC):
     def retrieve(self, query: str) -> list[dict[str, Any]]:
         """Return retrieval results for freshness/context enrichment."""
 
+    async def aretrieve(self, query: str) -> list[dict[str, Any]]:
+        """Async variant; providers with native async clients should override this."""
+        return await asyncio.to_thread(self.retrieve, query)
+
 
 class WeatherProvider(ABC):
     provider_name: str
@@ -67,3 +93,27 @@ class MapsProvider(ABC):
         travel_mode: str
     ) -> dict[str, Any] | None:
         """Return route metadata, if available."""
+
+    def get_routes_batch(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        travel_mode: str
+    ) -> list[dict[str, Any] | None]:
+        """Return route metadata for each (latitude, longitude) destination, in order.
+
+        Providers with a matrix endpoint should override this; the default
+        issues one `get_route` call per destination.
+        """
+        return [
+            self.get_route(
+                origin_latitude=origin_latitude,
+                origin_longitude=origin_longitude,
+                destination_latitude=destination_latitude,
+                destination_longitude=destination_longitude,
+                travel_mode=travel_mode,
+            )
+            for destination_latitude, destination_longitude in destinations
+        ]
@@ -1,5 +1,6 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 from io import BytesIO
 from pathlib import Path
@@ -59,10 +60,13 @@ class CantoneseAIVoiceProvider(VoiceProvider):
     SUPPORTED_FRAME_RATES = {"16000", "24000", "48000"}
     DEFAULT_FRAME_RATE = "24000"
 
-    def __init__(self):
+    def __init__(self, *, pool_maxsize: int = 10):
         """
         Initialize Cantonese.ai provider.
 
+        Args:
+            pool_maxsize: Keep-alive connections held by the HTTP session.
+
         Raises:
             ValueError: If CANTONESEAI_API_KEY environment variable is not set.
         """
@@ -76,6 +80,7 @@ class CantoneseAIVoiceProvider(VoiceProvider):
             )
 
         self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max(1, pool_maxsize)))
         self.session.headers.update({
             "User-Agent": "CantoneseAI-VoiceProvider/2.0"
         })
@@ -0,0 +1,187 @@
+import hashlib
+import json
+from typing import Any
+
+from app.core.single_flight import SingleFlight
+from app.providers.base import MapsProvider, RetrievalProvider, WeatherProvider
+from app.providers.maps_cache import place_search_key, route_key
+from app.providers.retrieval_cache import normalize_retrieval_query
+
+
+def _call_key(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+class SingleFlightWeatherProvider(WeatherProvider):
+    """Coalesces identical concurrent `get_current_weather` calls."""
+
+    def __init__(self, inner: WeatherProvider, single_flight: SingleFlight):
+        self._inner = inner
+        self._single_flight = single_flight
+        self.provider_name = inner.provider_name
+
+    def get_current_weather(
+        self,
+        *,
+        latitude: float,
+        longitude: float,
+        timezone: str = "auto"
+    ) -> dict[str, Any]:
+        return self._single_flight.do(
+            _call_key(self.provider_name, latitude, longitude, timezone),
+            lambda: self._inner.get_current_weather(
+                latitude=latitude, longitude=longitude, timezone=timezone
+            ),
+        )
+
+
+class SingleFlightMapsProvider(MapsProvider):
+    """
+    Coalesces concurrent place searches and route lookups that the caches
+    would answer with the same entry.
+
+    Searches key on the `PlaceSearchCache` key (normalized query and origin
+    geohash cell) plus `max_results`; route lookups key on the `RouteCache`
+    keys (origin cell and destinations rounded to four decimals). Nearby
+    callers in one cell therefore share one upstream call, just as they share
+    the cached result afterwards.
+    """
+
+    def __init__(
+        self,
+        inner: MapsProvider,
+        single_flight: SingleFlight,
+        *,
+        search_geohash_precision: int = 6,
+        route_geohash_precision: int = 7,
+    ):
+        self._inner = inner
+        self._single_flight = single_flight
+        self._search_geohash_precision = max(1, min(12, search_geohash_precision))
+        self._route_geohash_precision = max(1, min(12, route_geohash_precision))
+        self.provider_name = inner.provider_name
+
+    def _route_keys(
+        self,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        travel_mode: str,
+    ) -> list[tuple[str, str, str]]:
+        return [
+            route_key(
+                origin_latitude=origin_latitude,
+                origin_longitude=origin_longitude,
+                destination_latitude=destination_latitude,
+                destination_longitude=destination_longitude,
+                travel_mode=travel_mode,
+                geohash_precision=self._route_geohash_precision,
+            )
+            for destination_latitude, destination_longitude in destinations
+        ]
+
+    def search_places(
+        self,
+        *,
+        query: str,
+        latitude: float,
+        longitude: float,
+        radius_meters: int,
+        language: str,
+        max_results: int
+    ) -> list[dict[str, Any]]:
+        return self._single_flight.do(
+            _call_key(
+                "search",
+                place_search_key(
+                    query=query,
+                    language=language,
+                    latitude=latitude,
+                    longitude=longitude,
+                    radius_meters=radius_meters,
+                    geohash_precision=self._search_geohash_precision,
+                ),
+                max_results,
+            ),
+            lambda: self._inner.search_places(
+                query=query,
+                latitude=latitude,
+                longitude=longitude,
+                radius_meters=radius_meters,
+                language=language,
+                max_results=max_results,
+            ),
+        )
+
+    def get_route(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destination_latitude: float,
+        destination_longitude: float,
+        travel_mode: str
+    ) -> dict[str, Any] | None:
+        return self._single_flight.do(
+            _call_key(
+                "route",
+                self._route_keys(
+                    origin_latitude,
+                    origin_longitude,
+                    [(destination_latitude, destination_longitude)],
+                    travel_mode,
+                ),
+            ),
+            lambda: self._inner.get_route(
+                origin_latitude=origin_latitude,
+                origin_longitude=origin_longitude,
+                destination_latitude=destination_latitude,
+                destination_longitude=destination_longitude,
+                travel_mode=travel_mode,
+            ),
+        )
+
+    def get_routes_batch(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        travel_mode: str
+    ) -> list[dict[str, Any] | None]:
+        return self._single_flight.do(
+            _call_key(
+                "routes",
+                self._route_keys(origin_latitude, origin_longitude, destinations, travel_mode),
+            ),
+            lambda: self._inner.get_routes_batch(
+                origin_latitude=origin_latitude,
+                origin_longitude=origin_longitude,
+                destinations=destinations,
+                travel_mode=travel_mode,
+            ),
+        )
+
+
+class SingleFlightRetrievalProvider(RetrievalProvider):
+    """
+    Coalesces concurrent retrieval queries, sync or async, that normalize to
+    the same `RetrievalCache` key.
+    """
+
+    def __init__(self, inner: RetrievalProvider, single_flight: SingleFlight):
+        self._inner = inner
+        self._single_flight = single_flight
+        self.provider_name = inner.provider_name
+
+    def retrieve(self, query: str) -> list[dict[str, Any]]:
+        return self._single_flight.do(
+            _call_key(self.provider_name, normalize_retrieval_query(query)),
+            lambda: self._inner.retrieve(query),
+        )
+
+    async def aretrieve(self, query: str) -> list[dict[str, Any]]:
+        return await self._single_flight.ado(
+            _call_key(self.provider_name, normalize_retrieval_query(query)),
+            lambda: self._inner.aretrieve(query),
+        )
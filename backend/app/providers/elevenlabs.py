@@ -3,6 +3,7 @@ import os
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.providers.base import VoiceProvider
 
@@ -48,7 +49,7 @@ class ElevenLabsVoiceProvider(VoiceProvider):
 
     provider_name = "elevenlabs"
 
-    def __init__(self) -> None:
+    def __init__(self, *, pool_maxsize: int = 10) -> None:
         self.api_key = os.getenv("ELEVENLABS_API_KEY")
         if not self.api_key:
             logger.warning("ELEVENLABS_API_KEY environment variable not set")
@@ -62,6 +63,10 @@ class ElevenLabsVoiceProvider(VoiceProvider):
         )
         self.output_format = "mp3_44100_128"
 
+        # One keep-alive pool per instance; the router shares instances.
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max(1, pool_maxsize)))
+
     def synthesize(
         self,
         text: str,
@@ -90,7 +95,7 @@ class ElevenLabsVoiceProvider(VoiceProvider):
             }
             params = {"output_format": self.output_format}
 
-            response = requests.post(
+            response = self.session.post(
                 url,
                 params=params,
                 json=payload,
@@ -143,7 +148,7 @@ class ElevenLabsVoiceProvider(VoiceProvider):
                         language,
                     )
 
-            response = requests.post(
+            response = self.session.post(
                 url,
                 files=files,
                 data=data,
@@ -1,6 +1,7 @@
 import logging
 from typing import Any
 
+import httpx
 import requests
 
 from app.providers.base import RetrievalProvider
@@ -15,6 +16,10 @@ class StubRetrievalProvider(RetrievalProvider):
         _ = query
         return []
 
+    async def aretrieve(self, query: str) -> list[dict[str, Any]]:
+        _ = query
+        return []
+
 
 class ExaRetrievalProvider(RetrievalProvider):
     """
@@ -30,29 +35,31 @@ class ExaRetrievalProvider(RetrievalProvider):
         self._top_k = max(1, top_k)
         self._timeout_seconds = timeout_seconds
 
+    def _request_kwargs(self, query: str) -> dict[str, Any]:
+        return {
+            "headers": {
+                "x-api-key": self._api_key,
+                "Content-Type": "application/json",
+            },
+            "json": {
+                "query": f"{query} Hong Kong",
+                "numResults": self._top_k,
+                "useAutoprompt": True,
+                "contents": {
+                    "text": {"maxCharacters": 500},
+                    "highlights": {"numSentences": 2},
+                },
+            },
+            "timeout": self._timeout_seconds,
+        }
+
     def retrieve(self, query: str) -> list[dict[str, Any]]:
         if not self._api_key:
             logger.warning("exa_api_key_missing, returning_empty")
             return []
 
         try:
-            response = requests.post(
-                f"{self._base_url}/search",
-                headers={
-                    "x-api-key": self._api_key,
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "query": f"{query} Hong Kong",
-                    "numResults": self._top_k,
-                    "useAutoprompt": True,
-                    "contents": {
-                        "text": {"maxCharacters": 500},
-                        "highlights": {"numSentences": 2},
-                    },
-                },
-                timeout=self._timeout_seconds,
-            )
+            response = requests.post(f"{self._base_url}/search", **self._request_kwargs(query))
             if response.status_code != 200:
                 logger.warning(
                     "exa_request_failed status=%s body=%s",
@@ -65,6 +72,31 @@ class ExaRetrievalProvider(RetrievalProvider):
             logger.exception("exa_request_error")
             return []
 
+        return self._normalize_results(query, payload)
+
+    async def aretrieve(self, query: str) -> list[dict[str, Any]]:
+        if not self._api_key:
+            logger.warning("exa_api_key_missing, returning_empty")
+            return []
+
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(f"{self._base_url}/search", **self._request_kwargs(query))
+            if response.status_code != 200:
+                logger.warning(
+                    "exa_request_failed status=%s body=%s",
+                    response.status_code,
+                    response.text[:200],
+                )
+                return []
+            payload = response.json()
+        except Exception:
+            logger.exception("exa_request_error")
+            return []
+
+        return self._normalize_results(query, payload)
+
+    def _normalize_results(self, query: str, payload: Any) -> list[dict[str, Any]]:
         raw_results = payload.get("results") if isinstance(payload, dict) else None
         if not isinstance(raw_results, list):
             return []
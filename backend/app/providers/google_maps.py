@@ -5,6 +5,7 @@ from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
 from urllib.request import urlopen
 
+from app.core.geo import approximate_route
 from app.core.settings import Settings
 from app.providers.base import MapsProvider
 
@@ -12,6 +13,9 @@ logger = logging.getLogger(__name__)
 
 _TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
 _DIRECTIONS_URL = "https://maps.googleapis.com/maps/api/directions/json"
+_DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+# Distance Matrix accepts at most 25 destinations per request.
+_DISTANCE_MATRIX_MAX_DESTINATIONS = 25
 
 
 def _safe_float(value: Any) -> float | None:
@@ -66,6 +70,25 @@ class StubMapsProvider(MapsProvider):
         )
         return None
 
+    def get_routes_batch(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        travel_mode: str
+    ) -> list[dict[str, Any] | None]:
+        return [
+            approximate_route(
+                origin_latitude=origin_latitude,
+                origin_longitude=origin_longitude,
+                destination_latitude=destination_latitude,
+                destination_longitude=destination_longitude,
+                travel_mode=travel_mode,
+            )
+            for destination_latitude, destination_longitude in destinations
+        ]
+
 
 class GoogleMapsProvider(MapsProvider):
     provider_name = "google-maps"
@@ -232,3 +255,78 @@ class GoogleMapsProvider(MapsProvider):
             "duration_text": duration.get("text"),
             "travel_mode": mode
         }
+
+    def get_routes_batch(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        travel_mode: str
+    ) -> list[dict[str, Any] | None]:
+        if not self._api_key:
+            logger.warning("google_maps_api_key_missing route_skipped")
+            return [None] * len(destinations)
+
+        mode = travel_mode if travel_mode in {
+            "walking", "driving", "transit"} else "walking"
+        routes: list[dict[str, Any] | None] = []
+        for offset in range(0, len(destinations), _DISTANCE_MATRIX_MAX_DESTINATIONS):
+            chunk = destinations[offset:offset + _DISTANCE_MATRIX_MAX_DESTINATIONS]
+            routes.extend(
+                self._distance_matrix(
+                    origin=f"{origin_latitude},{origin_longitude}",
+                    destinations=chunk,
+                    mode=mode,
+                )
+            )
+        return routes
+
+    def _distance_matrix(
+        self,
+        *,
+        origin: str,
+        destinations: list[tuple[float, float]],
+        mode: str
+    ) -> list[dict[str, Any] | None]:
+        payload = self._get_json(
+            endpoint=_DISTANCE_MATRIX_URL,
+            params={
+                "origins": origin,
+                "destinations": "|".join(
+                    f"{latitude},{longitude}" for latitude, longitude in destinations
+                ),
+                "mode": mode,
+                "region": self._region,
+                "language": self._default_language,
+                "key": self._api_key
+            }
+        )
+        if payload is None:
+            return [None] * len(destinations)
+
+        status = str(payload.get("status", "UNKNOWN"))
+        if status != "OK":
+            logger.warning("google_maps_distance_matrix_unexpected_status status=%s", status)
+            return [None] * len(destinations)
+
+        rows = payload.get("rows") or []
+        elements = ((rows[0] or {}).get("elements") or []) if rows else []
+        routes: list[dict[str, Any] | None] = []
+        for index in range(len(destinations)):
+            element = elements[index] if index < len(elements) else None
+            if not element or element.get("status") != "OK":
+                routes.append(None)
+                continue
+            distance = element.get("distance") or {}
+            duration = element.get("duration") or {}
+            routes.append(
+                {
+                    "distance_meters": _safe_int(distance.get("value")),
+                    "distance_text": distance.get("text"),
+                    "duration_seconds": _safe_int(duration.get("value")),
+                    "duration_text": duration.get("text"),
+                    "travel_mode": mode
+                }
+            )
+        return routes
@@ -0,0 +1,413 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.core.geo import geohash_encode
+from app.core.metrics import metrics
+from app.core.redis_client import get_redis_client
+from app.providers.base import MapsProvider
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_place_query(query: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def place_search_key(
+    *,
+    query: str,
+    language: str,
+    latitude: float,
+    longitude: float,
+    radius_meters: int,
+    geohash_precision: int,
+) -> str:
+    cell = geohash_encode(latitude, longitude, geohash_precision)
+    digest = hashlib.sha256(normalize_place_query(query).encode("utf-8")).hexdigest()[:32]
+    return f"places:search:{language}:{radius_meters}:{cell}:{digest}"
+
+
+def route_key(
+    *,
+    origin_latitude: float,
+    origin_longitude: float,
+    destination_latitude: float,
+    destination_longitude: float,
+    travel_mode: str,
+    geohash_precision: int,
+    place_id: str | None = None,
+) -> "RouteCacheKey":
+    cell = geohash_encode(origin_latitude, origin_longitude, geohash_precision)
+    destination = place_id or f"{destination_latitude:.4f},{destination_longitude:.4f}"
+    return cell, destination, travel_mode
+
+
+class PlaceSearchCache:
+    """
+    Two-tier place search cache: an in-process LRU in front of Redis.
+
+    Keys are `(normalized query, language, radius, geohash cell of the
+    origin)`, so nearby users asking the same thing share one entry. An entry
+    younger than `ttl_seconds` is fresh. Up to `stale_seconds` past that it is
+    still served, but flagged for a background refresh (stale-while-revalidate).
+    Redis keeps entries for the whole fresh + stale window; Redis errors count
+    as misses.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_seconds: int = 900,
+        stale_seconds: int = 3600,
+        geohash_precision: int = 6,
+        use_redis: bool = True,
+    ):
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._stale_seconds = max(0, stale_seconds)
+        self._geohash_precision = max(1, min(12, geohash_precision))
+        self._use_redis = use_redis
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        *,
+        query: str,
+        language: str,
+        latitude: float,
+        longitude: float,
+        radius_meters: int,
+    ) -> str:
+        return place_search_key(
+            query=query,
+            language=language,
+            latitude=latitude,
+            longitude=longitude,
+            radius_meters=radius_meters,
+            geohash_precision=self._geohash_precision,
+        )
+
+    def _lru_get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _lru_set(self, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _record(self, outcome: str) -> None:
+        metrics.increment(f"place_search_cache.{outcome}")
+        metrics.set_gauge("place_search_cache.hit_ratio", self.hit_ratio())
+
+    def get(self, key: str, *, max_results: int) -> tuple[list[dict[str, Any]] | None, bool]:
+        """Return `(places, is_stale)`; `places` is None on a miss."""
+        now = time.time()
+        entry = self._lru_get(key)
+        tier = "memory_hits"
+        if entry is None and self._use_redis:
+            try:
+                raw = get_redis_client().get(key)
+                if raw:
+                    entry = json.loads(raw)
+                    self._lru_set(key, entry)
+                    tier = "redis_hits"
+            except Exception:
+                logger.debug("place_search_cache_redis_read_failed key=%s", key)
+
+        age = None if entry is None else now - float(entry["fetched_at"])
+        if (
+            entry is None
+            or age is None
+            or age > self._ttl_seconds + self._stale_seconds
+            # An entry fetched with a smaller limit cannot answer a larger request.
+            or int(entry["max_results"]) < max_results
+        ):
+            self._record("misses")
+            return None, False
+
+        is_stale = age > self._ttl_seconds
+        self._record("stale_hits" if is_stale else tier)
+        return [dict(place) for place in entry["places"][:max_results]], is_stale
+
+    def set(self, key: str, places: list[dict[str, Any]], *, max_results: int) -> None:
+        entry = {"fetched_at": time.time(), "max_results": max_results, "places": places}
+        self._lru_set(key, entry)
+        if self._use_redis:
+            try:
+                get_redis_client().set(
+                    key,
+                    json.dumps(entry),
+                    ex=self._ttl_seconds + self._stale_seconds,
+                )
+            except Exception:
+                logger.debug("place_search_cache_redis_write_failed key=%s", key)
+
+    @staticmethod
+    def hit_ratio() -> float:
+        hits = sum(
+            metrics.counter(f"place_search_cache.{outcome}")
+            for outcome in ("memory_hits", "redis_hits", "stale_hits")
+        )
+        total = hits + metrics.counter("place_search_cache.misses")
+        return hits / total if total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "memory_hits": metrics.counter("place_search_cache.memory_hits"),
+            "redis_hits": metrics.counter("place_search_cache.redis_hits"),
+            "stale_hits": metrics.counter("place_search_cache.stale_hits"),
+            "misses": metrics.counter("place_search_cache.misses"),
+            "hit_ratio": self.hit_ratio(),
+        }
+
+
+RouteCacheKey = tuple[str, str, str]
+
+
+class RouteCache:
+    """
+    Bounded in-process TTL cache of route/ETA metadata.
+
+    Keys are `(origin geohash cell, destination, travel_mode)`, where the
+    destination is a place_id or, failing that, coordinates rounded to four
+    decimals (about 11 m). Entries expire after `ttl_seconds`; beyond
+    `max_entries` the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 4096,
+        ttl_seconds: int = 600,
+        geohash_precision: int = 7,
+    ):
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._geohash_precision = max(1, min(12, geohash_precision))
+        self._entries: OrderedDict[RouteCacheKey, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destination_latitude: float,
+        destination_longitude: float,
+        travel_mode: str,
+        place_id: str | None = None,
+    ) -> RouteCacheKey:
+        return route_key(
+            origin_latitude=origin_latitude,
+            origin_longitude=origin_longitude,
+            destination_latitude=destination_latitude,
+            destination_longitude=destination_longitude,
+            travel_mode=travel_mode,
+            geohash_precision=self._geohash_precision,
+            place_id=place_id,
+        )
+
+    def get_many(self, keys: list[RouteCacheKey]) -> dict[RouteCacheKey, dict[str, Any]]:
+        now = time.monotonic()
+        found: dict[RouteCacheKey, dict[str, Any]] = {}
+        expired = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if now - entry[0] > self._ttl_seconds:
+                    del self._entries[key]
+                    expired += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = dict(entry[1])
+        if found:
+            metrics.increment("route_cache.hits", len(found))
+        if len(keys) > len(found):
+            metrics.increment("route_cache.misses", len(keys) - len(found))
+        if expired:
+            metrics.increment("route_cache.expired", expired)
+        return found
+
+    def set_many(self, routes: dict[RouteCacheKey, dict[str, Any]]) -> None:
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            for key, route in routes.items():
+                self._entries[key] = (now, dict(route))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.increment("route_cache.evictions", evicted)
+
+    def invalidate(
+        self,
+        *,
+        travel_mode: str,
+        origin_cell: str | None = None,
+        destination: str | None = None,
+    ) -> int:
+        """Drop entries for `travel_mode`, optionally narrowed to one origin cell and/or destination."""
+        with self._lock:
+            doomed = [
+                key
+                for key in self._entries
+                if key[2] == travel_mode
+                and (origin_cell is None or key[0] == origin_cell)
+                and (destination is None or key[1] == destination)
+            ]
+            for key in doomed:
+                del self._entries[key]
+        if doomed:
+            metrics.increment("route_cache.invalidated", len(doomed))
+        return len(doomed)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        hits = metrics.counter("route_cache.hits")
+        misses = metrics.counter("route_cache.misses")
+        return {
+            "size": size,
+            "max_entries": self._max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "expired": metrics.counter("route_cache.expired"),
+            "evictions": metrics.counter("route_cache.evictions"),
+            "invalidated": metrics.counter("route_cache.invalidated"),
+        }
+
+
+class CachedMapsProvider(MapsProvider):
+    """
+    Serves `search_places` through a `PlaceSearchCache` and delegates
+    everything else to the wrapped provider.
+
+    Stale entries are returned immediately while one background refresh per
+    key runs. Empty results are never cached, because the wrapped provider
+    also returns an empty list when the upstream request fails.
+    """
+
+    def __init__(self, inner: MapsProvider, cache: PlaceSearchCache):
+        self._inner = inner
+        self._cache = cache
+        self.provider_name = inner.provider_name
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="place-search-refresh"
+        )
+
+    @property
+    def cache(self) -> PlaceSearchCache:
+        return self._cache
+
+    def search_places(
+        self,
+        *,
+        query: str,
+        latitude: float,
+        longitude: float,
+        radius_meters: int,
+        language: str,
+        max_results: int
+    ) -> list[dict[str, Any]]:
+        search_kwargs = {
+            "query": query,
+            "latitude": latitude,
+            "longitude": longitude,
+            "radius_meters": radius_meters,
+            "language": language,
+            "max_results": max_results,
+        }
+        key = self._cache.key(
+            query=query,
+            language=language,
+            latitude=latitude,
+            longitude=longitude,
+            radius_meters=radius_meters,
+        )
+        places, is_stale = self._cache.get(key, max_results=max_results)
+        if places is not None:
+            if is_stale:
+                self._schedule_refresh(key, search_kwargs)
+            return places
+        return self._fetch(key, search_kwargs)
+
+    def _fetch(self, key: str, search_kwargs: dict[str, Any]) -> list[dict[str, Any]]:
+        places = self._inner.search_places(**search_kwargs)
+        if places:
+            self._cache.set(key, places, max_results=int(search_kwargs["max_results"]))
+        return places
+
+    def _schedule_refresh(self, key: str, search_kwargs: dict[str, Any]) -> None:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh() -> None:
+            try:
+                self._fetch(key, search_kwargs)
+                metrics.increment("place_search_cache.revalidations")
+            except Exception:
+                logger.exception("place_search_cache_revalidate_failed key=%s", key)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(refresh)
+
+    def get_route(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destination_latitude: float,
+        destination_longitude: float,
+        travel_mode: str
+    ) -> dict[str, Any] | None:
+        return self._inner.get_route(
+            origin_latitude=origin_latitude,
+            origin_longitude=origin_longitude,
+            destination_latitude=destination_latitude,
+            destination_longitude=destination_longitude,
+            travel_mode=travel_mode,
+        )
+
+    def get_routes_batch(
+        self,
+        *,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        travel_mode: str
+    ) -> list[dict[str, Any] | None]:
+        return self._inner.get_routes_batch(
+            origin_latitude=origin_latitude,
+            origin_longitude=origin_longitude,
+            destinations=destinations,
+            travel_mode=travel_mode,
+        )
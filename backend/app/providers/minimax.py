@@ -1,8 +1,14 @@
+import asyncio
 import logging
+import threading
+from collections.abc import AsyncIterator
 from typing import Any
+from weakref import WeakKeyDictionary
 
+import httpx
 from pydantic import SecretStr
 
+from app.prompts.assembler import PromptAssembler
 from app.providers.base import ChatProvider
 
 logger = logging.getLogger(__name__)
@@ -17,14 +23,25 @@ except ImportError:
     ChatOpenAI = None  # type: ignore[assignment]
     LANGCHAIN_AVAILABLE = False
 
+_UNAVAILABLE_REPLY = (
+    "I'm having trouble connecting right now. "
+    "Let me try again in a moment."
+)
+
+
 class MiniMaxChatProvider(ChatProvider):
     """
     MiniMax provider using LangChain's ChatOpenAI pointed at MiniMax's
     OpenAI-compatible endpoint (https://api.minimax.io/v1).
 
     When the LangGraph runtime is active, context may contain pre-built
-    'langchain_messages'. If present, we use them directly. Otherwise we
-    build messages from the raw context (system_prompt + plain message).
+    'langchain_messages'. If present, we use them directly. Otherwise the
+    `PromptAssembler` packs the raw context (system_prompt, memory, history
+    and the plain message) into messages under its token budget.
+
+    Instances are long-lived (see `ProviderRegistry`): the sync client and
+    one async client per event loop are built once and keep their HTTP
+    connections alive between calls.
     """
 
     provider_name = "minimax"
@@ -37,18 +54,27 @@ class MiniMaxChatProvider(ChatProvider):
         base_url: str = "https://api.minimax.io/v1",
         temperature: float = 0.7,
         max_tokens: int = 1024,
+        max_connections: int = 20,
+        keepalive_seconds: float = 60.0,
+        prompt_assembler: PromptAssembler | None = None,
     ):
         self._api_key = api_key
         self._model = model
         self._base_url = base_url
         self._temperature = temperature
         self._max_tokens = max_tokens
+        self._prompt_assembler = prompt_assembler or PromptAssembler()
+        self._limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(1, max_connections),
+            keepalive_expiry=keepalive_seconds,
+        )
         self._llm: Any = None
+        # httpx async pools are bound to the loop that opened them.
+        self._async_llms: "WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
 
-    def _get_llm(self) -> Any:
-        if self._llm is not None:
-            return self._llm
-
+    def _build_llm(self, **http_clients: Any) -> Any:
         if not LANGCHAIN_AVAILABLE:
             raise RuntimeError(
                 "langchain-openai is not installed. "
@@ -56,47 +82,56 @@ class MiniMaxChatProvider(ChatProvider):
             )
         assert ChatOpenAI is not None
 
-        self._llm = ChatOpenAI(
+        return ChatOpenAI(
             api_key=SecretStr(self._api_key),
             base_url=self._base_url,
             model=self._model,
             temperature=self._temperature,
             model_kwargs={"max_tokens": self._max_tokens},
+            **http_clients,
         )
-        return self._llm
 
-    def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
-        ctx = context or {}
-        if not LANGCHAIN_AVAILABLE:
-            logger.warning("minimax_langchain_unavailable")
-            return (
-                "I'm having trouble connecting right now. "
-                "Let me try again in a moment."
-            )
+    def _get_llm(self) -> Any:
+        with self._lock:
+            if self._llm is None:
+                self._llm = self._build_llm(http_client=httpx.Client(limits=self._limits))
+            return self._llm
+
+    def _get_async_llm(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            llm = self._async_llms.get(loop)
+            if llm is None:
+                llm = self._build_llm(http_async_client=httpx.AsyncClient(limits=self._limits))
+                self._async_llms[loop] = llm
+            return llm
+
+    def _build_messages(self, message: str, ctx: dict[str, Any]) -> list[Any]:
         assert SystemMessage is not None
         assert HumanMessage is not None
         assert AIMessage is not None
 
         lc_messages = ctx.get("langchain_messages")
         if isinstance(lc_messages, list) and lc_messages:
-            return self._invoke_with_messages(lc_messages)
-
-        system_prompt = ctx.get("system_prompt", "")
+            return lc_messages
+
+        history = ctx.get("history")
+        assembled = self._prompt_assembler.assemble(
+            system_prompt=ctx.get("system_prompt", ""),
+            context=ctx,
+            message=message,
+            history=history if isinstance(history, list) else None,
+        )
         messages: list[Any] = []
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
-
-        history = ctx.get("history", [])
-        if isinstance(history, list):
-            for turn in history:
-                if not isinstance(turn, dict):
-                    continue
-                role = turn.get("role", "")
-                content = turn.get("content", "")
-                if role == "user":
-                    messages.append(HumanMessage(content=content))
-                elif role == "assistant":
-                    messages.append(AIMessage(content=content))
+        for turn in assembled.messages[:-1]:
+            role = turn["role"]
+            content = turn["content"]
+            if role == "system":
+                messages.append(SystemMessage(content=content))
+            elif role == "user":
+                messages.append(HumanMessage(content=content))
+            elif role == "assistant":
+                messages.append(AIMessage(content=content))
 
         attachment = ctx.get("attachment")
         if attachment and isinstance(attachment, dict) and attachment.get("has_base64"):
@@ -111,27 +146,74 @@ class MiniMaxChatProvider(ChatProvider):
                 messages.append(HumanMessage(content=message))
         else:
             messages.append(HumanMessage(content=message))
-        return self._invoke_with_messages(messages)
+        return messages
+
+    def is_fallback_reply(self, reply: str) -> bool:
+        return reply.strip() == _UNAVAILABLE_REPLY
+
+    def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
+        if not LANGCHAIN_AVAILABLE:
+            logger.warning("minimax_langchain_unavailable")
+            return _UNAVAILABLE_REPLY
+        return self._invoke_with_messages(self._build_messages(message, context or {}))
+
+    async def agenerate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
+        if not LANGCHAIN_AVAILABLE:
+            logger.warning("minimax_langchain_unavailable")
+            return _UNAVAILABLE_REPLY
+        return await self._ainvoke_with_messages(self._build_messages(message, context or {}))
+
+    async def astream_reply(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        if not LANGCHAIN_AVAILABLE:
+            logger.warning("minimax_langchain_unavailable")
+            yield _UNAVAILABLE_REPLY
+            return
+        messages = self._build_messages(message, context or {})
+        streamed_any = False
+        try:
+            llm = self._get_async_llm()
+            async for chunk in llm.astream(messages):
+                text = self._response_text(chunk)
+                if text:
+                    streamed_any = True
+                    yield text
+        except Exception:
+            logger.exception("minimax_provider_stream_error streamed_any=%s", streamed_any)
+            if streamed_any:
+                # The caller already has part of a reply; fail the turn rather
+                # than let it be persisted as if complete.
+                raise
+            yield _UNAVAILABLE_REPLY
+
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        content = getattr(response, "content", "")
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            text_chunks = [
+                item["text"]
+                for item in content
+                if isinstance(item, dict) and isinstance(item.get("text"), str)
+            ]
+            if text_chunks:
+                return "\n".join(text_chunks)
+        return str(content)
 
     def _invoke_with_messages(self, messages: list[Any]) -> str:
         try:
             llm = self._get_llm()
-            response = llm.invoke(messages)
-            content = getattr(response, "content", "")
-            if isinstance(content, str):
-                return content
-            if isinstance(content, list):
-                text_chunks = [
-                    item["text"]
-                    for item in content
-                    if isinstance(item, dict) and isinstance(item.get("text"), str)
-                ]
-                if text_chunks:
-                    return "\n".join(text_chunks)
-            return str(content)
+            return self._response_text(llm.invoke(messages))
         except Exception:
             logger.exception("minimax_provider_error")
-            return (
-                "I'm having trouble connecting right now. "
-                "Let me try again in a moment."
-            )
+            return _UNAVAILABLE_REPLY
+
+    async def _ainvoke_with_messages(self, messages: list[Any]) -> str:
+        try:
+            llm = self._get_async_llm()
+            return self._response_text(await llm.ainvoke(messages))
+        except Exception:
+            logger.exception("minimax_provider_error")
+            return _UNAVAILABLE_REPLY
@@ -6,6 +6,11 @@ from app.providers.base import ChatProvider
 class MockChatProvider(ChatProvider):
     provider_name = "mock"
 
+    def is_fallback_reply(self, reply: str) -> bool:
+        # Every mock reply is a fixed greeting.
+        _ = reply
+        return True
+
     def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
         _ = message
         role = (context or {}).get("role", "companion")
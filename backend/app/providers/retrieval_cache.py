@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis_client, get_redis_client
+from app.providers.base import RetrievalProvider
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_retrieval_query(query: str) -> str:
+    """Casefold, drop punctuation and collapse whitespace so trivial variants share a key."""
+    text = unicodedata.normalize("NFKC", query).casefold()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+class RetrievalCache:
+    """
+    Retrieval result cache keyed by normalized query: an in-process LRU in
+    front of Redis, both bounded by `ttl_seconds`. Redis errors count as misses.
+    """
+
+    def __init__(
+        self,
+        *,
+        provider_name: str,
+        ttl_seconds: int = 1800,
+        max_entries: int = 512,
+        use_redis: bool = True,
+    ):
+        self._provider_name = provider_name
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._max_entries = max(1, max_entries)
+        self._use_redis = use_redis
+        self._entries: OrderedDict[str, tuple[float, list[dict[str, Any]]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, query: str) -> str:
+        digest = hashlib.sha256(normalize_retrieval_query(query).encode("utf-8")).hexdigest()[:32]
+        return f"retrieval:{self._provider_name}:{digest}"
+
+    def _get_local(self, key: str) -> list[dict[str, Any]] | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry[0] > self._ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return [dict(item) for item in entry[1]]
+
+    def _set_local(self, key: str, items: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _decode(self, key: str, raw: Any) -> list[dict[str, Any]] | None:
+        items = json.loads(raw)
+        if not isinstance(items, list):
+            return None
+        # Redis enforces the TTL; the local copy gets a fresh window.
+        self._set_local(key, items)
+        metrics.increment("retrieval_cache.redis_hits")
+        return [dict(item) for item in items]
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        items = self._get_local(key)
+        if items is not None:
+            metrics.increment("retrieval_cache.memory_hits")
+            return items
+        if self._use_redis:
+            try:
+                raw = get_redis_client().get(key)
+                if raw:
+                    decoded = self._decode(key, raw)
+                    if decoded is not None:
+                        return decoded
+            except Exception:
+                logger.debug("retrieval_cache_redis_read_failed key=%s", key)
+        metrics.increment("retrieval_cache.misses")
+        return None
+
+    async def aget(self, key: str) -> list[dict[str, Any]] | None:
+        items = self._get_local(key)
+        if items is not None:
+            metrics.increment("retrieval_cache.memory_hits")
+            return items
+        if self._use_redis:
+            try:
+                raw = await get_async_redis_client().get(key)
+                if raw:
+                    decoded = self._decode(key, raw)
+                    if decoded is not None:
+                        return decoded
+            except Exception:
+                logger.debug("retrieval_cache_redis_read_failed key=%s", key)
+        metrics.increment("retrieval_cache.misses")
+        return None
+
+    def set(self, key: str, items: list[dict[str, Any]]) -> None:
+        self._set_local(key, [dict(item) for item in items])
+        if self._use_redis:
+            try:
+                get_redis_client().set(key, json.dumps(items), ex=self._ttl_seconds)
+            except Exception:
+                logger.debug("retrieval_cache_redis_write_failed key=%s", key)
+
+    async def aset(self, key: str, items: list[dict[str, Any]]) -> None:
+        self._set_local(key, [dict(item) for item in items])
+        if self._use_redis:
+            try:
+                await get_async_redis_client().set(key, json.dumps(items), ex=self._ttl_seconds)
+            except Exception:
+                logger.debug("retrieval_cache_redis_write_failed key=%s", key)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        hits = metrics.counter("retrieval_cache.memory_hits") + metrics.counter("retrieval_cache.redis_hits")
+        misses = metrics.counter("retrieval_cache.misses")
+        return {
+            "size": size,
+            "memory_hits": metrics.counter("retrieval_cache.memory_hits"),
+            "redis_hits": metrics.counter("retrieval_cache.redis_hits"),
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_latency_ms": metrics.counter("retrieval_cache.saved_latency_ms"),
+        }
+
+
+class CachedRetrievalProvider(RetrievalProvider):
+    """
+    Serves `retrieve`/`aretrieve` through a `RetrievalCache`.
+
+    Upstream latency is recorded on every miss; each hit adds the running
+    average to `retrieval_cache.saved_latency_ms`. Empty results are never
+    cached, because the wrapped provider also returns an empty list when the
+    upstream request fails.
+    """
+
+    def __init__(self, inner: RetrievalProvider, cache: RetrievalCache):
+        self._inner = inner
+        self._cache = cache
+        self.provider_name = inner.provider_name
+
+    @property
+    def cache(self) -> RetrievalCache:
+        return self._cache
+
+    @staticmethod
+    def _record_hit() -> None:
+        metrics.increment(
+            "retrieval_cache.saved_latency_ms",
+            metrics.average("retrieval_cache.upstream_latency_ms"),
+        )
+
+    def retrieve(self, query: str) -> list[dict[str, Any]]:
+        key = self._cache.key(query)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._record_hit()
+            return cached
+        started = time.perf_counter()
+        items = self._inner.retrieve(query)
+        metrics.observe("retrieval_cache.upstream_latency_ms", (time.perf_counter() - started) * 1000)
+        if items:
+            self._cache.set(key, items)
+        return items
+
+    async def aretrieve(self, query: str) -> list[dict[str, Any]]:
+        key = self._cache.key(query)
+        cached = await self._cache.aget(key)
+        if cached is not None:
+            self._record_hit()
+            return cached
+        started = time.perf_counter()
+        items = await self._inner.aretrieve(query)
+        metrics.observe("retrieval_cache.upstream_latency_ms", (time.perf_counter() - started) * 1000)
+        if items:
+            await self._cache.aset(key, items)
+        return items
@@ -1,21 +1,117 @@
 import logging
+import os
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
 
 from app.core.settings import Settings
+from app.core.single_flight import SingleFlight, get_single_flight
+from app.prompts.assembler import PromptAssembler
 from app.providers.base import ChatProvider, MapsProvider, RetrievalProvider, VoiceProvider, WeatherProvider
 from app.providers.cantoneseai import CantoneseAIVoiceProvider
+from app.providers.coalescing import (
+    SingleFlightMapsProvider,
+    SingleFlightRetrievalProvider,
+    SingleFlightWeatherProvider,
+)
 from app.providers.elevenlabs import ElevenLabsVoiceProvider
 from app.providers.exa import ExaRetrievalProvider, StubRetrievalProvider
 from app.providers.google_maps import GoogleMapsProvider, StubMapsProvider
+from app.providers.maps_cache import CachedMapsProvider, PlaceSearchCache
 from app.providers.minimax import MiniMaxChatProvider
+from app.providers.retrieval_cache import CachedRetrievalProvider, RetrievalCache
 from app.providers.mock import MockChatProvider
 from app.providers.open_meteo import OpenMeteoWeatherProvider, StubWeatherProvider
 
 logger = logging.getLogger(__name__)
 
+_ProviderT = TypeVar("_ProviderT")
+
+
+class ProviderRegistry:
+    """
+    Process-wide registry of long-lived provider instances.
+
+    Each slot holds one instance together with the configuration it was built
+    from. A lookup with the same configuration returns the shared instance
+    (and its warm connection pool); a changed configuration rebuilds it.
+    Replaced instances are dropped rather than closed, since in-flight
+    requests may still hold them.
+    """
+
+    def __init__(self) -> None:
+        self._instances: dict[str, tuple[Hashable, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, slot: str, config: Hashable, factory: Callable[[], _ProviderT]) -> _ProviderT:
+        with self._lock:
+            entry = self._instances.get(slot)
+            if entry is not None and entry[0] == config:
+                return entry[1]
+            instance = factory()
+            self._instances[slot] = (config, instance)
+        if entry is not None:
+            logger.info("provider_rebuilt slot=%s", slot)
+        return instance
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+
+provider_registry = ProviderRegistry()
+
 
 class ProviderRouter:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, registry: ProviderRegistry | None = None):
         self._settings = settings
+        self._registry = registry or provider_registry
+
+    def _minimax_provider(
+        self,
+        slot: str,
+        *,
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> MiniMaxChatProvider:
+        config = (
+            self._settings.minimax_api_key,
+            model,
+            self._settings.minimax_base_url,
+            temperature,
+            max_tokens,
+            self._settings.provider_http_max_connections,
+            self._settings.provider_http_keepalive_seconds,
+            self._settings.prompt_token_budget,
+            self._settings.prompt_item_max_tokens,
+            self._settings.prompt_tokenizer,
+            self._settings.langgraph_history_summary_max_tokens,
+        )
+        return self._registry.get(
+            slot,
+            config,
+            lambda: MiniMaxChatProvider(
+                api_key=self._settings.minimax_api_key,
+                model=model,
+                base_url=self._settings.minimax_base_url,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                max_connections=self._settings.provider_http_max_connections,
+                keepalive_seconds=self._settings.provider_http_keepalive_seconds,
+                prompt_assembler=PromptAssembler.from_settings(self._settings),
+            ),
+        )
+
+    def _single_flight(self, name: str) -> SingleFlight | None:
+        if not self._settings.single_flight_enabled:
+            return None
+        return get_single_flight(
+            name,
+            use_redis=self._settings.single_flight_backend == "redis",
+            lock_ttl_seconds=self._settings.single_flight_lock_ttl_seconds,
+            wait_seconds=self._settings.single_flight_wait_seconds,
+        )
 
     def resolve_chat_provider(self) -> ChatProvider:
         if (
@@ -23,19 +119,14 @@ class ProviderRouter:
             and self._settings.feature_minimax_enabled
             and self._settings.minimax_api_key
         ):
-            return MiniMaxChatProvider(
-                api_key=self._settings.minimax_api_key,
-                model=self._settings.minimax_model,
-                base_url=self._settings.minimax_base_url,
-            )
+            return self._minimax_provider("chat", model=self._settings.minimax_model)
         return MockChatProvider()
 
     def resolve_safety_provider(self) -> ChatProvider:
         if self._settings.feature_minimax_enabled and self._settings.minimax_api_key:
-            return MiniMaxChatProvider(
-                api_key=self._settings.minimax_api_key,
+            return self._minimax_provider(
+                "safety",
                 model=self._settings.minimax_safety_model,
-                base_url=self._settings.minimax_base_url,
                 temperature=0.0,
                 max_tokens=300,
             )
@@ -43,24 +134,98 @@ class ProviderRouter:
 
     def resolve_weather_provider(self) -> WeatherProvider:
         if self._settings.feature_weather_enabled:
-            return OpenMeteoWeatherProvider(self._settings)
+            provider = OpenMeteoWeatherProvider(self._settings)
+            if self._settings.weather_cache_enabled:
+                # The weather cache already coalesces misses on its grid-cell key.
+                return provider
+            single_flight = self._single_flight("weather")
+            return provider if single_flight is None else SingleFlightWeatherProvider(provider, single_flight)
         return StubWeatherProvider()
 
     def resolve_maps_provider(self) -> MapsProvider:
         if self._settings.feature_google_maps_enabled and self._settings.google_maps_api_key:
-            return GoogleMapsProvider(self._settings)
+            single_flight = self._single_flight("maps")
+            if not self._settings.place_search_cache_enabled:
+                return self._google_maps_provider(single_flight)
+            # Long-lived so the place search cache and its refresh pool survive requests.
+            config = (
+                self._settings.google_maps_api_key,
+                self._settings.google_maps_language,
+                self._settings.google_maps_region,
+                self._settings.google_maps_photo_max_width,
+                self._settings.provider_timeout_seconds,
+                self._settings.place_search_cache_geohash_precision,
+                self._settings.place_search_cache_ttl_seconds,
+                self._settings.place_search_cache_stale_seconds,
+                self._settings.place_search_cache_max_entries,
+                self._settings.route_cache_geohash_precision,
+                single_flight,
+            )
+            return self._registry.get(
+                "maps",
+                config,
+                lambda: CachedMapsProvider(
+                    # Misses coalesce on the cache's own cell key, so a cold cell hits Google once.
+                    self._google_maps_provider(single_flight),
+                    PlaceSearchCache(
+                        max_entries=self._settings.place_search_cache_max_entries,
+                        ttl_seconds=self._settings.place_search_cache_ttl_seconds,
+                        stale_seconds=self._settings.place_search_cache_stale_seconds,
+                        geohash_precision=self._settings.place_search_cache_geohash_precision,
+                    ),
+                ),
+            )
         return StubMapsProvider()
 
+    def _google_maps_provider(self, single_flight: SingleFlight | None) -> MapsProvider:
+        provider = GoogleMapsProvider(self._settings)
+        if single_flight is None:
+            return provider
+        return SingleFlightMapsProvider(
+            provider,
+            single_flight,
+            search_geohash_precision=self._settings.place_search_cache_geohash_precision,
+            route_geohash_precision=self._settings.route_cache_geohash_precision,
+        )
+
     def resolve_retrieval_provider(self) -> RetrievalProvider:
         if self._settings.feature_exa_enabled and self._settings.exa_api_key:
-            return ExaRetrievalProvider(
-                api_key=self._settings.exa_api_key,
-                base_url=self._settings.exa_base_url,
-                top_k=self._settings.exa_top_k,
-                timeout_seconds=self._settings.provider_timeout_seconds,
+            single_flight = self._single_flight("retrieval")
+            if not self._settings.retrieval_cache_enabled:
+                return self._exa_provider(single_flight)
+            # Long-lived so the in-process tier of the retrieval cache survives requests.
+            config = (
+                self._settings.exa_api_key,
+                self._settings.exa_base_url,
+                self._settings.exa_top_k,
+                self._settings.provider_timeout_seconds,
+                self._settings.retrieval_cache_ttl_seconds,
+                self._settings.retrieval_cache_max_entries,
+                single_flight,
+            )
+            return self._registry.get(
+                "retrieval",
+                config,
+                lambda: CachedRetrievalProvider(
+                    self._exa_provider(single_flight),
+                    RetrievalCache(
+                        provider_name=ExaRetrievalProvider.provider_name,
+                        ttl_seconds=self._settings.retrieval_cache_ttl_seconds,
+                        max_entries=self._settings.retrieval_cache_max_entries,
+                    ),
+                ),
             )
         return StubRetrievalProvider()
 
+    def _exa_provider(self, single_flight: SingleFlight | None) -> RetrievalProvider:
+        provider = ExaRetrievalProvider(
+            api_key=self._settings.exa_api_key,
+            base_url=self._settings.exa_base_url,
+            top_k=self._settings.exa_top_k,
+            timeout_seconds=self._settings.provider_timeout_seconds,
+        )
+        return provider if single_flight is None else SingleFlightRetrievalProvider(provider, single_flight)
+
     def resolve_voice_provider(self, preferred_provider: str = "auto") -> VoiceProvider | None:
         order = ["elevenlabs", "cantoneseai"]
         if preferred_provider == "elevenlabs":
@@ -70,12 +235,37 @@ class ProviderRouter:
 
         for provider_name in order:
             if provider_name == "elevenlabs" and self._settings.feature_elevenlabs_enabled:
-                provider = ElevenLabsVoiceProvider()
+                provider = self.get_elevenlabs_provider()
                 if getattr(provider, "api_key", ""):
                     return provider
             if provider_name == "cantoneseai" and self._settings.feature_cantoneseai_enabled:
                 try:
-                    return CantoneseAIVoiceProvider()
+                    return self.get_cantoneseai_provider()
                 except ValueError:
                     continue
         return None
+
+    def get_elevenlabs_provider(self) -> ElevenLabsVoiceProvider:
+        # ElevenLabs reads its credentials from the environment, so they key the slot.
+        config = (
+            os.getenv("ELEVENLABS_API_KEY"),
+            os.getenv("ELEVENLABS_DEFAULT_VOICE_ID"),
+            self._settings.provider_http_max_connections,
+        )
+        return self._registry.get(
+            "elevenlabs",
+            config,
+            lambda: ElevenLabsVoiceProvider(pool_maxsize=self._settings.provider_http_max_connections),
+        )
+
+    def get_cantoneseai_provider(self) -> CantoneseAIVoiceProvider:
+        """Shared Cantonese.ai provider; raises ValueError when no API key is set."""
+        config = (
+            os.getenv("CANTONESEAI_API_KEY") or os.getenv("CANTONESE_AI_API_KEY"),
+            self._settings.provider_http_max_connections,
+        )
+        return self._registry.get(
+            "cantoneseai",
+            config,
+            lambda: CantoneseAIVoiceProvider(pool_maxsize=self._settings.provider_http_max_connections),
+        )
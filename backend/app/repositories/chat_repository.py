@@ -25,6 +25,12 @@ class ChatRepository:
             self._session.flush()
         return thread
 
+    def list_existing_request_ids(self, request_ids: list[str]) -> set[str]:
+        if not request_ids:
+            return set()
+        stmt = select(ChatMessage.request_id).where(ChatMessage.request_id.in_(request_ids))
+        return set(self._session.scalars(stmt))
+
     def create_chat_message(
         self,
         *,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models.enums import MemoryEntryType, RoleType
@@ -33,6 +34,8 @@ class MemoryRepository:
         role: RoleType,
         top_k: int,
         query_embedding: list[float] | None = None,
+        embedding_model: str | None = None,
+        search_parameters: dict[str, str] | None = None,
     ) -> list[MemoryEntry]:
         stmt = (
             select(MemoryEntry)
@@ -42,16 +45,30 @@ class MemoryRepository:
                 (MemoryEntry.role == role) | (MemoryEntry.role.is_(None)),
             )
         )
+        if embedding_model is not None:
+            # Distances between vectors from different models are meaningless.
+            stmt = stmt.where(MemoryEmbedding.embedding_model == embedding_model)
         if query_embedding:
+            stmt = stmt.where(MemoryEmbedding.embedding_dimensions == len(query_embedding))
+            # Order by distance alone: any secondary sort key stops Postgres
+            # from serving the ORDER BY ... LIMIT from the ANN index.
+            self.apply_vector_search_parameters(search_parameters or {})
             stmt = stmt.order_by(
                 MemoryEmbedding.embedding.cosine_distance(query_embedding),
-                desc(MemoryEmbedding.created_at),
             )
         else:
             stmt = stmt.order_by(desc(MemoryEmbedding.created_at))
         stmt = stmt.limit(top_k)
         return list(self._session.scalars(stmt))
 
+    def apply_vector_search_parameters(self, parameters: dict[str, str]) -> None:
+        """Set `hnsw.ef_search` / `ivfflat.probes` for the current transaction only."""
+        for name, value in parameters.items():
+            self._session.execute(
+                text("SELECT set_config(:name, :value, true)"),
+                {"name": name, "value": value},
+            )
+
     def create_memory_entry(
         self,
         *,
@@ -106,6 +123,32 @@ class MemoryRepository:
         self._session.flush()
         return memory_embedding
 
+    def bulk_create_memory_embeddings(self, rows: list[dict[str, object]]) -> int:
+        """
+        Insert many embeddings in one statement.
+
+        Rows whose memory entry has since been deleted, or that already have an
+        embedding for the same model, are skipped.
+        """
+        if not rows:
+            return 0
+        entry_ids = {str(row["memory_entry_id"]) for row in rows}
+        existing_entry_ids = set(
+            self._session.scalars(
+                select(MemoryEntry.id).where(MemoryEntry.id.in_(entry_ids))
+            )
+        )
+        rows = [row for row in rows if row["memory_entry_id"] in existing_entry_ids]
+        if not rows:
+            return 0
+        stmt = (
+            pg_insert(MemoryEmbedding)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_memory_embeddings_entry_model")
+        )
+        result = self._session.execute(stmt)
+        return result.rowcount  # type: ignore[return-value]
+
     def delete_by_thread(
         self,
         *,
@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any
 
 from app.providers.base import ChatProvider
@@ -16,3 +18,32 @@ class ConversationRuntime(ABC):
         context: dict[str, Any]
     ) -> str:
         """Generate a model response using the configured orchestration runtime."""
+
+    async def agenerate_reply(
+        self,
+        *,
+        message: str,
+        provider: ChatProvider,
+        context: dict[str, Any]
+    ) -> str:
+        """Async variant; runtimes with a native async path should override this."""
+        return await asyncio.to_thread(
+            self.generate_reply,
+            message=message,
+            provider=provider,
+            context=context,
+        )
+
+    async def astream_reply(
+        self,
+        *,
+        message: str,
+        provider: ChatProvider,
+        context: dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Yield reply text chunks; runtimes that can stream tokens should override this."""
+        yield await self.agenerate_reply(
+            message=message,
+            provider=provider,
+            context=context,
+        )
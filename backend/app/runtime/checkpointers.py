@@ -0,0 +1,817 @@
+"""
+LangGraph checkpointers for `LangGraphConversationRuntime`.
+
+`MemorySaver` keeps every checkpoint of every thread in one process, so state
+is lost on restart and each uvicorn worker / ECS task sees its own threads.
+The savers here keep only the latest checkpoint per (thread_id, checkpoint_ns):
+in Redis or Postgres, so any worker can continue a thread, or in a bounded
+in-process LRU that evicts whole threads past a byte budget.
+
+Each thread/namespace has msgpack records, zlib-compressed once they pass
+`_COMPRESS_MIN_BYTES`: the checkpoint (with metadata and parent id) and one
+record of pending writes per (checkpoint id, task). Keeping writes separate
+means a late `put_writes` can never overwrite a newer checkpoint, and keeping
+them per task means parallel tasks never overwrite each other's writes (each
+task only rewrites its own record). Only the writes of the latest checkpoint
+are read back, and each new checkpoint clears the writes of older ones. Redis and
+Postgres records expire `ttl_seconds` after the last write, matching the
+short-term memory window.
+Storage errors are logged and counted as `langgraph_checkpoint.<backend>.errors`;
+a failed read starts the thread from empty state instead of failing the turn.
+"""
+import logging
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import ormsgpack
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from sqlalchemy import delete, func, select
+
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis_binary_client, get_redis_binary_client
+from app.models.checkpoint import LangGraphCheckpoint
+
+logger = logging.getLogger(__name__)
+
+_COMPRESS_MIN_BYTES = 1024
+_RAW_PREFIX = b"m"
+_ZLIB_PREFIX = b"z"
+_POSTGRES_PRUNE_EVERY_WRITES = 200
+CHECKPOINT_KIND = "checkpoint"
+WRITES_KIND = "writes"
+
+
+def writes_kind(checkpoint_id: str, task_id: str) -> str:
+    return f"{WRITES_KIND}:{checkpoint_id}:{task_id}"
+
+
+def writes_checkpoint_id(kind: str) -> str | None:
+    """Checkpoint id of a `writes_kind` record, or None for other kinds."""
+    # Checkpoint and task ids are UUIDs and never contain ":".
+    name, _, rest = kind.partition(":")
+    if name != WRITES_KIND or not rest:
+        return None
+    return rest.partition(":")[0]
+
+
+def encode_record(record: dict[str, Any]) -> bytes:
+    packed = ormsgpack.packb(record)
+    if len(packed) >= _COMPRESS_MIN_BYTES:
+        return _ZLIB_PREFIX + zlib.compress(packed, 6)
+    return _RAW_PREFIX + packed
+
+
+def decode_record(payload: bytes) -> dict[str, Any]:
+    prefix, body = payload[:1], payload[1:]
+    if prefix == _ZLIB_PREFIX:
+        body = zlib.decompress(body)
+    elif prefix != _RAW_PREFIX:
+        raise ValueError("unknown checkpoint record encoding")
+    return ormsgpack.unpackb(body)
+
+
+def _thread_and_ns(config: RunnableConfig) -> tuple[str, str]:
+    configurable = config["configurable"]
+    return str(configurable["thread_id"]), str(configurable.get("checkpoint_ns", ""))
+
+
+class LatestCheckpointSaver(BaseCheckpointSaver, ABC):
+    """
+    Base saver that stores encoded records per (thread_id, checkpoint_ns, kind).
+
+    Subclasses only move opaque bytes: `_load`/`_store`, `_load_writes` (the
+    writes records of one checkpoint), `_clear_writes` (those of every other
+    checkpoint), `_drop_thread` and their async counterparts. History (`list`) therefore holds at most the
+    latest checkpoint, which is all the chat runtime reads back.
+    """
+
+    backend_name = "latest"
+
+    # -- storage hooks -------------------------------------------------------
+
+    @abstractmethod
+    def _load(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        """Return the record stored under `kind`, or None."""
+
+    @abstractmethod
+    def _store(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        """Store `payload` under `kind`, replacing any previous record."""
+
+    @abstractmethod
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        """Return the writes records of `checkpoint_id`."""
+
+    @abstractmethod
+    def _clear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        """Delete the writes records of every checkpoint except `keep_checkpoint_id`."""
+
+    @abstractmethod
+    def _drop_thread(self, thread_id: str) -> None:
+        """Delete every record of `thread_id`."""
+
+    @abstractmethod
+    async def _aload(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        """Async variant of `_load`."""
+
+    @abstractmethod
+    async def _astore(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        """Async variant of `_store`."""
+
+    @abstractmethod
+    async def _aload_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        """Async variant of `_load_writes`."""
+
+    @abstractmethod
+    async def _aclear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        """Async variant of `_clear_writes`."""
+
+    @abstractmethod
+    async def _adrop_thread(self, thread_id: str) -> None:
+        """Async variant of `_drop_thread`."""
+
+    # -- record helpers ------------------------------------------------------
+
+    def _failed(self, operation: str, thread_id: str, exc: Exception) -> None:
+        metrics.increment(f"langgraph_checkpoint.{self.backend_name}.errors")
+        logger.warning(
+            "langgraph_checkpoint_%s_failed backend=%s thread_id=%s error=%s",
+            operation,
+            self.backend_name,
+            thread_id,
+            exc,
+        )
+
+    def _read_record(self, thread_id: str, checkpoint_ns: str, kind: str) -> dict[str, Any] | None:
+        try:
+            payload = self._load(thread_id, checkpoint_ns, kind)
+            return decode_record(payload) if payload else None
+        except Exception as exc:
+            self._failed("read", thread_id, exc)
+            return None
+
+    async def _aread_record(self, thread_id: str, checkpoint_ns: str, kind: str) -> dict[str, Any] | None:
+        try:
+            payload = await self._aload(thread_id, checkpoint_ns, kind)
+            return decode_record(payload) if payload else None
+        except Exception as exc:
+            self._failed("read", thread_id, exc)
+            return None
+
+    def _read_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[dict[str, Any]]:
+        try:
+            return [decode_record(payload) for payload in self._load_writes(thread_id, checkpoint_ns, checkpoint_id)]
+        except Exception as exc:
+            self._failed("read", thread_id, exc)
+            return []
+
+    async def _aread_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[dict[str, Any]]:
+        try:
+            payloads = await self._aload_writes(thread_id, checkpoint_ns, checkpoint_id)
+            return [decode_record(payload) for payload in payloads]
+        except Exception as exc:
+            self._failed("read", thread_id, exc)
+            return []
+
+    def _drop_stale_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        try:
+            self._clear_writes(thread_id, checkpoint_ns, checkpoint_id)
+        except Exception as exc:
+            self._failed("write", thread_id, exc)
+
+    async def _adrop_stale_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        try:
+            await self._aclear_writes(thread_id, checkpoint_ns, checkpoint_id)
+        except Exception as exc:
+            self._failed("write", thread_id, exc)
+
+    def _write_record(self, thread_id: str, checkpoint_ns: str, kind: str, record: dict[str, Any]) -> None:
+        try:
+            payload = encode_record(record)
+            self._store(thread_id, checkpoint_ns, kind, payload)
+            metrics.observe(f"langgraph_checkpoint.{self.backend_name}.record_bytes", len(payload))
+        except Exception as exc:
+            self._failed("write", thread_id, exc)
+
+    async def _awrite_record(self, thread_id: str, checkpoint_ns: str, kind: str, record: dict[str, Any]) -> None:
+        try:
+            payload = encode_record(record)
+            await self._astore(thread_id, checkpoint_ns, kind, payload)
+            metrics.observe(f"langgraph_checkpoint.{self.backend_name}.record_bytes", len(payload))
+        except Exception as exc:
+            self._failed("write", thread_id, exc)
+
+    def _new_record(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+    ) -> dict[str, Any]:
+        return {
+            "id": checkpoint["id"],
+            "parent": config["configurable"].get("checkpoint_id"),
+            "checkpoint": list(self.serde.dumps_typed(checkpoint)),
+            "metadata": list(self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))),
+        }
+
+    def _merge_writes(
+        self,
+        record: dict[str, Any] | None,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str,
+    ) -> dict[str, Any]:
+        # Only `task_id` writes this record; writes of an older checkpoint
+        # are replaced, not merged.
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        if record is None or record["id"] != checkpoint_id:
+            record = {"id": checkpoint_id, "writes": []}
+        existing = {(entry[0], entry[5]) for entry in record["writes"] if entry[5] >= 0}
+        for index, (channel, value) in enumerate(writes):
+            write_index = WRITES_IDX_MAP.get(channel, index)
+            if write_index >= 0 and (task_id, write_index) in existing:
+                continue
+            if write_index < 0:
+                # Special channels (errors, interrupts) replace the previous entry.
+                record["writes"] = [
+                    entry for entry in record["writes"] if (entry[0], entry[5]) != (task_id, write_index)
+                ]
+            value_type, value_bytes = self.serde.dumps_typed(value)
+            record["writes"].append([task_id, channel, value_type, value_bytes, task_path, write_index])
+        return record
+
+    def _to_tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        record: dict[str, Any],
+        writes_records: list[dict[str, Any]],
+    ) -> CheckpointTuple:
+        parent_id = record.get("parent")
+        writes = sorted(
+            (entry for writes_record in writes_records if writes_record["id"] == record["id"]
+             for entry in writes_record["writes"]),
+            key=lambda entry: (entry[0], entry[5]),
+        )
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": record["id"],
+                }
+            },
+            checkpoint=self.serde.loads_typed(tuple(record["checkpoint"])),
+            metadata=self.serde.loads_typed(tuple(record["metadata"])),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value_bytes)))
+                for task_id, channel, value_type, value_bytes, _, _ in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+        )
+
+    @staticmethod
+    def _matches(config: RunnableConfig, record: dict[str, Any] | None) -> bool:
+        if record is None:
+            return False
+        requested_id = get_checkpoint_id(config)
+        return not (requested_id and requested_id != record["id"])
+
+    @staticmethod
+    def _passes_list_filters(
+        checkpoint_tuple: CheckpointTuple | None,
+        *,
+        filter: dict[str, Any] | None,
+        before: RunnableConfig | None,
+        limit: int | None,
+    ) -> bool:
+        if checkpoint_tuple is None or limit == 0:
+            return False
+        if filter and any(checkpoint_tuple.metadata.get(key) != value for key, value in filter.items()):
+            return False
+        before_id = get_checkpoint_id(before) if before else None
+        return not (before_id and checkpoint_tuple.config["configurable"]["checkpoint_id"] >= before_id)
+
+    # -- BaseCheckpointSaver API ---------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id, checkpoint_ns = _thread_and_ns(config)
+        record = self._read_record(thread_id, checkpoint_ns, CHECKPOINT_KIND)
+        if not self._matches(config, record):
+            return None
+        assert record is not None
+        writes_records = self._read_writes(thread_id, checkpoint_ns, record["id"])
+        return self._to_tuple(thread_id, checkpoint_ns, record, writes_records)
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id, checkpoint_ns = _thread_and_ns(config)
+        record = await self._aread_record(thread_id, checkpoint_ns, CHECKPOINT_KIND)
+        if not self._matches(config, record):
+            return None
+        assert record is not None
+        writes_records = await self._aread_writes(thread_id, checkpoint_ns, record["id"])
+        return self._to_tuple(thread_id, checkpoint_ns, record, writes_records)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        # Only per-thread listing is supported; records are not enumerable.
+        if not config or "thread_id" not in config.get("configurable", {}):
+            return
+        checkpoint_tuple = self.get_tuple(config)
+        if self._passes_list_filters(checkpoint_tuple, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if not config or "thread_id" not in config.get("configurable", {}):
+            return
+        checkpoint_tuple = await self.aget_tuple(config)
+        if self._passes_list_filters(checkpoint_tuple, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id, checkpoint_ns = _thread_and_ns(config)
+        self._write_record(thread_id, checkpoint_ns, CHECKPOINT_KIND, self._new_record(config, checkpoint, metadata))
+        self._drop_stale_writes(thread_id, checkpoint_ns, checkpoint["id"])
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id, checkpoint_ns = _thread_and_ns(config)
+        await self._awrite_record(
+            thread_id, checkpoint_ns, CHECKPOINT_KIND, self._new_record(config, checkpoint, metadata)
+        )
+        await self._adrop_stale_writes(thread_id, checkpoint_ns, checkpoint["id"])
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id, checkpoint_ns = _thread_and_ns(config)
+        kind = writes_kind(config["configurable"]["checkpoint_id"], task_id)
+        record = self._read_record(thread_id, checkpoint_ns, kind)
+        record = self._merge_writes(record, config, writes, task_id, task_path)
+        self._write_record(thread_id, checkpoint_ns, kind, record)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id, checkpoint_ns = _thread_and_ns(config)
+        kind = writes_kind(config["configurable"]["checkpoint_id"], task_id)
+        record = await self._aread_record(thread_id, checkpoint_ns, kind)
+        record = self._merge_writes(record, config, writes, task_id, task_path)
+        await self._awrite_record(thread_id, checkpoint_ns, kind, record)
+
+    def delete_thread(self, thread_id: str) -> None:
+        try:
+            self._drop_thread(str(thread_id))
+        except Exception as exc:
+            self._failed("delete", str(thread_id), exc)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        try:
+            await self._adrop_thread(str(thread_id))
+        except Exception as exc:
+            self._failed("delete", str(thread_id), exc)
+
+
+class RedisCheckpointSaver(LatestCheckpointSaver):
+    """
+    One Redis hash per thread (`langgraph:checkpoint:<thread_id>`) with a
+    `<kind>:<checkpoint_ns>` field per record
+    (`writes:<checkpoint_id>:<task_id>:<checkpoint_ns>` for pending writes). Every write refreshes the hash TTL.
+    """
+
+    backend_name = "redis"
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int,
+        client_factory: Callable[[], Any] | None = None,
+        async_client_factory: Callable[[], Any] | None = None,
+    ):
+        super().__init__()
+        self._ttl_seconds = max(1, int(ttl_seconds))
+        self._client_factory = client_factory or get_redis_binary_client
+        self._async_client_factory = async_client_factory or get_async_redis_binary_client
+
+    @staticmethod
+    def _key(thread_id: str) -> str:
+        return f"langgraph:checkpoint:{thread_id}"
+
+    @staticmethod
+    def _field(checkpoint_ns: str, kind: str) -> str:
+        return f"{kind}:{checkpoint_ns}"
+
+    @staticmethod
+    def _writes_field_checkpoint(field: bytes | str, checkpoint_ns: str) -> str | None:
+        """Checkpoint id of a writes field in `checkpoint_ns`, else None."""
+        name = field.decode() if isinstance(field, bytes) else field
+        # writes:<checkpoint_id>:<task_id>:<checkpoint_ns>; the ids never contain ":".
+        parts = name.split(":", 3)
+        if len(parts) != 4 or parts[0] != WRITES_KIND or parts[3] != checkpoint_ns:
+            return None
+        return parts[1]
+
+    def _load(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        return self._client_factory().hget(self._key(thread_id), self._field(checkpoint_ns, kind))
+
+    def _store(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        pipeline = self._client_factory().pipeline()
+        pipeline.hset(self._key(thread_id), self._field(checkpoint_ns, kind), payload)
+        pipeline.expire(self._key(thread_id), self._ttl_seconds)
+        pipeline.execute()
+
+    def _writes_fields(self, fields: list[Any], checkpoint_ns: str, checkpoint_id: str) -> list[Any]:
+        return [field for field in fields if self._writes_field_checkpoint(field, checkpoint_ns) == checkpoint_id]
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        # HKEYS + HMGET so only this checkpoint's writes cross the wire, not
+        # the checkpoint record and every other namespace in the hash.
+        client = self._client_factory()
+        fields = self._writes_fields(client.hkeys(self._key(thread_id)), checkpoint_ns, checkpoint_id)
+        if not fields:
+            return []
+        # A field cleared between the two calls comes back as None.
+        return [payload for payload in client.hmget(self._key(thread_id), fields) if payload is not None]
+
+    def _stale_writes_fields(self, fields: list[Any], checkpoint_ns: str, keep_checkpoint_id: str) -> list[Any]:
+        return [
+            field
+            for field in fields
+            if self._writes_field_checkpoint(field, checkpoint_ns) not in (None, keep_checkpoint_id)
+        ]
+
+    def _clear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        client = self._client_factory()
+        fields = self._stale_writes_fields(client.hkeys(self._key(thread_id)), checkpoint_ns, keep_checkpoint_id)
+        if fields:
+            client.hdel(self._key(thread_id), *fields)
+
+    def _drop_thread(self, thread_id: str) -> None:
+        self._client_factory().delete(self._key(thread_id))
+
+    async def _aload(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        return await self._async_client_factory().hget(self._key(thread_id), self._field(checkpoint_ns, kind))
+
+    async def _astore(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        pipeline = self._async_client_factory().pipeline()
+        pipeline.hset(self._key(thread_id), self._field(checkpoint_ns, kind), payload)
+        pipeline.expire(self._key(thread_id), self._ttl_seconds)
+        await pipeline.execute()
+
+    async def _aload_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        client = self._async_client_factory()
+        fields = self._writes_fields(await client.hkeys(self._key(thread_id)), checkpoint_ns, checkpoint_id)
+        if not fields:
+            return []
+        return [payload for payload in await client.hmget(self._key(thread_id), fields) if payload is not None]
+
+    async def _aclear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        client = self._async_client_factory()
+        fields = self._stale_writes_fields(await client.hkeys(self._key(thread_id)), checkpoint_ns, keep_checkpoint_id)
+        if fields:
+            await client.hdel(self._key(thread_id), *fields)
+
+    async def _adrop_thread(self, thread_id: str) -> None:
+        await self._async_client_factory().delete(self._key(thread_id))
+
+
+class PostgresCheckpointSaver(LatestCheckpointSaver):
+    """
+    Upserts into `langgraph_checkpoints` keyed by (thread_id, checkpoint_ns, kind).
+
+    Rows past `expires_at` are ignored on read and pruned every
+    `_POSTGRES_PRUNE_EVERY_WRITES` writes from this process.
+    """
+
+    backend_name = "postgres"
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int,
+        session_factory: Callable[[], Any] | None = None,
+        async_session_factory: Callable[[], Any] | None = None,
+    ):
+        super().__init__()
+        self._ttl = timedelta(seconds=max(1, int(ttl_seconds)))
+        self._session_factory = session_factory or SessionLocal
+        self._async_session_factory = async_session_factory or AsyncSessionLocal
+        self._writes_since_prune = 0
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _select(self, thread_id: str, checkpoint_ns: str, kind: str) -> Any:
+        return select(LangGraphCheckpoint.payload).where(
+            LangGraphCheckpoint.thread_id == thread_id,
+            LangGraphCheckpoint.checkpoint_ns == checkpoint_ns,
+            LangGraphCheckpoint.kind == kind,
+            LangGraphCheckpoint.expires_at > self._now(),
+        )
+
+    def _select_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Any:
+        return select(LangGraphCheckpoint.payload).where(
+            LangGraphCheckpoint.thread_id == thread_id,
+            LangGraphCheckpoint.checkpoint_ns == checkpoint_ns,
+            LangGraphCheckpoint.kind.startswith(f"{WRITES_KIND}:{checkpoint_id}:", autoescape=True),
+            LangGraphCheckpoint.expires_at > self._now(),
+        )
+
+    def _delete_stale_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> Any:
+        return delete(LangGraphCheckpoint).where(
+            LangGraphCheckpoint.thread_id == thread_id,
+            LangGraphCheckpoint.checkpoint_ns == checkpoint_ns,
+            LangGraphCheckpoint.kind.startswith(f"{WRITES_KIND}:"),
+            ~LangGraphCheckpoint.kind.startswith(f"{WRITES_KIND}:{keep_checkpoint_id}:", autoescape=True),
+        )
+
+    def _upsert(self, dialect_name: str, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> Any:
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(LangGraphCheckpoint).values(
+            thread_id=thread_id,
+            checkpoint_ns=checkpoint_ns,
+            kind=kind,
+            payload=payload,
+            expires_at=self._now() + self._ttl,
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[
+                LangGraphCheckpoint.thread_id,
+                LangGraphCheckpoint.checkpoint_ns,
+                LangGraphCheckpoint.kind,
+            ],
+            set_={
+                "payload": statement.excluded.payload,
+                "expires_at": statement.excluded.expires_at,
+                "updated_at": func.now(),
+            },
+        )
+
+    def _prune_due(self) -> bool:
+        self._writes_since_prune += 1
+        if self._writes_since_prune < _POSTGRES_PRUNE_EVERY_WRITES:
+            return False
+        self._writes_since_prune = 0
+        return True
+
+    def _prune_statement(self) -> Any:
+        return delete(LangGraphCheckpoint).where(LangGraphCheckpoint.expires_at <= self._now())
+
+    def _load(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        with self._session_factory() as session:
+            return session.execute(self._select(thread_id, checkpoint_ns, kind)).scalar_one_or_none()
+
+    def _store(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        with self._session_factory() as session:
+            dialect_name = session.get_bind().dialect.name
+            session.execute(self._upsert(dialect_name, thread_id, checkpoint_ns, kind, payload))
+            if self._prune_due():
+                session.execute(self._prune_statement())
+            session.commit()
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        with self._session_factory() as session:
+            return list(session.execute(self._select_writes(thread_id, checkpoint_ns, checkpoint_id)).scalars())
+
+    def _clear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        with self._session_factory() as session:
+            session.execute(self._delete_stale_writes(thread_id, checkpoint_ns, keep_checkpoint_id))
+            session.commit()
+
+    def _drop_thread(self, thread_id: str) -> None:
+        with self._session_factory() as session:
+            session.execute(delete(LangGraphCheckpoint).where(LangGraphCheckpoint.thread_id == thread_id))
+            session.commit()
+
+    async def _aload(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        async with self._async_session_factory() as session:
+            result = await session.execute(self._select(thread_id, checkpoint_ns, kind))
+            return result.scalar_one_or_none()
+
+    async def _astore(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        async with self._async_session_factory() as session:
+            dialect_name = session.get_bind().dialect.name
+            await session.execute(self._upsert(dialect_name, thread_id, checkpoint_ns, kind, payload))
+            if self._prune_due():
+                await session.execute(self._prune_statement())
+            await session.commit()
+
+    async def _aload_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        async with self._async_session_factory() as session:
+            result = await session.execute(self._select_writes(thread_id, checkpoint_ns, checkpoint_id))
+            return list(result.scalars())
+
+    async def _aclear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        async with self._async_session_factory() as session:
+            await session.execute(self._delete_stale_writes(thread_id, checkpoint_ns, keep_checkpoint_id))
+            await session.commit()
+
+    async def _adrop_thread(self, thread_id: str) -> None:
+        async with self._async_session_factory() as session:
+            await session.execute(delete(LangGraphCheckpoint).where(LangGraphCheckpoint.thread_id == thread_id))
+            await session.commit()
+
+
+class BoundedMemoryCheckpointSaver(LatestCheckpointSaver):
+    """
+    In-process saver bounded by `max_bytes` of encoded records.
+
+    Unlike `MemorySaver`, superseded checkpoints are replaced rather than
+    kept, and once the budget is exceeded the least recently read or written
+    threads are evicted whole (the thread being written is never evicted).
+    An evicted thread simply starts its next turn from empty state.
+
+    Reported as gauges `langgraph_checkpoint.memory.resident_bytes` and
+    `.threads` plus the counter `.evictions`; `stats()` returns the same.
+    """
+
+    backend_name = "memory"
+
+    def __init__(self, *, max_bytes: int):
+        super().__init__()
+        self._max_bytes = max(1, int(max_bytes))
+        self._threads: OrderedDict[str, dict[tuple[str, str], bytes]] = OrderedDict()
+        self._resident_bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_bytes(slot: tuple[str, str], payload: bytes) -> int:
+        return len(slot[0]) + len(slot[1]) + len(payload)
+
+    def _thread_bytes(self, thread_id: str, records: dict[tuple[str, str], bytes]) -> int:
+        return len(thread_id) + sum(self._entry_bytes(slot, payload) for slot, payload in records.items())
+
+    def _publish(self) -> None:
+        metrics.set_gauge("langgraph_checkpoint.memory.resident_bytes", self._resident_bytes)
+        metrics.set_gauge("langgraph_checkpoint.memory.threads", len(self._threads))
+
+    def _evict_over_budget(self) -> None:
+        while self._resident_bytes > self._max_bytes and len(self._threads) > 1:
+            thread_id, records = self._threads.popitem(last=False)
+            self._resident_bytes -= self._thread_bytes(thread_id, records)
+            self._evictions += 1
+            metrics.increment("langgraph_checkpoint.memory.evictions")
+            logger.info("langgraph_checkpoint_evicted thread_id=%s", thread_id)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "resident_bytes": self._resident_bytes,
+                "threads": len(self._threads),
+                "evictions": self._evictions,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _load(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        with self._lock:
+            records = self._threads.get(thread_id)
+            if records is None:
+                return None
+            self._threads.move_to_end(thread_id)
+            return records.get((checkpoint_ns, kind))
+
+    def _store(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        slot = (checkpoint_ns, kind)
+        with self._lock:
+            records = self._threads.get(thread_id)
+            if records is None:
+                records = self._threads[thread_id] = {}
+                self._resident_bytes += len(thread_id)
+            previous = records.get(slot)
+            if previous is not None:
+                self._resident_bytes -= self._entry_bytes(slot, previous)
+            records[slot] = payload
+            self._resident_bytes += self._entry_bytes(slot, payload)
+            self._threads.move_to_end(thread_id)
+            self._evict_over_budget()
+            self._publish()
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        with self._lock:
+            records = self._threads.get(thread_id) or {}
+            return [
+                payload
+                for (record_ns, kind), payload in records.items()
+                if record_ns == checkpoint_ns and writes_checkpoint_id(kind) == checkpoint_id
+            ]
+
+    def _clear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        with self._lock:
+            records = self._threads.get(thread_id)
+            if records is None:
+                return
+            stale = [
+                slot
+                for slot in records
+                if slot[0] == checkpoint_ns and writes_checkpoint_id(slot[1]) not in (None, keep_checkpoint_id)
+            ]
+            for slot in stale:
+                self._resident_bytes -= self._entry_bytes(slot, records.pop(slot))
+            self._publish()
+
+    def _drop_thread(self, thread_id: str) -> None:
+        with self._lock:
+            records = self._threads.pop(thread_id, None)
+            if records is not None:
+                self._resident_bytes -= self._thread_bytes(thread_id, records)
+            self._publish()
+
+    async def _aload(self, thread_id: str, checkpoint_ns: str, kind: str) -> bytes | None:
+        return self._load(thread_id, checkpoint_ns, kind)
+
+    async def _astore(self, thread_id: str, checkpoint_ns: str, kind: str, payload: bytes) -> None:
+        self._store(thread_id, checkpoint_ns, kind, payload)
+
+    async def _aload_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[bytes]:
+        return self._load_writes(thread_id, checkpoint_ns, checkpoint_id)
+
+    async def _aclear_writes(self, thread_id: str, checkpoint_ns: str, keep_checkpoint_id: str) -> None:
+        self._clear_writes(thread_id, checkpoint_ns, keep_checkpoint_id)
+
+    async def _adrop_thread(self, thread_id: str) -> None:
+        self._drop_thread(thread_id)
+
+
+def build_checkpointer(backend: str, *, ttl_seconds: int, memory_max_bytes: int) -> BaseCheckpointSaver:
+    if backend == "redis":
+        return RedisCheckpointSaver(ttl_seconds=ttl_seconds)
+    if backend == "postgres":
+        return PostgresCheckpointSaver(ttl_seconds=ttl_seconds)
+    return BoundedMemoryCheckpointSaver(max_bytes=memory_max_bytes)
@@ -1,12 +1,21 @@
 from app.core.settings import Settings
+from app.core.tokens import TokenCounter
+from app.prompts.assembler import PromptAssembler
 from app.runtime.base import ConversationRuntime
+from app.runtime.history_window import HistoryWindow
 from app.runtime.langgraph_runtime import LangGraphConversationRuntime
 from app.runtime.simple_runtime import SimpleConversationRuntime
 
 
 def build_runtime(settings: Settings) -> ConversationRuntime:
     if settings.feature_langgraph_enabled:
+        # One counter, so the window and the assembler agree on what fits.
+        token_counter = TokenCounter(settings.prompt_tokenizer)
         return LangGraphConversationRuntime(
-            checkpointer_backend=settings.langgraph_checkpointer_backend
+            checkpointer_backend=settings.langgraph_checkpointer_backend,
+            checkpoint_ttl_seconds=settings.memory_short_term_ttl_seconds,
+            memory_checkpoint_max_bytes=settings.langgraph_memory_checkpoint_max_bytes,
+            history_window=HistoryWindow.from_settings(settings, token_counter=token_counter),
+            prompt_assembler=PromptAssembler.from_settings(settings, token_counter=token_counter),
         )
     return SimpleConversationRuntime()
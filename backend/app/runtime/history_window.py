@@ -0,0 +1,322 @@
+"""
+Token-budgeted history windowing for the LangGraph chat node.
+
+Only the last `max_turns` user/assistant turns (further trimmed to
+`token_budget` tokens) are sent verbatim. Older turns are folded
+into a rolling summary by a background worker, so summarization never delays
+a reply. The summary is started right after a turn completes, for the turns
+that fall outside the window of the next turn, so it is normally ready by the
+time the user replies. Until it is, those turns are still sent verbatim; the
+next turn picks the finished summary up and drops them from the checkpointed
+history.
+
+Pending summaries are per worker process. With a shared (redis/postgres)
+checkpointer, a thread's next turn may land on another worker: that worker
+never sees the summary, keeps sending the turns verbatim and starts its own.
+Nothing is lost, and the abandoned entry expires after `pending_ttl_seconds`.
+Pending entries are also capped at `max_pending` (oldest dropped first), so
+threads that never return cannot grow the map without bound.
+
+Tokens are counted with the same `TokenCounter` as the `PromptAssembler`
+that packs the prompt, so the window and the assembler agree on what fits.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    HumanMessage = SystemMessage = None  # type: ignore[assignment]
+    LANGCHAIN_AVAILABLE = False
+
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.core.tokens import TokenCounter
+from app.prompts.assembler import AssembledPrompt
+from app.providers.base import ChatProvider
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = (
+    "Summarize the earlier part of this conversation as notes for the assistant. "
+    "Keep facts the user shared about themselves, their goals, preferences and "
+    "feelings, and any open questions or promises. Merge the previous summary with "
+    "the new turns. Write in the language of the conversation, as plain prose "
+    "without a preamble."
+)
+_EXTRACTIVE_TURN_CHARS = 160
+
+
+def _pair_turns(history: list[dict[str, str]]) -> list[list[dict[str, str]]]:
+    return [history[index:index + 2] for index in range(0, len(history), 2)]
+
+
+def extractive_summary(
+    previous_summary: str,
+    turns: list[dict[str, str]],
+    max_tokens: int,
+    token_counter: TokenCounter | None = None,
+) -> str:
+    """Fallback summary: the first sentence of each user message, newest kept."""
+    counter = token_counter or TokenCounter()
+    lines = [previous_summary] if previous_summary else []
+    for turn in turns:
+        if turn.get("role") != "user":
+            continue
+        content = " ".join(str(turn.get("content", "")).split())
+        first_sentence = content.split(". ")[0][:_EXTRACTIVE_TURN_CHARS]
+        if first_sentence:
+            lines.append(f"User said: {first_sentence}")
+    while len(lines) > 1 and counter.count("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return counter.truncate("\n".join(lines), max_tokens)
+
+
+@dataclass(frozen=True)
+class WindowPlan:
+    """
+    History and summary for one turn, also checkpointed after it.
+
+    `history` is everything not yet folded into `summary` and is sent
+    verbatim; `unsummarized` is the part of it that is only there because
+    its summary has not finished yet.
+    """
+
+    history: list[dict[str, str]]
+    summary: str
+    summarized_turns: int
+    summarized_tokens: int
+    unsummarized: list[dict[str, str]]
+
+
+@dataclass
+class _PendingSummary:
+    base_turns: int
+    folded_turns: int
+    folded_tokens: int
+    started_at: float
+    future: Future[str]
+
+
+class HistoryWindow:
+    """
+    Plans the verbatim history window per turn and runs rolling summaries.
+
+    Each turn reports `langgraph_history.prompt_tokens` (the assembled prompt
+    actually sent) and `langgraph_history.prompt_tokens_saved` (folded turns
+    no longer resent, less the summary that replaces them) as observations. Summaries are counted as
+    `langgraph_history.summaries`, and `.summary_fallbacks` when the provider
+    failed or only returned a canned reply (`ChatProvider.is_fallback_reply`)
+    and the extractive fallback was used. Pending summaries dropped unread
+    (expired or over `max_pending`) are counted as `.pending_expired`, and
+    the gauge `.pending_summaries` tracks how many are held.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        max_turns: int = 6,
+        token_budget: int = 2000,
+        summary_max_tokens: int = 300,
+        pending_ttl_seconds: float = 1800.0,
+        max_pending: int = 1024,
+        token_counter: TokenCounter | None = None,
+        executor_factory: Callable[[], ThreadPoolExecutor] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._enabled = enabled
+        self._max_turns = max(1, max_turns)
+        self._token_budget = max(1, token_budget)
+        self._summary_max_tokens = max(1, summary_max_tokens)
+        self._executor_factory = executor_factory or (
+            lambda: ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+        )
+        self._pending_ttl_seconds = max(1.0, pending_ttl_seconds)
+        self._max_pending = max(1, max_pending)
+        self._clock = clock
+        self._counter = token_counter or TokenCounter()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: OrderedDict[str, _PendingSummary] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(
+        cls, app_settings: Settings, *, token_counter: TokenCounter | None = None
+    ) -> "HistoryWindow":
+        return cls(
+            enabled=app_settings.langgraph_history_window_enabled,
+            max_turns=app_settings.langgraph_history_window_turns,
+            token_budget=app_settings.langgraph_history_window_token_budget,
+            summary_max_tokens=app_settings.langgraph_history_summary_max_tokens,
+            # Shared checkpoints expire after the same TTL.
+            pending_ttl_seconds=app_settings.memory_short_term_ttl_seconds,
+            token_counter=token_counter or TokenCounter(app_settings.prompt_tokenizer),
+        )
+
+    def _expire_pending(self) -> None:
+        """Drop entries past the TTL or over `max_pending`; caller holds the lock."""
+        expired = 0
+        now = self._clock()
+        while self._pending:
+            thread_id, oldest = next(iter(self._pending.items()))
+            if now - oldest.started_at <= self._pending_ttl_seconds and len(self._pending) <= self._max_pending:
+                break
+            del self._pending[thread_id]
+            expired += 1
+        if expired:
+            metrics.increment("langgraph_history.pending_expired", expired)
+        metrics.set_gauge("langgraph_history.pending_summaries", len(self._pending))
+
+    def pending_count(self) -> int:
+        with self._lock:
+            self._expire_pending()
+            return len(self._pending)
+
+    def _take_finished_summary(self, thread_id: str) -> _PendingSummary | None:
+        with self._lock:
+            self._expire_pending()
+            pending = self._pending.get(thread_id)
+            if pending is None or not pending.future.done():
+                return None
+            return self._pending.pop(thread_id)
+
+    def plan(
+        self,
+        *,
+        thread_id: str,
+        history: list[dict[str, str]],
+        summary: str,
+        summarized_turns: int,
+        summarized_tokens: int,
+    ) -> WindowPlan:
+        finished = self._take_finished_summary(thread_id)
+        # A summary started from another checkpoint (e.g. on another worker
+        # that has since folded its own) no longer lines up and is discarded.
+        if (
+            finished is not None
+            and finished.base_turns == summarized_turns
+            and len(history) >= finished.folded_turns * 2
+        ):
+            history = history[finished.folded_turns * 2:]
+            summary = finished.future.result()
+            summarized_turns += finished.folded_turns
+            summarized_tokens += finished.folded_tokens
+
+        return WindowPlan(
+            history=history,
+            summary=summary,
+            summarized_turns=summarized_turns,
+            summarized_tokens=summarized_tokens,
+            unsummarized=self._outside_window(history) if self._enabled else [],
+        )
+
+    def _outside_window(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Messages older than the last `max_turns` turns that fit `token_budget`."""
+        turns = _pair_turns(history)
+        kept_turns = 0
+        used_tokens = 0
+        for turn in reversed(turns[-self._max_turns:]):
+            cost = self._counter.count_messages(turn)
+            if kept_turns and used_tokens + cost > self._token_budget:
+                break
+            kept_turns += 1
+            used_tokens += cost
+        return [message for turn in turns[:len(turns) - kept_turns] for message in turn]
+
+    def record_turn(self, *, thread_id: str, plan: WindowPlan, prompt: AssembledPrompt) -> int:
+        """Report prompt tokens sent and saved for this turn; returns the savings."""
+        sent = prompt.prompt_tokens
+        saved = max(0, plan.summarized_tokens - prompt.section_tokens.get("summary", 0))
+        metrics.observe("langgraph_history.prompt_tokens", sent)
+        metrics.observe("langgraph_history.prompt_tokens_saved", saved)
+        logger.info(
+            "langgraph_history_window thread_id=%s prompt_tokens=%s saved_tokens=%s summarized_turns=%s",
+            thread_id,
+            sent,
+            saved,
+            plan.summarized_turns,
+        )
+        return saved
+
+    def schedule_summary(
+        self,
+        *,
+        thread_id: str,
+        history: list[dict[str, str]],
+        summary: str,
+        summarized_turns: int,
+        provider: ChatProvider,
+        role: str,
+    ) -> None:
+        """Fold the turns that fall outside the window of `history` in the background."""
+        if not self._enabled:
+            return
+        overflow = self._outside_window(history)
+        if not overflow:
+            return
+        with self._lock:
+            self._expire_pending()
+            if thread_id in self._pending:
+                return
+            if self._executor is None:
+                self._executor = self._executor_factory()
+            future = self._executor.submit(self._summarize, provider, role, summary, overflow)
+            self._pending[thread_id] = _PendingSummary(
+                base_turns=summarized_turns,
+                folded_turns=len(overflow) // 2,
+                folded_tokens=self._counter.count_messages(overflow),
+                started_at=self._clock(),
+                future=future,
+            )
+            self._expire_pending()
+
+    def wait_for_pending(self, timeout: float | None = None) -> None:
+        with self._lock:
+            futures = [pending.future for pending in self._pending.values()]
+        for future in futures:
+            future.exception(timeout=timeout)
+
+    def _summarize(
+        self,
+        provider: ChatProvider,
+        role: str,
+        previous_summary: str,
+        turns: list[dict[str, str]],
+    ) -> str:
+        started = time.perf_counter()
+        transcript = "\n".join(f"{turn.get('role', '')}: {turn.get('content', '')}" for turn in turns)
+        prompt = (
+            f"Previous summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}\n\n"
+            f"Updated summary (at most {self._summary_max_tokens} tokens):"
+        )
+        context: dict[str, Any] = {"role": role, "system_prompt": SUMMARY_SYSTEM_PROMPT}
+        if LANGCHAIN_AVAILABLE:
+            context["langchain_messages"] = [
+                SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+                HumanMessage(content=prompt),
+            ]
+        try:
+            summary = provider.generate_reply(prompt, context).strip()
+            if not summary:
+                raise ValueError("empty summary")
+            # Providers answer outages with a canned reply instead of raising;
+            # folding that in would lose the turns for good.
+            if provider.is_fallback_reply(summary):
+                raise ValueError("provider returned a fallback reply")
+            summary = self._counter.truncate(summary, self._summary_max_tokens)
+        except Exception as exc:
+            metrics.increment("langgraph_history.summary_fallbacks")
+            logger.warning("langgraph_history_summary_failed provider=%s error=%s", provider.provider_name, exc)
+            summary = extractive_summary(previous_summary, turns, self._summary_max_tokens, self._counter)
+        metrics.increment("langgraph_history.summaries")
+        metrics.observe("langgraph_history.summary_latency_ms", (time.perf_counter() - started) * 1000)
+        return summary
@@ -1,22 +1,29 @@
 import logging
+from collections.abc import AsyncIterator
 from typing import Any, TypedDict
 
 from app.providers.base import ChatProvider
+from app.prompts.assembler import AssembledPrompt, PromptAssembler
 from app.prompts.role_prompts import resolve_role_system_prompt
 from app.runtime.base import ConversationRuntime
+from app.runtime.history_window import HistoryWindow, WindowPlan
 
 logger = logging.getLogger(__name__)
 _KNOWN_ROLES = {"companion", "local_guide", "study_guide"}
 
 try:
     from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+    from langchain_core.runnables import RunnableLambda
     from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.config import get_stream_writer
     from langgraph.graph import END, StateGraph
 
     LANGGRAPH_AVAILABLE = True
 except ImportError:
     AIMessage = HumanMessage = SystemMessage = None  # type: ignore[assignment]
+    RunnableLambda = None  # type: ignore[assignment]
     MemorySaver = None  # type: ignore[assignment]
+    get_stream_writer = None  # type: ignore[assignment]
     StateGraph = None  # type: ignore[assignment]
     END = None  # type: ignore[assignment]
     LANGGRAPH_AVAILABLE = False
@@ -24,6 +31,9 @@ except ImportError:
 
 class ConversationState(TypedDict, total=False):
     history: list[dict[str, str]]
+    summary: str
+    summarized_turns: int
+    summarized_tokens: int
     context: dict[str, Any]
     incoming_message: str
     reply: str
@@ -34,19 +44,32 @@ class LangGraphConversationRuntime(ConversationRuntime):
     LangGraph-backed runtime that manages conversation state per thread_id.
 
     The graph has a single 'chat' node that:
-      1. Reads conversation history from checkpoint state.
-      2. Builds LangChain message objects (System + History + HumanMessage).
-      3. Passes them to the ChatProvider (which uses LangChain ChatOpenAI under the hood).
-      4. Appends the reply to history and checkpoints automatically.
+      1. Reads conversation history and its rolling summary from checkpoint state.
+      2. Windows the history (`HistoryWindow`): recent turns verbatim, older
+         turns folded into the summary in the background.
+      3. Packs the system prompt, memory context, summary and window into
+         LangChain messages under a token budget (`PromptAssembler`).
+      4. Passes them to the ChatProvider (which uses LangChain ChatOpenAI under the hood).
+      5. Appends the reply to history and checkpoints automatically.
 
-    Checkpointing means the backend remembers conversation per thread_id
-    without any external DB -- LangGraph handles it via MemorySaver (in-process).
+    Checkpointing means the backend remembers conversation per thread_id.
+    `memory` keeps the latest checkpoint per thread in process, evicting
+    least recently used threads past `memory_checkpoint_max_bytes`; `redis`
+    and `postgres` share it across workers and expire it after
+    `checkpoint_ttl_seconds` (see `app.runtime.checkpointers`).
     """
 
     runtime_name = "langgraph"
-    _SUPPORTED_CHECKPOINTER_BACKENDS = {"memory"}
+    _SUPPORTED_CHECKPOINTER_BACKENDS = {"memory", "redis", "postgres"}
 
-    def __init__(self, checkpointer_backend: str = "memory"):
+    def __init__(
+        self,
+        checkpointer_backend: str = "memory",
+        checkpoint_ttl_seconds: int = 1800,
+        memory_checkpoint_max_bytes: int = 64 * 1024 * 1024,
+        history_window: HistoryWindow | None = None,
+        prompt_assembler: PromptAssembler | None = None,
+    ):
         requested_backend = (checkpointer_backend or "memory").lower()
         if requested_backend not in self._SUPPORTED_CHECKPOINTER_BACKENDS:
             logger.warning(
@@ -56,6 +79,12 @@ class LangGraphConversationRuntime(ConversationRuntime):
             requested_backend = "memory"
 
         self._checkpointer_backend = requested_backend
+        self._checkpoint_ttl_seconds = checkpoint_ttl_seconds
+        self._memory_checkpoint_max_bytes = memory_checkpoint_max_bytes
+        self._prompt_assembler = prompt_assembler or PromptAssembler()
+        self._history_window = history_window or HistoryWindow(
+            token_counter=self._prompt_assembler.token_counter
+        )
         self._graphs: dict[str, Any] = {}
         self._checkpointer: Any = None
 
@@ -63,6 +92,10 @@ class LangGraphConversationRuntime(ConversationRuntime):
     def checkpointer_backend(self) -> str:
         return self._checkpointer_backend
 
+    @property
+    def history_window(self) -> HistoryWindow:
+        return self._history_window
+
     def _get_checkpointer(self) -> Any:
         if self._checkpointer is not None:
             return self._checkpointer
@@ -71,14 +104,19 @@ class LangGraphConversationRuntime(ConversationRuntime):
                 "langgraph is not installed. "
                 "Run: pip install langgraph"
             )
-        self._checkpointer = MemorySaver()
+        from app.runtime.checkpointers import build_checkpointer
+
+        self._checkpointer = build_checkpointer(
+            self._checkpointer_backend,
+            ttl_seconds=self._checkpoint_ttl_seconds,
+            memory_max_bytes=self._memory_checkpoint_max_bytes,
+        )
         return self._checkpointer
 
     def _build_langchain_messages(
         self,
         *,
-        system_prompt: str,
-        history: list[dict[str, str]],
+        assembled: AssembledPrompt,
         user_message: str,
         context: dict[str, Any] | None = None,
     ) -> list[Any]:
@@ -90,16 +128,18 @@ class LangGraphConversationRuntime(ConversationRuntime):
         assert SystemMessage is not None
         assert HumanMessage is not None
         assert AIMessage is not None
-        messages: list[Any] = [SystemMessage(content=system_prompt)]
-        for turn in history:
-            role = turn.get("role", "")
-            content = turn.get("content", "")
-            if role == "user":
+        ctx = context or {}
+        messages: list[Any] = []
+        for turn in assembled.messages[:-1]:
+            role = turn["role"]
+            content = turn["content"]
+            if role == "system":
+                messages.append(SystemMessage(content=content))
+            elif role == "user":
                 messages.append(HumanMessage(content=content))
             elif role == "assistant":
                 messages.append(AIMessage(content=content))
 
-        ctx = context or {}
         attachment = ctx.get("attachment")
         base64_data = ctx.get("attachment_base64", "")
         if (
@@ -128,28 +168,80 @@ class LangGraphConversationRuntime(ConversationRuntime):
         if provider_key in self._graphs:
             return self._graphs[provider_key]
 
-        def chat_node(state: ConversationState) -> dict[str, Any]:
-            history = list(state.get("history") or [])
+        window = self._history_window
+
+        def prepare_turn(state: ConversationState) -> tuple[WindowPlan, str, dict[str, Any]]:
             incoming = state.get("incoming_message", "")
             ctx = dict(state.get("context") or {})
+            thread_id = str(ctx.get("thread_id", "default"))
+            plan = window.plan(
+                thread_id=thread_id,
+                history=list(state.get("history") or []),
+                summary=state.get("summary", ""),
+                summarized_turns=state.get("summarized_turns", 0),
+                summarized_tokens=state.get("summarized_tokens", 0),
+            )
 
-            system_prompt = ctx.get("system_prompt", "")
-            lc_messages = self._build_langchain_messages(
-                system_prompt=system_prompt,
-                history=history,
-                user_message=incoming,
+            assembled = self._prompt_assembler.assemble(
+                system_prompt=ctx.get("system_prompt", ""),
                 context=ctx,
+                message=incoming,
+                history=plan.history,
+                summary=plan.summary,
+            )
+            ctx["langchain_messages"] = self._build_langchain_messages(
+                assembled=assembled, user_message=incoming, context=ctx
+            )
+            window.record_turn(thread_id=thread_id, plan=plan, prompt=assembled)
+            return plan, incoming, ctx
+
+        def finish_turn(plan: WindowPlan, incoming: str, reply: str, ctx: dict[str, Any]) -> dict[str, Any]:
+            history = plan.history + [
+                {"role": "user", "content": incoming},
+                {"role": "assistant", "content": reply},
+            ]
+            window.schedule_summary(
+                thread_id=str(ctx.get("thread_id", "default")),
+                history=history,
+                summary=plan.summary,
+                summarized_turns=plan.summarized_turns,
+                provider=provider,
+                role=str(ctx.get("role", "companion")),
             )
+            return {
+                "history": history,
+                "summary": plan.summary,
+                "summarized_turns": plan.summarized_turns,
+                "summarized_tokens": plan.summarized_tokens,
+                "reply": reply,
+            }
 
-            ctx["langchain_messages"] = lc_messages
+        def chat_node(state: ConversationState) -> dict[str, Any]:
+            plan, incoming, ctx = prepare_turn(state)
             reply = provider.generate_reply(incoming, ctx)
+            return finish_turn(plan, incoming, reply, ctx)
 
-            history.append({"role": "user", "content": incoming})
-            history.append({"role": "assistant", "content": reply})
-            return {"history": history, "reply": reply}
+        async def achat_node(state: ConversationState, config: dict[str, Any]) -> dict[str, Any]:
+            plan, incoming, ctx = prepare_turn(state)
+            if not (config.get("configurable") or {}).get("stream_tokens"):
+                # ainvoke(): nobody consumes chunks, so take the whole reply.
+                reply = await provider.agenerate_reply(incoming, ctx)
+                return finish_turn(plan, incoming, reply, ctx)
+            # Under astream(stream_mode="custom") each chunk reaches the caller
+            # as it arrives. A provider error mid-stream propagates, so the
+            # partial reply is never checkpointed.
+            assert get_stream_writer is not None
+            write = get_stream_writer()
+            chunks: list[str] = []
+            async for chunk in provider.astream_reply(incoming, ctx):
+                chunks.append(chunk)
+                write({"token": chunk})
+            return finish_turn(plan, incoming, "".join(chunks), ctx)
 
         builder = StateGraph(ConversationState)
-        builder.add_node("chat", chat_node)
+        assert RunnableLambda is not None
+        # Sync invoke() runs chat_node; ainvoke() runs achat_node natively.
+        builder.add_node("chat", RunnableLambda(chat_node, afunc=achat_node))
         builder.set_entry_point("chat")
         builder.add_edge("chat", END)
 
@@ -157,6 +249,22 @@ class LangGraphConversationRuntime(ConversationRuntime):
         self._graphs[provider_key] = graph
         return graph
 
+    def _runtime_context(self, context: dict[str, Any]) -> dict[str, Any]:
+        role = context.get("role")
+        if role not in _KNOWN_ROLES:
+            role = "companion"
+
+        runtime_context = dict(context)
+        runtime_context["system_prompt"] = resolve_role_system_prompt(role)
+        return runtime_context
+
+    @staticmethod
+    def _extract_reply(result: Any) -> str:
+        if not isinstance(result, dict):
+            return ""
+        reply = result.get("reply", "")
+        return reply if isinstance(reply, str) else str(reply)
+
     def generate_reply(
         self,
         *,
@@ -164,12 +272,7 @@ class LangGraphConversationRuntime(ConversationRuntime):
         provider: ChatProvider,
         context: dict[str, Any],
     ) -> str:
-        role = context.get("role")
-        if role not in _KNOWN_ROLES:
-            role = "companion"
-
-        runtime_context = dict(context)
-        runtime_context["system_prompt"] = resolve_role_system_prompt(role)
+        runtime_context = self._runtime_context(context)
 
         if not LANGGRAPH_AVAILABLE:
             logger.warning(
@@ -182,7 +285,7 @@ class LangGraphConversationRuntime(ConversationRuntime):
         logger.info(
             "langgraph_runtime thread_id=%s role=%s provider=%s",
             thread_id,
-            role,
+            runtime_context.get("role"),
             provider.provider_name,
         )
 
@@ -191,7 +294,70 @@ class LangGraphConversationRuntime(ConversationRuntime):
             {"incoming_message": message, "context": runtime_context},
             config={"configurable": {"thread_id": thread_id}},
         )
-        if not isinstance(result, dict):
-            return ""
-        reply = result.get("reply", "")
-        return reply if isinstance(reply, str) else str(reply)
+        return self._extract_reply(result)
+
+    async def agenerate_reply(
+        self,
+        *,
+        message: str,
+        provider: ChatProvider,
+        context: dict[str, Any],
+    ) -> str:
+        runtime_context = self._runtime_context(context)
+
+        if not LANGGRAPH_AVAILABLE:
+            logger.warning(
+                "langgraph_runtime_requested_but_unavailable thread_id=%s",
+                runtime_context.get("thread_id"),
+            )
+            return await provider.agenerate_reply(message, runtime_context)
+
+        thread_id = runtime_context.get("thread_id", "default")
+        logger.info(
+            "langgraph_runtime thread_id=%s role=%s provider=%s",
+            thread_id,
+            runtime_context.get("role"),
+            provider.provider_name,
+        )
+
+        graph = self._get_or_build_graph(provider)
+        result = await graph.ainvoke(
+            {"incoming_message": message, "context": runtime_context},
+            config={"configurable": {"thread_id": thread_id}},
+        )
+        return self._extract_reply(result)
+
+    async def astream_reply(
+        self,
+        *,
+        message: str,
+        provider: ChatProvider,
+        context: dict[str, Any],
+    ) -> AsyncIterator[str]:
+        runtime_context = self._runtime_context(context)
+
+        if not LANGGRAPH_AVAILABLE:
+            logger.warning(
+                "langgraph_runtime_requested_but_unavailable thread_id=%s",
+                runtime_context.get("thread_id"),
+            )
+            async for chunk in provider.astream_reply(message, runtime_context):
+                yield chunk
+            return
+
+        thread_id = runtime_context.get("thread_id", "default")
+        logger.info(
+            "langgraph_runtime_stream thread_id=%s role=%s provider=%s",
+            thread_id,
+            runtime_context.get("role"),
+            provider.provider_name,
+        )
+
+        graph = self._get_or_build_graph(provider)
+        async for event in graph.astream(
+            {"incoming_message": message, "context": runtime_context},
+            config={"configurable": {"thread_id": thread_id, "stream_tokens": True}},
+            stream_mode="custom",
+        ):
+            if isinstance(event, dict) and isinstance(event.get("token"), str):
+                yield event["token"]
@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from typing import Any
 
 from app.providers.base import ChatProvider
@@ -17,10 +18,33 @@ class SimpleConversationRuntime(ConversationRuntime):
         provider: ChatProvider,
         context: dict[str, Any]
     ) -> str:
+        return provider.generate_reply(message, self._runtime_context(context))
+
+    async def agenerate_reply(
+        self,
+        *,
+        message: str,
+        provider: ChatProvider,
+        context: dict[str, Any]
+    ) -> str:
+        return await provider.agenerate_reply(message, self._runtime_context(context))
+
+    async def astream_reply(
+        self,
+        *,
+        message: str,
+        provider: ChatProvider,
+        context: dict[str, Any]
+    ) -> AsyncIterator[str]:
+        async for chunk in provider.astream_reply(message, self._runtime_context(context)):
+            yield chunk
+
+    @staticmethod
+    def _runtime_context(context: dict[str, Any]) -> dict[str, Any]:
         role = context.get("role")
         if role not in _KNOWN_ROLES:
             role = "companion"
 
         runtime_context = dict(context)
         runtime_context["system_prompt"] = resolve_role_system_prompt(role)
-        return provider.generate_reply(message, runtime_context)
+        return runtime_context
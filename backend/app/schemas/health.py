@@ -26,6 +26,12 @@ class RuntimeStatusResponse(BaseModel):
     libraries: dict[str, bool]
 
 
+class MetricsResponse(BaseModel):
+    counters: dict[str, float]
+    gauges: dict[str, float]
+    observations: dict[str, dict[str, float]]
+
+
 class ExaProbeResult(BaseModel):
     provider: str
     query: str
@@ -1,16 +1,26 @@
+import asyncio
 import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import cast
+from typing import Any, cast
 from uuid import uuid4
 
-from app.core.database import SessionLocal
+from sqlalchemy.orm import Session
+
+from app.core.async_bridge import run_sync
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.write_behind import WriteBehindQueue
 from app.core.redis_client import (
     build_short_term_memory_key,
+    get_async_redis_client,
     get_redis_client,
     serialize_json,
 )
 from app.core.settings import settings
-from app.memory.embeddings import build_embedding_provider
+from app.memory.embedding_pipeline import MemoryEmbeddingPipeline
+from app.memory.embeddings import get_embedding_service
 from app.memory.context_builder import ConversationContextBuilder
 from app.models.enums import (
     AuditEventType,
@@ -20,6 +30,8 @@ from app.models.enums import (
     RoleType,
     SafetyRiskLevel,
 )
+from app.models.memory import MemoryEntry
+from app.providers.base import ChatProvider
 from app.providers.router import ProviderRouter
 from app.repositories.audit_repository import AuditRepository
 from app.repositories.chat_repository import ChatRepository
@@ -50,8 +62,27 @@ _SUPPORTIVE_REFUSAL_REPLY = (
 )
 
 
+@dataclass
+class _PreparedTurn:
+    """Everything resolved before the reply is generated for one chat turn."""
+
+    request_id: str
+    thread_id: str
+    provider: ChatProvider
+    provider_route: str
+    fallback_reason: str
+    safety: SafetyResult
+    runtime_context: dict[str, Any]
+
+
 class ChatOrchestrator:
-    """Mock orchestrator boundary for provider routing and safety hooks."""
+    """
+    Orchestrator boundary for provider routing, safety hooks and persistence.
+
+    `agenerate_reply` is the native async path used by the API routes,
+    `astream_reply` is its token-streaming counterpart, and
+    `generate_reply` is a sync shim for callers outside an event loop.
+    """
 
     def __init__(
         self,
@@ -63,19 +94,34 @@ class ChatOrchestrator:
         self._settings = settings
         self._provider_router = provider_router or ProviderRouter(settings)
         self._runtime = runtime or build_runtime(settings)
-        self._embedding_provider = build_embedding_provider(
-            api_key=settings.minimax_api_key,
-            model=settings.memory_embedding_model,
-            base_url=settings.minimax_base_url,
-            dimensions=settings.memory_embedding_dimensions,
-        )
+        self._embedding_service = get_embedding_service(settings)
         self._context_builder = context_builder or ConversationContextBuilder(
             settings)
         self._safety_monitor_service = safety_monitor_service or SafetyMonitorService(
             self._provider_router
         )
+        self._embedding_pipeline = MemoryEmbeddingPipeline(
+            settings, self._embedding_service)
+        self._write_queue: WriteBehindQueue | None = None
+        if settings.chat_persistence_write_behind_enabled:
+            self._write_queue = WriteBehindQueue(
+                name="chat_turns",
+                handler=self._apersist_chat_turn_batch,
+                backend=settings.chat_persistence_queue_backend,
+                batch_size=settings.chat_persistence_batch_size,
+                batch_wait_ms=settings.chat_persistence_batch_wait_ms,
+                max_attempts=settings.chat_persistence_max_attempts,
+                retry_backoff_seconds=settings.chat_persistence_retry_backoff_seconds,
+                worker_count=settings.chat_persistence_workers,
+            )
+
+    async def aclose(self) -> None:
+        if self._write_queue is not None:
+            await self._write_queue.aclose()
+        # Closed second so embeddings submitted by the final chat batches flush.
+        await self._embedding_pipeline.aclose()
 
-    def _persist_short_term_memory(
+    def _short_term_memory_write(
         self,
         *,
         user_id: str,
@@ -84,8 +130,7 @@ class ChatOrchestrator:
         request_id: str,
         user_message: str,
         assistant_reply: str,
-    ) -> None:
-        redis_client = get_redis_client()
+    ) -> tuple[str, str]:
         redis_key = build_short_term_memory_key(
             user_id=user_id,
             role=cast(ChatRole, role),
@@ -97,15 +142,36 @@ class ChatOrchestrator:
             "assistant_reply": assistant_reply,
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
+        return redis_key, serialize_json(payload)
+
+    async def _apersist_short_term_memory(
+        self,
+        *,
+        user_id: str,
+        role: str,
+        thread_id: str,
+        request_id: str,
+        user_message: str,
+        assistant_reply: str,
+    ) -> None:
+        redis_key, serialized = self._short_term_memory_write(
+            user_id=user_id,
+            role=role,
+            thread_id=thread_id,
+            request_id=request_id,
+            user_message=user_message,
+            assistant_reply=assistant_reply,
+        )
+        redis_client = get_async_redis_client()
         pipeline = redis_client.pipeline()
-        pipeline.lpush(redis_key, serialize_json(payload))
+        pipeline.lpush(redis_key, serialized)
         pipeline.ltrim(
             redis_key, 0, self._settings.memory_short_term_max_turns - 1)
         pipeline.expire(
             redis_key, self._settings.memory_short_term_ttl_seconds)
-        pipeline.execute()
+        await pipeline.execute()
 
-    def _persist_chat_turn(
+    async def _apersist_chat_turn(
         self,
         *,
         request_id: str,
@@ -120,169 +186,288 @@ class ChatOrchestrator:
         context_snapshot: dict[str, object],
         safety: SafetyResult,
     ) -> None:
+        job = {
+            "request_id": request_id,
+            "user_id": user_id,
+            "role": role,
+            "thread_id": thread_id,
+            "user_message": user_message,
+            "assistant_reply": assistant_reply,
+            "runtime": runtime,
+            "provider_route": provider_route,
+            "provider_fallback_reason": provider_fallback_reason,
+            "context_snapshot": context_snapshot,
+            # risk_level is excluded from API dumps but must survive the queue.
+            "safety": {**safety.model_dump(), "risk_level": safety.risk_level},
+        }
+        if self._write_queue is not None:
+            # The turn is acknowledged once it is queued; write-behind
+            # workers persist it in batches.
+            await self._write_queue.aenqueue(job)
+            return
+        await self._apersist_chat_turn_batch([job])
+
+    async def _apersist_chat_turn_batch(self, jobs: list[dict[str, object]]) -> None:
+        def write_batch(sync_session: Session) -> list[tuple[dict[str, object], str]]:
+            # Queue redelivery is at-least-once; skip turns already written.
+            already_written = ChatRepository(sync_session).list_existing_request_ids(
+                [cast(str, job["request_id"]) for job in jobs]
+            )
+            written: list[tuple[dict[str, object], str]] = []
+            for job in jobs:
+                if job["request_id"] in already_written:
+                    continue
+                memory_entry = self._write_chat_turn(
+                    sync_session,
+                    request_id=cast(str, job["request_id"]),
+                    user_id=cast(str, job["user_id"]),
+                    role=cast(str, job["role"]),
+                    thread_id=cast(str, job["thread_id"]),
+                    user_message=cast(str, job["user_message"]),
+                    assistant_reply=cast(str, job["assistant_reply"]),
+                    runtime=cast(str, job["runtime"]),
+                    provider_route=cast(str, job["provider_route"]),
+                    provider_fallback_reason=cast(str, job["provider_fallback_reason"]),
+                    context_snapshot=cast(dict[str, object], job["context_snapshot"]),
+                    safety=SafetyResult.model_validate(job["safety"]),
+                )
+                written.append((job, memory_entry.id))
+            return written
+
+        async with AsyncSessionLocal() as session:
+            written = await session.run_sync(write_batch)
+            await session.commit()
+
+        # Embeddings are generated in batches by the pipeline, after the turn
+        # has committed, so the remote embedding call never holds a connection.
+        for job, memory_entry_id in written:
+            await self._embedding_pipeline.asubmit(
+                memory_entry_id=memory_entry_id,
+                user_id=cast(str, job["user_id"]),
+                role=cast(str, job["role"]),
+                text=f"{job['user_message']}\n{job['assistant_reply']}",
+            )
+
+    def _write_chat_turn(
+        self,
+        session: Session,
+        *,
+        request_id: str,
+        user_id: str,
+        role: str,
+        thread_id: str,
+        user_message: str,
+        assistant_reply: str,
+        runtime: str,
+        provider_route: str,
+        provider_fallback_reason: str,
+        context_snapshot: dict[str, object],
+        safety: SafetyResult,
+    ) -> MemoryEntry:
         role_enum = RoleType(role)
         provider_status = (
             ProviderEventStatus.success
             if provider_fallback_reason == "not_applicable"
             else ProviderEventStatus.fallback
         )
-        with SessionLocal() as session:
-            user_repository = UserRepository(session)
-            chat_repository = ChatRepository(session)
-            memory_repository = MemoryRepository(session)
-            audit_repository = AuditRepository(session)
+        user_repository = UserRepository(session)
+        chat_repository = ChatRepository(session)
+        memory_repository = MemoryRepository(session)
+        audit_repository = AuditRepository(session)
 
-            user_repository.ensure_user(user_id)
-            thread = chat_repository.get_or_create_thread(
-                user_id=user_id,
-                role=role_enum,
-                thread_id=thread_id,
-            )
+        user_repository.ensure_user(user_id)
+        thread = chat_repository.get_or_create_thread(
+            user_id=user_id,
+            role=role_enum,
+            thread_id=thread_id,
+        )
 
-            message = chat_repository.create_chat_message(
-                thread_pk=thread.id,
-                user_id=user_id,
-                role=role_enum,
-                thread_id=thread_id,
-                request_id=request_id,
-                user_message=user_message,
-                assistant_reply=assistant_reply,
-                runtime=runtime,
-                provider=provider_route,
-                provider_fallback_reason=provider_fallback_reason,
-                context_snapshot=context_snapshot,
-            )
-            chat_repository.create_safety_event(
-                chat_message_id=message.id,
-                thread_pk=thread.id,
-                user_id=user_id,
-                role=role_enum,
-                thread_id=thread_id,
-                request_id=request_id,
-                risk_level=SafetyRiskLevel(safety.risk_level),
-                show_crisis_banner=safety.show_crisis_banner,
-                emotion_label=safety.emotion_label,
-                emotion_score=safety.emotion_score,
-            )
+        message = chat_repository.create_chat_message(
+            thread_pk=thread.id,
+            user_id=user_id,
+            role=role_enum,
+            thread_id=thread_id,
+            request_id=request_id,
+            user_message=user_message,
+            assistant_reply=assistant_reply,
+            runtime=runtime,
+            provider=provider_route,
+            provider_fallback_reason=provider_fallback_reason,
+            context_snapshot=context_snapshot,
+        )
+        chat_repository.create_safety_event(
+            chat_message_id=message.id,
+            thread_pk=thread.id,
+            user_id=user_id,
+            role=role_enum,
+            thread_id=thread_id,
+            request_id=request_id,
+            risk_level=SafetyRiskLevel(safety.risk_level),
+            show_crisis_banner=safety.show_crisis_banner,
+            emotion_label=safety.emotion_label,
+            emotion_score=safety.emotion_score,
+        )
 
-            audit_repository.create_provider_event(
-                user_id=user_id,
-                request_id=request_id,
-                role=role_enum,
-                scope=ProviderEventScope.chat,
-                provider_name=provider_route,
-                runtime=runtime,
-                status=provider_status,
-                fallback_reason=provider_fallback_reason,
-                metadata_json={"thread_id": thread_id},
+        audit_repository.create_provider_event(
+            user_id=user_id,
+            request_id=request_id,
+            role=role_enum,
+            scope=ProviderEventScope.chat,
+            provider_name=provider_route,
+            runtime=runtime,
+            status=provider_status,
+            fallback_reason=provider_fallback_reason,
+            metadata_json={"thread_id": thread_id},
+        )
+        audit_repository.create_provider_event(
+            user_id=user_id,
+            request_id=request_id,
+            role=role_enum,
+            scope=ProviderEventScope.safety,
+            provider_name=safety.monitor_provider,
+            runtime=runtime,
+            status=(
+                ProviderEventStatus.degraded
+                if safety.degraded
+                else ProviderEventStatus.success
+            ),
+            fallback_reason=safety.fallback_reason,
+            metadata_json={
+                "risk_level": safety.risk_level,
+                "policy_action": safety.policy_action,
+            },
+        )
+        fresh_retrieval = (
+            ((context_snapshot.get("memory") or {}).get("fresh_retrieval"))
+            if isinstance(context_snapshot, dict)
+            else None
+        )
+        if isinstance(fresh_retrieval, dict) and fresh_retrieval.get("status") != "skipped":
+            retrieval_source = str(fresh_retrieval.get("source", "retrieval-stub"))
+            retrieval_status = (
+                ProviderEventStatus.degraded
+                if fresh_retrieval.get("status") == "degraded"
+                else ProviderEventStatus.success
             )
             audit_repository.create_provider_event(
                 user_id=user_id,
                 request_id=request_id,
                 role=role_enum,
-                scope=ProviderEventScope.safety,
-                provider_name=safety.monitor_provider,
+                scope=ProviderEventScope.retrieval,
+                provider_name=retrieval_source,
                 runtime=runtime,
-                status=(
-                    ProviderEventStatus.degraded
-                    if safety.degraded
-                    else ProviderEventStatus.success
+                status=retrieval_status,
+                fallback_reason=(
+                    None
+                    if retrieval_status == ProviderEventStatus.success
+                    else str(fresh_retrieval.get("fallback_reason") or "retrieval_unavailable")
                 ),
-                fallback_reason=safety.fallback_reason,
                 metadata_json={
-                    "risk_level": safety.risk_level,
-                    "policy_action": safety.policy_action,
-                },
-            )
-            fresh_retrieval = (
-                ((context_snapshot.get("memory") or {}).get("fresh_retrieval"))
-                if isinstance(context_snapshot, dict)
-                else None
-            )
-            if isinstance(fresh_retrieval, dict):
-                retrieval_source = str(fresh_retrieval.get("source", "retrieval-stub"))
-                retrieval_status = (
-                    ProviderEventStatus.degraded
-                    if fresh_retrieval.get("status") == "degraded"
-                    else ProviderEventStatus.success
-                )
-                audit_repository.create_provider_event(
-                    user_id=user_id,
-                    request_id=request_id,
-                    role=role_enum,
-                    scope=ProviderEventScope.retrieval,
-                    provider_name=retrieval_source,
-                    runtime=runtime,
-                    status=retrieval_status,
-                    fallback_reason=(
-                        None
-                        if retrieval_status == ProviderEventStatus.success
-                        else str(fresh_retrieval.get("fallback_reason") or "retrieval_unavailable")
-                    ),
-                    metadata_json={
-                        "entry_count": len(fresh_retrieval.get("entries", [])),
-                    },
-                )
-            audit_repository.create_audit_event(
-                event_type=AuditEventType.safety_event,
-                user_id=user_id,
-                request_id=request_id,
-                role=role_enum,
-                thread_id=thread_id,
-                metadata_json={
-                    "risk_level": safety.risk_level,
-                    "show_crisis_banner": safety.show_crisis_banner,
-                    "emotion_label": safety.emotion_label,
-                    "emotion_score": safety.emotion_score,
-                    "policy_action": safety.policy_action,
-                    "monitor_provider": safety.monitor_provider,
-                    "fallback_reason": safety.fallback_reason,
+                    "entry_count": len(fresh_retrieval.get("entries", [])),
                 },
             )
+        audit_repository.create_audit_event(
+            event_type=AuditEventType.safety_event,
+            user_id=user_id,
+            request_id=request_id,
+            role=role_enum,
+            thread_id=thread_id,
+            metadata_json={
+                "risk_level": safety.risk_level,
+                "show_crisis_banner": safety.show_crisis_banner,
+                "emotion_label": safety.emotion_label,
+                "emotion_score": safety.emotion_score,
+                "policy_action": safety.policy_action,
+                "monitor_provider": safety.monitor_provider,
+                "fallback_reason": safety.fallback_reason,
+            },
+        )
 
-            summary_excerpt = user_message.strip()[:200]
-            memory_entry = memory_repository.create_memory_entry(
-                user_id=user_id,
-                role=role_enum,
-                thread_id=thread_id,
-                entry_type=MemoryEntryType.summary,
-                content=f"User intent summary: {summary_excerpt}",
-                write_reason="chat_turn_summary",
-                source_provider=provider_route,
-                created_by_request_id=request_id,
-                metadata_json={
-                    "runtime": runtime,
-                    "request_id": request_id,
-                },
-                is_sensitive=False,
-            )
-            memory_embedding = self._embedding_provider.embed(
-                f"{user_message}\n{assistant_reply}"
-            )
-            memory_repository.create_memory_embedding(
-                memory_entry_id=memory_entry.id,
-                user_id=user_id,
-                role=role_enum,
-                embedding_model=self._settings.memory_embedding_model,
-                embedding_dimensions=len(memory_embedding),
-                embedding=memory_embedding,
-                distance_metric="cosine",
-            )
-            audit_repository.create_audit_event(
-                event_type=AuditEventType.memory_write,
-                user_id=user_id,
-                request_id=request_id,
-                role=role_enum,
-                thread_id=thread_id,
-                metadata_json={
-                    "memory_entry_id": memory_entry.id,
-                    "entry_type": memory_entry.entry_type.value,
-                },
+        summary_excerpt = user_message.strip()[:200]
+        memory_entry = memory_repository.create_memory_entry(
+            user_id=user_id,
+            role=role_enum,
+            thread_id=thread_id,
+            entry_type=MemoryEntryType.summary,
+            content=f"User intent summary: {summary_excerpt}",
+            write_reason="chat_turn_summary",
+            source_provider=provider_route,
+            created_by_request_id=request_id,
+            metadata_json={
+                "runtime": runtime,
+                "request_id": request_id,
+            },
+            is_sensitive=False,
+        )
+        audit_repository.create_audit_event(
+            event_type=AuditEventType.memory_write,
+            user_id=user_id,
+            request_id=request_id,
+            role=role_enum,
+            thread_id=thread_id,
+            metadata_json={
+                "memory_entry_id": memory_entry.id,
+                "entry_type": memory_entry.entry_type.value,
+            },
+        )
+        return memory_entry
+
+    def generate_reply(self, chat_request: ChatRequest) -> ChatResponse:
+        return run_sync(self.agenerate_reply(chat_request))
+
+    async def agenerate_reply(self, chat_request: ChatRequest) -> ChatResponse:
+        turn = await self._aprepare_turn(chat_request)
+        if turn.safety.policy_action == "supportive_refusal":
+            reply = _SUPPORTIVE_REFUSAL_REPLY
+        else:
+            reply = await self._runtime.agenerate_reply(
+                message=chat_request.message,
+                provider=turn.provider,
+                context=turn.runtime_context
             )
+        return await self._afinish_turn(chat_request, turn, reply)
 
-            session.commit()
+    async def astream_reply(
+        self, chat_request: ChatRequest
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """
+        Yield `(event, payload)` pairs for one streamed chat turn.
 
-    def generate_reply(self, chat_request: ChatRequest) -> ChatResponse:
+        The safety verdict is always the first event so the client can show
+        the crisis banner before any text arrives. Reply text follows as
+        `token` events, and the turn is persisted only after the stream has
+        completed; the final `done` event carries the full `ChatResponse`. A
+        provider failure mid-stream raises, so nothing is persisted and the
+        route reports an `error` event instead of `done`.
+        """
+        turn = await self._aprepare_turn(chat_request)
+        yield "safety", {
+            "request_id": turn.request_id,
+            "thread_id": turn.thread_id,
+            "runtime": self._runtime.runtime_name,
+            "provider": turn.provider_route,
+            "safety": turn.safety.model_dump(),
+        }
+
+        chunks: list[str] = []
+        if turn.safety.policy_action == "supportive_refusal":
+            chunks.append(_SUPPORTIVE_REFUSAL_REPLY)
+            yield "token", {"text": _SUPPORTIVE_REFUSAL_REPLY}
+        else:
+            async for chunk in self._runtime.astream_reply(
+                message=chat_request.message,
+                provider=turn.provider,
+                context=turn.runtime_context,
+            ):
+                if not chunk:
+                    continue
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+
+        response = await self._afinish_turn(chat_request, turn, "".join(chunks))
+        yield "done", response.model_dump()
+
+    async def _aprepare_turn(self, chat_request: ChatRequest) -> _PreparedTurn:
         request_id = str(uuid4())
         role = chat_request.role
         thread_id = chat_request.thread_id or f"{chat_request.user_id}-{role}-thread"
@@ -293,12 +478,39 @@ class ChatOrchestrator:
             if provider_route != settings.chat_provider and settings.chat_provider != "mock"
             else "not_applicable"
         )
-        context = self._context_builder.build(
-            user_id=chat_request.user_id,
-            thread_id=thread_id,
-            role=role,
-            message=chat_request.message
+        # Safety and context building are independent, so they fan out
+        # together and the turn waits for max(safety, context) rather than
+        # the sum. A supportive refusal never uses fresh retrieval, so Exa is
+        # cancelled as soon as safety settles on one.
+        stage_started = time.perf_counter()
+        skip_fresh_retrieval = asyncio.Event()
+        context_task = asyncio.create_task(
+            self._context_builder.abuild(
+                user_id=chat_request.user_id,
+                thread_id=thread_id,
+                role=role,
+                message=chat_request.message,
+                skip_fresh_retrieval=skip_fresh_retrieval,
+            )
         )
+        try:
+            safety_result = await self._safety_monitor_service.aevaluate(
+                SafetyEvaluateRequest(
+                    user_id=chat_request.user_id,
+                    role=role,
+                    thread_id=thread_id,
+                    message=chat_request.message,
+                )
+            )
+            safety_ms = (time.perf_counter() - stage_started) * 1000
+            if safety_result.policy_action == "supportive_refusal":
+                skip_fresh_retrieval.set()
+            context = await context_task
+        except BaseException:
+            context_task.cancel()
+            raise
+        context_ms = (time.perf_counter() - stage_started) * 1000
+
         if chat_request.attachment is not None:
             context["attachment"] = {
                 "mime_type": chat_request.attachment.mime_type,
@@ -308,24 +520,19 @@ class ChatOrchestrator:
             }
 
         logger.info(
-            "chat_orchestrated request_id=%s role=%s thread_id=%s runtime=%s provider_route=%s fallback_reason=%s user_id=%s",
+            "chat_orchestrated request_id=%s role=%s thread_id=%s runtime=%s provider_route=%s fallback_reason=%s user_id=%s safety_ms=%.1f context_ms=%.1f fresh_retrieval_skipped=%s",
             request_id,
             role,
             thread_id,
             self._runtime.runtime_name,
             provider_route,
             fallback_reason,
-            chat_request.user_id
+            chat_request.user_id,
+            safety_ms,
+            context_ms,
+            skip_fresh_retrieval.is_set(),
         )
 
-        safety_result = self._safety_monitor_service.evaluate(
-            SafetyEvaluateRequest(
-                user_id=chat_request.user_id,
-                role=role,
-                thread_id=thread_id,
-                message=chat_request.message,
-            )
-        )
         safety = SafetyResult(
             risk_level=safety_result.risk_level,
             show_crisis_banner=safety_result.show_crisis_banner,
@@ -341,17 +548,29 @@ class ChatOrchestrator:
             runtime_context["attachment_base64"] = chat_request.attachment.base64_data
         runtime_context["safety"] = safety.model_dump()
 
-        if safety.policy_action == "supportive_refusal":
-            reply = _SUPPORTIVE_REFUSAL_REPLY
-        else:
-            reply = self._runtime.generate_reply(
-                message=chat_request.message,
-                provider=provider,
-                context=runtime_context
-            )
+        return _PreparedTurn(
+            request_id=request_id,
+            thread_id=thread_id,
+            provider=provider,
+            provider_route=provider_route,
+            fallback_reason=fallback_reason,
+            safety=safety,
+            runtime_context=runtime_context,
+        )
+
+    async def _afinish_turn(
+        self, chat_request: ChatRequest, turn: _PreparedTurn, reply: str
+    ) -> ChatResponse:
+        request_id = turn.request_id
+        role = chat_request.role
+        thread_id = turn.thread_id
+        provider_route = turn.provider_route
+        fallback_reason = turn.fallback_reason
+        runtime_context = turn.runtime_context
+        safety = turn.safety
 
         try:
-            self._persist_chat_turn(
+            await self._apersist_chat_turn(
                 request_id=request_id,
                 user_id=chat_request.user_id,
                 role=role,
@@ -374,7 +593,7 @@ class ChatOrchestrator:
             )
 
         try:
-            self._persist_short_term_memory(
+            await self._apersist_short_term_memory(
                 user_id=chat_request.user_id,
                 role=role,
                 thread_id=thread_id,
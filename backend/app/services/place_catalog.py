@@ -0,0 +1,238 @@
+import gzip
+import heapq
+import logging
+import math
+from collections import defaultdict
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.core.geo import approx_distance_meters
+from app.services.recommendation_scoring import tokenize_query
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_CATALOG_PATH = Path(__file__).resolve().parents[1] / "data" / "hk_places.tsv"
+_CATALOG_COLUMNS = ("place_id", "name", "address", "types", "latitude", "longitude")
+# Below this many query matches it is cheaper to score them all than to
+# walk the grid far enough to be sure none were missed.
+_DIRECT_SCORE_LIMIT = 64
+# Words are indexed by every substring up to this length; longer query tokens
+# intersect the word sets of their n-grams of this length.
+_NGRAM_SIZE = 3
+
+
+def _ngrams(text: str, size: int) -> set[str]:
+    return {text[start:start + size] for start in range(len(text) - size + 1)}
+
+
+def place_haystack(place: dict[str, Any]) -> str:
+    """Lowercased name and types; a query token matches anywhere inside it."""
+    return f"{str(place['name']).lower()} {' '.join(place['types']).lower()}"
+
+
+class PlaceCatalog:
+    """
+    Read-only POI catalog with a grid spatial index and an inverted token index.
+
+    Places are bucketed into `cell_degrees` lat/lng cells; nearest-first
+    searches walk outward ring by ring. A query token matches a place when it
+    is a substring of the place's name or types ("shop" matches
+    `shopping_mall`). Query tokens never contain whitespace, so a match always
+    falls inside one whitespace-separated word; an inverted index from those
+    words lets relevance scoring touch only places with a matching word, and
+    an n-gram index over the words finds those words without scanning the
+    vocabulary.
+    """
+
+    def __init__(self, places: list[dict[str, Any]], *, cell_degrees: float = 0.01):
+        self._places = places
+        self._cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._haystacks: list[str] = []
+        for index, place in enumerate(places):
+            self._cells[self._cell(float(place["latitude"]), float(place["longitude"]))].append(index)
+            haystack = place_haystack(place)
+            self._haystacks.append(haystack)
+            for word in haystack.split():
+                self._postings[word].add(index)
+        self._ngram_words: dict[str, set[str]] = defaultdict(set)
+        for word in self._postings:
+            for size in range(1, _NGRAM_SIZE + 1):
+                for gram in _ngrams(word, size):
+                    self._ngram_words[gram].add(word)
+        if self._cells:
+            rows = [cell[0] for cell in self._cells]
+            columns = [cell[1] for cell in self._cells]
+            self._bounds = (min(rows), max(rows), min(columns), max(columns))
+        else:
+            self._bounds = (0, -1, 0, -1)
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self._cell_degrees), math.floor(longitude / self._cell_degrees)
+
+    def _ring(self, center: tuple[int, int], radius: int) -> list[int]:
+        row, column = center
+        if radius == 0:
+            return list(self._cells.get(center, ()))
+        found: list[int] = []
+        for d_row in range(-radius, radius + 1):
+            step = 1 if abs(d_row) == radius else 2 * radius
+            for d_column in range(-radius, radius + 1, step):
+                found.extend(self._cells.get((row + d_row, column + d_column), ()))
+        return found
+
+    def _max_ring(self, center: tuple[int, int]) -> int:
+        min_row, max_row, min_column, max_column = self._bounds
+        return max(
+            abs(center[0] - min_row),
+            abs(center[0] - max_row),
+            abs(center[1] - min_column),
+            abs(center[1] - max_column),
+        )
+
+    def relevance(self, index: int, tokens: set[str]) -> float:
+        if not tokens:
+            return 0.0
+        haystack = self._haystacks[index]
+        return sum(1 for token in tokens if token in haystack) / len(tokens)
+
+    def _words_containing(self, token: str) -> set[str]:
+        if len(token) <= _NGRAM_SIZE:
+            return self._ngram_words.get(token, set())
+        candidates = sorted(
+            (self._ngram_words.get(gram, set()) for gram in _ngrams(token, _NGRAM_SIZE)),
+            key=len,
+        )
+        words = set(candidates[0])
+        for other in candidates[1:]:
+            if not words:
+                break
+            words &= other
+        # Sharing every n-gram does not guarantee containment ("abcab" vs "abcxcab").
+        return {word for word in words if token in word}
+
+    def _matching(self, tokens: set[str]) -> set[int]:
+        matched: set[int] = set()
+        for token in tokens:
+            for word in self._words_containing(token):
+                matched |= self._postings[word]
+        return matched
+
+    def search(
+        self,
+        *,
+        latitude: float,
+        longitude: float,
+        query: str,
+        limit: int,
+        score: Callable[[float, int], float],
+    ) -> list[tuple[float, dict[str, Any], int]]:
+        """
+        Return the `limit` best `(score, place, distance_meters)` tuples.
+
+        `score(relevance, distance_meters)` must not decrease as relevance
+        grows or as distance shrinks, and must be at most
+        `score(1.0, distance)`. That lets the ring walk stop as soon as no
+        unvisited place can beat the current top `limit`.
+        """
+        if limit <= 0 or not self._places:
+            return []
+        tokens = tokenize_query(query)
+        matched = self._matching(tokens)
+
+        heap: list[tuple[float, int, int]] = []
+        seen: set[int] = set()
+
+        def consider(index: int) -> None:
+            if index in seen:
+                return
+            seen.add(index)
+            place = self._places[index]
+            distance_meters = approx_distance_meters(
+                origin_latitude=latitude,
+                origin_longitude=longitude,
+                latitude=float(place["latitude"]),
+                longitude=float(place["longitude"]),
+            )
+            # Negated index keeps catalog order on ties, like a stable sort.
+            entry = (score(self.relevance(index, tokens), distance_meters), -index, distance_meters)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        if len(matched) <= _DIRECT_SCORE_LIMIT:
+            for index in matched:
+                consider(index)
+        unseen_matches = len(matched - seen)
+
+        center = self._cell(latitude, longitude)
+        # Any place in ring r is at least r - 1 whole cells from the origin.
+        cell_meters = self._cell_degrees * 110_000 * math.cos(math.radians(min(89.0, abs(latitude) + 1)))
+        for radius in range(self._max_ring(center) + 1):
+            if len(heap) >= limit:
+                best_relevance = 1.0 if unseen_matches else 0.0
+                bound = score(best_relevance, max(1, int((radius - 1) * cell_meters)))
+                if heap[0][0] >= bound:
+                    break
+            for index in self._ring(center, radius):
+                if index not in seen:
+                    if index in matched:
+                        unseen_matches -= 1
+                    consider(index)
+
+        ranked = sorted(heap, reverse=True)
+        return [(entry[0], self._places[-entry[1]], entry[2]) for entry in ranked]
+
+
+def _parse_catalog_line(line: str) -> dict[str, Any] | None:
+    fields = line.rstrip("\n").split("\t")
+    if len(fields) != len(_CATALOG_COLUMNS):
+        return None
+    place = dict(zip(_CATALOG_COLUMNS, fields))
+    try:
+        place["latitude"] = float(place["latitude"])
+        place["longitude"] = float(place["longitude"])
+    except ValueError:
+        return None
+    place["types"] = [place_type for place_type in str(place["types"]).split(",") if place_type]
+    return place
+
+
+def load_place_catalog(path: Path) -> PlaceCatalog:
+    """
+    Load a tab-separated catalog (`place_id, name, address, comma-separated
+    types, latitude, longitude`; `#` comments allowed), optionally gzipped.
+    Malformed lines are skipped.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    places: list[dict[str, Any]] = []
+    skipped = 0
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip() or line.startswith("#"):
+                continue
+            place = _parse_catalog_line(line)
+            if place is None:
+                skipped += 1
+                continue
+            places.append(place)
+    logger.info("place_catalog_loaded path=%s places=%d skipped=%d", path, len(places), skipped)
+    return PlaceCatalog(places)
+
+
+@lru_cache(maxsize=4)
+def get_place_catalog(path: str = "") -> PlaceCatalog:
+    """Return the shared catalog at `path`, falling back to the bundled one."""
+    if path:
+        try:
+            return load_place_catalog(Path(path))
+        except OSError:
+            logger.exception("place_catalog_load_failed path=%s, using_bundled", path)
+    return load_place_catalog(BUNDLED_CATALOG_PATH)
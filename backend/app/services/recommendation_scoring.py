@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.core.settings import Settings
+
+OUTDOOR_PLACE_TYPES = frozenset({"park", "tourist_attraction", "campground", "hiking_area", "beach"})
+INDOOR_PLACE_TYPES = frozenset({"cafe", "restaurant", "museum", "shopping_mall", "library"})
+WEATHER_INDOOR_CONDITIONS = frozenset({"rain", "drizzle", "thunderstorm", "snow"})
+WEATHER_OUTDOOR_CONDITIONS = frozenset({"clear", "partly_cloudy"})
+SCORE_COMPONENTS = ("relevance", "rating", "review_volume", "distance", "weather", "preference")
+# Catalog fallback places carry no rating, reviews or weather fit.
+_CATALOG_RELEVANCE_WEIGHT = 0.65
+_CATALOG_DISTANCE_WEIGHT = 0.35
+
+
+def tokenize_query(text: str) -> set[str]:
+    return {token.strip().lower() for token in text.split() if token.strip()}
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    relevance: float = 0.25
+    rating: float = 0.20
+    review_volume: float = 0.15
+    distance: float = 0.20
+    weather: float = 0.10
+    preference: float = 0.10
+
+    @classmethod
+    def from_settings(cls, app_settings: Settings) -> "ScoringWeights":
+        return cls(
+            relevance=app_settings.recommendation_weight_relevance,
+            rating=app_settings.recommendation_weight_rating,
+            review_volume=app_settings.recommendation_weight_review_volume,
+            distance=app_settings.recommendation_weight_distance,
+            weather=app_settings.recommendation_weight_weather,
+            preference=app_settings.recommendation_weight_preference,
+        )
+
+
+@dataclass(frozen=True)
+class ScoreBatch:
+    """Fit scores plus the unweighted component arrays they were built from."""
+
+    fit_scores: np.ndarray
+    components: dict[str, np.ndarray]
+    indoor: np.ndarray
+    outdoor: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.fit_scores)
+
+    def breakdown(self, index: int) -> dict[str, float]:
+        return {
+            **{name: round(float(values[index]), 4) for name, values in self.components.items()},
+            "fit_score": float(self.fit_scores[index]),
+        }
+
+
+def distance_scores(distances_meters: np.ndarray) -> np.ndarray:
+    """Distance component; NaN marks an unknown distance."""
+    with np.errstate(invalid="ignore"):
+        scores = np.where(
+            distances_meters <= 1000, 1.0, np.clip(1 - distances_meters / 12000, 0.0, 1.0)
+        )
+    return np.where(np.isnan(distances_meters), 0.4, scores)
+
+
+def distance_score(distance_meters: float | None) -> float:
+    """Scalar `distance_scores` for one place; None marks an unknown distance."""
+    if distance_meters is None:
+        return 0.4
+    if distance_meters <= 1000:
+        return 1.0
+    return min(1.0, max(0.0, 1 - distance_meters / 12000))
+
+
+class RecommendationScorer:
+    """
+    Scores a whole candidate list at once.
+
+    Query tokens and preference tags are normalized once per batch, and each
+    place's name/types are lowered and joined once. The six components are
+    computed as NumPy arrays and combined with `weights`. Numeric results
+    match the previous per-place helpers.
+    """
+
+    def __init__(self, weights: ScoringWeights | None = None):
+        self._weights = weights or ScoringWeights()
+
+    @property
+    def weights(self) -> ScoringWeights:
+        return self._weights
+
+    @staticmethod
+    def catalog_score(relevance: float, distance_meters: int | None) -> float:
+        """Score of a catalog fallback place from its query relevance and distance."""
+        # Called once per visited catalog place, so plain floats rather than NumPy.
+        total = _CATALOG_RELEVANCE_WEIGHT * relevance + _CATALOG_DISTANCE_WEIGHT * distance_score(distance_meters)
+        return round(min(1.0, max(0.0, total)), 4)
+
+    def score_batch(
+        self,
+        *,
+        query: str,
+        preference_tags: list[str],
+        condition: str,
+        places: list[dict[str, Any]],
+        distances_meters: list[int | None],
+    ) -> ScoreBatch:
+        count = len(places)
+        query_tokens = tokenize_query(query)
+        tags = [tag.lower() for tag in preference_tags]
+        haystacks: list[str] = []
+        indoor_flags: list[bool] = []
+        outdoor_flags: list[bool] = []
+        rating_values: list[float] = []
+        review_values: list[int] = []
+        for place in places:
+            type_names = [str(value).lower() for value in list(place.get("types") or [])]
+            haystacks.append(f"{str(place.get('name', '')).lower()} {' '.join(type_names)}")
+            indoor_flags.append(not INDOOR_PLACE_TYPES.isdisjoint(type_names))
+            outdoor_flags.append(not OUTDOOR_PLACE_TYPES.isdisjoint(type_names))
+            rating_value = place.get("rating")
+            rating_values.append(np.nan if rating_value is None else float(rating_value))
+            review_values.append(int(place.get("user_ratings_total") or 0))
+        indoor = np.array(indoor_flags, dtype=bool)
+        outdoor = np.array(outdoor_flags, dtype=bool)
+        ratings = np.array(rating_values, dtype=float)
+        review_counts = np.array(review_values, dtype=float)
+
+        if query_tokens:
+            overlaps = np.fromiter(
+                (sum(1 for token in query_tokens if token in haystack) for haystack in haystacks),
+                dtype=float,
+                count=count,
+            )
+            relevance = np.clip(overlaps / len(query_tokens), 0.0, 1.0)
+        else:
+            relevance = np.zeros(count)
+
+        if tags:
+            matches = np.fromiter(
+                (sum(1 for tag in tags if tag in haystack) for haystack in haystacks),
+                dtype=float,
+                count=count,
+            )
+            preference = np.clip(matches / len(tags), 0.0, 1.0)
+        else:
+            preference = np.full(count, 0.5)
+
+        rating = np.where(np.isnan(ratings), 0.35, np.clip(ratings / 5.0, 0.0, 1.0))
+        review_volume = np.where(
+            review_counts > 0, np.clip(np.log10(review_counts + 1) / 3, 0.0, 1.0), 0.1
+        )
+        distance = distance_scores(
+            np.array([np.nan if value is None else float(value) for value in distances_meters], dtype=float)
+        )
+        if condition in WEATHER_INDOOR_CONDITIONS:
+            weather = np.where(indoor, 1.0, 0.45)
+        elif condition in WEATHER_OUTDOOR_CONDITIONS:
+            weather = np.where(outdoor, 1.0, 0.6)
+        else:
+            weather = np.full(count, 0.7)
+
+        components = {
+            "relevance": relevance,
+            "rating": rating,
+            "review_volume": review_volume,
+            "distance": distance,
+            "weather": weather,
+            "preference": preference,
+        }
+        # Summed term by term in a fixed order so results are reproducible.
+        total = np.zeros(count)
+        for name in SCORE_COMPONENTS:
+            total = total + getattr(self._weights, name) * components[name]
+        # Python's correctly rounded `round`; np.round can differ on half-way values.
+        fit_scores = np.array([round(value, 4) for value in np.clip(total, 0.0, 1.0).tolist()])
+        return ScoreBatch(fit_scores=fit_scores, components=components, indoor=indoor, outdoor=outdoor)
@@ -1,11 +1,19 @@
 import logging
-import math
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from hashlib import sha256
 from typing import Any
 from urllib.parse import quote_plus
 from uuid import uuid4
 
 from app.core.database import SessionLocal
+from app.core.geo import (
+    approx_distance_meters,
+    approximate_route,
+    format_distance_text,
+    format_walking_duration_text,
+)
+from app.core.metrics import metrics
 from app.core.settings import settings
 from app.models.enums import (
     AuditEventType,
@@ -14,6 +22,8 @@ from app.models.enums import (
     RoleType,
     TravelMode,
 )
+from app.providers.base import MapsProvider
+from app.providers.maps_cache import RouteCache, RouteCacheKey
 from app.providers.router import ProviderRouter
 from app.repositories.audit_repository import AuditRepository
 from app.repositories.recommendation_repository import RecommendationRepository
@@ -26,163 +36,19 @@ from app.schemas.recommendations import (
     RecommendationRequest,
     RecommendationResponse
 )
+from app.services.place_catalog import PlaceCatalog, get_place_catalog
+from app.services.recommendation_scoring import (
+    WEATHER_INDOOR_CONDITIONS,
+    WEATHER_OUTDOOR_CONDITIONS,
+    RecommendationScorer,
+    ScoringWeights,
+)
 from app.services.weather_service import WeatherService
 
-_OUTDOOR_PLACE_TYPES = {"park", "tourist_attraction",
-                        "campground", "hiking_area", "beach"}
-_INDOOR_PLACE_TYPES = {"cafe", "restaurant",
-                       "museum", "shopping_mall", "library"}
 _FALLBACK_DISCOVERY_QUERIES = ["cafe", "park", "museum", "restaurant"]
-_WEATHER_INDOOR_CONDITIONS = {"rain", "drizzle", "thunderstorm", "snow"}
-_HK_FALLBACK_PLACE_CATALOG: list[dict[str, Any]] = [
-    {
-        "place_id": "hk-hung-hom-promenade",
-        "name": "Hung Hom Promenade",
-        "address": "Hung Hom Waterfront, Kowloon",
-        "types": ["park", "point_of_interest"],
-        "latitude": 22.3021,
-        "longitude": 114.1872,
-    },
-    {
-        "place_id": "hk-kowloon-park",
-        "name": "Kowloon Park",
-        "address": "22 Austin Road, Tsim Sha Tsui",
-        "types": ["park", "point_of_interest"],
-        "latitude": 22.3019,
-        "longitude": 114.1716,
-    },
-    {
-        "place_id": "hk-art-park",
-        "name": "Art Park (West Kowloon Cultural District)",
-        "address": "West Kowloon, Kowloon",
-        "types": ["park", "tourist_attraction", "point_of_interest"],
-        "latitude": 22.2937,
-        "longitude": 114.1580,
-    },
-    {
-        "place_id": "hk-victoria-park",
-        "name": "Victoria Park",
-        "address": "1 Hing Fat Street, Causeway Bay",
-        "types": ["park", "point_of_interest"],
-        "latitude": 22.2803,
-        "longitude": 114.1916,
-    },
-    {
-        "place_id": "hk-hong-kong-park",
-        "name": "Hong Kong Park",
-        "address": "19 Cotton Tree Drive, Central",
-        "types": ["park", "point_of_interest"],
-        "latitude": 22.2772,
-        "longitude": 114.1616,
-    },
-    {
-        "place_id": "hk-nan-lian-garden",
-        "name": "Nan Lian Garden",
-        "address": "60 Fung Tak Road, Diamond Hill",
-        "types": ["park", "tourist_attraction", "point_of_interest"],
-        "latitude": 22.3402,
-        "longitude": 114.2017,
-    },
-    {
-        "place_id": "hk-k11-musea",
-        "name": "K11 MUSEA",
-        "address": "18 Salisbury Road, Tsim Sha Tsui",
-        "types": ["shopping_mall", "point_of_interest"],
-        "latitude": 22.2933,
-        "longitude": 114.1745,
-    },
-    {
-        "place_id": "hk-harbour-city",
-        "name": "Harbour City",
-        "address": "3-27 Canton Road, Tsim Sha Tsui",
-        "types": ["shopping_mall", "point_of_interest"],
-        "latitude": 22.2952,
-        "longitude": 114.1679,
-    },
-    {
-        "place_id": "hk-pmq",
-        "name": "PMQ",
-        "address": "35 Aberdeen Street, Central",
-        "types": ["art_gallery", "point_of_interest"],
-        "latitude": 22.2838,
-        "longitude": 114.1505,
-    },
-    {
-        "place_id": "hk-tai-kwun",
-        "name": "Tai Kwun",
-        "address": "10 Hollywood Road, Central",
-        "types": ["museum", "point_of_interest"],
-        "latitude": 22.2819,
-        "longitude": 114.1549,
-    },
-    {
-        "place_id": "hk-kam-wah-cafe",
-        "name": "Kam Wah Cafe",
-        "address": "47 Bute Street, Mong Kok",
-        "types": ["cafe", "food"],
-        "latitude": 22.3241,
-        "longitude": 114.1688,
-    },
-    {
-        "place_id": "hk-sing-heung-yuen",
-        "name": "Sing Heung Yuen",
-        "address": "2 Mee Lun Street, Central",
-        "types": ["restaurant", "food"],
-        "latitude": 22.2841,
-        "longitude": 114.1542,
-    },
-    {
-        "place_id": "hk-ozone",
-        "name": "OZONE",
-        "address": "Ritz-Carlton Hong Kong, West Kowloon",
-        "types": ["bar", "night_club", "point_of_interest"],
-        "latitude": 22.3036,
-        "longitude": 114.1609,
-    },
-    {
-        "place_id": "hk-quinary",
-        "name": "Quinary",
-        "address": "56-58 Hollywood Road, Central",
-        "types": ["bar", "night_club", "point_of_interest"],
-        "latitude": 22.2812,
-        "longitude": 114.1547,
-    },
-]
 logger = logging.getLogger(__name__)
 
 
-def _tokenize(text: str) -> set[str]:
-    return {token.strip().lower() for token in text.split() if token.strip()}
-
-
-def _clamp_score(value: float) -> float:
-    return max(0.0, min(1.0, value))
-
-
-def _approx_distance_meters(
-    *, origin_latitude: float, origin_longitude: float, latitude: float, longitude: float
-) -> int:
-    # Equirectangular approximation is accurate enough for nearby HK urban ranges.
-    meters_per_degree_lat = 111_320.0
-    meters_per_degree_lng = 111_320.0 * math.cos(math.radians(origin_latitude))
-    delta_lat = (latitude - origin_latitude) * meters_per_degree_lat
-    delta_lng = (longitude - origin_longitude) * meters_per_degree_lng
-    return max(1, int(round(math.sqrt((delta_lat * delta_lat) + (delta_lng * delta_lng)))))
-
-
-def _format_distance_text(distance_meters: int) -> str:
-    if distance_meters < 1000:
-        rounded = max(50, int(round(distance_meters / 50.0) * 50))
-        return f"{rounded} m"
-    return f"{distance_meters / 1000:.1f} km"
-
-
-def _format_walking_duration_text(distance_meters: int) -> str:
-    # Approximate walking speed: 4.8 km/h => ~80 m/min.
-    minutes = max(3, int(round(distance_meters / 80)))
-    return f"{minutes} mins"
-
-
 class RecommendationService:
     def __init__(
         self,
@@ -193,6 +59,22 @@ class RecommendationService:
         self._provider_router = provider_router or ProviderRouter(settings)
         self._weather_service = weather_service or WeatherService(
             self._provider_router)
+        self._route_executor = ThreadPoolExecutor(
+            max_workers=max(1, self._settings.recommendation_route_concurrency),
+            thread_name_prefix="recommendation-route",
+        )
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=max(1, self._settings.recommendation_search_concurrency),
+            thread_name_prefix="recommendation-search",
+        )
+        self._scorer = RecommendationScorer(ScoringWeights.from_settings(self._settings))
+        self._route_cache: RouteCache | None = None
+        if self._settings.route_cache_enabled:
+            self._route_cache = RouteCache(
+                max_entries=self._settings.route_cache_max_entries,
+                ttl_seconds=self._settings.route_cache_ttl_seconds,
+                geohash_precision=self._settings.route_cache_geohash_precision,
+            )
 
     def _coarse_user_location(self, *, latitude: float, longitude: float) -> tuple[str, str]:
         region = f"{latitude:.2f},{longitude:.2f}"
@@ -302,6 +184,233 @@ class RecommendationService:
             )
             session.commit()
 
+    @property
+    def route_cache(self) -> RouteCache | None:
+        return self._route_cache
+
+    @property
+    def place_catalog(self) -> PlaceCatalog:
+        # Loaded on first fallback and shared process-wide.
+        return get_place_catalog(self._settings.recommendation_fallback_catalog_path)
+
+    def _resolve_routes(
+        self,
+        *,
+        maps_provider: MapsProvider,
+        origin_latitude: float,
+        origin_longitude: float,
+        destinations: list[tuple[float, float]],
+        place_ids: list[str | None],
+        travel_mode: str
+    ) -> list[dict[str, Any] | None]:
+        """
+        Look up routes for all destinations with one batch call under a deadline.
+
+        Routes already in the route cache are served from it, and only the rest
+        go to the provider. The call runs on a bounded pool shared across
+        requests. If it has not finished when
+        `RECOMMENDATION_ROUTE_DEADLINE_SECONDS` elapses, those destinations get
+        the equirectangular approximation, which is never cached.
+        """
+        if not destinations:
+            return []
+        started = time.perf_counter()
+        routes: list[dict[str, Any] | None] = [None] * len(destinations)
+        keys: list[RouteCacheKey] = []
+        missing = list(range(len(destinations)))
+        if self._route_cache is not None:
+            keys = [
+                self._route_cache.key(
+                    origin_latitude=origin_latitude,
+                    origin_longitude=origin_longitude,
+                    destination_latitude=destination_latitude,
+                    destination_longitude=destination_longitude,
+                    travel_mode=travel_mode,
+                    place_id=place_id,
+                )
+                for (destination_latitude, destination_longitude), place_id in zip(
+                    destinations, place_ids
+                )
+            ]
+            cached = self._route_cache.get_many(keys)
+            missing = []
+            for index, key in enumerate(keys):
+                if key in cached:
+                    routes[index] = cached[key]
+                else:
+                    missing.append(index)
+        if not missing:
+            metrics.observe("recommendation.route_resolution_ms", (time.perf_counter() - started) * 1000)
+            return routes
+
+        future: Future[list[dict[str, Any] | None]] = self._route_executor.submit(
+            maps_provider.get_routes_batch,
+            origin_latitude=origin_latitude,
+            origin_longitude=origin_longitude,
+            destinations=[destinations[index] for index in missing],
+            travel_mode=travel_mode,
+        )
+        wait([future], timeout=max(0.0, self._settings.recommendation_route_deadline_seconds))
+
+        if future.done():
+            try:
+                fetched = list(future.result())
+            except Exception:
+                logger.exception("recommendation_route_lookup_failed")
+                fetched = [None] * len(missing)
+            for index, route in zip(missing, fetched):
+                routes[index] = route
+            if self._route_cache is not None:
+                self._route_cache.set_many(
+                    {keys[index]: route for index, route in zip(missing, fetched) if route is not None}
+                )
+        else:
+            # A queued call is dropped; a running one finishes within the provider timeout.
+            future.cancel()
+            metrics.increment("recommendation.route_deadline_fallbacks", len(missing))
+            logger.warning(
+                "recommendation_route_deadline_exceeded destinations=%s deadline_seconds=%s",
+                len(missing),
+                self._settings.recommendation_route_deadline_seconds,
+            )
+            for index in missing:
+                destination_latitude, destination_longitude = destinations[index]
+                routes[index] = approximate_route(
+                    origin_latitude=origin_latitude,
+                    origin_longitude=origin_longitude,
+                    destination_latitude=destination_latitude,
+                    destination_longitude=destination_longitude,
+                    travel_mode=travel_mode,
+                )
+
+        metrics.observe("recommendation.route_resolution_ms", (time.perf_counter() - started) * 1000)
+        return routes
+
+    @staticmethod
+    def _timed_search(
+        maps_provider: MapsProvider, **search_kwargs: Any
+    ) -> tuple[list[dict[str, Any]], float]:
+        started = time.perf_counter()
+        candidates = maps_provider.search_places(**search_kwargs)
+        return candidates, (time.perf_counter() - started) * 1000
+
+    def _search_candidates(
+        self,
+        *,
+        maps_provider: MapsProvider,
+        request: RecommendationRequest,
+        target_count: int
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Run every discovery query concurrently and merge results as they arrive.
+
+        Aggregation stops once `target_count` unique places are in hand and the
+        user's own query has answered, so its results are never dropped in
+        favour of the generic "near me" queries. Outstanding queries are then
+        cancelled. Latency and the number of new places each query contributed
+        are recorded per query.
+        """
+        queries = self._build_search_queries(request.query)
+        futures: dict[Future[tuple[list[dict[str, Any]], float]], int] = {
+            self._search_executor.submit(
+                self._timed_search,
+                maps_provider,
+                query=query,
+                latitude=request.latitude,
+                longitude=request.longitude,
+                radius_meters=self._settings.google_maps_default_radius_meters,
+                language=self._settings.google_maps_language,
+                max_results=target_count,
+            ): index
+            for index, query in enumerate(queries)
+        }
+
+        deduplicated_places: dict[str, dict[str, Any]] = {}
+        pending = set(futures)
+        primary_done = False
+        while pending and not (primary_done and len(deduplicated_places) >= target_count):
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.__getitem__):
+                query_index = futures[future]
+                primary_done = primary_done or query_index == 0
+                try:
+                    candidates, latency_ms = future.result()
+                except Exception:
+                    logger.exception("recommendation_place_search_failed query_index=%s", query_index)
+                    continue
+                before = len(deduplicated_places)
+                for place in candidates:
+                    place_id = str(place.get("place_id") or "")
+                    dedupe_key = place_id or f"{place.get('name')}-{place.get('address')}"
+                    if dedupe_key not in deduplicated_places:
+                        deduplicated_places[dedupe_key] = place
+                new_places = len(deduplicated_places) - before
+                metrics.observe("recommendation.search_latency_ms", latency_ms)
+                metrics.observe("recommendation.search_yield", new_places)
+                logger.info(
+                    "recommendation_place_search query_index=%s latency_ms=%.1f results=%s new_places=%s",
+                    query_index,
+                    latency_ms,
+                    len(candidates),
+                    new_places,
+                )
+
+        # Queued searches are dropped; running ones finish within the provider timeout.
+        for future in pending:
+            future.cancel()
+        if pending:
+            metrics.increment("recommendation.search_cancelled", len(pending))
+        return deduplicated_places
+
+    def _shortlist_for_routing(
+        self,
+        *,
+        request: RecommendationRequest,
+        places: list[dict[str, Any]],
+        destinations: list[tuple[float, float]],
+        condition: str,
+        max_results: int,
+    ) -> list[int]:
+        """
+        Stage one of ranking: score every candidate with straight-line
+        distances and return the indexes of the best `max_results` plus
+        `RECOMMENDATION_ROUTE_MARGIN`, best first. Only these get real routes.
+        """
+        if not places:
+            return []
+        stage_one = self._scorer.score_batch(
+            query=request.query,
+            preference_tags=request.preference_tags,
+            condition=condition,
+            places=places,
+            distances_meters=[
+                approx_distance_meters(
+                    origin_latitude=request.latitude,
+                    origin_longitude=request.longitude,
+                    latitude=destination_latitude,
+                    longitude=destination_longitude,
+                )
+                for destination_latitude, destination_longitude in destinations
+            ],
+        )
+        budget = max_results + max(0, self._settings.recommendation_route_margin)
+        ranked = sorted(range(len(places)), key=lambda index: stage_one.fit_scores[index], reverse=True)
+        shortlist = ranked[:budget]
+        if len(ranked) > budget:
+            metrics.increment("recommendation.routes_skipped", len(ranked) - budget)
+        return shortlist
+
+    @staticmethod
+    def _record_stage_one_agreement(*, stage_one_top: list[str], final_top: list[str]) -> None:
+        """Report how much of the final top K stage one had already picked, to tune the margin."""
+        if not final_top:
+            return
+        overlap = len(set(stage_one_top) & set(final_top)) / len(final_top)
+        metrics.observe("recommendation.rank_stage_one_overlap", overlap)
+        metrics.increment("recommendation.rank_requests")
+        if overlap == 1.0:
+            metrics.increment("recommendation.rank_stage_one_exact")
+
     def _build_search_queries(self, query: str) -> list[str]:
         queries = [query.strip()]
         lowered = query.lower()
@@ -310,89 +419,12 @@ class RecommendationService:
                 queries.append(f"{fallback} near me")
         return queries
 
-    def _weather_fit_score(self, *, condition: str, place_types: list[str]) -> float:
-        type_set = {place_type.lower() for place_type in place_types}
-        if condition in _WEATHER_INDOOR_CONDITIONS:
-            return 1.0 if type_set.intersection(_INDOOR_PLACE_TYPES) else 0.45
-        if condition in {"clear", "partly_cloudy"}:
-            return 1.0 if type_set.intersection(_OUTDOOR_PLACE_TYPES) else 0.6
-        return 0.7
-
-    def _preference_score(self, *, preference_tags: list[str], place_name: str, place_types: list[str]) -> float:
-        if not preference_tags:
-            return 0.5
-        haystack = f"{place_name.lower()} {' '.join(place_types).lower()}"
-        matches = sum(1 for tag in preference_tags if tag.lower() in haystack)
-        return _clamp_score(matches / max(1, len(preference_tags)))
-
-    def _query_relevance_score(self, *, query: str, place_name: str, place_types: list[str]) -> float:
-        query_tokens = _tokenize(query)
-        if not query_tokens:
-            return 0.0
-        haystack = f"{place_name.lower()} {' '.join(place_types).lower()}"
-        overlaps = sum(1 for token in query_tokens if token in haystack)
-        return _clamp_score(overlaps / len(query_tokens))
-
-    def _distance_score(self, *, distance_meters: int | None) -> float:
-        if distance_meters is None:
-            return 0.4
-        if distance_meters <= 1000:
-            return 1.0
-        return _clamp_score(1 - (distance_meters / 12000))
-
-    def _rating_score(self, *, rating: float | None) -> float:
-        if rating is None:
-            return 0.35
-        return _clamp_score(rating / 5.0)
-
-    def _review_volume_score(self, *, review_count: int | None) -> float:
-        if not review_count:
-            return 0.1
-        return _clamp_score(math.log10(review_count + 1) / 3)
-
-    def _total_fit_score(
-        self,
-        *,
-        query: str,
-        place_name: str,
-        place_types: list[str],
-        rating: float | None,
-        review_count: int | None,
-        distance_meters: int | None,
-        condition: str,
-        preference_tags: list[str]
-    ) -> float:
-        relevance = self._query_relevance_score(
-            query=query,
-            place_name=place_name,
-            place_types=place_types
-        )
-        rating_score = self._rating_score(rating=rating)
-        review_score = self._review_volume_score(review_count=review_count)
-        distance_score = self._distance_score(distance_meters=distance_meters)
-        weather_score = self._weather_fit_score(
-            condition=condition, place_types=place_types)
-        preference_score = self._preference_score(
-            preference_tags=preference_tags,
-            place_name=place_name,
-            place_types=place_types
-        )
-
-        score = (
-            (0.25 * relevance) +
-            (0.20 * rating_score) +
-            (0.15 * review_score) +
-            (0.20 * distance_score) +
-            (0.10 * weather_score) +
-            (0.10 * preference_score)
-        )
-        return round(_clamp_score(score), 4)
-
     def _build_rationale(
         self,
         *,
         condition: str,
-        place_types: list[str],
+        indoor: bool,
+        outdoor: bool,
         rating: float | None,
         distance_text: str | None,
         duration_text: str | None,
@@ -406,10 +438,9 @@ class RecommendationService:
         elif distance_text:
             reasons.append(f"about {distance_text} away")
 
-        type_set = {place_type.lower() for place_type in place_types}
-        if condition in _WEATHER_INDOOR_CONDITIONS and type_set.intersection(_INDOOR_PLACE_TYPES):
+        if condition in WEATHER_INDOOR_CONDITIONS and indoor:
             reasons.append("indoor-friendly for current weather")
-        elif condition in {"clear", "partly_cloudy"} and type_set.intersection(_OUTDOOR_PLACE_TYPES):
+        elif condition in WEATHER_OUTDOOR_CONDITIONS and outdoor:
             reasons.append("great fit for outdoor weather")
 
         if not reasons:
@@ -424,25 +455,13 @@ class RecommendationService:
         longitude: float,
         query: str
     ) -> list[RecommendationItem]:
-        ranked: list[tuple[float, dict[str, Any], int]] = []
-        for place in _HK_FALLBACK_PLACE_CATALOG:
-            distance_meters = _approx_distance_meters(
-                origin_latitude=latitude,
-                origin_longitude=longitude,
-                latitude=float(place["latitude"]),
-                longitude=float(place["longitude"]),
-            )
-            query_score = self._query_relevance_score(
-                query=query,
-                place_name=str(place["name"]),
-                place_types=[str(t) for t in list(place["types"])],
-            )
-            distance_score = self._distance_score(distance_meters=distance_meters)
-            composite = _clamp_score((0.65 * query_score) + (0.35 * distance_score))
-            ranked.append((round(composite, 4), place, distance_meters))
-
-        ranked.sort(key=lambda item: item[0], reverse=True)
-        top_candidates = ranked[:5]
+        top_candidates = self.place_catalog.search(
+            latitude=latitude,
+            longitude=longitude,
+            query=query,
+            limit=5,
+            score=self._scorer.catalog_score,
+        )
 
         recommendations: list[RecommendationItem] = []
         for score, place, distance_meters in top_candidates:
@@ -461,8 +480,8 @@ class RecommendationService:
                     ),
                     photo_url=None,
                     maps_uri=f"https://www.google.com/maps/search/?api=1&query={query_str}",
-                    distance_text=_format_distance_text(distance_meters),
-                    duration_text=_format_walking_duration_text(distance_meters),
+                    distance_text=format_distance_text(distance_meters),
+                    duration_text=format_walking_duration_text(distance_meters),
                     fit_score=max(0.35, score),
                     rationale=(
                         f"Known Hong Kong option matched to '{query}' while live place data is limited."
@@ -543,41 +562,54 @@ class RecommendationService:
             timezone="auto"
         )
 
-        deduplicated_places: dict[str, dict[str, Any]] = {}
-        for query in self._build_search_queries(request.query):
-            candidates = maps_provider.search_places(
-                query=query,
-                latitude=request.latitude,
-                longitude=request.longitude,
-                radius_meters=settings.google_maps_default_radius_meters,
-                language=settings.google_maps_language,
-                max_results=max_results * 2
-            )
-            for place in candidates:
-                place_id = str(place.get("place_id") or "")
-                dedupe_key = place_id or f"{place.get('name')}-{place.get('address')}"
-                if dedupe_key not in deduplicated_places:
-                    deduplicated_places[dedupe_key] = place
-            if len(deduplicated_places) >= max_results * 2:
-                break
+        deduplicated_places = self._search_candidates(
+            maps_provider=maps_provider,
+            request=request,
+            target_count=max_results * 2,
+        )
 
         live_candidate_count = len(deduplicated_places)
         scored_items: list[RecommendationItem] = []
         weather_condition = weather_response.weather.condition
-        for place in deduplicated_places.values():
-            destination_latitude = float(
-                place.get("latitude", request.latitude))
-            destination_longitude = float(
-                place.get("longitude", request.longitude))
-            route = maps_provider.get_route(
-                origin_latitude=request.latitude,
-                origin_longitude=request.longitude,
-                destination_latitude=destination_latitude,
-                destination_longitude=destination_longitude,
-                travel_mode=request.travel_mode
+        places = list(deduplicated_places.values())
+        destinations = [
+            (
+                float(place.get("latitude", request.latitude)),
+                float(place.get("longitude", request.longitude)),
             )
-            distance_meters = None if route is None else route.get(
-                "distance_meters")
+            for place in places
+        ]
+        shortlist = self._shortlist_for_routing(
+            request=request,
+            places=places,
+            destinations=destinations,
+            condition=weather_condition,
+            max_results=max_results,
+        )
+        places = [places[index] for index in shortlist]
+        destinations = [destinations[index] for index in shortlist]
+        routes = self._resolve_routes(
+            maps_provider=maps_provider,
+            origin_latitude=request.latitude,
+            origin_longitude=request.longitude,
+            destinations=destinations,
+            place_ids=[str(place.get("place_id") or "") or None for place in places],
+            travel_mode=request.travel_mode
+        )
+        scores = self._scorer.score_batch(
+            query=request.query,
+            preference_tags=request.preference_tags,
+            condition=weather_condition,
+            places=places,
+            distances_meters=[
+                None if route is None or route.get("distance_meters") is None
+                else int(route["distance_meters"])
+                for route in routes
+            ],
+        )
+        for index, (place, (destination_latitude, destination_longitude), route) in enumerate(
+            zip(places, destinations, routes)
+        ):
             distance_text = None if route is None else route.get(
                 "distance_text")
             duration_text = None if route is None else route.get(
@@ -587,17 +619,10 @@ class RecommendationService:
                            for value in list(place.get("types") or [])]
             rating = place.get("rating")
             review_count = place.get("user_ratings_total")
-            fit_score = self._total_fit_score(
-                query=request.query,
-                place_name=str(place.get("name", "")),
-                place_types=place_types,
-                rating=None if rating is None else float(rating),
-                review_count=None if review_count is None else int(
-                    review_count),
-                distance_meters=None if distance_meters is None else int(
-                    distance_meters),
-                condition=weather_condition,
-                preference_tags=request.preference_tags
+            logger.debug(
+                "recommendation_scored place_id=%s breakdown=%s",
+                place.get("place_id"),
+                scores.breakdown(index),
             )
 
             scored_items.append(
@@ -627,10 +652,11 @@ class RecommendationService:
                         distance_text),
                     duration_text=None if duration_text is None else str(
                         duration_text),
-                    fit_score=fit_score,
+                    fit_score=float(scores.fit_scores[index]),
                     rationale=self._build_rationale(
                         condition=weather_condition,
-                        place_types=place_types,
+                        indoor=bool(scores.indoor[index]),
+                        outdoor=bool(scores.outdoor[index]),
                         rating=None if rating is None else float(rating),
                         distance_text=None if distance_text is None else str(
                             distance_text),
@@ -643,6 +669,10 @@ class RecommendationService:
 
         scored_items.sort(key=lambda item: item.fit_score, reverse=True)
         recommendations = scored_items[:max_results]
+        self._record_stage_one_agreement(
+            stage_one_top=[str(place.get("place_id") or "") for place in places[:max_results]],
+            final_top=[item.place_id for item in recommendations],
+        )
 
         degraded = weather_response.degraded
         fallback_reason = weather_response.fallback_reason
@@ -1,10 +1,11 @@
+import asyncio
 import json
 import logging
 import re
 from typing import Any
 
 from app.core.settings import settings
-from app.providers.minimax import MiniMaxChatProvider
+from app.providers.base import ChatProvider
 from app.providers.router import ProviderRouter
 from app.schemas.safety import SafetyEvaluateRequest, SafetyEvaluateResponse
 
@@ -100,19 +101,50 @@ class SafetyMonitorService:
         fallback.fallback_reason = "minimax_not_configured"
         return fallback
 
+    async def aevaluate(self, request: SafetyEvaluateRequest) -> SafetyEvaluateResponse:
+        if not self._settings.feature_safety_monitor_enabled:
+            fallback = self._evaluate_with_rules(request.message)
+            fallback.degraded = True
+            fallback.fallback_reason = "safety_monitor_disabled"
+            return fallback
+
+        if self._can_use_minimax():
+            try:
+                return await asyncio.wait_for(
+                    self._aevaluate_with_minimax(request),
+                    timeout=self._settings.chat_safety_deadline_seconds,
+                )
+            except TimeoutError:
+                logger.warning(
+                    "safety_monitor_minimax_deadline_exceeded deadline_seconds=%s",
+                    self._settings.chat_safety_deadline_seconds,
+                )
+                fallback = self._evaluate_with_rules(request.message)
+                fallback.degraded = True
+                fallback.fallback_reason = "minimax_deadline_exceeded"
+                return fallback
+            except Exception:
+                logger.exception("safety_monitor_minimax_failed")
+                fallback = self._evaluate_with_rules(request.message)
+                fallback.degraded = True
+                fallback.fallback_reason = "minimax_unavailable_or_invalid_response"
+                return fallback
+
+        fallback = self._evaluate_with_rules(request.message)
+        fallback.degraded = True
+        fallback.fallback_reason = "minimax_not_configured"
+        return fallback
+
     def _can_use_minimax(self) -> bool:
         return bool(
             self._settings.feature_minimax_enabled and self._settings.minimax_api_key
         )
 
-    def _evaluate_with_minimax(self, request: SafetyEvaluateRequest) -> SafetyEvaluateResponse:
-        provider = MiniMaxChatProvider(
-            api_key=self._settings.minimax_api_key,
-            model=self._settings.minimax_safety_model,
-            base_url=self._settings.minimax_base_url,
-            temperature=0.0,
-            max_tokens=300,
-        )
+    def _build_minimax_provider(self) -> ChatProvider:
+        return self._provider_router.resolve_safety_provider()
+
+    @staticmethod
+    def _build_minimax_context(request: SafetyEvaluateRequest) -> dict[str, Any]:
         prompt = (
             "You are a safety and emotion classifier for a supportive chat app. "
             "Return only strict JSON with keys: risk_level, emotion_label, emotion_score, "
@@ -124,15 +156,24 @@ class SafetyMonitorService:
             "Classify this user message:\n"
             f"message: {request.message}"
         )
-        raw = provider.generate_reply(
-            request.message,
-            {
-                "role": request.role,
-                "system_prompt": prompt,
-                "thread_id": request.thread_id or "safety-eval",
-                "user_id": request.user_id,
-            },
-        )
+        return {
+            "role": request.role,
+            "system_prompt": prompt,
+            "thread_id": request.thread_id or "safety-eval",
+            "user_id": request.user_id,
+        }
+
+    def _evaluate_with_minimax(self, request: SafetyEvaluateRequest) -> SafetyEvaluateResponse:
+        provider = self._build_minimax_provider()
+        raw = provider.generate_reply(request.message, self._build_minimax_context(request))
+        return self._response_from_model_output(raw)
+
+    async def _aevaluate_with_minimax(self, request: SafetyEvaluateRequest) -> SafetyEvaluateResponse:
+        provider = self._build_minimax_provider()
+        raw = await provider.agenerate_reply(request.message, self._build_minimax_context(request))
+        return self._response_from_model_output(raw)
+
+    def _response_from_model_output(self, raw: str) -> SafetyEvaluateResponse:
         parsed = self._parse_json_object(raw)
         risk_level = str(parsed.get("risk_level", "low")).lower()
         if risk_level not in {"low", "medium", "high"}:
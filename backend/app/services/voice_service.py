@@ -5,8 +5,7 @@ from uuid import uuid4
 from app.core.database import SessionLocal
 from app.core.settings import settings
 from app.models.enums import ProviderEventScope, ProviderEventStatus
-from app.providers.cantoneseai import CantoneseAIVoiceProvider
-from app.providers.elevenlabs import ElevenLabsVoiceProvider
+from app.providers.router import ProviderRouter
 from app.repositories.audit_repository import AuditRepository
 from app.schemas.voice import VoiceSTTResponse, VoiceTTSRequest, VoiceTTSResponse
 
@@ -14,8 +13,9 @@ logger = logging.getLogger(__name__)
 
 
 class VoiceService:
-    def __init__(self):
+    def __init__(self, provider_router: ProviderRouter | None = None):
         self._settings = settings
+        self._provider_router = provider_router or ProviderRouter(settings)
 
     def synthesize(self, request: VoiceTTSRequest) -> VoiceTTSResponse:
         request_id = str(uuid4())
@@ -36,7 +36,7 @@ class VoiceService:
                     if not self._settings.feature_elevenlabs_enabled:
                         fallback_reasons.append("elevenlabs_disabled")
                         continue
-                    provider = ElevenLabsVoiceProvider()
+                    provider = self._provider_router.get_elevenlabs_provider()
                     audio = provider.synthesize(
                         request.text,
                         language=request.language,
@@ -63,7 +63,7 @@ class VoiceService:
                     if not self._settings.feature_cantoneseai_enabled:
                         fallback_reasons.append("cantoneseai_disabled")
                         continue
-                    provider = CantoneseAIVoiceProvider()
+                    provider = self._provider_router.get_cantoneseai_provider()
                     audio = provider.synthesize(
                         request.text,
                         voice=request.voice_id,
@@ -137,7 +137,7 @@ class VoiceService:
                     if not self._settings.feature_elevenlabs_enabled:
                         fallback_reasons.append("elevenlabs_disabled")
                         continue
-                    provider = ElevenLabsVoiceProvider()
+                    provider = self._provider_router.get_elevenlabs_provider()
                     text = provider.transcribe(audio_bytes, language=language)
                     if text:
                         self._log_voice_provider_event(
@@ -159,7 +159,7 @@ class VoiceService:
                     if not self._settings.feature_cantoneseai_enabled:
                         fallback_reasons.append("cantoneseai_disabled")
                         continue
-                    provider = CantoneseAIVoiceProvider()
+                    provider = self._provider_router.get_cantoneseai_provider()
                     result = provider.transcribe(audio_bytes, language=language)
                     text = str((result or {}).get("text", "")) if isinstance(result, dict) else ""
                     if text:
@@ -1,13 +1,175 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
 from uuid import uuid4
 
-from app.core.settings import settings
+from app.core.metrics import metrics
+from app.core.redis_client import get_redis_client
+from app.core.settings import Settings, settings
+from app.core.single_flight import SingleFlight, get_single_flight
 from app.providers.router import ProviderRouter
 from app.schemas.weather import WeatherData, WeatherResponse
 
+logger = logging.getLogger(__name__)
+
+
+def _is_degraded(payload: dict[str, Any]) -> bool:
+    return payload.get("source") == "stub" or payload.get("condition") == "unknown"
+
+
+class WeatherCache:
+    """
+    Current-weather cache over a lat/lng grid: an in-process LRU in front of Redis.
+
+    Coordinates snap to the nearest `grid_degrees` cell (0.05 deg is about
+    5 km), and the upstream fetch uses the cell centre, so every request in
+    a cell shares one entry. With a `SingleFlight`, concurrent misses on one
+    cell (in this process, or across processes with its Redis backend) are
+    coalesced into a single fetch. Degraded payloads (stub or unknown condition) are never
+    stored, so an outage is not pinned for the TTL.
+    """
+
+    def __init__(
+        self,
+        *,
+        grid_degrees: float = 0.05,
+        ttl_seconds: int = 600,
+        max_entries: int = 512,
+        use_redis: bool = True,
+        single_flight: SingleFlight | None = None,
+    ):
+        self._grid_degrees = max(0.001, grid_degrees)
+        self._ttl_seconds = max(1, ttl_seconds)
+        self._max_entries = max(1, max_entries)
+        self._use_redis = use_redis
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._single_flight = single_flight
+        self._lock = threading.Lock()
+
+    def snap(self, latitude: float, longitude: float) -> tuple[float, float]:
+        grid = self._grid_degrees
+        return round(round(latitude / grid) * grid, 4), round(round(longitude / grid) * grid, 4)
+
+    def key(self, *, latitude: float, longitude: float, timezone: str) -> str:
+        snapped_latitude, snapped_longitude = self.snap(latitude, longitude)
+        return f"weather:current:{self._grid_degrees}:{snapped_latitude}:{snapped_longitude}:{timezone}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self._ttl_seconds:
+                self._entries.move_to_end(key)
+                metrics.increment("weather_cache.memory_hits")
+                return dict(entry[1])
+        if self._use_redis:
+            try:
+                raw = get_redis_client().get(key)
+                if raw:
+                    payload = json.loads(raw)
+                    # Redis enforces the TTL; the local copy gets a fresh window.
+                    self._store_local(key, payload)
+                    metrics.increment("weather_cache.redis_hits")
+                    return dict(payload)
+            except Exception:
+                logger.debug("weather_cache_redis_read_failed key=%s", key)
+        metrics.increment("weather_cache.misses")
+        return None
+
+    def _store_local(self, key: str, payload: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def set(self, key: str, payload: dict[str, Any]) -> None:
+        if _is_degraded(payload):
+            return
+        self._store_local(key, dict(payload))
+        if self._use_redis:
+            try:
+                get_redis_client().set(key, json.dumps(payload), ex=self._ttl_seconds)
+            except Exception:
+                logger.debug("weather_cache_redis_write_failed key=%s", key)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch_and_store() -> dict[str, Any]:
+            payload = fetch()
+            self.set(key, payload)
+            return payload
+
+        if self._single_flight is None:
+            return dict(fetch_and_store())
+        return dict(self._single_flight.do(key, fetch_and_store))
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        hits = metrics.counter("weather_cache.memory_hits") + metrics.counter("weather_cache.redis_hits")
+        misses = metrics.counter("weather_cache.misses")
+        return {
+            "size": size,
+            "memory_hits": metrics.counter("weather_cache.memory_hits"),
+            "redis_hits": metrics.counter("weather_cache.redis_hits"),
+            "misses": misses,
+            "coalesced": 0.0 if self._single_flight is None else self._single_flight.stats()["coalesced"],
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+@lru_cache(maxsize=4)
+def _shared_weather_cache(
+    grid_degrees: float,
+    ttl_seconds: int,
+    max_entries: int,
+    single_flight: SingleFlight | None,
+) -> WeatherCache:
+    return WeatherCache(
+        grid_degrees=grid_degrees,
+        ttl_seconds=ttl_seconds,
+        max_entries=max_entries,
+        single_flight=single_flight,
+    )
+
+
+def get_weather_cache(app_settings: Settings) -> WeatherCache | None:
+    """Return the process-wide weather cache, or None when caching is disabled."""
+    if not app_settings.weather_cache_enabled:
+        return None
+    single_flight = None
+    if app_settings.single_flight_enabled:
+        single_flight = get_single_flight(
+            "weather_cache",
+            use_redis=app_settings.single_flight_backend == "redis",
+            lock_ttl_seconds=app_settings.single_flight_lock_ttl_seconds,
+            wait_seconds=app_settings.single_flight_wait_seconds,
+        )
+    return _shared_weather_cache(
+        app_settings.weather_cache_grid_degrees,
+        app_settings.weather_cache_ttl_seconds,
+        app_settings.weather_cache_max_entries,
+        single_flight,
+    )
+
 
 class WeatherService:
-    def __init__(self, provider_router: ProviderRouter | None = None):
+    def __init__(
+        self,
+        provider_router: ProviderRouter | None = None,
+        weather_cache: WeatherCache | None = None,
+    ):
         self._provider_router = provider_router or ProviderRouter(settings)
+        self._weather_cache = weather_cache or get_weather_cache(settings)
 
     def get_current_weather(
         self,
@@ -17,11 +179,24 @@ class WeatherService:
         timezone: str = "auto"
     ) -> WeatherResponse:
         provider = self._provider_router.resolve_weather_provider()
-        weather_payload = provider.get_current_weather(
-            latitude=latitude,
-            longitude=longitude,
-            timezone=timezone
-        )
+        if self._weather_cache is None:
+            weather_payload = provider.get_current_weather(
+                latitude=latitude,
+                longitude=longitude,
+                timezone=timezone
+            )
+        else:
+            snapped_latitude, snapped_longitude = self._weather_cache.snap(latitude, longitude)
+            weather_payload = self._weather_cache.get_or_fetch(
+                self._weather_cache.key(latitude=latitude, longitude=longitude, timezone=timezone),
+                lambda: provider.get_current_weather(
+                    latitude=snapped_latitude,
+                    longitude=snapped_longitude,
+                    timezone=timezone
+                ),
+            )
+            # Report the caller's coordinates, not the grid cell's.
+            weather_payload.update(latitude=latitude, longitude=longitude)
         weather = WeatherData(**weather_payload)
         degraded = weather.source == "stub" or weather.condition == "unknown"
 
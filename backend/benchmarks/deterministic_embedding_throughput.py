@@ -0,0 +1,73 @@
+"""
+Throughput (texts/sec) of DeterministicEmbeddingProvider.
+
+Compares the original pure-Python scalar implementation against the NumPy
+provider, one text at a time (`embed`) and as a single batch
+(`embed_batch`). Texts are synthetic chat-sized messages drawn from a fixed
+vocabulary, so token digests repeat the way they do in real conversations.
+
+Usage:
+
+    python -m benchmarks.deterministic_embedding_throughput --texts 1000 10000 --dimensions 1536
+"""
+import argparse
+import hashlib
+import math
+import random
+import time
+from collections.abc import Callable
+
+from app.memory.embeddings import DeterministicEmbeddingProvider
+
+_VOCABULARY_SIZE = 5000
+
+
+def scalar_embed(text: str, dimensions: int) -> list[float]:
+    """The pre-NumPy implementation, kept as the reference for identical output."""
+    dimensions = max(8, dimensions)
+    tokens = text.strip().lower().split()
+    values = [0.0] * dimensions
+    for token in tokens:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        for byte_index in range(0, len(digest), 2):
+            bucket = int.from_bytes(digest[byte_index:byte_index + 2], "big") % dimensions
+            values[bucket] += 1.0 if digest[byte_index] % 2 == 0 else -1.0
+    norm = math.sqrt(sum(value * value for value in values))
+    if norm == 0:
+        return values
+    return [value / norm for value in values]
+
+
+def _texts(count: int, rng: random.Random) -> list[str]:
+    vocabulary = [f"word{index}" for index in range(_VOCABULARY_SIZE)]
+    return [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 60)))
+        for _ in range(count)
+    ]
+
+
+def _throughput(run: Callable[[], object], count: int) -> float:
+    started = time.perf_counter()
+    run()
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    provider = DeterministicEmbeddingProvider(args.dimensions)
+    print(f"{'texts':>8} {'scalar/s':>12} {'embed/s':>12} {'batch/s':>12} {'speedup':>8}")
+    for count in args.texts:
+        texts = _texts(count, random.Random(args.seed))
+        scalar = _throughput(lambda: [scalar_embed(text, args.dimensions) for text in texts], count)
+        single = _throughput(lambda: [provider.embed(text) for text in texts], count)
+        batch = _throughput(lambda: provider.embed_batch(texts), count)
+        print(f"{count:>8} {scalar:>12.0f} {single:>12.0f} {batch:>12.0f} {batch / scalar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
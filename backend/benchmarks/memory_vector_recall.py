@@ -0,0 +1,165 @@
+"""
+Recall@k and latency of the memory_embeddings ANN index against exact search.
+
+Builds a scratch table shaped like `memory_embeddings`, fills it with random
+vectors server-side, records exact top-k neighbours with a sequential scan,
+then builds the configured index (`MEMORY_VECTOR_INDEX_TYPE` and its build
+parameters from Settings) and replays the queries for each ef_search/probes
+value. Uniform random vectors are the hardest case for ANN, so recall here is
+a lower bound for real embedding distributions.
+
+Usage (against a pgvector-enabled DATABASE_URL):
+
+    python -m benchmarks.memory_vector_recall --rows 10000 100000 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+
+from app.core.settings import settings
+from app.memory.vector_index import create_vector_index_sql, resolve_vector_index_type
+
+_TABLE = "memory_ann_benchmark"
+_INSERT_CHUNK_ROWS = 50_000
+
+
+def _vector_literal(values: list[float]) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in values) + "]"
+
+
+def _random_vector(dimensions: int, rng: random.Random) -> list[float]:
+    return [rng.random() - 0.5 for _ in range(dimensions)]
+
+
+def _populate(connection: Connection, *, rows: int, dimensions: int) -> None:
+    connection.execute(text(f"DROP TABLE IF EXISTS {_TABLE}"))
+    connection.execute(
+        text(f"CREATE TABLE {_TABLE} (id bigserial PRIMARY KEY, embedding vector({dimensions}) NOT NULL)")
+    )
+    inserted = 0
+    while inserted < rows:
+        count = min(_INSERT_CHUNK_ROWS, rows - inserted)
+        # The correlated `g.i > 0` predicate forces one random vector per row.
+        connection.execute(
+            text(
+                f"INSERT INTO {_TABLE} (embedding) "
+                "SELECT (SELECT array_agg(random() - 0.5) FROM generate_series(1, :dimensions) "
+                "WHERE g.i > 0)::vector "
+                "FROM generate_series(1, :count) AS g(i)"
+            ),
+            {"dimensions": dimensions, "count": count},
+        )
+        connection.commit()
+        inserted += count
+    connection.execute(text(f"ANALYZE {_TABLE}"))
+    connection.commit()
+
+
+def _top_k(connection: Connection, query: str, k: int) -> tuple[list[int], float]:
+    started = time.perf_counter()
+    ids = list(
+        connection.scalars(
+            text(f"SELECT id FROM {_TABLE} ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k"),
+            {"query": query, "k": k},
+        )
+    )
+    return ids, (time.perf_counter() - started) * 1000
+
+
+def _run_size(
+    connection: Connection,
+    *,
+    rows: int,
+    dimensions: int,
+    queries: list[str],
+    k: int,
+    index_type: str,
+    search_values: list[int],
+) -> None:
+    print(f"\n== {rows:,} rows, {dimensions} dims, {len(queries)} queries, k={k}, index={index_type}")
+    _populate(connection, rows=rows, dimensions=dimensions)
+
+    exact: list[set[int]] = []
+    exact_latencies: list[float] = []
+    for query in queries:
+        ids, elapsed_ms = _top_k(connection, query, k)
+        exact.append(set(ids))
+        exact_latencies.append(elapsed_ms)
+    connection.commit()
+    print(f"exact    p50={statistics.median(exact_latencies):8.2f} ms")
+
+    started = time.perf_counter()
+    connection.execute(text(create_vector_index_sql(settings, table=_TABLE, index_type=index_type)))
+    connection.commit()
+    print(f"index build {time.perf_counter() - started:8.1f} s")
+
+    parameter = "ivfflat.probes" if index_type == "ivfflat" else "hnsw.ef_search"
+    for value in search_values:
+        recalls: list[float] = []
+        latencies: list[float] = []
+        for query, expected in zip(queries, exact):
+            connection.execute(
+                text("SELECT set_config(:name, :value, true)"),
+                {"name": parameter, "value": str(value)},
+            )
+            ids, elapsed_ms = _top_k(connection, query, k)
+            connection.commit()
+            recalls.append(len(expected.intersection(ids)) / k)
+            latencies.append(elapsed_ms)
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(
+            f"{parameter}={value:<5} recall@{k}={statistics.mean(recalls):.3f} "
+            f"p50={statistics.median(latencies):8.2f} ms p95={p95:8.2f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimensions", type=int, default=settings.memory_embedding_dimensions)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=settings.memory_retrieval_top_k)
+    parser.add_argument("--index-type", choices=["hnsw", "ivfflat"], default=resolve_vector_index_type(settings))
+    parser.add_argument(
+        "--search-values",
+        type=int,
+        nargs="+",
+        help="ef_search (hnsw) or probes (ivfflat) values to sweep",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table afterwards")
+    args = parser.parse_args()
+
+    search_values = args.search_values or (
+        [1, 5, 10, 20, 50] if args.index_type == "ivfflat" else [20, 40, 80, 160]
+    )
+    rng = random.Random(args.seed)
+    queries = [_vector_literal(_random_vector(args.dimensions, rng)) for _ in range(args.queries)]
+
+    engine = create_engine(settings.sqlalchemy_database_url)
+    with engine.connect() as connection:
+        try:
+            for rows in args.rows:
+                _run_size(
+                    connection,
+                    rows=rows,
+                    dimensions=args.dimensions,
+                    queries=queries,
+                    k=args.k,
+                    index_type=args.index_type,
+                    search_values=search_values,
+                )
+        finally:
+            if not args.keep:
+                connection.rollback()
+                connection.execute(text(f"DROP TABLE IF EXISTS {_TABLE}"))
+                connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Candidates/sec of recommendation fit scoring.
+
+Compares the original per-place scorer (six helper calls per candidate)
+against `RecommendationScorer.score_batch`, at 10, 100 and 1000 candidates by
+default. Candidates are synthetic places with a realistic mix of types,
+ratings, review counts and route distances.
+
+Usage:
+
+    python -m benchmarks.recommendation_scoring --candidates 10 100 1000 --repeat 200
+"""
+import argparse
+import math
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.services.recommendation_scoring import (
+    INDOOR_PLACE_TYPES,
+    OUTDOOR_PLACE_TYPES,
+    WEATHER_INDOOR_CONDITIONS,
+    RecommendationScorer,
+    tokenize_query,
+)
+
+_TYPES = ["cafe", "restaurant", "park", "museum", "shopping_mall", "bar", "library", "beach", "food"]
+_WORDS = ["harbour", "garden", "dragon", "pearl", "lantern", "jade", "tea", "noodle", "peak", "bay"]
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(1.0, value))
+
+
+def scalar_fit_score(
+    *,
+    query: str,
+    place_name: str,
+    place_types: list[str],
+    rating: float | None,
+    review_count: int | None,
+    distance_meters: int | None,
+    condition: str,
+    preference_tags: list[str],
+) -> float:
+    """The pre-batch per-place scorer, kept as the reference for identical output."""
+    query_tokens = tokenize_query(query)
+    haystack = f"{place_name.lower()} {' '.join(place_types).lower()}"
+    relevance = (
+        _clamp(sum(1 for token in query_tokens if token in haystack) / len(query_tokens))
+        if query_tokens
+        else 0.0
+    )
+    rating_score = 0.35 if rating is None else _clamp(rating / 5.0)
+    review_score = 0.1 if not review_count else _clamp(math.log10(review_count + 1) / 3)
+    if distance_meters is None:
+        distance_score = 0.4
+    elif distance_meters <= 1000:
+        distance_score = 1.0
+    else:
+        distance_score = _clamp(1 - (distance_meters / 12000))
+    type_set = {place_type.lower() for place_type in place_types}
+    if condition in WEATHER_INDOOR_CONDITIONS:
+        weather_score = 1.0 if type_set.intersection(INDOOR_PLACE_TYPES) else 0.45
+    elif condition in {"clear", "partly_cloudy"}:
+        weather_score = 1.0 if type_set.intersection(OUTDOOR_PLACE_TYPES) else 0.6
+    else:
+        weather_score = 0.7
+    if not preference_tags:
+        preference_score = 0.5
+    else:
+        matches = sum(1 for tag in preference_tags if tag.lower() in haystack)
+        preference_score = _clamp(matches / max(1, len(preference_tags)))
+    score = (
+        (0.25 * relevance) +
+        (0.20 * rating_score) +
+        (0.15 * review_score) +
+        (0.20 * distance_score) +
+        (0.10 * weather_score) +
+        (0.10 * preference_score)
+    )
+    return round(_clamp(score), 4)
+
+
+def synthetic_candidates(count: int, rng: random.Random) -> tuple[list[dict[str, Any]], list[int | None]]:
+    places = [
+        {
+            "place_id": f"poi-{index}",
+            "name": f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()}",
+            "types": rng.sample(_TYPES, rng.randint(1, 3)),
+            "rating": None if rng.random() < 0.1 else round(rng.uniform(2.5, 5.0), 1),
+            "user_ratings_total": None if rng.random() < 0.1 else rng.randint(0, 20000),
+        }
+        for index in range(count)
+    ]
+    distances = [None if rng.random() < 0.1 else rng.randint(50, 15000) for _ in range(count)]
+    return places, distances
+
+
+def _throughput(run: Callable[[], object], count: int, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return count * repeat / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    scorer = RecommendationScorer()
+    query = "quiet tea garden near the harbour"
+    tags = ["tea", "garden"]
+    print(f"{'candidates':>10} {'scalar/s':>12} {'batch/s':>12} {'speedup':>8}")
+    for count in args.candidates:
+        places, distances = synthetic_candidates(count, random.Random(args.seed))
+
+        def scalar() -> list[float]:
+            return [
+                scalar_fit_score(
+                    query=query,
+                    place_name=place["name"],
+                    place_types=place["types"],
+                    rating=place["rating"],
+                    review_count=place["user_ratings_total"],
+                    distance_meters=distance,
+                    condition="rain",
+                    preference_tags=tags,
+                )
+                for place, distance in zip(places, distances)
+            ]
+
+        def batch() -> object:
+            return scorer.score_batch(
+                query=query,
+                preference_tags=tags,
+                condition="rain",
+                places=places,
+                distances_meters=distances,
+            )
+
+        scalar_rate = _throughput(scalar, count, args.repeat)
+        batch_rate = _throughput(batch, count, args.repeat)
+        print(f"{count:>10} {scalar_rate:>12.0f} {batch_rate:>12.0f} {batch_rate / scalar_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import pytest
 from fastapi.testclient import TestClient
 
 from app.api.routes import chat as chat_route
 from app.main import app
+from app.providers.minimax import MiniMaxChatProvider
+from app.schemas.chat import ChatRequest
 from app.schemas.safety import SafetyEvaluateResponse
+from app.services.chat_orchestrator import ChatOrchestrator
 
 
 client = TestClient(app)
@@ -69,7 +73,7 @@ def test_chat_endpoint_rejects_unknown_role() -> None:
 
 
 def test_chat_endpoint_high_risk_returns_supportive_refusal_and_banner(monkeypatch) -> None:
-    def fake_evaluate(_request) -> SafetyEvaluateResponse:
+    async def fake_evaluate(_request) -> SafetyEvaluateResponse:
         return SafetyEvaluateResponse(
             risk_level="high",
             show_crisis_banner=True,
@@ -82,7 +86,7 @@ def test_chat_endpoint_high_risk_returns_supportive_refusal_and_banner(monkeypat
             rationale="test",
         )
 
-    monkeypatch.setattr(chat_route.orchestrator._safety_monitor_service, "evaluate", fake_evaluate)
+    monkeypatch.setattr(chat_route.orchestrator._safety_monitor_service, "aevaluate", fake_evaluate)
 
     payload = {
         "user_id": "test-user",
@@ -103,7 +107,7 @@ def test_chat_endpoint_high_risk_returns_supportive_refusal_and_banner(monkeypat
 def test_role_specific_chat_aliases_force_expected_role(monkeypatch) -> None:
     captured_roles: list[str] = []
 
-    def fake_generate_reply(payload):
+    async def fake_generate_reply(payload):
         captured_roles.append(payload.role)
         return {
             "request_id": "r-1",
@@ -121,7 +125,7 @@ def test_role_specific_chat_aliases_force_expected_role(monkeypatch) -> None:
             },
         }
 
-    monkeypatch.setattr(chat_route.orchestrator, "generate_reply", fake_generate_reply)
+    monkeypatch.setattr(chat_route.orchestrator, "agenerate_reply", fake_generate_reply)
 
     common_payload = {
         "user_id": "test-user",
@@ -194,7 +198,7 @@ def test_chat_guide_history_alias_forces_local_guide_role(monkeypatch) -> None:
 def test_api_prefixed_chat_alias_reaches_backend(monkeypatch) -> None:
     captured_roles: list[str] = []
 
-    def fake_generate_reply(payload):
+    async def fake_generate_reply(payload):
         captured_roles.append(payload.role)
         return {
             "request_id": "r-api-1",
@@ -212,7 +216,7 @@ def test_api_prefixed_chat_alias_reaches_backend(monkeypatch) -> None:
             },
         }
 
-    monkeypatch.setattr(chat_route.orchestrator, "generate_reply", fake_generate_reply)
+    monkeypatch.setattr(chat_route.orchestrator, "agenerate_reply", fake_generate_reply)
 
     payload = {
         "user_id": "test-user",
@@ -223,3 +227,119 @@ def test_api_prefixed_chat_alias_reaches_backend(monkeypatch) -> None:
 
     assert response.status_code == 200
     assert captured_roles == ["companion"]
+
+
+class _FakeContextBuilder:
+    async def abuild(self, *, user_id: str, thread_id: str, role: str, message: str, **_kwargs) -> dict:
+        return {"user_id": user_id, "thread_id": thread_id, "role": role, "memory": {}}
+
+
+def _build_offline_orchestrator(monkeypatch) -> tuple[ChatOrchestrator, list[str]]:
+    orchestrator = ChatOrchestrator(context_builder=_FakeContextBuilder())
+    persisted: list[str] = []
+
+    async def fake_persist_chat_turn(**kwargs) -> None:
+        persisted.append(kwargs["request_id"])
+
+    async def fake_persist_short_term_memory(**_kwargs) -> None:
+        return None
+
+    monkeypatch.setattr(orchestrator, "_apersist_chat_turn", fake_persist_chat_turn)
+    monkeypatch.setattr(orchestrator, "_apersist_short_term_memory", fake_persist_short_term_memory)
+    return orchestrator, persisted
+
+
+@pytest.mark.asyncio
+async def test_async_generate_reply_persists_turn(monkeypatch) -> None:
+    orchestrator, persisted = _build_offline_orchestrator(monkeypatch)
+
+    response = await orchestrator.agenerate_reply(
+        ChatRequest(user_id="async-user", message="Can we plan my week?", role="study_guide")
+    )
+
+    assert response.thread_id == "async-user-study_guide-thread"
+    assert "study plan" in response.reply.lower()
+    assert persisted == [response.request_id]
+
+
+def test_sync_generate_reply_shim_runs_async_pipeline(monkeypatch) -> None:
+    orchestrator, persisted = _build_offline_orchestrator(monkeypatch)
+
+    response = orchestrator.generate_reply(
+        ChatRequest(user_id="sync-user", message="hello there")
+    )
+
+    assert response.runtime == "simple"
+    assert response.safety.policy_action == "allow"
+    assert persisted == [response.request_id]
+
+
+@pytest.mark.asyncio
+async def test_stream_reply_emits_safety_first_and_persists_after_completion(monkeypatch) -> None:
+    orchestrator, persisted = _build_offline_orchestrator(monkeypatch)
+    events: list[tuple[str, dict]] = []
+
+    async for event, data in orchestrator.astream_reply(
+        ChatRequest(user_id="stream-user", message="I had a hard day.")
+    ):
+        events.append((event, data))
+        if event == "token":
+            assert persisted == []
+
+    names = [name for name, _ in events]
+    assert names[0] == "safety"
+    assert names[-1] == "done"
+    assert "token" in names
+    streamed = "".join(data["text"] for name, data in events if name == "token")
+    done = events[-1][1]
+    assert done["reply"] == streamed
+    assert events[0][1]["request_id"] == done["request_id"]
+    assert persisted == [done["request_id"]]
+
+
+def test_chat_stream_endpoint_returns_server_sent_events(monkeypatch) -> None:
+    async def fake_stream_reply(payload):
+        yield "safety", {"request_id": "r-s", "safety": {"show_crisis_banner": False}}
+        yield "token", {"text": "Hi"}
+        yield "done", {"request_id": "r-s", "thread_id": payload.thread_id, "reply": "Hi"}
+
+    monkeypatch.setattr(chat_route.orchestrator, "astream_reply", fake_stream_reply)
+
+    response = client.post(
+        "/chat/stream",
+        json={"user_id": "test-user", "thread_id": "thread-s", "message": "hello"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert [block.split("\n")[0] for block in events] == [
+        "event: safety",
+        "event: token",
+        "event: done",
+    ]
+    assert '"text": "Hi"' in events[1]
+
+
+class _DroppedStreamLLM:
+    async def astream(self, messages):
+        yield type("Chunk", (), {"content": "Half a"})()
+        raise ConnectionError("stream dropped")
+
+
+@pytest.mark.asyncio
+async def test_stream_reply_failing_mid_stream_persists_nothing(monkeypatch) -> None:
+    orchestrator, persisted = _build_offline_orchestrator(monkeypatch)
+    provider = MiniMaxChatProvider(api_key="test")
+    monkeypatch.setattr(provider, "_get_async_llm", lambda: _DroppedStreamLLM())
+    monkeypatch.setattr(orchestrator._provider_router, "resolve_chat_provider", lambda: provider)
+    names: list[str] = []
+
+    with pytest.raises(ConnectionError):
+        async for event, _data in orchestrator.astream_reply(
+            ChatRequest(user_id="stream-user", message="I had a hard day.")
+        ):
+            names.append(event)
+
+    assert names == ["safety", "token"]
+    assert persisted == []
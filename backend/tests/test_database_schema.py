@@ -49,3 +49,73 @@ def test_offline_migration_sql_does_not_duplicate_enum_create_statements() -> No
     assert sql_output.count("CREATE TYPE role_type AS ENUM") == 1
     assert sql_output.count("CREATE TYPE safety_risk_level AS ENUM") == 1
     assert sql_output.count("CREATE TYPE memory_entry_type AS ENUM") == 1
+
+
+def test_offline_migration_sql_builds_tuned_vector_index() -> None:
+    backend_dir = Path(__file__).resolve().parents[1]
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head", "--sql"],
+        cwd=backend_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert (
+        "ON memory_embeddings USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    ) in result.stdout
+
+
+def test_ivfflat_index_ddl_and_search_parameters_follow_settings() -> None:
+    from app.core.settings import Settings
+    from app.memory.vector_index import create_vector_index_sql, vector_search_parameters
+
+    settings = Settings(
+        MEMORY_VECTOR_INDEX_TYPE="ivfflat",
+        MEMORY_VECTOR_IVFFLAT_LISTS=400,
+        MEMORY_VECTOR_IVFFLAT_PROBES=20,
+    )
+
+    assert create_vector_index_sql(settings) == (
+        "CREATE INDEX IF NOT EXISTS ix_memory_embeddings_embedding_ivfflat "
+        "ON memory_embeddings USING ivfflat (embedding vector_cosine_ops) WITH (lists = 400)"
+    )
+    assert vector_search_parameters(settings) == {"ivfflat.probes": "20"}
+
+
+def test_vector_retrieval_orders_by_distance_only_and_sets_search_parameters() -> None:
+    from sqlalchemy.dialects import postgresql
+
+    from app.models.enums import RoleType
+    from app.repositories.memory_repository import MemoryRepository
+
+    class RecordingSession:
+        def __init__(self) -> None:
+            self.executed: list[dict] = []
+            self.statement = None
+
+        def execute(self, statement, params=None):
+            self.executed.append(params)
+
+        def scalars(self, statement):
+            self.statement = statement
+            return []
+
+    session = RecordingSession()
+    MemoryRepository(session).list_retrieval_memory(  # type: ignore[arg-type]
+        user_id="u",
+        role=RoleType.companion,
+        top_k=5,
+        query_embedding=[0.1] * 1536,
+        embedding_model="text-embedding-3-small",
+        search_parameters={"hnsw.ef_search": "80"},
+    )
+
+    sql = str(session.statement.compile(dialect=postgresql.dialect()))
+    where_clause, order_by = sql.split("ORDER BY", 1)
+    assert "memory_embeddings.embedding_model =" in where_clause
+    assert "memory_embeddings.embedding_dimensions =" in where_clause
+    assert "<=>" in order_by
+    assert "created_at" not in order_by
+    assert session.executed == [{"name": "hnsw.ef_search", "value": "80"}]
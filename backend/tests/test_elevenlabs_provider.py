@@ -45,7 +45,7 @@ def test_synthesize_includes_output_format_query(
         captured["timeout"] = timeout
         return FakeResponse(status_code=200, content=b"audio-bytes")
 
-    monkeypatch.setattr("app.providers.elevenlabs.requests.post", fake_post)
+    provider.session.post = fake_post  # type: ignore[assignment]
     audio = provider.synthesize("Hello world", language="en")
 
     assert audio == b"audio-bytes"
@@ -79,7 +79,7 @@ def test_transcribe_uses_language_code_and_wav_metadata(
             json_data={"text": "transcribed", "language_code": "en"},
         )
 
-    monkeypatch.setattr("app.providers.elevenlabs.requests.post", fake_post)
+    provider.session.post = fake_post  # type: ignore[assignment]
     text = provider.transcribe(wav_bytes, language="en")
 
     assert text == "transcribed"
@@ -114,7 +114,7 @@ def test_transcribe_omits_language_code_for_unsupported_hint(
             json_data={"text": "ok", "language_code": "en"},
         )
 
-    monkeypatch.setattr("app.providers.elevenlabs.requests.post", fake_post)
+    provider.session.post = fake_post  # type: ignore[assignment]
     text = provider.transcribe(b"ID3\x00\x00\x00\x00", language="xx")
 
     assert text == "ok"
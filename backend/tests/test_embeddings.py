@@ -0,0 +1,182 @@
+import numpy as np
+import pytest
+
+from benchmarks.deterministic_embedding_throughput import scalar_embed
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.memory.embedding_cache import EmbeddingCache, decode_vector, encode_vector
+from app.memory.embeddings import (
+    DETERMINISTIC_EMBEDDING_MODEL,
+    DeterministicEmbeddingProvider,
+    EmbeddingService,
+    get_embedding_service,
+)
+
+
+class _FailingProvider:
+    def embed(self, text: str) -> list[float]:
+        raise RuntimeError("embedding endpoint down")
+
+    async def aembed(self, text: str) -> list[float]:
+        raise RuntimeError("embedding endpoint down")
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("embedding endpoint down")
+
+    async def aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("embedding endpoint down")
+
+
+def test_embedding_service_tags_vectors_with_primary_model() -> None:
+    service = EmbeddingService(
+        DeterministicEmbeddingProvider(16), model="text-embedding-3-small", dimensions=16
+    )
+
+    embedding = service.embed("hello")
+
+    assert embedding.model == "text-embedding-3-small"
+    assert embedding.dimensions == 16
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_tags_fallback_vectors_as_deterministic() -> None:
+    service = EmbeddingService(_FailingProvider(), model="text-embedding-3-small", dimensions=16)
+
+    single = await service.aembed("hello")
+    batch = await service.aembed_batch(["a", "b"])
+
+    assert single.model == DETERMINISTIC_EMBEDDING_MODEL
+    assert [embedding.model for embedding in batch] == [DETERMINISTIC_EMBEDDING_MODEL] * 2
+    assert single.vector == DeterministicEmbeddingProvider(16).embed("hello").tolist()
+
+
+def test_reads_and_writes_share_one_embedding_service() -> None:
+    from app.memory.context_builder import ConversationContextBuilder
+    from app.services.chat_orchestrator import ChatOrchestrator
+
+    settings = Settings()
+    builder = ConversationContextBuilder(settings)
+    orchestrator = ChatOrchestrator(context_builder=builder)
+
+    assert builder._embedding_service is orchestrator._embedding_service
+    assert builder._embedding_service is get_embedding_service(settings)
+
+
+class _CountingProvider:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+        self._inner = DeterministicEmbeddingProvider(16)
+
+    def embed(self, text: str) -> list[float]:
+        self.calls.append([text])
+        return self._inner.embed(text)
+
+    async def aembed(self, text: str) -> list[float]:
+        return self.embed(text)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return self._inner.embed_batch(texts)
+
+    async def aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_batch(texts)
+
+
+class _FakeBinaryRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> "_FakeBinaryRedis":
+        return self
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        self.store[key] = value
+        self.ttls[key] = ex
+
+    def execute(self) -> None:
+        return None
+
+
+def test_deterministic_provider_matches_scalar_reference() -> None:
+    texts = ["Hello world", "", "  exam STRESS exam  ", "今日好攰 but ok", "a b c d e f g h"]
+    provider = DeterministicEmbeddingProvider(64)
+
+    batch = provider.embed_batch(texts)
+
+    assert batch.dtype == np.float32
+    assert batch.shape == (len(texts), 64)
+    for text, vector in zip(texts, batch):
+        expected = np.asarray(scalar_embed(text, 64), dtype=np.float32)
+        assert np.array_equal(vector, expected)
+        assert np.array_equal(provider.embed(text), expected)
+    assert not batch[1].any()
+
+
+@pytest.mark.parametrize(("encoding", "bytes_per_value"), [("float16", 2), ("float32", 4)])
+def test_vector_encoding_is_compact_binary(encoding: str, bytes_per_value: int) -> None:
+    vector = DeterministicEmbeddingProvider(64).embed("study plan for exams")
+
+    payload = encode_vector(vector, encoding)
+    decoded = decode_vector(payload)
+
+    assert len(payload) == 1 + 64 * bytes_per_value
+    assert max(abs(a - b) for a, b in zip(vector, decoded)) < 1e-3
+
+
+def test_embedding_cache_serves_normalized_repeats_from_memory(monkeypatch) -> None:
+    import app.memory.embedding_cache as cache_module
+
+    monkeypatch.setattr(cache_module, "get_redis_binary_client", _FakeBinaryRedis)
+    provider = _CountingProvider()
+    service = EmbeddingService(
+        provider, model="m", dimensions=16, cache=EmbeddingCache(encoding="float32")
+    )
+    hits_before = metrics.counter("embedding_cache.memory_hits")
+
+    first = service.embed("Thanks!")
+    second = service.embed("  thanks!  ")
+
+    assert provider.calls == [["Thanks!"]]
+    assert first == second
+    assert metrics.counter("embedding_cache.memory_hits") == hits_before + 1
+
+
+def test_embedding_cache_reads_through_redis_with_ttl(monkeypatch) -> None:
+    import app.memory.embedding_cache as cache_module
+
+    redis = _FakeBinaryRedis()
+    monkeypatch.setattr(cache_module, "get_redis_binary_client", lambda: redis)
+    writer = EmbeddingService(
+        _CountingProvider(), model="m", dimensions=16, cache=EmbeddingCache(ttl_seconds=60)
+    )
+    reader_provider = _CountingProvider()
+    reader = EmbeddingService(
+        reader_provider, model="m", dimensions=16, cache=EmbeddingCache(ttl_seconds=60)
+    )
+    redis_hits_before = metrics.counter("embedding_cache.redis_hits")
+
+    written = writer.embed_batch(["hi", "how do I revise?"])
+    read = reader.embed_batch(["hi", "how do I revise?", "new question"])
+
+    assert read[:2] == written
+    assert reader_provider.calls == [["new question"]]
+    assert set(redis.ttls.values()) == {60}
+    assert all(value[:1] == b"\x01" for value in redis.store.values())
+    assert metrics.counter("embedding_cache.redis_hits") == redis_hits_before + 2
+
+
+def test_embedding_cache_skips_fallback_vectors(monkeypatch) -> None:
+    import app.memory.embedding_cache as cache_module
+
+    monkeypatch.setattr(cache_module, "get_redis_binary_client", _FakeBinaryRedis)
+    cache = EmbeddingCache()
+    service = EmbeddingService(_FailingProvider(), model="m", dimensions=16, cache=cache)
+
+    embedding = service.embed("hello")
+
+    assert embedding.model == DETERMINISTIC_EMBEDDING_MODEL
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,80 @@
+from app.core.settings import Settings
+from app.providers.google_maps import GoogleMapsProvider, StubMapsProvider
+
+
+def test_get_routes_batch_uses_one_distance_matrix_request(monkeypatch) -> None:
+    provider = GoogleMapsProvider(Settings(GOOGLE_MAPS_API_KEY="maps-key"))
+    requests: list[dict] = []
+
+    def fake_get_json(*, endpoint: str, params: dict) -> dict:
+        requests.append({"endpoint": endpoint, "params": params})
+        return {
+            "status": "OK",
+            "rows": [
+                {
+                    "elements": [
+                        {
+                            "status": "OK",
+                            "distance": {"value": 850, "text": "0.9 km"},
+                            "duration": {"value": 660, "text": "11 mins"},
+                        },
+                        {"status": "ZERO_RESULTS"},
+                    ]
+                }
+            ],
+        }
+
+    monkeypatch.setattr(provider, "_get_json", fake_get_json)
+    routes = provider.get_routes_batch(
+        origin_latitude=22.30,
+        origin_longitude=114.18,
+        destinations=[(22.31, 114.17), (22.28, 114.15)],
+        travel_mode="walking",
+    )
+
+    assert len(requests) == 1
+    assert requests[0]["endpoint"].endswith("/distancematrix/json")
+    assert requests[0]["params"]["origins"] == "22.3,114.18"
+    assert requests[0]["params"]["destinations"] == "22.31,114.17|22.28,114.15"
+    assert routes[0] == {
+        "distance_meters": 850,
+        "distance_text": "0.9 km",
+        "duration_seconds": 660,
+        "duration_text": "11 mins",
+        "travel_mode": "walking",
+    }
+    assert routes[1] is None
+
+
+def test_get_routes_batch_chunks_large_destination_lists(monkeypatch) -> None:
+    provider = GoogleMapsProvider(Settings(GOOGLE_MAPS_API_KEY="maps-key"))
+    chunk_sizes: list[int] = []
+
+    def fake_get_json(*, endpoint: str, params: dict) -> None:
+        _ = endpoint
+        chunk_sizes.append(len(params["destinations"].split("|")))
+        return None
+
+    monkeypatch.setattr(provider, "_get_json", fake_get_json)
+    routes = provider.get_routes_batch(
+        origin_latitude=22.30,
+        origin_longitude=114.18,
+        destinations=[(22.30 + index * 0.001, 114.18) for index in range(30)],
+        travel_mode="driving",
+    )
+
+    assert chunk_sizes == [25, 5]
+    assert routes == [None] * 30
+
+
+def test_stub_get_routes_batch_uses_equirectangular_estimate() -> None:
+    routes = StubMapsProvider().get_routes_batch(
+        origin_latitude=22.3030,
+        origin_longitude=114.1820,
+        destinations=[(22.3060, 114.1820)],
+        travel_mode="walking",
+    )
+
+    assert routes[0]["distance_meters"] == 334
+    assert routes[0]["distance_text"] == "350 m"
+    assert routes[0]["duration_text"] == "4 mins"
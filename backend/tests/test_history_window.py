@@ -0,0 +1,227 @@
+from typing import Any
+
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.core.tokens import estimate_tokens, truncate_to_tokens
+from app.providers.base import ChatProvider
+from app.providers.minimax import MiniMaxChatProvider
+from app.providers.mock import MockChatProvider
+from app.runtime.history_window import SUMMARY_SYSTEM_PROMPT, HistoryWindow, extractive_summary
+from app.runtime.factory import build_runtime
+from app.runtime.langgraph_runtime import LangGraphConversationRuntime
+
+
+class _RecordingProvider(ChatProvider):
+    provider_name = "recording"
+
+    def __init__(self, *, fail_summaries: bool = False) -> None:
+        self.prompts: list[list[Any]] = []
+        self.summary_requests = 0
+        self._fail_summaries = fail_summaries
+
+    def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
+        messages = (context or {})["langchain_messages"]
+        if messages[0].content == SUMMARY_SYSTEM_PROMPT:
+            self.summary_requests += 1
+            if self._fail_summaries:
+                raise RuntimeError("summary model unavailable")
+            return f"summary #{self.summary_requests}"
+        self.prompts.append(messages)
+        return f"reply to {message}"
+
+
+def _history(turns: int) -> list[dict[str, str]]:
+    history: list[dict[str, str]] = []
+    for index in range(turns):
+        history.append({"role": "user", "content": f"question {index}"})
+        history.append({"role": "assistant", "content": f"answer {index}"})
+    return history
+
+
+def test_plan_keeps_recent_turns_and_folds_finished_summaries() -> None:
+    window = HistoryWindow(max_turns=2, token_budget=1000)
+    provider = _RecordingProvider()
+    history = _history(5)
+
+    plan = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+    window.schedule_summary(
+        thread_id="t", history=history, summary="", summarized_turns=0, provider=provider, role="companion"
+    )
+    window.wait_for_pending(timeout=5)
+    folded = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+    # Until the summary lands, older turns are still sent verbatim.
+    assert plan.history == history
+    assert plan.unsummarized == history[:6]
+    assert folded.summary == "summary #1"
+    assert folded.summarized_turns == 3
+    assert folded.summarized_tokens > 0
+    assert folded.history == history[6:]
+    assert folded.unsummarized == []
+
+
+def test_plan_trims_the_window_to_the_token_budget() -> None:
+    window = HistoryWindow(max_turns=6, token_budget=20)
+    history = _history(2) + [
+        {"role": "user", "content": "a much longer question " * 10},
+        {"role": "assistant", "content": "short"},
+    ]
+
+    plan = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+    # The newest turn alone is over budget; it is still kept verbatim.
+    assert plan.unsummarized == history[:4]
+
+
+def test_summary_from_a_different_checkpoint_is_discarded() -> None:
+    window = HistoryWindow(max_turns=1)
+    history = _history(3)
+    plan = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+    window.schedule_summary(
+        thread_id="t",
+        history=plan.history,
+        summary="",
+        summarized_turns=0,
+        provider=_RecordingProvider(),
+        role="companion",
+    )
+    window.wait_for_pending(timeout=5)
+
+    # Another worker already folded two turns into this thread's checkpoint.
+    later = window.plan(
+        thread_id="t", history=history[4:], summary="other", summarized_turns=2, summarized_tokens=10
+    )
+
+    assert later.summary == "other"
+    assert later.history == history[4:]
+
+
+def test_runtime_sends_summary_plus_window_and_reports_savings() -> None:
+    metrics.reset()
+    window = HistoryWindow(max_turns=2, token_budget=1000)
+    runtime = LangGraphConversationRuntime(history_window=window)
+    provider = _RecordingProvider()
+    context = {"thread_id": "window-thread", "role": "companion"}
+
+    for index in range(6):
+        runtime.generate_reply(message=f"question {index}", provider=provider, context=context)
+        window.wait_for_pending(timeout=5)
+
+    last_prompt = provider.prompts[-1]
+    assert "SUMMARY OF EARLIER CONVERSATION:\nsummary #" in last_prompt[0].content
+    assert [message.content for message in last_prompt[1:]] == [
+        "question 3",
+        "reply to question 3",
+        "question 4",
+        "reply to question 4",
+        "question 5",
+    ]
+    assert provider.summary_requests >= 1
+    snapshot = metrics.snapshot()["observations"]
+    assert snapshot["langgraph_history.prompt_tokens"]["count"] == 6
+    assert snapshot["langgraph_history.prompt_tokens_saved"]["last"] > 0
+    # The window reports what the assembler actually packed.
+    assert snapshot["langgraph_history.prompt_tokens"]["last"] == snapshot["prompt_assembler.prompt_tokens"]["last"]
+
+
+def test_window_and_assembler_share_one_token_counter() -> None:
+    runtime = build_runtime(Settings(FEATURE_LANGGRAPH_ENABLED=True, PROMPT_TOKENIZER="o200k_base"))
+    default = LangGraphConversationRuntime()
+
+    assert runtime.history_window._counter is runtime._prompt_assembler.token_counter
+    assert default.history_window._counter is default._prompt_assembler.token_counter
+
+
+def test_failed_provider_summary_falls_back_to_extractive_notes() -> None:
+    metrics.reset()
+    window = HistoryWindow(max_turns=1, summary_max_tokens=50)
+    history = _history(3)
+    plan = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+    window.schedule_summary(
+        thread_id="t",
+        history=plan.history,
+        summary="",
+        summarized_turns=0,
+        provider=_RecordingProvider(fail_summaries=True),
+        role="companion",
+    )
+    window.wait_for_pending(timeout=5)
+    folded = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+    assert folded.summary == "User said: question 0\nUser said: question 1"
+    assert metrics.counter("langgraph_history.summary_fallbacks") == 1
+
+
+class _BrokenLLM:
+    def invoke(self, messages: Any) -> Any:
+        raise ConnectionError("minimax unreachable")
+
+
+def test_canned_replies_from_real_providers_fall_back_to_extractive_notes(monkeypatch) -> None:
+    metrics.reset()
+    minimax = MiniMaxChatProvider(api_key="test")
+    monkeypatch.setattr(minimax, "_get_llm", lambda: _BrokenLLM())
+    history = _history(3)
+
+    for provider in (minimax, MockChatProvider()):
+        window = HistoryWindow(max_turns=1, summary_max_tokens=50)
+        window.schedule_summary(
+            thread_id="t", history=history, summary="", summarized_turns=0, provider=provider, role="companion"
+        )
+        window.wait_for_pending(timeout=5)
+        folded = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+        assert folded.summary == "User said: question 0\nUser said: question 1"
+    assert metrics.counter("langgraph_history.summary_fallbacks") == 2
+
+
+def test_pending_summaries_are_capped_and_expire() -> None:
+    metrics.reset()
+    now = [0.0]
+    window = HistoryWindow(max_turns=1, pending_ttl_seconds=60, max_pending=2, clock=lambda: now[0])
+    history = _history(3)
+
+    for thread_id in ("a", "b", "c"):
+        window.schedule_summary(
+            thread_id=thread_id,
+            history=history,
+            summary="",
+            summarized_turns=0,
+            provider=_RecordingProvider(),
+            role="companion",
+        )
+    window.wait_for_pending(timeout=5)
+    capped = window.pending_count()
+    now[0] = 61.0
+    expired = window.plan(thread_id="b", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+    assert capped == 2
+    # Thread "b" never came back in time (e.g. it moved to another worker).
+    assert expired.summary == ""
+    assert expired.history == history
+    assert window.pending_count() == 0
+    assert metrics.counter("langgraph_history.pending_expired") == 3
+    assert metrics.snapshot()["gauges"]["langgraph_history.pending_summaries"] == 0
+
+
+def test_extractive_summary_and_truncation_respect_token_limits() -> None:
+    turns = [{"role": "user", "content": f"topic {index} " + "detail " * 20} for index in range(10)]
+
+    summary = extractive_summary("old notes", turns, max_tokens=40)
+
+    assert estimate_tokens(summary) <= 41
+    assert "topic 9" in summary
+    assert truncate_to_tokens("今日好攰 but ok", 3) == "今日好…"
+
+
+def test_window_is_read_from_settings() -> None:
+    window = HistoryWindow.from_settings(
+        Settings(LANGGRAPH_HISTORY_WINDOW_TURNS=1, LANGGRAPH_HISTORY_WINDOW_ENABLED=False)
+    )
+    history = _history(4)
+
+    plan = window.plan(thread_id="t", history=history, summary="", summarized_turns=0, summarized_tokens=0)
+
+    assert plan.history == history
+    assert plan.unsummarized == []
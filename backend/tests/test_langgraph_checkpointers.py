@@ -0,0 +1,298 @@
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.models.checkpoint import LangGraphCheckpoint
+from app.providers.base import ChatProvider
+from app.runtime import checkpointers
+from app.runtime.checkpointers import (
+    BoundedMemoryCheckpointSaver,
+    PostgresCheckpointSaver,
+    RedisCheckpointSaver,
+    CHECKPOINT_KIND,
+    decode_record,
+    encode_record,
+    writes_checkpoint_id,
+)
+from app.runtime.factory import build_runtime
+from app.runtime.langgraph_runtime import LangGraphConversationRuntime
+
+
+class _HistoryCountingProvider(ChatProvider):
+    provider_name = "history-counter"
+
+    def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
+        # System prompt + prior turns + the incoming message.
+        return f"seen {len((context or {})['langchain_messages'])} messages"
+
+
+class _FakeBinaryRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, bytes]] = {}
+        self.ttls: dict[str, int] = {}
+
+    def pipeline(self) -> "_FakeBinaryRedis":
+        return self
+
+    def hget(self, key: str, field: str) -> bytes | None:
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key: str, field: str, value: bytes) -> None:
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hmget(self, key: str, fields: list[str]) -> list[bytes | None]:
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def hkeys(self, key: str) -> list[str]:
+        return list(self.hashes.get(key, {}))
+
+    def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.ttls[key] = seconds
+
+    def delete(self, key: str) -> None:
+        self.hashes.pop(key, None)
+
+    def execute(self) -> None:
+        return None
+
+
+class _FakeAsyncBinaryRedis:
+    def __init__(self, backing: _FakeBinaryRedis) -> None:
+        self._backing = backing
+
+    def pipeline(self) -> "_FakeAsyncBinaryRedis":
+        return self
+
+    async def hget(self, key: str, field: str) -> bytes | None:
+        return self._backing.hget(key, field)
+
+    def hset(self, key: str, field: str, value: bytes) -> None:
+        self._backing.hset(key, field, value)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[bytes | None]:
+        return self._backing.hmget(key, fields)
+
+    async def hkeys(self, key: str) -> list[str]:
+        return self._backing.hkeys(key)
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        self._backing.hdel(key, *fields)
+
+    def expire(self, key: str, seconds: int) -> None:
+        self._backing.expire(key, seconds)
+
+    async def delete(self, key: str) -> None:
+        self._backing.delete(key)
+
+    async def execute(self) -> None:
+        return None
+
+
+def test_record_encoding_compresses_large_checkpoints() -> None:
+    small = {"id": "1", "writes": []}
+    large = {"id": "2", "history": ["same turn text"] * 500}
+
+    assert decode_record(encode_record(small)) == small
+    assert encode_record(small)[:1] == b"m"
+    assert encode_record(large)[:1] == b"z"
+    assert len(encode_record(large)) < len(str(large)) / 10
+    assert decode_record(encode_record(large)) == large
+
+
+@pytest.mark.asyncio
+async def test_redis_checkpointer_shares_threads_across_runtimes(monkeypatch) -> None:
+    redis = _FakeBinaryRedis()
+    monkeypatch.setattr(checkpointers, "get_redis_binary_client", lambda: redis)
+    monkeypatch.setattr(checkpointers, "get_async_redis_binary_client", lambda: _FakeAsyncBinaryRedis(redis))
+    settings = Settings(
+        FEATURE_LANGGRAPH_ENABLED=True,
+        LANGGRAPH_CHECKPOINTER_BACKEND="redis",
+        MEMORY_SHORT_TERM_TTL_SECONDS=90,
+    )
+    worker_a, worker_b = build_runtime(settings), build_runtime(settings)
+    provider = _HistoryCountingProvider()
+    context = {"thread_id": "shared-thread", "role": "companion"}
+
+    first = await worker_a.agenerate_reply(message="hi", provider=provider, context=context)
+    second = await worker_b.agenerate_reply(message="again", provider=provider, context=context)
+    third = worker_a.generate_reply(message="sync turn", provider=provider, context=context)
+
+    assert getattr(worker_b, "checkpointer_backend") == "redis"
+    assert [first, second, third] == ["seen 2 messages", "seen 4 messages", "seen 6 messages"]
+    assert list(redis.hashes) == ["langgraph:checkpoint:shared-thread"]
+    assert redis.ttls["langgraph:checkpoint:shared-thread"] == 90
+
+    await worker_b._get_checkpointer().adelete_thread("shared-thread")
+    assert redis.hashes == {}
+
+
+def test_redis_checkpointer_degrades_to_empty_state_when_redis_fails() -> None:
+    def broken_client() -> Any:
+        raise ConnectionError("redis down")
+
+    metrics.reset()
+    runtime = LangGraphConversationRuntime(checkpointer_backend="redis")
+    runtime._checkpointer = RedisCheckpointSaver(ttl_seconds=60, client_factory=broken_client)
+    provider = _HistoryCountingProvider()
+
+    reply = runtime.generate_reply(
+        message="hi", provider=provider, context={"thread_id": "t-1", "role": "companion"}
+    )
+
+    assert reply == "seen 2 messages"
+    assert metrics.counter("langgraph_checkpoint.redis.errors") >= 2
+
+
+def test_postgres_checkpointer_upserts_latest_checkpoint_and_ignores_expired_rows(tmp_path) -> None:
+    # A file database gives the checkpointer's background threads their own connections.
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkpoints.db'}")
+    LangGraphCheckpoint.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    runtime = LangGraphConversationRuntime(checkpointer_backend="postgres", checkpoint_ttl_seconds=60)
+    runtime._checkpointer = PostgresCheckpointSaver(ttl_seconds=60, session_factory=session_factory)
+    provider = _HistoryCountingProvider()
+    context = {"thread_id": "pg-thread", "role": "study_guide"}
+
+    replies = [
+        runtime.generate_reply(message=message, provider=provider, context=context)
+        for message in ("one", "two")
+    ]
+
+    with session_factory() as session:
+        rows = session.query(LangGraphCheckpoint).all()
+        # Only writes of the latest checkpoint, or late ones cleared by the next, remain.
+        assert [(row.thread_id, row.checkpoint_ns) for row in rows if row.kind == CHECKPOINT_KIND] == [
+            ("pg-thread", "")
+        ]
+        assert all(
+            writes_checkpoint_id(row.kind) is not None for row in rows if row.kind != CHECKPOINT_KIND
+        )
+        session.execute(
+            update(LangGraphCheckpoint).values(expires_at=rows[0].expires_at - timedelta(seconds=120))
+        )
+        session.commit()
+    after_expiry = runtime.generate_reply(message="three", provider=provider, context=context)
+
+    assert replies == ["seen 2 messages", "seen 4 messages"]
+    assert after_expiry == "seen 2 messages"
+
+
+def test_late_writes_for_an_older_checkpoint_do_not_replace_the_latest_one() -> None:
+    redis = _FakeBinaryRedis()
+    saver = RedisCheckpointSaver(ttl_seconds=60, client_factory=lambda: redis)
+    runtime = LangGraphConversationRuntime(checkpointer_backend="redis")
+    runtime._checkpointer = saver
+    provider = _HistoryCountingProvider()
+    config = {"configurable": {"thread_id": "late", "checkpoint_ns": ""}}
+    runtime.generate_reply(message="one", provider=provider, context={"thread_id": "late"})
+    first = saver.get_tuple(config)
+    runtime.generate_reply(message="two", provider=provider, context={"thread_id": "late"})
+
+    saver.put_writes(first.config, [("history", [])], task_id="stale-task")
+
+    latest = saver.get_tuple(config)
+    assert latest.config["configurable"]["checkpoint_id"] != first.config["configurable"]["checkpoint_id"]
+    assert len(latest.checkpoint["channel_values"]["history"]) == 4
+    assert all(task_id != "stale-task" for task_id, _, _ in latest.pending_writes)
+
+
+def _sqlite_postgres_saver(tmp_path: Any) -> PostgresCheckpointSaver:
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkpoints.db'}")
+    LangGraphCheckpoint.__table__.create(engine)
+    return PostgresCheckpointSaver(ttl_seconds=60, session_factory=sessionmaker(bind=engine))
+
+
+@pytest.mark.parametrize(
+    "make_saver",
+    [
+        lambda tmp_path: BoundedMemoryCheckpointSaver(max_bytes=1_000_000),
+        lambda tmp_path: RedisCheckpointSaver(ttl_seconds=60, client_factory=lambda redis=_FakeBinaryRedis(): redis),
+        _sqlite_postgres_saver,
+    ],
+    ids=["memory", "redis", "postgres"],
+)
+def test_parallel_tasks_keep_their_own_pending_writes(make_saver, tmp_path) -> None:
+    saver = make_saver(tmp_path)
+    runtime = LangGraphConversationRuntime()
+    runtime._checkpointer = saver
+    config = {"configurable": {"thread_id": "fan-out", "checkpoint_ns": ""}}
+    runtime.generate_reply(message="one", provider=_HistoryCountingProvider(), context={"thread_id": "fan-out"})
+    checkpoint_config = saver.get_tuple(config).config
+
+    # Each task rewrites only its own record, so task-b cannot drop task-a's
+    # writes; a task's repeated write is not duplicated.
+    saver.put_writes(checkpoint_config, [("reply", "from a"), ("history", ["a"])], task_id="task-a")
+    saver.put_writes(checkpoint_config, [("reply", "from b")], task_id="task-b")
+    saver.put_writes(checkpoint_config, [("reply", "from a")], task_id="task-a")
+
+    # Writes can land before their checkpoint's own put; that put keeps them.
+    latest = saver.get_tuple(config)
+    saver.put(checkpoint_config, latest.checkpoint, latest.metadata, {})
+
+    pending = saver.get_tuple(config).pending_writes
+    assert pending == [
+        ("task-a", "reply", "from a"),
+        ("task-a", "history", ["a"]),
+        ("task-b", "reply", "from b"),
+    ]
+
+
+def test_unknown_checkpointer_backend_falls_back_to_memory() -> None:
+    runtime = LangGraphConversationRuntime(checkpointer_backend="dynamodb")
+
+    assert runtime.checkpointer_backend == "memory"
+
+
+def test_memory_checkpointer_keeps_latest_checkpoint_and_evicts_lru_threads() -> None:
+    metrics.reset()
+    saver = BoundedMemoryCheckpointSaver(max_bytes=12000)
+    runtime = LangGraphConversationRuntime()
+    runtime._checkpointer = saver
+    provider = _HistoryCountingProvider()
+
+    def turn(thread_id: str, message: str) -> str:
+        return runtime.generate_reply(
+            message=message, provider=provider, context={"thread_id": thread_id, "role": "companion"}
+        )
+
+    assert [turn("alpha", "one"), turn("alpha", "two")] == ["seen 2 messages", "seen 4 messages"]
+    single_thread_bytes = saver.stats()["resident_bytes"]
+    assert saver.stats()["threads"] == 1
+
+    for index in range(20):
+        turn(f"thread-{index}", "hello")
+    # Touch thread-19 so thread-18 becomes the least recently used.
+    assert turn("thread-19", "again") == "seen 4 messages"
+    turn("thread-new", "hello")
+
+    stats = saver.stats()
+    assert stats["resident_bytes"] <= 12000
+    assert stats["evictions"] == metrics.counter("langgraph_checkpoint.memory.evictions") > 0
+    assert metrics.snapshot()["gauges"]["langgraph_checkpoint.memory.threads"] == stats["threads"]
+    assert turn("thread-19", "third") == "seen 6 messages"
+    assert turn("alpha", "three") == "seen 2 messages"
+    assert single_thread_bytes < 12000
+
+
+def test_memory_checkpointer_releases_bytes_when_a_thread_is_deleted() -> None:
+    saver = BoundedMemoryCheckpointSaver(max_bytes=1_000_000)
+    runtime = LangGraphConversationRuntime()
+    runtime._checkpointer = saver
+    provider = _HistoryCountingProvider()
+    for thread_id in ("a", "b"):
+        runtime.generate_reply(message="hi", provider=provider, context={"thread_id": thread_id})
+
+    saver.delete_thread("a")
+
+    assert saver.stats()["threads"] == 1
+    saver.delete_thread("b")
+    assert saver.stats()["resident_bytes"] == 0
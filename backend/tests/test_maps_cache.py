@@ -0,0 +1,222 @@
+import threading
+
+from app.core.geo import geohash_encode
+from app.core.settings import Settings
+from app.providers.google_maps import StubMapsProvider
+from app.providers.maps_cache import CachedMapsProvider, PlaceSearchCache, RouteCache
+from app.providers.router import ProviderRegistry, ProviderRouter
+
+
+class _CountingMapsProvider(StubMapsProvider):
+    provider_name = "google-maps"
+
+    def __init__(self, results: int = 3) -> None:
+        self.calls: list[str] = []
+        self.results = results
+        self.refreshed = threading.Event()
+
+    def search_places(self, *, query: str, max_results: int, **kwargs):
+        _ = kwargs
+        self.calls.append(query)
+        self.refreshed.set()
+        return [
+            {"place_id": f"{query}-{len(self.calls)}-{index}", "name": f"Place {index}"}
+            for index in range(min(max_results, self.results))
+        ]
+
+
+def _search(provider: CachedMapsProvider, query: str, *, latitude: float = 22.2819, longitude: float = 114.1549, max_results: int = 3):
+    return provider.search_places(
+        query=query,
+        latitude=latitude,
+        longitude=longitude,
+        radius_meters=5000,
+        language="en",
+        max_results=max_results,
+    )
+
+
+class _FakeTextRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def get(self, key: str) -> str | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: str, ex: int) -> None:
+        self.store[key] = value
+        self.ttls[key] = ex
+
+
+def test_geohash_encode_matches_reference_cell() -> None:
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_nearby_normalized_queries_share_one_cached_search() -> None:
+    inner = _CountingMapsProvider()
+    provider = CachedMapsProvider(inner, PlaceSearchCache(use_redis=False))
+
+    first = _search(provider, "Cafe near me")
+    # ~100 m away, same precision-6 cell, different casing/whitespace.
+    second = _search(provider, "  cafe   NEAR me ", latitude=22.2825, longitude=114.1553)
+    far_away = _search(provider, "cafe near me", latitude=22.3193, longitude=114.1694)
+
+    assert inner.calls == ["Cafe near me", "cafe near me"]
+    assert second == first
+    assert far_away != first
+    stats = provider.cache.stats()
+    assert stats["memory_hits"] >= 1
+    assert 0 < stats["hit_ratio"] <= 1
+
+
+def test_cached_entry_cannot_serve_a_larger_request() -> None:
+    inner = _CountingMapsProvider(results=10)
+    provider = CachedMapsProvider(inner, PlaceSearchCache(use_redis=False))
+
+    _search(provider, "museum", max_results=3)
+    assert len(_search(provider, "museum", max_results=2)) == 2
+    assert len(_search(provider, "museum", max_results=6)) == 6
+
+    assert len(inner.calls) == 2
+
+
+def test_empty_results_are_not_cached() -> None:
+    inner = _CountingMapsProvider(results=0)
+    provider = CachedMapsProvider(inner, PlaceSearchCache(use_redis=False))
+
+    _search(provider, "cafe")
+    _search(provider, "cafe")
+
+    assert len(inner.calls) == 2
+
+
+def test_stale_entries_are_served_while_revalidating(monkeypatch) -> None:
+    import app.providers.maps_cache as cache_module
+
+    now = [1_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    inner = _CountingMapsProvider()
+    provider = CachedMapsProvider(
+        inner, PlaceSearchCache(ttl_seconds=60, stale_seconds=600, use_redis=False)
+    )
+
+    original = _search(provider, "park")
+    inner.refreshed.clear()
+    now[0] += 120
+    stale = _search(provider, "park")
+
+    assert stale == original
+    assert inner.refreshed.wait(timeout=2)
+    provider._refresh_executor.shutdown(wait=True)
+    assert len(inner.calls) == 2
+    assert _search(provider, "park") != original
+
+    now[0] += 10_000
+    _search(provider, "park")
+    assert len(inner.calls) == 3
+
+
+def test_redis_tier_serves_other_processes(monkeypatch) -> None:
+    import app.providers.maps_cache as cache_module
+
+    redis = _FakeTextRedis()
+    monkeypatch.setattr(cache_module, "get_redis_client", lambda: redis)
+    inner = _CountingMapsProvider()
+    writer = CachedMapsProvider(inner, PlaceSearchCache(ttl_seconds=60, stale_seconds=300))
+    reader = CachedMapsProvider(inner, PlaceSearchCache(ttl_seconds=60, stale_seconds=300))
+
+    first = _search(writer, "restaurant")
+    second = _search(reader, "restaurant")
+
+    assert second == first
+    assert len(inner.calls) == 1
+    assert set(redis.ttls.values()) == {360}
+
+
+def test_router_shares_cached_maps_provider() -> None:
+    settings = Settings(FEATURE_GOOGLE_MAPS_ENABLED=True, GOOGLE_MAPS_API_KEY="maps-key")
+    registry = ProviderRegistry()
+
+    first = ProviderRouter(settings, registry).resolve_maps_provider()
+    second = ProviderRouter(settings, registry).resolve_maps_provider()
+
+    assert isinstance(first, CachedMapsProvider)
+    assert first is second
+    assert first.provider_name == "google-maps"
+
+
+def _route(distance_meters: int) -> dict:
+    return {
+        "distance_meters": distance_meters,
+        "distance_text": f"{distance_meters} m",
+        "duration_seconds": None,
+        "duration_text": None,
+        "travel_mode": "walking",
+    }
+
+
+def test_route_cache_keys_on_origin_cell_and_destination() -> None:
+    cache = RouteCache(geohash_precision=7)
+    here = cache.key(
+        origin_latitude=22.28190,
+        origin_longitude=114.15490,
+        destination_latitude=22.30,
+        destination_longitude=114.17,
+        travel_mode="walking",
+        place_id="place-1",
+    )
+    nearby = cache.key(
+        origin_latitude=22.28192,
+        origin_longitude=114.15493,
+        destination_latitude=22.31,
+        destination_longitude=114.18,
+        travel_mode="walking",
+        place_id="place-1",
+    )
+    unnamed = cache.key(
+        origin_latitude=22.2819,
+        origin_longitude=114.1549,
+        destination_latitude=22.300004,
+        destination_longitude=114.169996,
+        travel_mode="walking",
+    )
+
+    assert here == nearby
+    assert unnamed[1] == "22.3000,114.1700"
+
+
+def test_route_cache_expires_and_evicts(monkeypatch) -> None:
+    import app.providers.maps_cache as cache_module
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = RouteCache(max_entries=2, ttl_seconds=60)
+    keys = [("cell", f"place-{index}", "walking") for index in range(3)]
+
+    cache.set_many({keys[0]: _route(100), keys[1]: _route(200)})
+    assert cache.get_many([keys[0]]) == {keys[0]: _route(100)}
+    cache.set_many({keys[2]: _route(300)})
+
+    assert set(cache.get_many(keys)) == {keys[0], keys[2]}
+    now[0] += 61
+    assert cache.get_many(keys) == {}
+    assert cache.stats()["size"] == 0
+
+
+def test_route_cache_invalidates_precisely_by_travel_mode() -> None:
+    cache = RouteCache()
+    cache.set_many(
+        {
+            ("cell-a", "place-1", "walking"): _route(100),
+            ("cell-b", "place-1", "walking"): _route(150),
+            ("cell-a", "place-1", "transit"): _route(900),
+        }
+    )
+
+    assert cache.invalidate(travel_mode="walking", origin_cell="cell-a") == 1
+    assert cache.invalidate(travel_mode="walking") == 1
+    assert set(cache.get_many([("cell-a", "place-1", "transit")])) == {
+        ("cell-a", "place-1", "transit")
+    }
+    assert cache.stats()["size"] == 1
@@ -1,6 +1,11 @@
+import asyncio
+import time
 from types import SimpleNamespace
 
+import pytest
+
 from app.core.settings import Settings
+from app.memory.embeddings import DETERMINISTIC_EMBEDDING_MODEL, TaggedEmbedding
 from app.models.enums import AuditEventType, MemoryEntryType, RoleType
 from app.schemas.chat import SafetyResult
 from app.schemas.recommendations import (
@@ -33,14 +38,16 @@ class _FakeSession:
         self.committed = True
 
 
-def test_chat_persistence_writes_audited_memory_entry(monkeypatch) -> None:
+@pytest.mark.asyncio
+async def test_chat_persistence_writes_audited_memory_entry(monkeypatch) -> None:
     import app.services.chat_orchestrator as chat_module
+    from app.core.write_behind import WriteBehindQueue
 
-    fake_session = _FakeSession()
+    fake_session = _FakeAsyncSession()
     captured: dict[str, object] = {"audit_event_types": []}
+    submitted: list[dict] = []
 
-    monkeypatch.setattr(chat_module, "SessionLocal",
-                        lambda: _SessionContext(fake_session))
+    monkeypatch.setattr(chat_module, "AsyncSessionLocal", lambda: fake_session)
 
     class FakeUserRepository:
         def __init__(self, session: object):
@@ -53,6 +60,9 @@ def test_chat_persistence_writes_audited_memory_entry(monkeypatch) -> None:
         def __init__(self, session: object):
             _ = session
 
+        def list_existing_request_ids(self, request_ids: list[str]) -> set[str]:
+            return set()
+
         def get_or_create_thread(self, **kwargs) -> SimpleNamespace:
             captured["thread_kwargs"] = kwargs
             return SimpleNamespace(id="thread-pk")
@@ -72,10 +82,6 @@ def test_chat_persistence_writes_audited_memory_entry(monkeypatch) -> None:
             captured["memory_kwargs"] = kwargs
             return SimpleNamespace(id="memory-entry-pk", entry_type=MemoryEntryType.summary)
 
-        def create_memory_embedding(self, **kwargs) -> SimpleNamespace:
-            captured["embedding_kwargs"] = kwargs
-            return SimpleNamespace(id="memory-embedding-pk")
-
     class FakeAuditRepository:
         def __init__(self, session: object):
             _ = session
@@ -91,8 +97,19 @@ def test_chat_persistence_writes_audited_memory_entry(monkeypatch) -> None:
     monkeypatch.setattr(chat_module, "MemoryRepository", FakeMemoryRepository)
     monkeypatch.setattr(chat_module, "AuditRepository", FakeAuditRepository)
 
+    async def fake_submit(**kwargs) -> None:
+        submitted.append(kwargs)
+
     orchestrator = ChatOrchestrator()
-    orchestrator._persist_chat_turn(
+    monkeypatch.setattr(orchestrator._embedding_pipeline, "asubmit", fake_submit)
+    # The production path: the turn is queued, and write-behind workers persist it.
+    orchestrator._write_queue = WriteBehindQueue(
+        name="test_chat_persistence",
+        handler=orchestrator._apersist_chat_turn_batch,
+        backend="memory",
+        batch_wait_ms=10,
+    )
+    await orchestrator._apersist_chat_turn(
         request_id="chat-request-1",
         user_id="chat-user",
         role="companion",
@@ -105,13 +122,22 @@ def test_chat_persistence_writes_audited_memory_entry(monkeypatch) -> None:
         context_snapshot={"memory": {}},
         safety=SafetyResult(risk_level="low", show_crisis_banner=False),
     )
+    await orchestrator.aclose()
 
     assert fake_session.committed is True
+    assert captured["message_kwargs"]["request_id"] == "chat-request-1"
     assert captured["memory_kwargs"]["write_reason"] == "chat_turn_summary"
     assert captured["memory_kwargs"]["entry_type"] == MemoryEntryType.summary
-    assert captured["embedding_kwargs"]["embedding_model"] == "text-embedding-3-small"
-    assert len(captured["embedding_kwargs"]["embedding"]) > 0
     assert AuditEventType.memory_write in captured["audit_event_types"]
+    # The embedding is computed by the pipeline after the turn commits.
+    assert submitted == [
+        {
+            "memory_entry_id": "memory-entry-pk",
+            "user_id": "chat-user",
+            "role": "companion",
+            "text": "I had a rough day.\nI am here with you.",
+        }
+    ]
 
 
 def test_recommendation_persistence_redacts_user_location(monkeypatch) -> None:
@@ -266,9 +292,13 @@ def test_context_builder_respects_retrieval_top_k(monkeypatch) -> None:
             role: RoleType,
             top_k: int,
             query_embedding: list[float] | None = None,
+            embedding_model: str | None = None,
+            search_parameters: dict[str, str] | None = None,
         ) -> list[SimpleNamespace]:
             captured["top_k"] = top_k
+            captured["embedding_model"] = embedding_model
             captured["query_embedding"] = query_embedding
+            captured["search_parameters"] = search_parameters
             _ = user_id, role
             return [
                 SimpleNamespace(
@@ -295,4 +325,299 @@ def test_context_builder_respects_retrieval_top_k(monkeypatch) -> None:
     assert len(captured["query_embedding"]
                ) == settings.memory_embedding_dimensions
     assert context["memory"]["long_term_retrieval"]["top_k"] == 3
+    assert captured["embedding_model"] == DETERMINISTIC_EMBEDDING_MODEL
+    assert captured["search_parameters"] == {"hnsw.ef_search": str(settings.memory_vector_hnsw_ef_search)}
     assert len(context["memory"]["long_term_retrieval"]["entries"]) == 1
+
+
+class _SlowRetrievalProvider:
+    provider_name = "exa"
+
+    def __init__(self, delay_seconds: float):
+        self._delay_seconds = delay_seconds
+
+    async def aretrieve(self, query: str) -> list[dict[str, object]]:
+        await asyncio.sleep(self._delay_seconds)
+        return [{"title": query, "url": None, "summary": None}]
+
+
+def _offline_async_context_builder(monkeypatch, settings: Settings, retrieval_provider: object):
+    import app.memory.context_builder as context_builder_module
+
+    def unavailable(*_args, **_kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(context_builder_module, "get_async_redis_client", unavailable)
+    monkeypatch.setattr(context_builder_module, "AsyncSessionLocal", unavailable)
+    context_builder = context_builder_module.ConversationContextBuilder(settings)
+    monkeypatch.setattr(
+        context_builder._provider_router,
+        "resolve_retrieval_provider",
+        lambda: retrieval_provider,
+    )
+    return context_builder
+
+
+@pytest.mark.asyncio
+async def test_async_context_builder_skips_retrieval_when_signalled(monkeypatch) -> None:
+    context_builder = _offline_async_context_builder(
+        monkeypatch, Settings(), _SlowRetrievalProvider(delay_seconds=5))
+    skip_fresh_retrieval = asyncio.Event()
+
+    async def refuse_soon() -> None:
+        await asyncio.sleep(0.01)
+        skip_fresh_retrieval.set()
+
+    started = time.perf_counter()
+    context, _ = await asyncio.gather(
+        context_builder.abuild(
+            user_id="context-user",
+            thread_id="context-thread",
+            role="companion",
+            message="I want to end my life",
+            skip_fresh_retrieval=skip_fresh_retrieval,
+        ),
+        refuse_soon(),
+    )
+
+    assert time.perf_counter() - started < 1
+    fresh_retrieval = context["memory"]["fresh_retrieval"]
+    assert fresh_retrieval["status"] == "skipped"
+    assert fresh_retrieval["fallback_reason"] == "safety_supportive_refusal"
+    assert context["memory"]["short_term"]["fallback_reason"] == "redis_unavailable"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_context_build_cancels_in_flight_retrieval(monkeypatch) -> None:
+    retrieval_cancelled = asyncio.Event()
+
+    class _CancellationRecordingProvider(_SlowRetrievalProvider):
+        async def aretrieve(self, query: str) -> list[dict[str, object]]:
+            try:
+                return await super().aretrieve(query)
+            except asyncio.CancelledError:
+                retrieval_cancelled.set()
+                raise
+
+    context_builder = _offline_async_context_builder(
+        monkeypatch, Settings(), _CancellationRecordingProvider(delay_seconds=5))
+    build = asyncio.ensure_future(
+        context_builder.abuild(
+            user_id="context-user",
+            thread_id="context-thread",
+            role="local_guide",
+            message="Any events in Central tonight?",
+            skip_fresh_retrieval=asyncio.Event(),
+        )
+    )
+    await asyncio.sleep(0.05)
+
+    build.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await build
+
+    await asyncio.wait_for(retrieval_cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_async_context_builder_enforces_retrieval_deadline(monkeypatch) -> None:
+    context_builder = _offline_async_context_builder(
+        monkeypatch,
+        Settings(CHAT_FRESH_RETRIEVAL_DEADLINE_SECONDS=0.05),
+        _SlowRetrievalProvider(delay_seconds=5),
+    )
+
+    context = await context_builder.abuild(
+        user_id="context-user",
+        thread_id="context-thread",
+        role="local_guide",
+        message="Any events in Central tonight?",
+    )
+
+    fresh_retrieval = context["memory"]["fresh_retrieval"]
+    assert fresh_retrieval["status"] == "degraded"
+    assert fresh_retrieval["fallback_reason"] == "exa_deadline_exceeded"
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_is_acknowledged_before_write_behind_persists_it() -> None:
+    from app.core.write_behind import WriteBehindQueue
+
+    captured: list[dict] = []
+
+    async def slow_handler(jobs: list[dict]) -> None:
+        await asyncio.sleep(0.05)
+        captured.extend(jobs)
+
+    orchestrator = ChatOrchestrator()
+    orchestrator._write_queue = WriteBehindQueue(
+        name="test_chat_turns", handler=slow_handler, backend="memory", batch_wait_ms=10
+    )
+
+    await orchestrator._apersist_chat_turn(
+        request_id="write-behind-1",
+        user_id="chat-user",
+        role="companion",
+        thread_id="chat-user-companion-thread",
+        user_message="hello",
+        assistant_reply="hi",
+        runtime="simple",
+        provider_route="mock",
+        provider_fallback_reason="not_applicable",
+        context_snapshot={"memory": {}},
+        safety=SafetyResult(risk_level="high", show_crisis_banner=True),
+    )
+    assert captured == []
+
+    # Workers run on the bridge loop; closing flushes whatever is left.
+    await orchestrator.aclose()
+    assert captured[0]["request_id"] == "write-behind-1"
+    assert captured[0]["safety"]["risk_level"] == "high"
+
+
+class _FakeAsyncSession:
+    def __init__(self) -> None:
+        self.committed = False
+
+    async def __aenter__(self) -> "_FakeAsyncSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    async def run_sync(self, fn):
+        return fn(object())
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+@pytest.mark.asyncio
+async def test_embedding_pipeline_embeds_batch_then_bulk_writes(monkeypatch) -> None:
+    import app.memory.embedding_pipeline as pipeline_module
+    from app.core.metrics import metrics
+    from app.memory.embedding_pipeline import MemoryEmbeddingPipeline
+
+    fake_session = _FakeAsyncSession()
+    captured: dict[str, object] = {}
+
+    class RecordingEmbeddingService:
+        model = "test-model"
+
+        async def aembed_batch(self, texts: list[str]) -> list[TaggedEmbedding]:
+            captured["texts"] = texts
+            # The embedding call must finish before any session is opened.
+            assert fake_session.committed is False
+            return [
+                TaggedEmbedding(vector=[float(index)] * 4, model="test-model", dimensions=4)
+                for index, _ in enumerate(texts)
+            ]
+
+    class FakeMemoryRepository:
+        def __init__(self, session: object):
+            _ = session
+
+        def bulk_create_memory_embeddings(self, rows: list[dict]) -> int:
+            captured["rows"] = rows
+            return len(rows)
+
+    monkeypatch.setattr(pipeline_module, "AsyncSessionLocal", lambda: fake_session)
+    monkeypatch.setattr(pipeline_module, "MemoryRepository", FakeMemoryRepository)
+
+    pipeline = MemoryEmbeddingPipeline(Settings(), RecordingEmbeddingService())  # type: ignore[arg-type]
+    await pipeline._aembed_batch(
+        [
+            {"memory_entry_id": "m-1", "user_id": "u", "role": "companion", "text": "a"},
+            {"memory_entry_id": "m-2", "user_id": "u", "role": None, "text": "b"},
+        ]
+    )
+
+    assert captured["texts"] == ["a", "b"]
+    rows = captured["rows"]
+    assert [row["memory_entry_id"] for row in rows] == ["m-1", "m-2"]
+    assert rows[0]["role"] == RoleType.companion
+    assert rows[1]["embedding"] == [1.0] * 4
+    assert rows[1]["embedding_model"] == "test-model"
+    assert fake_session.committed is True
+    assert metrics.snapshot()["observations"]["memory_embedding.batch_size"]["last"] == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_pipeline_refuses_to_store_fallback_vectors(monkeypatch) -> None:
+    import app.memory.embedding_pipeline as pipeline_module
+    from app.memory.embedding_pipeline import MemoryEmbeddingPipeline
+    from app.memory.embeddings import DETERMINISTIC_EMBEDDING_MODEL
+
+    class FlakyEmbeddingService:
+        model = "test-model"
+
+        async def aembed_batch(self, texts: list[str]) -> list[TaggedEmbedding]:
+            # One cache hit from the real model, one miss during the outage.
+            return [
+                TaggedEmbedding(vector=[0.5] * 4, model="test-model", dimensions=4),
+                TaggedEmbedding(vector=[0.1] * 4, model=DETERMINISTIC_EMBEDDING_MODEL, dimensions=4),
+            ]
+
+    def no_session() -> object:
+        raise AssertionError("a batch with fallback vectors must not open a session")
+
+    monkeypatch.setattr(pipeline_module, "AsyncSessionLocal", no_session)
+
+    pipeline = MemoryEmbeddingPipeline(Settings(), FlakyEmbeddingService())  # type: ignore[arg-type]
+    with pytest.raises(RuntimeError, match="1 of 2"):
+        await pipeline._aembed_batch(
+            [
+                {"memory_entry_id": "m-1", "user_id": "u", "role": None, "text": "a"},
+                {"memory_entry_id": "m-2", "user_id": "u", "role": None, "text": "b"},
+            ]
+        )
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_batch_defers_embeddings_until_after_commit(monkeypatch) -> None:
+    import app.services.chat_orchestrator as chat_module
+
+    fake_session = _FakeAsyncSession()
+    submitted: list[dict] = []
+    memory_entry_ids = iter(["entry-1", "entry-2"])
+
+    class FakeChatRepository:
+        def __init__(self, session: object):
+            _ = session
+
+        def list_existing_request_ids(self, request_ids: list[str]) -> set[str]:
+            return set()
+
+    orchestrator = ChatOrchestrator()
+
+    def fake_write_chat_turn(session, **kwargs):
+        assert "memory_embedding" not in kwargs
+        return SimpleNamespace(id=next(memory_entry_ids))
+
+    async def fake_submit(**kwargs) -> None:
+        assert fake_session.committed is True
+        submitted.append(kwargs)
+
+    monkeypatch.setattr(chat_module, "AsyncSessionLocal", lambda: fake_session)
+    monkeypatch.setattr(chat_module, "ChatRepository", FakeChatRepository)
+    monkeypatch.setattr(orchestrator, "_write_chat_turn", fake_write_chat_turn)
+    monkeypatch.setattr(orchestrator._embedding_pipeline, "asubmit", fake_submit)
+
+    job = {
+        "user_id": "chat-user",
+        "role": "companion",
+        "thread_id": "t",
+        "user_message": "hello",
+        "assistant_reply": "hi",
+        "runtime": "simple",
+        "provider_route": "mock",
+        "provider_fallback_reason": "not_applicable",
+        "context_snapshot": {},
+        "safety": {"risk_level": "low"},
+    }
+    await orchestrator._apersist_chat_turn_batch(
+        [{**job, "request_id": "r-1"}, {**job, "request_id": "r-2"}]
+    )
+
+    assert [item["memory_entry_id"] for item in submitted] == ["entry-1", "entry-2"]
+    assert submitted[0]["text"] == "hello\nhi"
@@ -0,0 +1,147 @@
+import gzip
+import random
+
+import pytest
+
+from app.core.geo import approx_distance_meters
+from app.services.place_catalog import (
+    BUNDLED_CATALOG_PATH,
+    PlaceCatalog,
+    get_place_catalog,
+    load_place_catalog,
+)
+from app.services.recommendation_scoring import tokenize_query
+
+_TYPES = ["cafe", "restaurant", "park", "museum", "shopping_mall", "bar", "library", "beach"]
+_WORDS = ["harbour", "garden", "dragon", "pearl", "lantern", "jade", "tea", "noodle", "peak", "bay"]
+
+
+def _composite(relevance: float, distance_meters: int) -> float:
+    distance_score = 1.0 if distance_meters <= 1000 else max(0.0, 1 - distance_meters / 12000)
+    return round(max(0.0, min(1.0, 0.65 * relevance + 0.35 * distance_score)), 4)
+
+
+def _synthetic_places(count: int) -> list[dict]:
+    rng = random.Random(7)
+    return [
+        {
+            "place_id": f"poi-{index}",
+            "name": f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} {index}",
+            "address": "Hong Kong",
+            "types": [rng.choice(_TYPES), "point_of_interest"],
+            "latitude": rng.uniform(22.20, 22.50),
+            "longitude": rng.uniform(113.90, 114.30),
+        }
+        for index in range(count)
+    ]
+
+
+def _baseline_relevance(*, query: str, place_name: str, place_types: list[str]) -> float:
+    """The scorer the recommendation service used before the catalog index."""
+    query_tokens = {token.strip().lower() for token in query.split() if token.strip()}
+    if not query_tokens:
+        return 0.0
+    haystack = f"{place_name.lower()} {' '.join(place_types).lower()}"
+    overlaps = sum(1 for token in query_tokens if token in haystack)
+    return max(0.0, min(1.0, overlaps / len(query_tokens)))
+
+
+def _linear_scan(places: list[dict], *, latitude: float, longitude: float, query: str, limit: int):
+    ranked = []
+    for place in places:
+        relevance = _baseline_relevance(query=query, place_name=place["name"], place_types=place["types"])
+        distance = approx_distance_meters(
+            origin_latitude=latitude,
+            origin_longitude=longitude,
+            latitude=place["latitude"],
+            longitude=place["longitude"],
+        )
+        ranked.append((_composite(relevance, distance), place["place_id"]))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return ranked[:limit]
+
+
+@pytest.mark.parametrize(
+    ("query", "latitude", "longitude"),
+    [
+        ("quiet museum", 22.2819, 114.1549),
+        ("jade noodle restaurant", 22.3193, 114.1694),
+        ("cafe", 22.45, 114.25),
+        ("something unmatched", 22.30, 114.00),
+        ("harbour 1234", 22.25, 113.95),
+        ("shop", 22.30, 114.10),
+        ("NOODLE bar!", 22.35, 114.20),
+        ("ar", 22.28, 114.15),
+    ],
+)
+def test_indexed_search_matches_a_linear_scan(query, latitude, longitude) -> None:
+    places = _synthetic_places(3000)
+    catalog = PlaceCatalog(places)
+
+    results = catalog.search(
+        latitude=latitude, longitude=longitude, query=query, limit=5, score=_composite
+    )
+
+    assert [(score, place["place_id"]) for score, place, _ in results] == _linear_scan(
+        places, latitude=latitude, longitude=longitude, query=query, limit=5
+    )
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["museum", "shop mall", "Art", "garden?", "jade noodle", "an", "tai kwun", "  ", "point_of"],
+)
+def test_relevance_matches_the_baseline_substring_scorer(query) -> None:
+    places = _synthetic_places(300)
+    catalog = PlaceCatalog(places)
+    tokens = tokenize_query(query)
+
+    for index, place in enumerate(places):
+        assert catalog.relevance(index, tokens) == _baseline_relevance(
+            query=query, place_name=place["name"], place_types=place["types"]
+        )
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["r", "ar", "ark", "oodle", "ping_mal", "harbour 12", "12", "_of_int", "zzzz", "dragondragon"],
+)
+def test_ngram_index_finds_every_place_with_a_matching_word(query) -> None:
+    places = _synthetic_places(300)
+    catalog = PlaceCatalog(places)
+    tokens = tokenize_query(query)
+
+    expected = {index for index in range(len(places)) if catalog.relevance(index, tokens) > 0}
+
+    assert catalog._matching(tokens) == expected
+
+
+def test_catalog_loads_gzipped_files_and_skips_malformed_lines(tmp_path) -> None:
+    path = tmp_path / "places.tsv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write("# place_id\tname\taddress\ttypes\tlatitude\tlongitude\n")
+        handle.write("poi-1\tLantern Cafe\t1 Queen's Road\tcafe,food\t22.28\t114.15\n")
+        handle.write("poi-2\tBroken\tnowhere\tpark\tnot-a-number\t114.15\n")
+        handle.write("poi-3\ttoo few fields\n")
+
+    catalog = load_place_catalog(path)
+
+    assert len(catalog) == 1
+    [(_, place, distance)] = catalog.search(
+        latitude=22.28, longitude=114.15, query="cafe", limit=3, score=_composite
+    )
+    assert place["types"] == ["cafe", "food"]
+    assert distance == 1
+
+
+def test_bundled_catalog_is_used_when_no_path_is_configured(tmp_path) -> None:
+    bundled = get_place_catalog("")
+    missing = get_place_catalog(str(tmp_path / "missing.tsv"))
+
+    assert BUNDLED_CATALOG_PATH.exists()
+    assert len(bundled) >= 14
+    assert len(missing) == len(bundled)
+    [(_, place, _)] = bundled.search(
+        latitude=22.2819, longitude=114.1549, query="tai kwun", limit=1, score=_composite
+    )
+    assert place["place_id"] == "hk-tai-kwun"
@@ -0,0 +1,192 @@
+from typing import Any
+
+from app.core import tokens
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.core.tokens import TokenCounter, estimate_tokens
+from app.prompts.assembler import PromptAssembler
+from app.providers.minimax import MiniMaxChatProvider
+
+
+def _context(**memory: Any) -> dict[str, Any]:
+    return {"thread_id": "t-1", "role": "companion", "memory": memory}
+
+
+def _short_term(*turns: tuple[str, str]) -> dict[str, Any]:
+    # Redis keeps short-term turns newest first.
+    return {
+        "status": "ok",
+        "entries": [
+            {"request_id": f"r{index}", "user_message": user, "assistant_reply": reply}
+            for index, (user, reply) in reversed(list(enumerate(turns)))
+        ],
+    }
+
+
+def test_short_term_turns_become_history_and_repeated_memories_are_skipped() -> None:
+    metrics.reset()
+    news = "I start my new job at the bank in Central on Monday and feel nervous"
+    context = _context(
+        short_term=_short_term((news, "Congrats!"), ("thanks", "Anytime.")),
+        long_term_profile={
+            "profiles": [
+                {"key": "name", "value": "Mei", "is_sensitive": False},
+                {"key": "diagnosis", "value": "anxiety", "is_sensitive": True},
+            ],
+            "preferences": [{"tag": "hiking", "weight": 0.2}, {"tag": "dim sum", "weight": 0.9}],
+        },
+        long_term_retrieval={
+            "entries": [
+                {"entry_type": "summary", "content": f"User intent summary: {news}"},
+                {"entry_type": "summary", "content": "User intent summary: worried about exams"},
+                {"entry_type": "summary", "content": "User intent summary: worried about the exams"},
+            ]
+        },
+    )
+
+    assembled = PromptAssembler().assemble(system_prompt="Be kind.", context=context, message="any tips?")
+
+    system, *history, incoming = assembled.messages
+    assert [message["content"] for message in history] == [
+        news,
+        "Congrats!",
+        "thanks",
+        "Anytime.",
+    ]
+    assert incoming == {"role": "user", "content": "any tips?"}
+    assert system["content"] == (
+        "Be kind.\n\n"
+        "WHAT YOU KNOW ABOUT THE USER:\n- name: Mei\n- Interested in: dim sum\n- Interested in: hiking\n\n"
+        "RELEVANT MEMORIES:\n- User intent summary: worried about exams"
+    )
+    assert assembled.deduplicated_items == 2
+    assert metrics.counter("prompt_assembler.deduplicated_items") == 2
+
+
+def test_sections_are_filled_in_priority_order_within_the_budget() -> None:
+    metrics.reset()
+    context = _context(
+        long_term_profile={"profiles": [{"key": "district", "value": "Sha Tin"}], "preferences": []},
+        long_term_retrieval={
+            "entries": [{"entry_type": "fact", "content": f"memory {index} " + "detail " * 30} for index in range(50)]
+        },
+        fresh_retrieval={
+            "entries": [{"title": "Weather", "summary": "Sunny. " * 200, "url": "https://example.com/w"}]
+        },
+    )
+    context["safety"] = {"policy_action": "supportive_refusal", "emotion_label": "distressed"}
+    assembler = PromptAssembler(token_budget=300, item_max_tokens=40)
+
+    assembled = assembler.assemble(system_prompt="Be kind.", context=context, message="hello")
+
+    content = assembled.messages[0]["content"]
+    assert assembled.prompt_tokens <= 300
+    assert estimate_tokens(content) + estimate_tokens("hello") + 8 <= 300
+    assert content.index("SAFETY CONTEXT:") < content.index("district: Sha Tin") < content.index("memory 0")
+    assert "FRESH WEB RESULTS" not in content
+    assert assembled.dropped_items > 40
+    assert metrics.counter("prompt_assembler.dropped_items") == assembled.dropped_items
+    assert metrics.snapshot()["observations"]["prompt_assembler.prompt_tokens"]["last"] == assembled.prompt_tokens
+
+
+def test_runtime_history_replaces_short_term_turns_and_summary_is_truncated() -> None:
+    context = _context(
+        short_term=_short_term(("Where should we eat tonight?", "How about Mong Kok?")),
+        long_term_retrieval={"entries": [{"content": "Where should we eat tonight?"}]},
+        fresh_retrieval={"entries": [{"title": "Mong Kok food guide", "summary": "Street food " * 100}]},
+    )
+    history = [
+        {"role": "user", "content": "Where should we eat tonight?"},
+        {"role": "assistant", "content": "How about Mong Kok?"},
+        {"role": "tool", "content": "ignored"},
+    ]
+
+    assembled = PromptAssembler(item_max_tokens=5, summary_max_tokens=3).assemble(
+        system_prompt="Be kind.",
+        context=context,
+        message="sounds good",
+        history=history,
+        summary="one two three four five six",
+    )
+
+    assert assembled.messages[1:] == [*history[:2], {"role": "user", "content": "sounds good"}]
+    assert assembled.messages[0]["content"] == (
+        "Be kind.\n\n"
+        "SUMMARY OF EARLIER CONVERSATION:\none two…\n\n"
+        "FRESH WEB RESULTS:\n- Mong Kok food guide: Street food Street…"
+    )
+    assert assembled.deduplicated_items == 1
+
+
+def test_oldest_history_turns_are_dropped_first() -> None:
+    history = [
+        {"role": role, "content": f"{role} {index} " + "words " * 20}
+        for index in range(10)
+        for role in ("user", "assistant")
+    ]
+
+    assembled = PromptAssembler(token_budget=200).assemble(
+        system_prompt="", context={}, message="latest", history=history
+    )
+
+    kept = assembled.messages[:-1]
+    assert kept == history[-len(kept):]
+    assert kept[0]["role"] == "user"
+    assert assembled.prompt_tokens <= 200
+    assert assembled.dropped_items == len(history) - len(kept)
+
+
+class _CharEncoding:
+    """One token per character, standing in for a tiktoken encoding."""
+
+    def encode(self, text: str, disallowed_special: Any = ()) -> list[int]:
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens_: list[int]) -> bytes:
+        return bytes(tokens_)
+
+
+class _FakeTiktoken:
+    @staticmethod
+    def get_encoding(name: str) -> Any:
+        if name != "fake_base":
+            raise ConnectionError("encodings cannot be downloaded")
+        return _CharEncoding()
+
+
+def test_token_counter_uses_the_configured_encoding_and_falls_back_to_the_heuristic(monkeypatch) -> None:
+    monkeypatch.setattr(tokens, "tiktoken", _FakeTiktoken)
+
+    exact = TokenCounter("fake_base")
+    offline = TokenCounter("o200k_base")
+
+    assert exact.name == "fake_base"
+    assert exact.count("hello world") == 11
+    assert exact.truncate("hello world", 5) == "hello…"
+    assert exact.truncate("今日", 4) == "今…"
+    assert offline.name == "heuristic"
+    assert offline.count("hello world") == estimate_tokens("hello world")
+    assert TokenCounter().count_messages([{"content": "hi"}]) == 5
+
+
+def test_minimax_provider_packs_memory_into_the_system_prompt() -> None:
+    provider = MiniMaxChatProvider(
+        api_key="test",
+        prompt_assembler=PromptAssembler.from_settings(Settings(PROMPT_TOKEN_BUDGET=500)),
+    )
+    context = _context(
+        short_term=_short_term(("hi", "hello!")),
+        long_term_profile={"profiles": [{"key": "name", "value": "Mei"}], "preferences": []},
+    )
+    context["system_prompt"] = "Be kind."
+
+    messages = provider._build_messages("how are you?", context)
+
+    assert [type(message).__name__ for message in messages] == [
+        "SystemMessage",
+        "HumanMessage",
+        "AIMessage",
+        "HumanMessage",
+    ]
+    assert messages[0].content == "Be kind.\n\nWHAT YOU KNOW ABOUT THE USER:\n- name: Mei"
+    assert messages[-1].content == "how are you?"
@@ -1,5 +1,7 @@
+import pytest
+
 from app.core.settings import Settings
-from app.providers.router import ProviderRouter
+from app.providers.router import ProviderRegistry, ProviderRouter
 
 
 def test_provider_router_falls_back_to_mock_when_minimax_disabled() -> None:
@@ -122,3 +124,67 @@ def test_provider_router_safety_falls_back_to_mock_when_unavailable() -> None:
     provider = router.resolve_safety_provider()
 
     assert provider.provider_name == "mock"
+
+
+def test_provider_router_reuses_minimax_instances_across_routers() -> None:
+    settings = Settings(
+        CHAT_PROVIDER="minimax",
+        FEATURE_MINIMAX_ENABLED=True,
+        MINIMAX_API_KEY="test-minimax-key",
+    )
+    registry = ProviderRegistry()
+
+    first = ProviderRouter(settings, registry).resolve_chat_provider()
+    second = ProviderRouter(settings, registry).resolve_chat_provider()
+    safety = ProviderRouter(settings, registry).resolve_safety_provider()
+
+    assert first is second
+    assert safety is not first
+    assert safety is ProviderRouter(settings, registry).resolve_safety_provider()
+
+
+def test_provider_router_rebuilds_provider_when_settings_change() -> None:
+    settings = Settings(
+        CHAT_PROVIDER="minimax",
+        FEATURE_MINIMAX_ENABLED=True,
+        MINIMAX_API_KEY="test-minimax-key",
+        MINIMAX_MODEL="MiniMax-M2.5",
+    )
+    registry = ProviderRegistry()
+    router = ProviderRouter(settings, registry)
+    original = router.resolve_chat_provider()
+
+    settings.minimax_model = "MiniMax-M2"
+    rebuilt = router.resolve_chat_provider()
+
+    assert rebuilt is not original
+    assert rebuilt is router.resolve_chat_provider()
+
+
+def test_provider_router_shares_voice_providers_until_key_changes(monkeypatch) -> None:
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "eleven-key")
+    monkeypatch.setenv("CANTONESEAI_API_KEY", "cantonese-key")
+    router = ProviderRouter(Settings(), ProviderRegistry())
+
+    elevenlabs = router.get_elevenlabs_provider()
+    cantoneseai = router.get_cantoneseai_provider()
+
+    assert router.get_elevenlabs_provider() is elevenlabs
+    assert router.get_cantoneseai_provider() is cantoneseai
+
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "rotated-key")
+    rotated = router.get_elevenlabs_provider()
+    assert rotated is not elevenlabs
+    assert rotated.api_key == "rotated-key"
+
+
+def test_provider_router_does_not_cache_failed_cantoneseai_construction(monkeypatch) -> None:
+    monkeypatch.delenv("CANTONESEAI_API_KEY", raising=False)
+    monkeypatch.delenv("CANTONESE_AI_API_KEY", raising=False)
+    router = ProviderRouter(Settings(), ProviderRegistry())
+
+    with pytest.raises(ValueError):
+        router.get_cantoneseai_provider()
+
+    monkeypatch.setenv("CANTONESEAI_API_KEY", "cantonese-key")
+    assert router.get_cantoneseai_provider().api_key == "cantonese-key"
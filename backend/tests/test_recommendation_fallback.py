@@ -1,3 +1,8 @@
+import threading
+import time
+
+import pytest
+
 from app.providers.google_maps import StubMapsProvider
 from app.schemas.recommendations import RecommendationRequest
 from app.schemas.weather import WeatherData, WeatherResponse
@@ -53,3 +58,216 @@ def test_fallback_recommendations_use_realistic_hong_kong_places() -> None:
     assert response.recommendations[0].name != "Nearby Cafe Option"
     assert response.recommendations[0].maps_uri is not None
     assert "google.com/maps/search/" in response.recommendations[0].maps_uri
+
+
+class _SlowRouteMapsProvider(StubMapsProvider):
+    provider_name = "google-maps"
+
+    def __init__(self, *, block: bool) -> None:
+        self.block = block
+        self.release = threading.Event()
+        self.batch_calls: list[int] = []
+
+    def search_places(self, **kwargs):
+        _ = kwargs
+        return [
+            {
+                "place_id": f"place-{index}",
+                "name": f"Cafe {index}",
+                "address": f"{index} Nathan Road",
+                "types": ["cafe"],
+                "rating": 4.5,
+                "user_ratings_total": 120,
+                "latitude": 22.3030 + (index * 0.001),
+                "longitude": 114.1820,
+            }
+            for index in range(4)
+        ]
+
+    def get_routes_batch(self, *, destinations, **kwargs):
+        _ = kwargs
+        self.batch_calls.append(len(destinations))
+        if self.block:
+            self.release.wait(timeout=5)
+        return [
+            {
+                "distance_meters": 400,
+                "distance_text": "400 m",
+                "duration_seconds": 300,
+                "duration_text": "5 mins",
+                "travel_mode": "walking",
+            }
+            for _ in destinations
+        ]
+
+
+class _RouterFor:
+    def __init__(self, maps_provider) -> None:
+        self._maps_provider = maps_provider
+
+    def resolve_maps_provider(self):
+        return self._maps_provider
+
+
+def _cafe_request() -> RecommendationRequest:
+    return RecommendationRequest(
+        user_id="test-user",
+        role="local_guide",
+        query="cafe",
+        latitude=22.3030,
+        longitude=114.1820,
+        max_results=5,
+        travel_mode="walking",
+    )
+
+
+def test_routes_are_resolved_with_one_batch_call() -> None:
+    maps_provider = _SlowRouteMapsProvider(block=False)
+    service = RecommendationService(
+        provider_router=_RouterFor(maps_provider),
+        weather_service=_FakeWeatherService(),
+    )
+
+    response = service.generate_recommendations(_cafe_request())
+
+    assert maps_provider.batch_calls == [4]
+    assert {item.distance_text for item in response.recommendations} == {"400 m"}
+
+
+def test_route_lookups_fall_back_to_approximation_after_deadline(monkeypatch) -> None:
+    import app.services.recommendation_service as recommendation_module
+
+    monkeypatch.setattr(recommendation_module.settings, "recommendation_route_deadline_seconds", 0.2)
+    maps_provider = _SlowRouteMapsProvider(block=True)
+    service = RecommendationService(
+        provider_router=_RouterFor(maps_provider),
+        weather_service=_FakeWeatherService(),
+    )
+
+    started = time.perf_counter()
+    try:
+        response = service.generate_recommendations(_cafe_request())
+    finally:
+        maps_provider.release.set()
+
+    assert time.perf_counter() - started < 2
+    by_id = {item.place_id: item for item in response.recommendations}
+    assert by_id["place-0"].distance_text == "50 m"
+    assert by_id["place-3"].distance_text == "350 m"
+    assert by_id["place-3"].duration_text == "4 mins"
+
+
+class _EarlyStopMapsProvider(StubMapsProvider):
+    provider_name = "google-maps"
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.queries: list[str] = []
+
+    def search_places(self, *, query: str, **kwargs):
+        _ = kwargs
+        self.queries.append(query)
+        if query != "cafe":
+            self.release.wait(timeout=5)
+            return []
+        return [
+            {
+                "place_id": f"place-{index}",
+                "name": f"Cafe {index}",
+                "address": f"{index} Nathan Road",
+                "types": ["cafe"],
+                "latitude": 22.3030,
+                "longitude": 114.1820,
+            }
+            for index in range(10)
+        ]
+
+
+def test_place_searches_stop_once_enough_unique_places_arrive() -> None:
+    from app.core.metrics import metrics
+
+    maps_provider = _EarlyStopMapsProvider()
+    service = RecommendationService(
+        provider_router=_RouterFor(maps_provider),
+        weather_service=_FakeWeatherService(),
+    )
+    yields_before = metrics.snapshot()["observations"].get("recommendation.search_yield", {}).get("count", 0)
+
+    started = time.perf_counter()
+    try:
+        places = service._search_candidates(
+            maps_provider=maps_provider,
+            request=_cafe_request(),
+            target_count=10,
+        )
+    finally:
+        maps_provider.release.set()
+
+    assert time.perf_counter() - started < 2
+    assert len(places) == 10
+    assert "cafe" in maps_provider.queries
+    yields_after = metrics.snapshot()["observations"]["recommendation.search_yield"]["count"]
+    assert yields_after == yields_before + 1
+
+
+def test_repeated_requests_reuse_cached_routes() -> None:
+    maps_provider = _SlowRouteMapsProvider(block=False)
+    service = RecommendationService(
+        provider_router=_RouterFor(maps_provider),
+        weather_service=_FakeWeatherService(),
+    )
+
+    service.generate_recommendations(_cafe_request())
+    response = service.generate_recommendations(_cafe_request())
+
+    assert maps_provider.batch_calls == [4]
+    assert {item.distance_text for item in response.recommendations} == {"400 m"}
+    assert service.route_cache is not None
+    assert service.route_cache.stats()["size"] == 4
+
+
+class _ManyCandidatesMapsProvider(_SlowRouteMapsProvider):
+    def search_places(self, **kwargs):
+        _ = kwargs
+        # Place i sits i * ~1.1 km north, so straight-line ranking is predictable.
+        return [
+            {
+                "place_id": f"place-{index}",
+                "name": f"Cafe {index}",
+                "address": f"{index} Nathan Road",
+                "types": ["cafe"],
+                "rating": 4.5,
+                "user_ratings_total": 120,
+                "latitude": 22.3030 + (index * 0.01),
+                "longitude": 114.1820,
+            }
+            for index in range(10)
+        ]
+
+    def get_routes_batch(self, *, destinations, **kwargs):
+        self.routed = list(destinations)
+        return super().get_routes_batch(destinations=destinations, **kwargs)
+
+
+def test_only_the_stage_one_shortlist_gets_real_routes(monkeypatch) -> None:
+    import app.services.recommendation_service as recommendation_module
+    from app.core.metrics import metrics
+
+    monkeypatch.setattr(recommendation_module.settings, "recommendation_route_margin", 2)
+    monkeypatch.setattr(recommendation_module.settings, "route_cache_enabled", False)
+    metrics.reset()
+    maps_provider = _ManyCandidatesMapsProvider(block=False)
+    service = RecommendationService(
+        provider_router=_RouterFor(maps_provider),
+        weather_service=_FakeWeatherService(),
+    )
+
+    response = service.generate_recommendations(_cafe_request())
+
+    assert maps_provider.batch_calls == [7]
+    assert max(latitude for latitude, _ in maps_provider.routed) == pytest.approx(22.3630)
+    assert [item.place_id for item in response.recommendations] == [f"place-{index}" for index in range(5)]
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["recommendation.routes_skipped"] == 3
+    assert snapshot["counters"]["recommendation.rank_stage_one_exact"] == 1
+    assert snapshot["observations"]["recommendation.rank_stage_one_overlap"]["last"] == 1.0
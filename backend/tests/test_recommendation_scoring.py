@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.core.settings import Settings
+from app.services.recommendation_scoring import (
+    SCORE_COMPONENTS,
+    RecommendationScorer,
+    ScoringWeights,
+    distance_score,
+    distance_scores,
+)
+from benchmarks.recommendation_scoring import scalar_fit_score, synthetic_candidates
+
+
+@pytest.mark.parametrize("condition", ["rain", "clear", "cloudy"])
+@pytest.mark.parametrize("preference_tags", [[], ["tea", "Garden", "museum"]])
+def test_batch_scores_match_the_per_place_scorer(condition, preference_tags) -> None:
+    places, distances = synthetic_candidates(300, random.Random(11))
+    query = "Quiet tea garden near the harbour"
+
+    batch = RecommendationScorer().score_batch(
+        query=query,
+        preference_tags=preference_tags,
+        condition=condition,
+        places=places,
+        distances_meters=distances,
+    )
+
+    expected = [
+        scalar_fit_score(
+            query=query,
+            place_name=place["name"],
+            place_types=place["types"],
+            rating=place["rating"],
+            review_count=place["user_ratings_total"],
+            distance_meters=distance,
+            condition=condition,
+            preference_tags=preference_tags,
+        )
+        for place, distance in zip(places, distances)
+    ]
+    assert batch.fit_scores.tolist() == expected
+
+
+def test_breakdown_and_configurable_weights() -> None:
+    places = [
+        {"name": "Lantern Cafe", "types": ["cafe"], "rating": 5.0, "user_ratings_total": 999},
+        {"name": "Peak Trail", "types": ["hiking_area"], "rating": None, "user_ratings_total": None},
+    ]
+    distance_only = RecommendationScorer(
+        ScoringWeights(relevance=0, rating=0, review_volume=0, distance=1, weather=0, preference=0)
+    )
+
+    batch = distance_only.score_batch(
+        query="cafe",
+        preference_tags=[],
+        condition="rain",
+        places=places,
+        distances_meters=[5000, 500],
+    )
+
+    assert batch.fit_scores.tolist() == [0.5833, 1.0]
+    breakdown = batch.breakdown(0)
+    assert set(breakdown) == {*SCORE_COMPONENTS, "fit_score"}
+    assert breakdown["relevance"] == 1.0
+    assert breakdown["weather"] == 1.0
+    assert batch.indoor.tolist() == [True, False]
+    assert batch.outdoor.tolist() == [False, True]
+
+
+def test_weights_are_read_from_settings() -> None:
+    weights = ScoringWeights.from_settings(Settings(RECOMMENDATION_WEIGHT_DISTANCE=0.5))
+
+    assert weights.distance == 0.5
+    assert weights.relevance == 0.25
+
+
+@pytest.mark.parametrize("relevance", [0.0, 0.25, 0.5, 1.0])
+@pytest.mark.parametrize("distance_meters", [None, 0, 1000, 1001, 6000, 12000, 50000])
+def test_catalog_score_combines_relevance_and_the_batch_distance_component(relevance, distance_meters) -> None:
+    if distance_meters is None:
+        distance_score = 0.4
+    elif distance_meters <= 1000:
+        distance_score = 1.0
+    else:
+        distance_score = max(0.0, min(1.0, 1 - distance_meters / 12000))
+
+    assert RecommendationScorer.catalog_score(relevance, distance_meters) == round(
+        max(0.0, min(1.0, 0.65 * relevance + 0.35 * distance_score)), 4
+    )
+
+
+def test_scalar_distance_score_matches_the_batch_component() -> None:
+    distances = [None, 0, 999, 1000, 1001, 5500, 11999, 12000, 40000]
+
+    batch = distance_scores(np.array([np.nan if d is None else float(d) for d in distances]))
+
+    assert [distance_score(d) for d in distances] == batch.tolist()
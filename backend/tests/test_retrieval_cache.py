@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.memory.retrieval_gate import classify_fresh_retrieval
+from app.providers.base import RetrievalProvider
+from app.providers.retrieval_cache import (
+    CachedRetrievalProvider,
+    RetrievalCache,
+    normalize_retrieval_query,
+)
+from app.providers.router import ProviderRegistry, ProviderRouter
+
+
+class _CountingRetrievalProvider(RetrievalProvider):
+    provider_name = "exa"
+
+    def __init__(self, results: int = 2) -> None:
+        self.calls: list[str] = []
+        self.results = results
+
+    def retrieve(self, query: str) -> list[dict]:
+        self.calls.append(query)
+        return [{"title": f"{query} {index}"} for index in range(self.results)]
+
+
+@pytest.mark.parametrize(
+    ("role", "message", "should_retrieve", "reason"),
+    [
+        ("companion", "Thank you!", False, "small_talk"),
+        ("local_guide", "ok", False, "small_talk"),
+        ("companion", "   ", False, "empty"),
+        ("local_guide", "Any events in Central tonight?", True, "freshness_keyword"),
+        ("companion", "附近有咩好食", True, "local_keyword"),
+        ("local_guide", "Somewhere quiet to think", True, "role_default"),
+        ("study_guide", "Explain photosynthesis to me please", True, "role_default"),
+        ("companion", "I had a rough day at work", True, "role_default"),
+    ],
+)
+def test_retrieval_gate_uses_role_and_keyword_signals(role, message, should_retrieve, reason) -> None:
+    decision = classify_fresh_retrieval(role, message)
+
+    assert decision.should_retrieve is should_retrieve
+    assert decision.reason == reason
+
+
+@pytest.mark.parametrize(
+    ("role", "message", "should_retrieve", "reason"),
+    [
+        ("companion", "I had a rough day at work", False, "no_fresh_signal"),
+        ("companion", "Any events in Central tonight?", True, "freshness_keyword"),
+        ("local_guide", "Somewhere quiet to think", True, "role_default"),
+    ],
+)
+def test_signal_only_roles_need_a_keyword(role, message, should_retrieve, reason) -> None:
+    decision = classify_fresh_retrieval(role, message, signal_only_roles=frozenset({"companion"}))
+
+    assert decision.should_retrieve is should_retrieve
+    assert decision.reason == reason
+
+
+def test_trivially_different_queries_share_one_cache_entry() -> None:
+    metrics.reset()
+    inner = _CountingRetrievalProvider()
+    provider = CachedRetrievalProvider(inner, RetrievalCache(provider_name="exa", use_redis=False))
+
+    first = provider.retrieve("Events in Central tonight?")
+    second = provider.retrieve("  events in central TONIGHT ")
+
+    assert normalize_retrieval_query("Events in Central tonight?") == "events in central tonight"
+    assert inner.calls == ["Events in Central tonight?"]
+    assert second == first
+    assert provider.cache.stats()["memory_hits"] == 1
+
+
+def test_retrieval_cache_expires_and_skips_empty_results(monkeypatch) -> None:
+    import app.providers.retrieval_cache as cache_module
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    inner = _CountingRetrievalProvider()
+    provider = CachedRetrievalProvider(
+        inner, RetrievalCache(provider_name="exa", ttl_seconds=60, use_redis=False)
+    )
+
+    provider.retrieve("hk news")
+    now[0] += 61
+    provider.retrieve("hk news")
+    assert len(inner.calls) == 2
+
+    inner.results = 0
+    provider.retrieve("nothing here")
+    provider.retrieve("nothing here")
+    assert inner.calls[-2:] == ["nothing here", "nothing here"]
+
+
+def test_async_retrieval_is_cached() -> None:
+    inner = _CountingRetrievalProvider()
+    provider = CachedRetrievalProvider(inner, RetrievalCache(provider_name="exa", use_redis=False))
+
+    async def main() -> None:
+        await provider.aretrieve("hk weather")
+        await provider.aretrieve("HK weather!")
+
+    asyncio.run(main())
+
+    assert inner.calls == ["hk weather"]
+
+
+def test_router_shares_cached_retrieval_provider() -> None:
+    settings = Settings(FEATURE_EXA_ENABLED=True, EXA_API_KEY="exa-key")
+    registry = ProviderRegistry()
+
+    first = ProviderRouter(settings, registry).resolve_retrieval_provider()
+    second = ProviderRouter(settings, registry).resolve_retrieval_provider()
+
+    assert isinstance(first, CachedRetrievalProvider)
+    assert first is second
+    assert first.provider_name == "exa"
+
+
+def test_context_builder_reports_gated_turns(monkeypatch) -> None:
+    import app.memory.context_builder as context_builder_module
+
+    def unavailable(*_args, **_kwargs):
+        raise ConnectionError("offline")
+
+    metrics.reset()
+    monkeypatch.setattr(context_builder_module, "get_redis_client", unavailable)
+    monkeypatch.setattr(context_builder_module, "SessionLocal", unavailable)
+    inner = _CountingRetrievalProvider()
+    context_builder = context_builder_module.ConversationContextBuilder(Settings())
+    monkeypatch.setattr(
+        context_builder._provider_router, "resolve_retrieval_provider", lambda: inner
+    )
+
+    def build(role: str, message: str) -> dict:
+        return context_builder.build(
+            user_id="gate-user", thread_id="gate-thread", role=role, message=message
+        )["memory"]["fresh_retrieval"]
+
+    assert build("local_guide", "Any exhibitions this weekend?")["entries"]
+    skipped = build("companion", "thanks")
+
+    assert skipped["status"] == "skipped"
+    assert skipped["fallback_reason"] == "gate_small_talk"
+    assert inner.calls == ["Any exhibitions this weekend?"]
+    snapshot = metrics.snapshot()
+    assert snapshot["gauges"]["fresh_retrieval.gate.skip_rate"] == 0.5
+    assert snapshot["counters"]["fresh_retrieval.gate.skipped.small_talk"] == 1
+    assert "fresh_retrieval.gate.saved_latency_ms" in snapshot["counters"]
@@ -1,4 +1,11 @@
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
 from app.core.settings import Settings
+from app.providers.base import ChatProvider
+from app.providers.minimax import MiniMaxChatProvider
 from app.runtime.factory import build_runtime
 
 
@@ -19,4 +26,85 @@ def test_runtime_factory_uses_langgraph_when_flag_enabled() -> None:
     runtime = build_runtime(settings)
 
     assert runtime.runtime_name == "langgraph"
-    assert getattr(runtime, "checkpointer_backend") == "memory"
+    assert getattr(runtime, "checkpointer_backend") == "postgres"
+
+
+class _ChunkedProvider(ChatProvider):
+    provider_name = "chunked"
+
+    def generate_reply(self, message: str, context: dict[str, Any] | None = None) -> str:
+        return "".join(["Hello", " there", "."])
+
+    async def astream_reply(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        for chunk in ["Hello", " there", "."]:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_langgraph_runtime_streams_provider_chunks_and_keeps_history() -> None:
+    runtime = build_runtime(Settings(FEATURE_LANGGRAPH_ENABLED=True))
+    provider = _ChunkedProvider()
+    context = {"thread_id": "stream-thread", "role": "companion"}
+
+    chunks = [
+        chunk
+        async for chunk in runtime.astream_reply(
+            message="hi", provider=provider, context=context
+        )
+    ]
+    follow_up = await runtime.agenerate_reply(
+        message="again", provider=provider, context=context
+    )
+
+    assert chunks == ["Hello", " there", "."]
+    assert follow_up == "Hello there."
+
+
+class _NonStreamingProvider(_ChunkedProvider):
+    async def astream_reply(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        raise AssertionError("ainvoke must not stream")
+        yield ""
+
+
+@pytest.mark.asyncio
+async def test_langgraph_runtime_agenerate_reply_does_not_stream() -> None:
+    runtime = build_runtime(Settings(FEATURE_LANGGRAPH_ENABLED=True))
+
+    reply = await runtime.agenerate_reply(
+        message="hi", provider=_NonStreamingProvider(), context={"thread_id": "invoke-thread"}
+    )
+
+    assert reply == "Hello there."
+
+
+class _Chunk:
+    def __init__(self, content: str) -> None:
+        self.content = content
+
+
+class _DroppedStreamLLM:
+    async def astream(self, messages: Any) -> AsyncIterator[_Chunk]:
+        yield _Chunk("Half a")
+        raise ConnectionError("stream dropped")
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_provider_error_raises_and_keeps_partial_reply_out_of_history(monkeypatch) -> None:
+    runtime = build_runtime(Settings(FEATURE_LANGGRAPH_ENABLED=True))
+    provider = MiniMaxChatProvider(api_key="test")
+    monkeypatch.setattr(provider, "_get_async_llm", lambda: _DroppedStreamLLM())
+    context = {"thread_id": "dropped-thread", "role": "companion"}
+
+    chunks: list[str] = []
+    with pytest.raises(ConnectionError):
+        async for chunk in runtime.astream_reply(message="hi", provider=provider, context=context):
+            chunks.append(chunk)
+
+    graph = runtime._get_or_build_graph(provider)
+    state = await graph.aget_state({"configurable": {"thread_id": "dropped-thread"}})
+    assert chunks == ["Half a"]
+    assert not state.values.get("history")
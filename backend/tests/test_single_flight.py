@@ -0,0 +1,370 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.settings import Settings
+from app.core.single_flight import SingleFlight
+from app.providers.base import RetrievalProvider
+from app.providers.coalescing import (
+    SingleFlightMapsProvider,
+    SingleFlightRetrievalProvider,
+    SingleFlightWeatherProvider,
+)
+from app.providers.google_maps import StubMapsProvider
+from app.providers.maps_cache import CachedMapsProvider, PlaceSearchCache
+from app.providers.open_meteo import OpenMeteoWeatherProvider
+from app.providers.router import ProviderRegistry, ProviderRouter
+
+
+class _FakeLockRedis:
+    """Just enough of redis-py for the cross-process lock/result handshake."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    def set(self, key: str, value: str, nx: bool = False, px: int | None = None) -> bool:
+        _ = px
+        if nx and key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    def get(self, key: str) -> str | None:
+        return self.store.get(key)
+
+    def exists(self, key: str) -> int:
+        return int(key in self.store)
+
+    def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        # Mirrors _RELEASE_LOCK_SCRIPT: delete the lock only if we still own it.
+        _ = script, numkeys
+        if self.store.get(key) != token:
+            return 0
+        del self.store[key]
+        return 1
+
+    def pipeline(self, transaction: bool = True) -> "_FakeLockPipeline":
+        _ = transaction
+        return _FakeLockPipeline(self)
+
+
+class _FakeLockPipeline:
+    def __init__(self, redis: _FakeLockRedis) -> None:
+        self._redis = redis
+        self._commands: list = []
+
+    def set(self, *args, **kwargs) -> None:
+        self._commands.append((self._redis.set, args, kwargs))
+
+    def eval(self, *args) -> None:
+        self._commands.append((self._redis.eval, args, {}))
+
+    def execute(self) -> list:
+        return [command(*args, **kwargs) for command, args, kwargs in self._commands]
+
+
+def _run_concurrently(count: int, target) -> list:
+    results: list = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_identical_calls_reach_upstream_once() -> None:
+    metrics.reset()
+    group = SingleFlight("test-threads", use_redis=False)
+    calls: list[int] = []
+
+    def slow_call() -> dict:
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    results = _run_concurrently(5, lambda: group.do("same", slow_call))
+
+    assert calls == [1]
+    assert results == [{"value": 42}] * 5
+    assert group.stats() == {"originated": 1, "coalesced": 4, "coalesced_remote": 0}
+
+
+def test_upstream_errors_propagate_to_every_waiter() -> None:
+    group = SingleFlight("test-errors", use_redis=False)
+    calls: list[int] = []
+
+    def failing_call() -> dict:
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def attempt():
+        try:
+            return group.do("same", failing_call)
+        except RuntimeError as exc:
+            return str(exc)
+
+    assert _run_concurrently(3, attempt) == ["upstream down"] * 3
+    assert calls == [1]
+    # Failed flights are not remembered.
+    with pytest.raises(RuntimeError):
+        group.do("same", failing_call)
+    assert len(calls) == 2
+
+
+def test_async_callers_share_one_flight() -> None:
+    metrics.reset()
+    group = SingleFlight("test-async", use_redis=False)
+    calls: list[str] = []
+
+    async def slow_call() -> list[dict]:
+        calls.append("called")
+        await asyncio.sleep(0.05)
+        return [{"title": "result"}]
+
+    async def main() -> list:
+        return await asyncio.gather(*(group.ado("query", slow_call) for _ in range(4)))
+
+    results = asyncio.run(main())
+
+    assert calls == ["called"]
+    assert results == [[{"title": "result"}]] * 4
+    assert group.stats()["coalesced"] == 3
+
+
+def test_followers_in_other_processes_reuse_the_published_result(monkeypatch) -> None:
+    import app.core.single_flight as single_flight_module
+
+    metrics.reset()
+    redis = _FakeLockRedis()
+    monkeypatch.setattr(single_flight_module, "get_redis_client", lambda: redis)
+    leader = SingleFlight("test-remote", wait_seconds=2)
+    follower = SingleFlight("test-remote", wait_seconds=2)
+    # Another process already holds the lock for this key.
+    redis.set(leader._lock_key("key"), "other-process")
+
+    def publish_later() -> None:
+        time.sleep(0.1)
+        redis.store[leader._result_key("key")] = '{"value": 7}'
+
+    threading.Thread(target=publish_later).start()
+    calls: list[int] = []
+
+    result = follower.do("key", lambda: calls.append(1) or {"value": 0})
+
+    assert result == {"value": 7}
+    assert calls == []
+    assert follower.stats()["coalesced_remote"] == 1
+
+
+def test_remote_leader_releases_the_lock_when_upstream_fails(monkeypatch) -> None:
+    import app.core.single_flight as single_flight_module
+
+    redis = _FakeLockRedis()
+    monkeypatch.setattr(single_flight_module, "get_redis_client", lambda: redis)
+    group = SingleFlight("test-remote-failure", wait_seconds=2)
+
+    def failing() -> dict:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        group.do("key", failing)
+
+    assert group._lock_key("key") not in redis.store
+    assert group._result_key("key") not in redis.store
+    assert group.do("key", lambda: {"value": 1}) == {"value": 1}
+    assert redis.get(group._result_key("key")) == '{"value": 1}'
+    assert group._lock_key("key") not in redis.store
+
+
+def test_redis_failures_fall_back_to_calling_upstream(monkeypatch) -> None:
+    import app.core.single_flight as single_flight_module
+
+    def unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(single_flight_module, "get_redis_client", unavailable)
+    group = SingleFlight("test-redis-down")
+
+    assert group.do("key", lambda: {"ok": True}) == {"ok": True}
+
+
+class _CountingRetrievalProvider(RetrievalProvider):
+    provider_name = "exa"
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def retrieve(self, query: str) -> list[dict]:
+        self.calls.append(query)
+        time.sleep(0.1)
+        return [{"title": query}]
+
+
+def test_wrappers_keep_provider_identity_and_coalesce() -> None:
+    inner = _CountingRetrievalProvider()
+    provider = SingleFlightRetrievalProvider(inner, SingleFlight("test-wrapper", use_redis=False))
+
+    results = _run_concurrently(3, lambda: provider.retrieve("hk news"))
+
+    assert provider.provider_name == "exa"
+    assert inner.calls == ["hk news"]
+    assert results == [[{"title": "hk news"}]] * 3
+
+
+def test_retrieval_wrapper_coalesces_queries_that_share_a_cache_key() -> None:
+    inner = _CountingRetrievalProvider()
+    provider = SingleFlightRetrievalProvider(inner, SingleFlight("test-normalized", use_redis=False))
+    queries = iter(["HK news!", "hk  news", "hk news"])
+    lock = threading.Lock()
+
+    def next_query() -> list[dict]:
+        with lock:
+            query = next(queries)
+        return provider.retrieve(query)
+
+    results = _run_concurrently(3, next_query)
+
+    assert len(inner.calls) == 1
+    assert results == [[{"title": inner.calls[0]}]] * 3
+
+
+def test_router_wraps_outbound_providers_in_single_flight() -> None:
+    settings = Settings(
+        FEATURE_WEATHER_ENABLED=True,
+        WEATHER_CACHE_ENABLED=False,
+        FEATURE_GOOGLE_MAPS_ENABLED=True,
+        GOOGLE_MAPS_API_KEY="maps-key",
+        PLACE_SEARCH_CACHE_ENABLED=False,
+        FEATURE_EXA_ENABLED=True,
+        EXA_API_KEY="exa-key",
+        RETRIEVAL_CACHE_ENABLED=False,
+    )
+    router = ProviderRouter(settings, ProviderRegistry())
+
+    assert isinstance(router.resolve_weather_provider(), SingleFlightWeatherProvider)
+    assert isinstance(router.resolve_maps_provider(), SingleFlightMapsProvider)
+    assert isinstance(router.resolve_retrieval_provider(), SingleFlightRetrievalProvider)
+
+    cached = ProviderRouter(
+        Settings(FEATURE_GOOGLE_MAPS_ENABLED=True, GOOGLE_MAPS_API_KEY="maps-key"),
+        ProviderRegistry(),
+    ).resolve_maps_provider()
+    assert isinstance(cached, CachedMapsProvider)
+    assert isinstance(cached._inner, SingleFlightMapsProvider)
+
+    # Cached weather misses coalesce inside WeatherCache, so the provider stays bare.
+    cached_weather = ProviderRouter(Settings(FEATURE_WEATHER_ENABLED=True), ProviderRegistry())
+    assert isinstance(cached_weather.resolve_weather_provider(), OpenMeteoWeatherProvider)
+
+    disabled = ProviderRouter(
+        Settings(SINGLE_FLIGHT_ENABLED=False, FEATURE_GOOGLE_MAPS_ENABLED=False),
+        ProviderRegistry(),
+    )
+    assert isinstance(disabled.resolve_maps_provider(), StubMapsProvider)
+
+
+class _SlowMapsProvider(StubMapsProvider):
+    def __init__(self) -> None:
+        self.searches: list[tuple[float, float]] = []
+        self.route_batches: list[tuple[float, float]] = []
+
+    def search_places(self, *, query, latitude, longitude, radius_meters, language, max_results):
+        self.searches.append((latitude, longitude))
+        time.sleep(0.2)
+        return [{"place_id": "p1", "name": query}]
+
+    def get_routes_batch(self, *, origin_latitude, origin_longitude, destinations, travel_mode):
+        self.route_batches.append((origin_latitude, origin_longitude))
+        time.sleep(0.2)
+        return [{"distance_meters": 100, "travel_mode": travel_mode} for _ in destinations]
+
+
+def test_cold_cache_misses_in_one_cell_coalesce_into_one_search() -> None:
+    inner = _SlowMapsProvider()
+    provider = CachedMapsProvider(
+        SingleFlightMapsProvider(inner, SingleFlight("test-maps-cell", use_redis=False)),
+        PlaceSearchCache(use_redis=False),
+    )
+    # ~100 m apart, same precision-6 cell.
+    origins = iter([(22.2819, 114.1580), (22.2825, 114.1553)])
+    lock = threading.Lock()
+
+    def search() -> list:
+        with lock:
+            latitude, longitude = next(origins)
+        return provider.search_places(
+            query="Cafe",
+            latitude=latitude,
+            longitude=longitude,
+            radius_meters=1500,
+            language="en",
+            max_results=5,
+        )
+
+    results = _run_concurrently(2, search)
+
+    assert len(inner.searches) == 1
+    assert results[0] == results[1]
+
+
+def test_route_batches_from_one_origin_cell_coalesce() -> None:
+    inner = _SlowMapsProvider()
+    provider = SingleFlightMapsProvider(
+        inner, SingleFlight("test-maps-routes", use_redis=False), route_geohash_precision=7
+    )
+    origins = iter([(22.28190, 114.15800), (22.28192, 114.15803)])
+    lock = threading.Lock()
+
+    def lookup() -> list:
+        with lock:
+            latitude, longitude = next(origins)
+        return provider.get_routes_batch(
+            origin_latitude=latitude,
+            origin_longitude=longitude,
+            destinations=[(22.30001, 114.17001), (22.31, 114.18)],
+            travel_mode="walking",
+        )
+
+    results = _run_concurrently(2, lookup)
+
+    assert len(inner.route_batches) == 1
+    assert results[0] == results[1]
+
+
+def test_cancelled_async_leader_still_completes_the_flight_for_followers() -> None:
+    group = SingleFlight("test-cancel-leader", use_redis=False)
+    calls: list[str] = []
+
+    async def slow_call() -> list[dict]:
+        calls.append("called")
+        await asyncio.sleep(0.1)
+        return [{"title": "result"}]
+
+    async def main() -> tuple:
+        leader = asyncio.create_task(group.ado("query", slow_call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(asyncio.wait_for(group.ado("query", slow_call), timeout=2))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        # A follower that gives up must not cancel the flight either.
+        impatient = asyncio.create_task(asyncio.wait_for(group.ado("query", slow_call), timeout=0.02))
+        results = await asyncio.gather(leader, follower, impatient, return_exceptions=True)
+        return results
+
+    leader_result, follower_result, impatient_result = asyncio.run(main())
+
+    assert isinstance(leader_result, asyncio.CancelledError)
+    assert follower_result == [{"title": "result"}]
+    assert isinstance(impatient_result, asyncio.TimeoutError)
+    assert calls == ["called"]
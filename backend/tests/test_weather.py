@@ -1,8 +1,13 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi.testclient import TestClient
 
 from app.api.routes import weather as weather_route
+from app.core.single_flight import SingleFlight
 from app.main import app
 from app.schemas.weather import WeatherData, WeatherResponse
+from app.services.weather_service import WeatherCache, WeatherService
 
 client = TestClient(app)
 
@@ -44,3 +49,81 @@ def test_weather_endpoint_validates_required_coordinates() -> None:
     response = client.get("/weather")
 
     assert response.status_code == 422
+
+
+class _CountingWeatherProvider:
+    provider_name = "open-meteo"
+
+    def __init__(self, *, source: str = "open-meteo", delay: float = 0.0) -> None:
+        self.calls: list[tuple[float, float]] = []
+        self.source = source
+        self.delay = delay
+
+    def get_current_weather(self, *, latitude: float, longitude: float, timezone: str = "auto") -> dict:
+        _ = timezone
+        self.calls.append((latitude, longitude))
+        time.sleep(self.delay)
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "temperature_c": 26.0,
+            "weather_code": 1,
+            "is_day": True,
+            "condition": "partly_cloudy" if self.source != "stub" else "unknown",
+            "source": self.source,
+        }
+
+
+class _WeatherRouter:
+    def __init__(self, provider) -> None:
+        self._provider = provider
+
+    def resolve_weather_provider(self):
+        return self._provider
+
+
+def test_weather_cache_serves_nearby_coordinates_from_one_grid_cell() -> None:
+    provider = _CountingWeatherProvider()
+    service = WeatherService(_WeatherRouter(provider), WeatherCache(use_redis=False))
+
+    first = service.get_current_weather(latitude=22.3193, longitude=114.1694)
+    second = service.get_current_weather(latitude=22.3080, longitude=114.1720)
+
+    assert provider.calls == [(22.3, 114.15)]
+    assert first.weather.latitude == 22.3193
+    assert second.weather.latitude == 22.3080
+    assert second.weather.condition == "partly_cloudy"
+
+
+def test_weather_cache_never_stores_degraded_stub_payloads() -> None:
+    provider = _CountingWeatherProvider(source="stub")
+    cache = WeatherCache(use_redis=False)
+    service = WeatherService(_WeatherRouter(provider), cache)
+
+    service.get_current_weather(latitude=22.3193, longitude=114.1694)
+    response = service.get_current_weather(latitude=22.3193, longitude=114.1694)
+
+    assert len(provider.calls) == 2
+    assert response.degraded is True
+    assert cache.stats()["size"] == 0
+
+
+def test_weather_cache_coalesces_concurrent_misses() -> None:
+    provider = _CountingWeatherProvider(delay=0.2)
+    cache = WeatherCache(use_redis=False, single_flight=SingleFlight("test-weather-cell", use_redis=False))
+    service = WeatherService(_WeatherRouter(provider), cache)
+
+    # Different coordinates in one grid cell share the flight.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(
+            executor.map(
+                lambda index: service.get_current_weather(
+                    latitude=22.28 + index * 0.001, longitude=114.16 - index * 0.001
+                ),
+                range(8),
+            )
+        )
+
+    assert len(provider.calls) == 1
+    assert cache.stats()["coalesced"] == 7
+    assert {response.weather.condition for response in responses} == {"partly_cloudy"}
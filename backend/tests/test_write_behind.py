@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.write_behind import WriteBehindQueue
+
+
+async def _wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached before timeout")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_memory_queue_persists_jobs_in_batches_and_records_lag() -> None:
+    batches: list[list[int]] = []
+
+    async def handler(jobs: list[dict]) -> None:
+        batches.append([job["n"] for job in jobs])
+
+    queue = WriteBehindQueue(
+        name="test_batches", handler=handler, backend="memory", batch_size=3, batch_wait_ms=50
+    )
+    for n in range(7):
+        await queue.aenqueue({"n": n})
+
+    await _wait_until(lambda: sum(len(batch) for batch in batches) == 7)
+    await queue.aclose()
+
+    assert sorted(n for batch in batches for n in batch) == list(range(7))
+    assert max(len(batch) for batch in batches) <= 3
+    snapshot = metrics.snapshot()
+    assert snapshot["observations"]["write_behind.test_batches.lag_seconds"]["count"] >= 7
+
+
+@pytest.mark.asyncio
+async def test_failing_job_is_retried_individually_then_dead_lettered() -> None:
+    persisted: list[int] = []
+
+    async def handler(jobs: list[dict]) -> None:
+        if any(job["n"] == 1 for job in jobs):
+            raise RuntimeError("poison job")
+        persisted.extend(job["n"] for job in jobs)
+
+    queue = WriteBehindQueue(
+        name="test_dead_letter",
+        handler=handler,
+        backend="memory",
+        batch_size=10,
+        batch_wait_ms=20,
+        max_attempts=3,
+        retry_backoff_seconds=0.01,
+    )
+    for n in range(3):
+        await queue.aenqueue({"n": n})
+
+    await _wait_until(lambda: len(queue.dead_letters) == 1)
+    await queue.aclose()
+
+    assert sorted(persisted) == [0, 2]
+    assert queue.dead_letters[0]["payload"] == {"n": 1}
+    assert queue.dead_letters[0]["attempts"] == 3
+    assert metrics.counter("write_behind.test_dead_letter.dead_lettered") == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_enqueue_failure_falls_back_to_in_process_buffer() -> None:
+    persisted: list[dict] = []
+
+    class _BrokenRedis:
+        async def xadd(self, *_args, **_kwargs):
+            raise ConnectionError("redis down")
+
+        async def xgroup_create(self, *_args, **_kwargs):
+            raise ConnectionError("redis down")
+
+    async def handler(jobs: list[dict]) -> None:
+        persisted.extend(jobs)
+
+    queue = WriteBehindQueue(
+        name="test_fallback",
+        handler=handler,
+        backend="redis",
+        batch_wait_ms=20,
+        retry_backoff_seconds=0.05,
+        redis_client_factory=_BrokenRedis,
+    )
+    await queue.aenqueue({"request_id": "r-1"})
+
+    await _wait_until(lambda: len(persisted) == 1)
+    await queue.aclose()
+
+    assert persisted == [{"request_id": "r-1"}]
+    assert metrics.counter("write_behind.test_fallback.fallback_enqueued") == 1